@@ -0,0 +1,243 @@
+"""
+Compiled read serializers.
+
+`Serializer.to_representation` walks every field through `get_attribute`,
+a None check and the field's `to_representation`, looking settings up
+again on each call. For hot read endpoints `compiled()` generates one
+Python function per serializer class (and sparse fieldset) instead, with
+the per-field work decided once:
+
+- plain model attributes are read directly (`obj.title`, or `row['title']`
+  for `values()` rows) and primary-key relations from their `*_id` column;
+- common field types are converted inline (`int(v)`, `str(v)`, ISO dates,
+  choice lookups, JSON passed through);
+- nested serializers are compiled recursively;
+- anything else (decimals, files, method fields, custom fields) still calls
+  the field's own `to_representation`, or its full DRF path.
+
+The output is the same as `serializer.data`, down to the rendered bytes;
+jobs/tests.py and users/tests.py check that for the serializers in use.
+Serializers that override `to_representation` are not compiled and fall
+back to DRF.
+
+    serializer = compiled(JobSerializer, **sparse_fields(request))
+    rows = queryset.values(*serializer.value_names)  # when not None
+    data = serializer.many(rows)
+"""
+import datetime
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone
+from rest_framework import fields as drf_fields, serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject, PrimaryKeyRelatedField
+from rest_framework.settings import api_settings
+
+# Compiled serializers kept, one per class and distinct sparse fieldset
+CACHE_SIZE = 256
+
+_STRING_FIELDS = (
+    drf_fields.CharField, drf_fields.EmailField, drf_fields.URLField, drf_fields.SlugField,
+)
+
+
+def _iso_datetime(field):
+    explicit_timezone = getattr(field, 'timezone', None)
+    if explicit_timezone is None and not settings.USE_TZ:
+        return None
+    represent = field.to_representation
+
+    def iso(value):
+        # Aware datetimes are the only case handled here; DRF does the rest
+        if value.__class__ is datetime.datetime and value.tzinfo is not None:
+            text = value.astimezone(explicit_timezone or timezone.get_current_timezone()).isoformat()
+            return text[:-6] + 'Z' if text.endswith('+00:00') else text
+        return represent(value)
+    return iso
+
+
+def _boolean(field):
+    represent = field.to_representation
+    return lambda value: value if value.__class__ is bool else represent(value)
+
+
+def _choice(field):
+    lookup = field.choice_strings_to_values
+    represent = field.to_representation
+    return lambda value: lookup.get(value, value) if value.__class__ is str and value else represent(value)
+
+
+def _converter(field):
+    """
+    (expression template, helper) for a field read from `{v}`: helper is
+    bound as `{h}` in the generated code. None when the field needs DRF.
+    """
+    kind = type(field)
+    if kind in _STRING_FIELDS:
+        return 'str({v})', None
+    if kind is drf_fields.IntegerField:
+        return 'int({v})', None
+    if kind is drf_fields.FloatField:
+        return 'float({v})', None
+    if kind is drf_fields.JSONField and not field.binary:
+        return '{v}', None
+    if kind is drf_fields.BooleanField:
+        return '{h}({v})', _boolean(field)
+    if kind is drf_fields.ChoiceField:
+        return '{h}({v})', _choice(field)
+    if kind is drf_fields.DateTimeField:
+        if getattr(field, 'format', api_settings.DATETIME_FORMAT) == drf_fields.ISO_8601:
+            iso = _iso_datetime(field)
+            if iso is not None:
+                return '{h}({v})', iso
+    if kind is drf_fields.DateField:
+        if getattr(field, 'format', api_settings.DATE_FORMAT) == drf_fields.ISO_8601:
+            return '{h}({v})', _iso_date(field)
+    return None
+
+
+def _iso_date(field):
+    represent = field.to_representation
+    return lambda value: value.isoformat() if value.__class__ is datetime.date else represent(value)
+
+
+def _generic(field):
+    """DRF's own per-field path, for fields that cannot be compiled"""
+    name = field.field_name
+
+    def represent(instance, ret):
+        try:
+            attribute = field.get_attribute(instance)
+        except SkipField:
+            return
+        check_for_none = attribute.pk if isinstance(attribute, PKOnlyObject) else attribute
+        ret[name] = None if check_for_none is None else field.to_representation(attribute)
+    return represent
+
+
+def _model_field(model, field):
+    """The concrete model field `field` reads, if it reads one directly"""
+    if model is None or field.source == '*' or '.' in field.source:
+        return None
+    if type(field).get_attribute not in (drf_fields.Field.get_attribute, PrimaryKeyRelatedField.get_attribute):
+        return None
+    try:
+        model_field = model._meta.get_field(field.source)
+    except FieldDoesNotExist:
+        return None
+    if not model_field.concrete or model_field.many_to_many:
+        return None
+    return model_field
+
+
+class CompiledSerializer:
+    """
+    Generated `to_representation` for one serializer instance's fields.
+    `value_names` lists the `values()` columns to fetch for the dict path,
+    or is None when some field needs model instances.
+    """
+
+    def __init__(self, serializer):
+        self.serializer = serializer
+        self.value_names = None
+        if type(serializer).to_representation is not serializers.Serializer.to_representation:
+            self.from_instance = serializer.to_representation
+            self.from_values = None
+            return
+        self.from_instance = self._compile(serializer, rows=False)
+        self.from_values = self._compile(serializer, rows=True)
+        if self.from_values is not None:
+            self.value_names = [field.source for field in serializer._readable_fields]
+
+    def _compile(self, serializer, rows):
+        """The generated function, or None when `rows` can't be served from values()"""
+        model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+        namespace = {}
+        lines = ['def represent(obj):', '    ret = {}']
+        for index, field in enumerate(serializer._readable_fields):
+            name = field.field_name
+            helper = f'_h{index}'
+            model_field = _model_field(model, field)
+            if model_field is None:
+                # Properties, methods, dotted sources, custom lookups: DRF's own path
+                if rows:
+                    return None
+                namespace[helper] = _generic(field)
+                lines.append(f'    {helper}(obj, ret)')
+                continue
+
+            source = field.source
+            if model_field.is_relation:
+                if isinstance(field, PrimaryKeyRelatedField) and field.pk_field is None:
+                    # values() gives the ID under the field name; instances carry it as *_id
+                    read = f'obj[{source!r}]' if rows else f'obj.{model_field.attname}'
+                    lines.append(f'    ret[{name!r}] = {read}')
+                    continue
+                if rows:
+                    return None
+                if not isinstance(field, serializers.Serializer):
+                    namespace[helper] = _generic(field)
+                    lines.append(f'    {helper}(obj, ret)')
+                    continue
+                namespace[helper] = CompiledSerializer(field).from_instance
+                expression = f'{helper}(v)'
+            elif rows and isinstance(field, drf_fields.FileField):
+                # values() gives the stored name, which DRF cannot turn into a URL
+                return None
+            else:
+                converter = _converter(field)
+                if converter is None:
+                    namespace[helper] = field.to_representation
+                    expression = f'{helper}(v)'
+                else:
+                    template, function = converter
+                    if function is not None:
+                        namespace[helper] = function
+                    expression = template.format(v='v', h=helper)
+            lines.append(f'    v = obj[{source!r}]' if rows else f'    v = obj.{source}')
+            lines.append(f'    ret[{name!r}] = None if v is None else {expression}')
+        lines.append('    return ret')
+        exec(compile('\n'.join(lines), f'<compiled {type(serializer).__name__}>', 'exec'), namespace)
+        return namespace['represent']
+
+    def to_representation(self, obj):
+        """Serialize a model instance or a `values()` row"""
+        if isinstance(obj, dict):
+            if self.from_values is None:
+                raise TypeError(f'{type(self.serializer).__name__} needs model instances, not values() rows')
+            return self.from_values(obj)
+        return self.from_instance(obj)
+
+    def many(self, objects):
+        return [self.to_representation(obj) for obj in objects]
+
+
+@lru_cache(maxsize=None)
+def _field_names(serializer_class):
+    return frozenset(serializer_class().fields)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _compiled(serializer_class, fields, exclude):
+    if fields is None and not exclude:
+        return CompiledSerializer(serializer_class())
+    return CompiledSerializer(serializer_class(fields=fields, exclude=exclude))
+
+
+def compiled(serializer_class, fields=None, exclude=None):
+    """
+    The compiled form of `serializer_class`, optionally for a sparse
+    fieldset (see api/sparse.py). Built once per class and fieldset.
+
+    Fieldsets come from the query string, so names the serializer does
+    not have are dropped before the cache is consulted: `?fields=title,x1`
+    and `?fields=title,x2` share an entry, and the cache stays bounded.
+    """
+    names = _field_names(serializer_class)
+    return _compiled(
+        serializer_class,
+        None if fields is None else frozenset(fields) & names,
+        frozenset(exclude or ()) & names,
+    )
@@ -0,0 +1,191 @@
+"""
+A per-process database connection pool.
+
+The pool is driver-agnostic: it is given functions to open, health-check,
+reset and close a connection (see api/db/postgresql/base.py for psycopg2). It
+keeps at most `max_size` connections open, in use or idle. When all of
+them are busy, `getconn()` waits up to `timeout` seconds.
+
+Idle connections are handed out most recently used first, so that extra
+connections from a burst sit unused and are closed after `idle_timeout`
+(keeping `min_size`). A connection older than `max_lifetime` is closed
+instead of being reused. With `check` set, each idle connection is
+checked before being handed out, and broken ones are replaced.
+
+Connections never cross a fork. A pool created in another process is
+abandoned, and its connections are kept referenced but never closed:
+closing them, even by garbage collection, would end the parent's
+sessions. Close pools before forking (api/warmup.py does) so that there
+is nothing to inherit.
+"""
+import os
+import threading
+import time
+from collections import Counter, deque
+
+DEFAULTS = {
+    'max_size': 10,
+    'min_size': 0,
+    'timeout': 30.0,
+    'idle_timeout': 300.0,
+    'max_lifetime': 3600.0,
+    'check': True,
+}
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the pool's timeout"""
+
+
+def _always(connection):
+    return True
+
+
+class ConnectionPool:
+    def __init__(self, connect, health_check=_always, reset=_always, close=None, **options):
+        unknown = set(options) - set(DEFAULTS)
+        if unknown:
+            raise TypeError(f"Unknown pool options: {', '.join(sorted(unknown))}")
+        options = {**DEFAULTS, **options}
+        self.max_size = int(options['max_size'])
+        self.min_size = min(int(options['min_size']), self.max_size)
+        self.timeout = float(options['timeout'])
+        self.idle_timeout = float(options['idle_timeout'])
+        self.max_lifetime = float(options['max_lifetime'])
+        self._connect = connect
+        self._check = health_check if options['check'] else _always
+        self._reset = reset
+        self._close = close or (lambda connection: connection.close())
+
+        self.pid = os.getpid()
+        self.stats = Counter()
+        self._condition = threading.Condition()
+        self._idle = deque()  # (connection, opened_at, returned_at), most recent on the right
+        self._opened_at = {}  # id(connection) -> opened_at for connections in use
+        self._size = 0
+        self._closed = False
+        self._inherited = []
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def idle(self):
+        return len(self._idle)
+
+    @property
+    def forked(self):
+        """True in a child process of the one that created the pool"""
+        return os.getpid() != self.pid
+
+    def getconn(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            connection, opened_at = self._acquire(deadline)
+            if connection is None:
+                return self._open()
+            if self._check(connection):
+                self.stats['reused'] += 1
+                with self._condition:
+                    self._opened_at[id(connection)] = opened_at
+                return connection
+            self.stats['failed_checks'] += 1
+            self._discard(connection)
+
+    def putconn(self, connection):
+        with self._condition:
+            opened_at = self._opened_at.pop(id(connection))
+        now = time.monotonic()
+        keep = (
+            not self.forked and not self._closed
+            and now - opened_at < self.max_lifetime and self._reset(connection)
+        )
+        if not keep:
+            self._discard(connection)
+            return
+        with self._condition:
+            self._idle.append((connection, opened_at, now))
+            self._condition.notify()
+
+    def close(self):
+        """Close every idle connection; connections in use are closed when returned"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for connection, _, _ in idle:
+            self._close_quietly(connection)
+
+    # --- Internals ---
+
+    def _acquire(self, deadline):
+        """(idle connection, opened_at), or (None, None) once a slot for a new one is reserved"""
+        with self._condition:
+            while True:
+                expired = self._expire(time.monotonic())
+                if expired:
+                    break
+                if self._idle:
+                    connection, opened_at, _ = self._idle.pop()
+                    return connection, opened_at
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats['timeouts'] += 1
+                    raise PoolTimeout(f'No free connection within {self.timeout}s ({self.max_size} in use)')
+                self.stats['waits'] += 1
+                self._condition.wait(remaining)
+        # Close what expired outside the lock, then try again
+        for connection in expired:
+            self._close_quietly(connection)
+        return self._acquire(deadline)
+
+    def _expire(self, now):
+        """Remove idle connections past idle_timeout or max_lifetime; caller holds the lock"""
+        expired = []
+        kept = deque()
+        # Oldest returns are on the left; the newest min_size idle connections survive idle_timeout
+        for index, (connection, opened_at, returned_at) in enumerate(self._idle):
+            protected = len(self._idle) - index <= self.min_size
+            if now - opened_at >= self.max_lifetime or (not protected and now - returned_at >= self.idle_timeout):
+                expired.append(connection)
+            else:
+                kept.append((connection, opened_at, returned_at))
+        if expired:
+            self._idle = kept
+            self._size -= len(expired)
+            self.stats['expired'] += len(expired)
+            self._condition.notify(len(expired))
+        return expired
+
+    def _open(self):
+        try:
+            connection = self._connect()
+        except BaseException:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        self.stats['opened'] += 1
+        with self._condition:
+            self._opened_at[id(connection)] = time.monotonic()
+        return connection
+
+    def _discard(self, connection):
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+        if self.forked:
+            self._inherited.append(connection)
+        else:
+            self._close_quietly(connection)
+
+    def _close_quietly(self, connection):
+        self.stats['closed'] += 1
+        try:
+            self._close(connection)
+        except Exception:
+            pass
@@ -0,0 +1,123 @@
+"""
+PostgreSQL backend with a per-process connection pool for psycopg2.
+
+Django's own pooling (OPTIONS['pool']) needs psycopg 3. This backend
+pools psycopg2 connections with api/db/pool.py instead. It is configured
+by the database's POOL dict, which api.db.database_config fills from
+`?pool=true&pool_max_size=...` on DATABASE_URL.
+
+Django still opens and closes the connection around every request
+(CONN_MAX_AGE must stay 0). A "close" returns the connection to the pool,
+and the next "connect" reuses it, which skips the TCP, TLS and
+authentication round trips.
+"""
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import OperationalError
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+from psycopg2 import extensions
+
+from api.db.pool import ConnectionPool, PoolTimeout
+
+_pools = {}
+_pools_lock = threading.Lock()
+# Pools inherited over a fork: kept alive so their sockets are never closed here
+_abandoned = []
+
+
+def _check(connection):
+    if connection.closed:
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except base.Database.Error:
+        return False
+    return True
+
+
+def _reset(connection):
+    """Make a returned connection reusable; False when it should be closed"""
+    if connection.closed:
+        return False
+    status = connection.info.transaction_status
+    if status == extensions.TRANSACTION_STATUS_IDLE:
+        return True
+    if status in (extensions.TRANSACTION_STATUS_INTRANS, extensions.TRANSACTION_STATUS_INERROR):
+        try:
+            connection.rollback()
+        except base.Database.Error:
+            return False
+        return True
+    # A query still running or an unknown state: not worth rescuing
+    return False
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    @property
+    def pool(self):
+        # Django's psycopg 3 pool; the psycopg2 pool is connection_pool()
+        return None
+
+    def connection_pool(self, conn_params):
+        """This process's pool for these connection parameters"""
+        options = self.settings_dict.get('POOL')
+        if options is None or self.alias == base.NO_DB_ALIAS:
+            return None
+        if self.settings_dict.get('CONN_MAX_AGE', 0) != 0:
+            raise ImproperlyConfigured('Connection pooling needs CONN_MAX_AGE = 0.')
+        with _pools_lock:
+            pool, params = _pools.get(self.alias, (None, None))
+            # A fork, or changed settings (the test database), needs a new pool
+            if pool is None or pool.forked or params != conn_params:
+                if pool is not None:
+                    if pool.forked:
+                        _abandoned.append(pool)
+                    else:
+                        pool.close()
+                connect = super().get_new_connection
+                pool = ConnectionPool(
+                    lambda: connect(conn_params), health_check=_check, reset=_reset, **options,
+                )
+                _pools[self.alias] = pool, conn_params
+        return pool
+
+    def get_new_connection(self, conn_params):
+        pool = self.connection_pool(conn_params)
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        try:
+            connection = pool.getconn()
+        except PoolTimeout as error:
+            raise OperationalError(str(error)) from error
+        level = self.settings_dict['OPTIONS'].get('isolation_level')
+        self.isolation_level = IsolationLevel.READ_COMMITTED if level is None else IsolationLevel(level)
+        self._connection_pool = pool
+        return connection
+
+    def _close(self):
+        pool = getattr(self, '_connection_pool', None)
+        if self.connection is None or pool is None:
+            return super()._close()
+        self._connection_pool = None
+        with self.wrap_database_errors:
+            pool.putconn(self.connection)
+        # Connection can no longer be used.
+        self.connection = None
+
+    def close_pool(self):
+        with _pools_lock:
+            pool, _ = _pools.pop(self.alias, (None, None))
+        if pool is not None:
+            if pool.forked:
+                _abandoned.append(pool)
+            else:
+                pool.close()
+
+    def close_if_health_check_failed(self):
+        if self.settings_dict.get('POOL') is not None:
+            # The pool checks connections as it hands them out
+            return
+        return super().close_if_health_check_failed()
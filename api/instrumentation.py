@@ -0,0 +1,285 @@
+"""
+Request-level performance instrumentation.
+
+`PerformanceMiddleware` measures every request and records, per resolved
+URL name: wall time, DB time, query count, duplicate queries, render
+(serialization) time and response size. The numbers are kept in a
+per-process registry that `metrics_view` exposes in Prometheus text format,
+and are echoed back to the client as a `Server-Timing` header.
+
+Views declare how many queries they are allowed with `query_budget`. When
+`QUERY_BUDGET_STRICT` is on (the test runner in api/test_runner.py turns it
+on) a request that goes over its budget raises `QueryBudgetExceeded`,
+failing the test; otherwise it is logged.
+"""
+import hmac
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in strict mode when a view runs more queries than it declared"""
+
+
+def query_budget(max_queries=None, **per_method):
+    """
+    Declare the number of queries a view may run per request.
+
+    Works on function views and on class-based views (decorate the class):
+
+        @query_budget(2)
+        class UserProfileView(APIView): ...
+
+        @query_budget(get=2, put=4)
+        class EmployerProfileView(APIView): ...
+    """
+    budget = {method.upper(): count for method, count in per_method.items()}
+    if max_queries is not None:
+        budget['*'] = max_queries
+
+    def decorator(view):
+        view.query_budget = budget
+        return view
+    return decorator
+
+
+def get_query_budget(resolver_match, method):
+    """Return the declared budget for the resolved view and method, or None"""
+    func = resolver_match.func
+    budget = getattr(func, 'query_budget', None)
+    if budget is None:
+        view_class = getattr(func, 'view_class', None) or getattr(func, 'cls', None)
+        budget = getattr(view_class, 'query_budget', None)
+    if not budget:
+        return None
+    return budget.get(method, budget.get('*'))
+
+
+# --- Per-request collection ---
+
+class RequestMetrics:
+    """
+    Collects DB timings for a single request. Installed as a
+    `connection.execute_wrapper`, so it works with DEBUG off.
+    """
+
+    def __init__(self):
+        self.db_time = 0.0
+        self.queries = 0
+        self.statements = Counter()
+        self.render_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+            self.statements[(sql, repr(params))] += 1
+
+    @property
+    def duplicate_queries(self):
+        """Queries that repeated an earlier statement with identical params"""
+        return sum(count - 1 for count in self.statements.values())
+
+
+# --- Process-wide registry ---
+
+class MetricsRegistry:
+    """
+    Thread-safe in-process aggregation of request metrics, keyed by
+    (view, method). Each gunicorn worker keeps its own registry; Prometheus
+    sums them when scraping every worker.
+    """
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, view, method, status, wall, db_time, queries, duplicates, render_time, size):
+        with self._lock:
+            series = self._series.get((view, method))
+            if series is None:
+                series = self._series[(view, method)] = {
+                    'count': 0, 'statuses': Counter(), 'buckets': [0] * len(self.buckets),
+                    'wall': 0.0, 'db': 0.0, 'render': 0.0,
+                    'queries': 0, 'duplicates': 0, 'bytes': 0, 'max_queries': 0,
+                }
+            series['count'] += 1
+            series['statuses'][status] += 1
+            for index, bound in enumerate(self.buckets):
+                if wall <= bound:
+                    series['buckets'][index] += 1
+            series['wall'] += wall
+            series['db'] += db_time
+            series['render'] += render_time
+            series['queries'] += queries
+            series['duplicates'] += duplicates
+            series['bytes'] += size
+            series['max_queries'] = max(series['max_queries'], queries)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                key: dict(value, statuses=Counter(value['statuses']), buckets=list(value['buckets']))
+                for key, value in self._series.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def render_prometheus(self):
+        """Render the registry in the Prometheus text exposition format"""
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        snapshot = sorted(self.snapshot().items())
+
+        header('workzone_http_requests_total', 'counter', 'Requests served, by view, method and status.')
+        for (view, method), series in snapshot:
+            for status, count in sorted(series['statuses'].items()):
+                lines.append(f'workzone_http_requests_total{{view="{view}",method="{method}",status="{status}"}} {count}')
+
+        header('workzone_http_request_duration_seconds', 'histogram', 'Wall time spent serving requests.')
+        for (view, method), series in snapshot:
+            labels = f'view="{view}",method="{method}"'
+            for bound, count in zip(self.buckets, series['buckets']):
+                lines.append(f'workzone_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'workzone_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {series["count"]}')
+            lines.append(f'workzone_http_request_duration_seconds_sum{{{labels}}} {series["wall"]:.6f}')
+            lines.append(f'workzone_http_request_duration_seconds_count{{{labels}}} {series["count"]}')
+
+        counters = (
+            ('workzone_db_duration_seconds_total', 'db', 'Time spent in database queries.', '.6f'),
+            ('workzone_render_duration_seconds_total', 'render', 'Time spent rendering (serializing) responses.', '.6f'),
+            ('workzone_db_queries_total', 'queries', 'Database queries executed.', 'd'),
+            ('workzone_db_duplicate_queries_total', 'duplicates', 'Queries repeating an identical earlier query in the same request.', 'd'),
+            ('workzone_http_response_bytes_total', 'bytes', 'Response body bytes sent.', 'd'),
+        )
+        for name, key, help_text, fmt in counters:
+            header(name, 'counter', help_text)
+            for (view, method), series in snapshot:
+                lines.append(f'{name}{{view="{view}",method="{method}"}} {series[key]:{fmt}}')
+
+        header('workzone_db_queries_max', 'gauge', 'Most queries seen in a single request.')
+        for (view, method), series in snapshot:
+            lines.append(f'workzone_db_queries_max{{view="{view}",method="{method}"}} {series["max_queries"]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+# --- Middleware ---
+
+class PerformanceMiddleware:
+    """
+    Times each request and records it in the metrics registry.
+
+    Should sit at the top of `MIDDLEWARE` so the wall time covers the whole
+    stack.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        request._performance_metrics = metrics
+
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(metrics))
+            response = self.get_response(request)
+        wall = time.perf_counter() - start
+
+        resolver_match = getattr(request, 'resolver_match', None)
+        view = resolver_match.view_name if resolver_match else 'unresolved'
+        size = 0 if response.streaming else len(response.content)
+        duplicates = metrics.duplicate_queries
+
+        registry.observe(
+            view, request.method, response.status_code, wall,
+            metrics.db_time, metrics.queries, duplicates, metrics.render_time, size,
+        )
+
+        if getattr(settings, 'SERVER_TIMING_HEADER', True):
+            response['Server-Timing'] = ', '.join([
+                f'total;dur={wall * 1000:.2f}',
+                f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries"',
+                f'render;dur={metrics.render_time * 1000:.2f}',
+            ])
+
+        threshold = getattr(settings, 'DUPLICATE_QUERY_WARNING_THRESHOLD', 3)
+        if duplicates >= threshold:
+            logger.warning(
+                "%s %s ran %d duplicate queries (%d total); possible N+1",
+                request.method, view, duplicates, metrics.queries,
+            )
+
+        if resolver_match is not None:
+            budget = get_query_budget(resolver_match, request.method)
+            if budget is not None and metrics.queries > budget:
+                message = (
+                    f"{request.method} {view} ran {metrics.queries} queries, "
+                    f"over its budget of {budget}"
+                )
+                if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                    raise QueryBudgetExceeded(message)
+                logger.warning(message)
+
+        return response
+
+    def process_template_response(self, request, response):
+        """Time the render step of DRF/template responses"""
+        metrics = getattr(request, '_performance_metrics', None)
+        if metrics is None:
+            return response
+
+        render = response.render
+
+        def timed_render():
+            start = time.perf_counter()
+            try:
+                return render()
+            finally:
+                metrics.render_time += time.perf_counter() - start
+
+        response.render = timed_render
+        return response
+
+
+# --- Metrics endpoint ---
+
+def metrics_view(request):
+    """
+    Expose the registry to Prometheus, which sends `Authorization: Bearer
+    <METRICS_TOKEN>`, or to a staff user signed in to the admin. The client
+    address is not trusted: behind a proxy every request comes from it.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    scheme, _, credentials = request.META.get('HTTP_AUTHORIZATION', '').partition(' ')
+    authorized = bool(token) and scheme.lower() == 'bearer' and hmac.compare_digest(credentials.encode(), token.encode())
+    user = getattr(request, 'user', None)
+    if not authorized and not (user and user.is_staff):
+        return HttpResponseForbidden()
+    return HttpResponse(registry.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from api.schema import build, schema_dir
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema files served at /swagger.json and /swagger.yaml (run on deploy)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', help='Where to write the files (default: OPENAPI_SCHEMA_DIR)')
+
+    def handle(self, *args, **options):
+        directory = options['output_dir'] or schema_dir()
+        manifest = build(directory)
+        for format, entry in manifest['files'].items():
+            self.stdout.write(f"{format[1:].upper()}: {entry['name']}")
+        self.stdout.write(self.style.SUCCESS(f"Schema {manifest['version']} written to {directory}"))
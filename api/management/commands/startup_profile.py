@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a worker does before serving: load the WSGI app and the URLconf
+BOOT = """
+import os
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', {settings_module!r})
+from api.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+if {warmup!r}:
+    from api.warmup import warmup
+    warmup(database=False)
+"""
+
+
+def parse_importtime(output):
+    """[(module, self_us, cumulative_us, depth)] from `python -X importtime` stderr"""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        module = name.lstrip()
+        rows.append((module, int(self_us), int(cumulative_us), (len(name) - len(module) - 1) // 2))
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Report which imports a worker spends its boot time on (python -X importtime)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=25, help='Rows per table')
+        parser.add_argument('--warmup', action='store_true', help='Also run api.warmup before exiting')
+
+    def handle(self, *args, **options):
+        code = BOOT.format(settings_module=settings.SETTINGS_MODULE, warmup=options['warmup'])
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            cwd=settings.BASE_DIR, env=os.environ.copy(), capture_output=True, text=True,
+        )
+        if process.returncode:
+            raise CommandError(process.stderr.strip().splitlines()[-1])
+        rows = parse_importtime(process.stderr)
+        limit = options['limit']
+
+        total = sum(cumulative for _, _, cumulative, depth in rows if depth == 0)
+        self.stdout.write(f"{len(rows)} modules imported in {total / 1000:.1f}ms\n")
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Slowest imports (cumulative, including what they import)'))
+        for module, _, cumulative, depth in sorted(rows, key=lambda row: -row[2])[:limit]:
+            self.stdout.write(f"  {cumulative / 1000:8.1f}ms  {'  ' * min(depth, 8)}{module}")
+
+        packages = defaultdict(lambda: [0, 0])
+        for module, self_us, _, _ in rows:
+            package = packages[module.split('.')[0]]
+            package[0] += self_us
+            package[1] += 1
+        self.stdout.write(self.style.MIGRATE_HEADING('\nTime by top-level package (self time)'))
+        for package, (self_us, count) in sorted(packages.items(), key=lambda item: -item[1][0])[:limit]:
+            self.stdout.write(f"  {self_us / 1000:8.1f}ms  {package} ({count} modules)")
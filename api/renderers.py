@@ -0,0 +1,58 @@
+"""
+Compact renderers for list responses.
+
+Both are opt-in through content negotiation (`Accept:` header or
+`?format=`) and turn a list of objects, bare or under a paginated
+`results` key, into columns plus rows so field names are sent once per
+page instead of once per object:
+
+    {"count": 2, ..., "results": {"columns": ["id", "title"], "rows": [[1, "A"], [2, "B"]]}}
+
+- `CompactJSONRenderer`: `?format=compact`, application/vnd.workzone.compact+json
+- `MessagePackRenderer`: `?format=msgpack`, application/msgpack; needs the
+  optional `msgpack` package and is only enabled when it is installed.
+
+Anything that is not a list of objects (errors, detail views) is rendered
+unchanged.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def columnar(data):
+    """Rewrite a list of dicts (bare or under `results`) as columns and rows"""
+    if isinstance(data, dict) and isinstance(data.get('results'), list):
+        return {**data, 'results': columnar(data['results'])}
+    if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+        return data
+    columns = {}
+    for item in data:
+        for key in item:
+            columns.setdefault(key, None)
+    return {'columns': list(columns), 'rows': [[item.get(key) for key in columns] for item in data]}
+
+
+class CompactJSONRenderer(JSONRenderer):
+    media_type = 'application/vnd.workzone.compact+json'
+    format = 'compact'
+    compact = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(columnar(data), accepted_media_type, renderer_context)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # Serializers already give strings for dates and decimals; str() covers lazy text
+        return msgpack.packb(columnar(data), default=str)
@@ -0,0 +1,205 @@
+"""
+Prebuilt OpenAPI schema.
+
+Generating the schema introspects every view and serializer, so it is done
+once per deploy with `manage.py build_schema`. The command writes
+`openapi.<hash>.json` and `.yaml` to OPENAPI_SCHEMA_DIR, each with a
+gzipped copy, then points `manifest.json` at them and removes older builds. `/swagger.json` and
+`/swagger.yaml` serve those files with an ETag and
+`Cache-Control: public, max-age=OPENAPI_SCHEMA_MAX_AGE`, gzipped when the
+client accepts it. The manifest is re-read when it changes, so a new build
+is picked up without a restart.
+
+Without a build the endpoints generate the schema live in DEBUG and
+return 404 otherwise. The Swagger UI and ReDoc pages load the prebuilt
+file.
+
+drf_yasg is imported on first use, not when the URLconf loads: most
+workers never serve a schema page.
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+from functools import cache
+from pathlib import Path
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import permissions
+
+MANIFEST = 'manifest.json'
+DEFAULT_MAX_AGE = 60 * 60 * 24
+FORMATS = {
+    '.json': ('application/json', 'OpenAPICodecJson'),
+    '.yaml': ('application/yaml', 'OpenAPICodecYaml'),
+}
+
+
+@cache
+def info():
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title="WorkZone API",
+        default_version='v1',
+        description="A comprehensive job portal API for connecting employers and job seekers",
+        terms_of_service="https://www.workzone.com/terms/",
+        contact=openapi.Contact(email="support@workzone.com"),
+        license=openapi.License(name="MIT License"),
+    )
+
+
+# Swagger Schema View
+@cache
+def schema_view():
+    from drf_yasg.views import get_schema_view
+
+    return get_schema_view(
+        info(),
+        public=True,
+        permission_classes=(permissions.AllowAny,),
+    )
+
+
+@cache
+def _view(renderer):
+    if renderer is None:
+        return schema_view().without_ui(cache_timeout=0)
+    return schema_view().with_ui(renderer, cache_timeout=0)
+
+
+def schema_dir():
+    return Path(getattr(settings, 'OPENAPI_SCHEMA_DIR', Path(settings.BASE_DIR) / 'schema'))
+
+
+# --- Building ---
+
+def build(directory=None):
+    """Generate the schema and write the artifacts; returns the manifest"""
+    directory = Path(directory or schema_dir())
+    directory.mkdir(parents=True, exist_ok=True)
+    from drf_yasg import codecs
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    schema = OpenAPISchemaGenerator(info()).get_schema(request=None, public=True)
+    manifest = {'version': schema.info.version, 'files': {}}
+    for format, (content_type, codec_name) in FORMATS.items():
+        body = getattr(codecs, codec_name)(validators=[]).encode(schema)
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        name = f'openapi.{digest}{format}'
+        (directory / name).write_bytes(body)
+        # mtime=0 keeps the compressed bytes identical across builds
+        (directory / f'{name}.gz').write_bytes(gzip.compress(body, compresslevel=9, mtime=0))
+        manifest['files'][format] = {'name': name, 'etag': digest, 'content_type': content_type}
+
+    # Swap the manifest in atomically so readers never see a partial build
+    tmp = directory / f'{MANIFEST}.tmp'
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True) + '\n')
+    os.replace(tmp, directory / MANIFEST)
+
+    current = {entry['name'] for entry in manifest['files'].values()}
+    for path in directory.glob('openapi.*'):
+        if path.name.removesuffix('.gz') not in current:
+            path.unlink()
+    return manifest
+
+
+# --- Serving ---
+
+class SchemaArtifacts:
+    """The built files, loaded into memory and reloaded when the manifest changes"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._files = {}
+
+    def get(self, format):
+        path = schema_dir() / MANIFEST
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        stamp = (str(path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if stamp != self._stamp:
+                self._files = self._load(path)
+                self._stamp = stamp
+            return self._files.get(format)
+
+    def _load(self, path):
+        manifest = json.loads(path.read_text())
+        files = {}
+        for format, entry in manifest['files'].items():
+            body = (path.parent / entry['name']).read_bytes()
+            files[format] = {
+                **entry,
+                'body': body,
+                'gzip': (path.parent / f"{entry['name']}.gz").read_bytes(),
+            }
+        return files
+
+
+artifacts = SchemaArtifacts()
+
+
+def _accepts_gzip(request):
+    """Whether Accept-Encoding gives gzip, or "*" when gzip is not listed, a q-value above 0"""
+    qualities = {}
+    for item in request.headers.get('Accept-Encoding', '').split(','):
+        coding, *params = (part.strip() for part in item.split(';'))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding:
+            qualities[coding.lower()] = quality
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
+
+
+def _none_match(request, etag):
+    """If-None-Match lists `etag` or is "*"; weak comparison, as the RFC asks for this header"""
+    tags = parse_etags(request.headers.get('If-None-Match', ''))
+    return '*' in tags or etag in (tag.removeprefix('W/') for tag in tags)
+
+
+def schema_file_view(request, format):
+    """Serve a prebuilt schema file; generate it live only in DEBUG"""
+    if format not in FORMATS:
+        raise Http404
+    artifact = artifacts.get(format)
+    if artifact is None:
+        if settings.DEBUG:
+            return _view(None)(request, format=format)
+        raise Http404("The API schema has not been built; run `manage.py build_schema`.")
+
+    compressed = _accepts_gzip(request)
+    etag = '"{}{}"'.format(artifact['etag'], '-gzip' if compressed else '')
+    if _none_match(request, etag):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(artifact['gzip'] if compressed else artifact['body'],
+                                content_type=artifact['content_type'])
+        if compressed:
+            response['Content-Encoding'] = 'gzip'
+    response['ETag'] = etag
+    max_age = getattr(settings, 'OPENAPI_SCHEMA_MAX_AGE', DEFAULT_MAX_AGE)
+    response['Cache-Control'] = f'public, max-age={max_age}'
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def swagger_ui_view(request):
+    return _view('swagger')(request)
+
+
+def redoc_view(request):
+    return _view('redoc')(request)
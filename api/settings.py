@@ -1,14 +1,16 @@
 import os
+import sys
+from importlib.util import find_spec
 from dotenv import load_dotenv
-load_dotenv()
-import dj_database_url
-from rest_framework.permissions import IsAuthenticated
 
 from pathlib import Path
 from datetime import timedelta
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# An explicit path skips python-dotenv's search up the call stack
+load_dotenv(BASE_DIR / '.env')
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
@@ -19,6 +21,8 @@ SECRET_KEY = str(os.getenv('SECRET_KEY'))
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
 ALLOWED_HOSTS = []
 
 
@@ -36,17 +40,26 @@ INSTALLED_APPS = [
     #localapps
     'users.apps.UsersConfig',
     'jobs.apps.JobsConfig',
+    'tasks.apps.TasksConfig',
+    'webhooks.apps.WebhooksConfig',
+    # Project-level management commands (build_schema)
+    'api',
 
     #third party apps
     'rest_framework',
     'rest_framework_simplejwt',
     'rest_framework.authtoken',
     'rest_framework_simplejwt.token_blacklist',
-    'drf_yasg',
 
 ]
 
+# drf_yasg is only needed by the schema pages (see api/schema.py). Its
+# templates and static files are found by path rather than as an installed
+# app, so workers don't import it (and pkg_resources) at boot.
+DRF_YASG_DIR = Path(find_spec('drf_yasg').origin).parent
+
 MIDDLEWARE = [
+    'api.instrumentation.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -58,10 +71,99 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'api.urls'
 
+# Performance instrumentation (see api/instrumentation.py)
+SERVER_TIMING_HEADER = True
+DUPLICATE_QUERY_WARNING_THRESHOLD = 3
+# Prometheus scrapes /metrics with `Authorization: Bearer <METRICS_TOKEN>`; unset, only staff can read it
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+# Raise instead of logging when a view runs more queries than its @query_budget;
+# `manage.py test` always runs strict (see TEST_RUNNER)
+QUERY_BUDGET_STRICT = os.getenv('QUERY_BUDGET_STRICT') == '1'
+TEST_RUNNER = 'api.test_runner.TestRunner'
+
+# Autocomplete (see jobs/autocomplete.py): searches older than this many days no longer count towards popularity
+AUTOCOMPLETE_SEARCH_DAYS = 90
+
+# Background tasks (see tasks/runner.py); run workers with `manage.py run_tasks`
+TASK_CHUNK_SIZE = 1000
+# Seconds without a heartbeat before another worker takes a running task over
+TASK_STALE_AFTER = 600
+
+# Personal data exports (see users/export.py); download links and files expire after this many seconds
+PERSONAL_EXPORT_MAX_AGE = 7 * 24 * 3600
+
+# Outbound webhooks (see webhooks/dispatch.py); run workers with `manage.py run_webhooks`
+WEBHOOK_TIMEOUT = 10
+WEBHOOK_MAX_ATTEMPTS = 8
+# Endpoints on loopback and private addresses are refused outside development
+WEBHOOK_ALLOW_PRIVATE_HOSTS = DEBUG or TESTING
+
+# Admin changelists use the planner's row estimate above this many rows (see api/admin_performance.py)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 100_000
+
+# Shared cache: per-process memory by default; set REDIS_URL (needs the
+# `redis` package) so processes share bookmarks, facet versions and job pages
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+if os.getenv('REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('REDIS_URL'),
+    }
+
+# Public job list and detail payloads (see jobs/cache.py); times in seconds.
+# Version bumps only reach other processes through a shared CACHES backend:
+# with LocMemCache, run a single process or accept FRESH + STALE seconds of
+# old payloads. Tests roll back instead of committing, so nothing is cached
+# under test; jobs.tests.TieredCacheTests sets its own times.
+JOB_CACHE = {
+    'LOCAL_SIZE': 1024,
+    'LOCAL_TTL': 5,
+    'VERSION_TTL': 1,
+    'FRESH': 0 if TESTING else 30,
+    'STALE': 0 if TESTING else 120,
+    'LOCK_TIMEOUT': 5,
+}
+# Cached bookmark arrays (see jobs/bookmarks.py), in seconds. A write only clears
+# the cache it can reach, so per-process copies are kept just briefly.
+BOOKMARK_CACHE_TIMEOUT = 60 * 60 if os.getenv('REDIS_URL') else 5
+
+# Prebuilt OpenAPI schema (see api/schema.py); run `manage.py build_schema` on deploy
+OPENAPI_SCHEMA_DIR = BASE_DIR / 'schema'
+OPENAPI_SCHEMA_MAX_AGE = 60 * 60 * 24
+# The documentation pages load the prebuilt file instead of regenerating it
+SWAGGER_SETTINGS = {'SPEC_URL': ('schema-json', {'format': '.json'})}
+REDOC_SETTINGS = {'SPEC_URL': ('schema-json', {'format': '.json'})}
+
+# Estimated text similarity at which a new posting is flagged as a repost (see jobs/dedupe.py)
+JOB_DUPLICATE_THRESHOLD = 0.8
+
+# USD per unit of currency for salary filters (see jobs/salary.py).
+# Run `manage.py normalize_salaries` after editing.
+SALARY_RATES_TO_USD = {
+    'USD': '1',
+    'EUR': '1.08',
+    'GBP': '1.27',
+    'CAD': '0.73',
+    'AUD': '0.66',
+    'CHF': '1.13',
+    'JPY': '0.0067',
+    'INR': '0.012',
+    'AED': '0.2723',
+    'ZAR': '0.055',
+    'NGN': '0.00065',
+    'KES': '0.0077',
+    'GHS': '0.064',
+    'RWF': '0.00073',
+}
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
+        'DIRS': [DRF_YASG_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -86,6 +188,11 @@ DATABASES = {
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
+# A server database from DATABASE_URL. For Postgres, add `?pool=true` to
+# pool connections per process (see api/db/__init__.py for the options).
+if os.getenv('DATABASE_URL'):
+    from api.db import database_config
+    DATABASES['default'] = database_config(os.getenv('DATABASE_URL'))
 
 
 # Password validation
@@ -123,10 +230,21 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.1/howto/static-files/
 
 STATIC_URL = 'static/'
+STATICFILES_DIRS = [DRF_YASG_DIR / 'static']
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    # Personal data exports: kept outside MEDIA_ROOT so they are never served publicly
+    'exports': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        'OPTIONS': {'location': BASE_DIR / 'exports'},
+    },
+}
+
 
 #Email Settings
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -149,8 +267,16 @@ SIMPLE_JWT = {
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+    ),
+    # Columnar list formats are opt-in with ?format= (see api/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'api.renderers.CompactJSONRenderer',
+    ],
 }
+if find_spec('msgpack'):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('api.renderers.MessagePackRenderer')
 
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
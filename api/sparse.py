@@ -0,0 +1,71 @@
+"""
+Sparse fieldsets for read endpoints.
+
+`?fields=id,title` keeps only the named fields of each object and
+`?exclude=description` drops fields; both take comma-separated names and
+combine. The primary key is always kept. Serializers opt in with
+`SparseFieldsetMixin` and views pass the selection along:
+
+    JobSerializer(page, many=True, **sparse_fields(request))
+
+Only GET and HEAD are narrowed, so writes always validate every field.
+
+`sparse_queryset` narrows the SQL to match with `only()`, so a list that
+asks for `id,title` does not fetch `description` at all.
+"""
+from django.core.exceptions import FieldDoesNotExist
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def _names(value):
+    return {name.strip() for name in value.split(',') if name.strip()} if value else set()
+
+
+def requested_fields(request):
+    """(fields to keep or None for all, fields to drop) from the query string"""
+    if request is None or request.method not in SAFE_METHODS:
+        return None, set()
+    return _names(request.query_params.get('fields')) or None, _names(request.query_params.get('exclude'))
+
+
+def sparse_fields(request):
+    """Serializer keyword arguments for the request's sparse fieldset"""
+    fields, exclude = requested_fields(request)
+    return {'fields': fields, 'exclude': exclude}
+
+
+class SparseFieldsetMixin:
+    def __init__(self, *args, fields=None, exclude=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        exclude = set(exclude or ())
+        pk_name = self.Meta.model._meta.pk.name
+        for name in list(self.fields):
+            if name == pk_name:
+                continue
+            if (fields is not None and name not in fields) or name in exclude:
+                self.fields.pop(name)
+
+
+def sparse_queryset(queryset, serializer_class, request):
+    """
+    `queryset` loading only the columns `serializer_class` will read for
+    this request. Unchanged when every field is wanted or when a field's
+    source is not a plain model field.
+    """
+    fields, exclude = requested_fields(request)
+    if fields is None and not exclude:
+        return queryset
+    serializer = serializer_class(fields=fields, exclude=exclude)
+    opts = queryset.model._meta
+    columns = {opts.pk.name}
+    for field in serializer.fields.values():
+        source = field.source.split('.')[0]
+        try:
+            model_field = opts.get_field(source)
+        except FieldDoesNotExist:
+            return queryset
+        if model_field.many_to_many or model_field.one_to_many:
+            return queryset
+        columns.add(model_field.name)
+    return queryset.only(*columns)
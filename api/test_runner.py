@@ -0,0 +1,12 @@
+"""
+Test runner for `manage.py test`: requests over their @query_budget fail
+the test instead of logging a warning.
+"""
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.QUERY_BUDGET_STRICT = True
@@ -0,0 +1,526 @@
+import gzip
+import json
+import tempfile
+import threading
+from io import StringIO
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import OperationalError, connections
+from django.db.utils import ConnectionHandler
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import clear_url_caches, get_resolver, path
+from psycopg2 import extensions
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from api.admin_performance import EstimatedCountPaginator, estimated_count, prefix_range_q
+from api.db import database_config
+from api.db.pool import ConnectionPool, PoolTimeout
+from api.db.postgresql import base as pooled_base
+from api.instrumentation import QueryBudgetExceeded, metrics_view, query_budget
+from api.renderers import CompactJSONRenderer, MessagePackRenderer, columnar, msgpack
+from api.sparse import sparse_queryset
+from api.warmup import warmup
+from jobs.autocomplete import autocomplete
+from jobs.models import Job
+from jobs.serializers import JobSerializer
+
+User = get_user_model()
+
+
+@query_budget(2)
+def within_budget(request):
+    User.objects.exists()
+    User.objects.count()
+    return HttpResponse()
+
+
+@query_budget(1)
+def over_budget(request):
+    User.objects.exists()
+    User.objects.count()
+    return HttpResponse()
+
+
+urlpatterns = [
+    path('within/', within_budget),
+    path('over/', over_budget),
+    path('metrics', metrics_view),
+]
+
+
+@override_settings(ROOT_URLCONF='api.tests')
+class QueryBudgetTests(TestCase):
+    def test_tests_run_strict(self):
+        self.assertTrue(settings.QUERY_BUDGET_STRICT)
+
+    def test_going_over_the_budget_fails_the_test(self):
+        self.assertEqual(self.client.get('/within/').status_code, 200)
+        with self.assertRaisesMessage(QueryBudgetExceeded, 'ran 2 queries, over its budget of 1'):
+            self.client.get('/over/')
+
+    @override_settings(QUERY_BUDGET_STRICT=False)
+    def test_otherwise_it_is_logged(self):
+        with self.assertLogs('api.instrumentation', 'WARNING'):
+            self.assertEqual(self.client.get('/over/').status_code, 200)
+
+
+@override_settings(ROOT_URLCONF='api.tests', METRICS_TOKEN='scrape-token')
+class MetricsViewTests(TestCase):
+    def test_local_requests_are_not_trusted(self):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='127.0.0.1').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_no_token_is_configured(self):
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer ').status_code, 403)
+
+    def test_token_or_staff(self):
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'workzone_http_requests_total', response.content)
+
+        self.client.force_login(User.objects.create_user(username='ops', email='ops@example.com', is_staff=True))
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+
+class AdminPerformanceTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(
+            username='employer', email='hiring@acme.com', password='x', role='employer',
+        )
+        for title, external_id in [('Backend Engineer', 'be-1'), ('Senior Backend Engineer', 'be-2'), ('Designer', 'ds-1')]:
+            Job.objects.create(
+                employer=self.employer, title=title, description='', requirements='', responsibilities='',
+                location='Lagos', external_id=external_id,
+            )
+        self.job_admin = admin.site._registry[Job]
+        self.request = RequestFactory().get('/admin/jobs/job/')
+
+    def search(self, term):
+        queryset, may_have_duplicates = self.job_admin.get_search_results(self.request, Job.objects.all(), term)
+        return sorted(queryset.values_list('title', flat=True)), may_have_duplicates
+
+    def test_the_exact_count_is_used_without_an_estimate(self):
+        self.assertIsNone(estimated_count(Job.objects.all()))
+        self.assertEqual(EstimatedCountPaginator(Job.objects.order_by('pk'), 2).count, 3)
+        # Lists are counted as they are
+        self.assertEqual(EstimatedCountPaginator([1, 2], 2).count, 2)
+
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1000)
+    def test_large_estimates_replace_the_count(self):
+        with mock.patch('api.admin_performance.estimated_count', return_value=250_000):
+            paginator = EstimatedCountPaginator(Job.objects.order_by('pk'), 100)
+            self.assertEqual(paginator.count, 250_000)
+            self.assertEqual(paginator.num_pages, 2500)
+        with mock.patch('api.admin_performance.estimated_count', return_value=999):
+            self.assertEqual(EstimatedCountPaginator(Job.objects.order_by('pk'), 100).count, 3)
+
+    def test_prefix_range(self):
+        alias, _, q = prefix_range_q('employer__email', 'Hir')
+        self.assertEqual(alias, 'employer_email_lower')
+        self.assertEqual(dict(q.children), {'employer_email_lower__gte': 'hir', 'employer_email_lower__lt': 'his'})
+
+    def test_prefix_search(self):
+        self.assertEqual(self.search('back'), (['Backend Engineer'], False))
+        self.assertEqual(self.search('SENIOR'), (['Senior Backend Engineer'], False))
+        # Prefixes of the employer's email match their jobs; every word has to match
+        self.assertEqual(self.search('hiring')[0], ['Backend Engineer', 'Designer', 'Senior Backend Engineer'])
+        self.assertEqual(self.search('hiring des')[0], ['Designer'])
+        # `=external_id` stays an exact match, and infixes do not match
+        self.assertEqual(self.search('BE-2')[0], ['Senior Backend Engineer'])
+        self.assertEqual(self.search('be-')[0], [])
+        self.assertEqual(self.search('engineer')[0], [])
+
+    def test_changelist(self):
+        self.assertEqual(self.job_admin.list_select_related, ['employer'])
+        self.client.force_login(User.objects.create_superuser(username='root', email='root@example.com', password='x'))
+        response = self.client.get('/admin/jobs/job/', {'q': 'back'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([job.title for job in response.context['cl'].result_list], ['Backend Engineer'])
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+        )
+        self.job = Job.objects.create(
+            employer=self.employer, title='Backend Engineer', description='Build APIs', requirements='',
+            responsibilities='', location='Lagos',
+        )
+        self.client = APIClient()
+
+    def request(self, method='get', **params):
+        return Request(getattr(APIRequestFactory(), method)('/api/jobs/', params))
+
+    def test_fields_and_exclude(self):
+        results = self.client.get('/api/jobs/', {'fields': 'title, location,nope', 'facets': 'false'}).data['results']
+        self.assertEqual(results, [{'id': self.job.pk, 'title': 'Backend Engineer', 'location': 'Lagos'}])
+
+        detail = self.client.get(f'/api/jobs/{self.job.pk}/', {'exclude': 'description,id'}).data
+        self.assertEqual(detail['id'], self.job.pk)
+        self.assertNotIn('description', detail)
+        self.assertIn('requirements', detail)
+
+        detail = self.client.get(f'/api/jobs/{self.job.pk}/', {'fields': 'title,description', 'exclude': 'description'}).data
+        self.assertEqual(detail, {'id': self.job.pk, 'title': 'Backend Engineer'})
+
+    def test_writes_are_not_narrowed(self):
+        self.client.force_authenticate(self.employer)
+        response = self.client.put(
+            f'/api/jobs/{self.job.pk}/?fields=title', {'title': 'Senior Backend Engineer'}, format='json',
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['description'], 'Build APIs')
+
+    def test_only_the_wanted_columns_are_loaded(self):
+        queryset = sparse_queryset(Job.objects.all(), JobSerializer, self.request(fields='title,employer'))
+        self.assertEqual(queryset.query.deferred_loading, ({'id', 'title', 'employer'}, False))
+        job = queryset.get()
+        self.assertEqual(job.get_deferred_fields() & {'title', 'employer_id'}, set())
+        self.assertIn('description', job.get_deferred_fields())
+        # Everything wanted, or a write: unchanged
+        for request in (self.request(), self.request('post', fields='title')):
+            self.assertEqual(sparse_queryset(Job.objects.all(), JobSerializer, request).query.deferred_loading, (frozenset(), True))
+
+
+class RendererTests(TestCase):
+    def test_columnar(self):
+        rows = [{'id': 1, 'title': 'A'}, {'id': 2, 'salary': 5}]
+        self.assertEqual(columnar(rows), {'columns': ['id', 'title', 'salary'], 'rows': [[1, 'A', None], [2, None, 5]]})
+        page = {'count': 2, 'next': None, 'results': rows[:1]}
+        self.assertEqual(columnar(page), {'count': 2, 'next': None, 'results': {'columns': ['id', 'title'], 'rows': [[1, 'A']]}})
+        # Anything else is left alone
+        for data in ({'detail': 'Not found.'}, [1, 2], {'results': 'x'}, None):
+            self.assertEqual(columnar(data), data)
+
+    def test_compact_json_by_format_or_accept(self):
+        employer = User.objects.create_user(username='employer', email='employer@example.com', role='employer')
+        job = Job.objects.create(
+            employer=employer, title='Backend Engineer', description='', requirements='', responsibilities='',
+            location='Lagos',
+        )
+        client = APIClient()
+        response = client.get('/api/jobs/', {'format': 'compact', 'fields': 'title', 'facets': 'false'})
+        self.assertEqual(response['Content-Type'], CompactJSONRenderer.media_type)
+        self.assertEqual(json.loads(response.content)['results'], {'columns': ['id', 'title'], 'rows': [[job.pk, 'Backend Engineer']]})
+
+        response = client.get(f'/api/jobs/{job.pk}/', HTTP_ACCEPT=CompactJSONRenderer.media_type)
+        self.assertEqual(response['Content-Type'], CompactJSONRenderer.media_type)
+        self.assertEqual(json.loads(response.content)['title'], 'Backend Engineer')
+
+    def test_messagepack_only_when_installed(self):
+        renderers = settings.REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES']
+        self.assertEqual('api.renderers.MessagePackRenderer' in renderers, msgpack is not None)
+
+    @skipUnless(msgpack, 'msgpack is not installed')
+    def test_messagepack(self):
+        content = MessagePackRenderer().render([{'id': 1, 'title': 'A'}])
+        self.assertEqual(msgpack.unpackb(content), {'columns': ['id', 'title'], 'rows': [[1, 'A']]})
+        self.assertEqual(MessagePackRenderer().render(None), b'')
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def execute(self, sql, params=None):
+        if self.connection.broken:
+            raise pooled_base.base.Database.OperationalError('server closed the connection unexpectedly')
+        self.connection.queries.append(sql)
+        if not self.connection.autocommit and self.connection.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE:
+            self.connection.info.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Enough of a psycopg2 connection for Django and the pool"""
+    opened = 0
+
+    def __init__(self, **params):
+        FakeConnection.opened += 1
+        self.params = params
+        self.closed = 0
+        self.broken = False
+        self.autocommit = False
+        self.isolation_level = None
+        self.queries = []
+        self.rollbacks = 0
+        self.info = mock.Mock(
+            transaction_status=extensions.TRANSACTION_STATUS_IDLE, server_version=160000,
+            parameter_status=lambda name: 'UTC',
+        )
+
+    def cursor(self, *args, **kwargs):
+        return FakeCursor(self)
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def commit(self):
+        self.info.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+# --- Connection Pool ---
+class ConnectionPoolTests(SimpleTestCase):
+    def pool(self, **options):
+        return ConnectionPool(FakeConnection, **options)
+
+    def test_reuses_returned_connections(self):
+        pool = self.pool()
+        first = pool.getconn()
+        pool.putconn(first)
+        self.assertIs(pool.getconn(), first)
+        self.assertEqual(pool.stats['opened'], 1)
+        self.assertEqual(pool.stats['reused'], 1)
+
+    def test_waits_for_a_free_connection_then_times_out(self):
+        pool = self.pool(max_size=1, timeout=0.5)
+        held = pool.getconn()
+        threading.Timer(0.05, pool.putconn, [held]).start()
+        self.assertIs(pool.getconn(), held)
+        pool.timeout = 0.01
+        with self.assertRaises(PoolTimeout):
+            pool.getconn()
+        self.assertEqual((len(pool), pool.stats['timeouts']), (1, 1))
+
+    def test_idle_timeout_keeps_min_size(self):
+        pool = self.pool(idle_timeout=0, min_size=1)
+        connections = [pool.getconn() for _ in range(3)]
+        for connection in connections:
+            pool.putconn(connection)
+        # The most recently returned connection survives; the others are closed
+        self.assertIs(pool.getconn(), connections[-1])
+        self.assertEqual(pool.stats['expired'], 2)
+        self.assertEqual([connection.closed for connection in connections[:2]], [1, 1])
+        self.assertEqual(len(pool), 1)
+
+    def test_max_lifetime(self):
+        pool = self.pool(max_lifetime=0)
+        connection = pool.getconn()
+        pool.putconn(connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual((len(pool), pool.idle), (0, 0))
+
+    def test_failed_check_replaces_the_connection(self):
+        pool = ConnectionPool(FakeConnection, health_check=pooled_base._check)
+        connection = pool.getconn()
+        pool.putconn(connection)
+        connection.broken = True
+        replacement = pool.getconn()
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats['failed_checks'], 1)
+
+        unchecked = ConnectionPool(FakeConnection, health_check=pooled_base._check, check=False)
+        connection = unchecked.getconn()
+        unchecked.putconn(connection)
+        connection.broken = True
+        self.assertIs(unchecked.getconn(), connection)
+
+    def test_reset_rolls_back_open_transactions(self):
+        pool = ConnectionPool(FakeConnection, reset=pooled_base._reset)
+        connection = pool.getconn()
+        connection.info.transaction_status = extensions.TRANSACTION_STATUS_INERROR
+        pool.putconn(connection)
+        self.assertEqual(connection.rollbacks, 1)
+        self.assertIs(pool.getconn(), connection)
+
+        connection.info.transaction_status = extensions.TRANSACTION_STATUS_ACTIVE
+        pool.putconn(connection)
+        self.assertTrue(connection.closed)
+
+    def test_connections_are_not_closed_after_fork(self):
+        pool = self.pool()
+        connection = pool.getconn()
+        pool.pid -= 1
+        self.assertTrue(pool.forked)
+        pool.putconn(connection)
+        self.assertFalse(connection.closed)
+        self.assertEqual(pool.idle, 0)
+
+
+# --- Pooled Backend ---
+class DatabaseConfigTests(SimpleTestCase):
+    def test_pool_options(self):
+        config = database_config(
+            'postgres://app:secret@db:5432/workzone?pool=true&pool_max_size=20&pool_check=false&sslmode=require'
+        )
+        self.assertEqual(config['ENGINE'], 'api.db.postgresql')
+        self.assertEqual(config['POOL'], {'max_size': 20, 'check': False})
+        self.assertEqual(config['OPTIONS'], {'sslmode': 'require'})
+
+    def test_without_pool(self):
+        config = database_config('postgres://app:secret@db:5432/workzone')
+        self.assertEqual(config['ENGINE'], 'django.db.backends.postgresql')
+        self.assertNotIn('POOL', config)
+
+    def test_invalid(self):
+        for url in (
+            'sqlite:///tmp/db.sqlite3?pool=true',
+            'postgres://db/workzone?pool_max_size=5',
+            'postgres://db/workzone?pool=true&pool_size=5',
+        ):
+            with self.subTest(url=url), self.assertRaises(ImproperlyConfigured):
+                database_config(url)
+
+
+@mock.patch('psycopg2.extras.register_default_jsonb', mock.Mock())
+@mock.patch.object(pooled_base.base.Database, 'connect', FakeConnection)
+class PooledBackendTests(SimpleTestCase):
+    def setUp(self):
+        config = database_config(
+            'postgres://app:secret@db:5432/workzone?pool=true&pool_max_size=2&pool_timeout=0.01&pool_check=false'
+        )
+        self.connections = ConnectionHandler({'default': {'ENGINE': 'django.db.backends.dummy'}, 'pooled': config})
+        self.addCleanup(self.connections['pooled'].close_pool)
+        FakeConnection.opened = 0
+
+    def request(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        raw = connection.connection
+        connection.close()
+        return raw
+
+    def test_close_returns_the_connection_to_the_pool(self):
+        connection = self.connections['pooled']
+        first = self.request(connection)
+        self.assertIsNone(connection.connection)
+        self.assertFalse(first.closed)
+        self.assertIs(self.request(connection), first)
+        self.assertEqual(FakeConnection.opened, 1)
+        self.assertTrue(first.autocommit)
+
+    def test_pool_is_shared_by_threads(self):
+        self.request(self.connections['pooled'])
+        thread = threading.Thread(target=lambda: self.request(self.connections['pooled']))
+        thread.start()
+        thread.join()
+        self.assertEqual(FakeConnection.opened, 1)
+
+    def test_exhausted_pool_raises_operational_error(self):
+        held = []
+
+        def hold():
+            connection = self.connections['pooled']
+            try:
+                connection.ensure_connection()
+                held.append(connection.connection)
+            except OperationalError:
+                held.append(None)
+
+        for _ in range(3):
+            thread = threading.Thread(target=hold)
+            thread.start()
+            thread.join()
+        self.assertEqual(held.count(None), 1)
+
+    def test_close_pool(self):
+        connection = self.connections['pooled']
+        first = self.request(connection)
+        connection.close_pool()
+        self.assertTrue(first.closed)
+        self.assertIsNot(self.request(connection), first)
+
+
+# --- OpenAPI Schema ---
+class SchemaTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = Path(cls.enterClassContext(tempfile.TemporaryDirectory()))
+        (cls.directory / 'openapi.0000000000000000.json').write_text('{}')
+        call_command('build_schema', output_dir=cls.directory, stdout=StringIO())
+        cls.manifest = json.loads((cls.directory / 'manifest.json').read_text())
+
+    def get(self, format='.json', **headers):
+        with self.settings(OPENAPI_SCHEMA_DIR=self.directory):
+            return self.client.get(f'/swagger{format}/', **headers)
+
+    def test_build_writes_the_files_and_drops_older_builds(self):
+        entry = self.manifest['files']['.json']
+        self.assertEqual(
+            sorted(path.name for path in self.directory.iterdir()),
+            sorted(['manifest.json', entry['name'], f"{entry['name']}.gz",
+                    self.manifest['files']['.yaml']['name'], f"{self.manifest['files']['.yaml']['name']}.gz"]),
+        )
+        body = (self.directory / entry['name']).read_bytes()
+        self.assertEqual(gzip.decompress((self.directory / f"{entry['name']}.gz").read_bytes()), body)
+        self.assertIn('/jobs/', json.loads(body)['paths'])
+
+    def test_served_with_an_etag_and_gzipped_when_accepted(self):
+        etag = self.manifest['files']['.json']['etag']
+        response = self.get(HTTP_ACCEPT_ENCODING='br, gzip;q=0.5')
+        self.assertEqual((response['Content-Encoding'], response['ETag']), ('gzip', f'"{etag}-gzip"'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertIn('max-age=', response['Cache-Control'])
+        for accept in ('gzip;q=0', 'identity', '*;q=0', 'x-gzip'):
+            with self.subTest(accept=accept):
+                response = self.get(HTTP_ACCEPT_ENCODING=accept)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(response['ETag'], f'"{etag}"')
+        self.assertEqual(self.get(HTTP_ACCEPT_ENCODING='*')['Content-Encoding'], 'gzip')
+
+    def test_if_none_match_compares_whole_tags(self):
+        etag = self.manifest['files']['.json']['etag']
+        for header in (f'"{etag}"', f'"other", W/"{etag}"', '*'):
+            with self.subTest(header=header):
+                self.assertEqual(self.get(HTTP_IF_NONE_MATCH=header).status_code, 304)
+        # The gzipped variant's tag is not the plain one, nor the other way round
+        for header in (f'"{etag}-gzip"', f'"{etag[:-1]}"', f'W/"x{etag}"', etag):
+            with self.subTest(header=header):
+                self.assertEqual(self.get(HTTP_IF_NONE_MATCH=header).status_code, 200)
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=f'"{etag}"', HTTP_ACCEPT_ENCODING='gzip').status_code, 200)
+
+    def test_without_a_build_the_schema_is_only_generated_in_debug(self):
+        with tempfile.TemporaryDirectory() as empty, self.settings(OPENAPI_SCHEMA_DIR=empty):
+            self.assertEqual(self.client.get('/swagger.json/').status_code, 404)
+            with self.settings(DEBUG=True):
+                response = self.client.get('/swagger.json/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('/jobs/', json.loads(response.content)['paths'])
+
+
+# --- Warmup ---
+# warmup() closes the database connections, which a TestCase transaction cannot survive
+class WarmupTests(TransactionTestCase):
+    def setUp(self):
+        clear_url_caches()
+
+    def test_warmup_populates_the_url_resolver(self):
+        self.assertFalse(get_resolver()._populated)
+        timings = warmup(database=False)
+        self.assertEqual(list(timings), ['urls', 'serializers', 'gazetteer', 'backends'])
+        self.assertTrue(get_resolver()._populated)
+
+    def test_warmup_builds_the_autocomplete_index_and_closes_connections(self):
+        with mock.patch.object(autocomplete, 'build', wraps=autocomplete.build) as build, \
+                mock.patch.object(connections, 'close_all', wraps=connections.close_all) as close_all:
+            timings = warmup()
+        build.assert_called_once_with()
+        close_all.assert_called_once_with()
+        self.assertIn('database', timings)
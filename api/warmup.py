@@ -0,0 +1,80 @@
+"""
+Worker warmup.
+
+A fresh process pays for a lot of first-use work on its first request:
+compiling URL patterns, building serializer fields and compiled
+serializers, loading the gazetteer, importing the cache and message
+backends, building the autocomplete index, connecting to the database
+and compiling the first queries.
+`warmup()` does that up front. gunicorn.conf.py calls it in the master
+once the app is preloaded, so forked workers inherit the warm state.
+
+Database connections must not be shared across fork, so `warmup()`
+runs one small query per hot model and then closes every connection.
+Each worker opens its own on its first query.
+"""
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _hot_serializers():
+    from jobs.serializers import JobApplicationSerializer, JobSerializer
+    from users.serializers import (
+        AdminProfileSerializer, ApplicantProfileSerializer, EmployerProfileSerializer, UserSerializer,
+    )
+
+    return [
+        JobSerializer, JobApplicationSerializer, UserSerializer,
+        AdminProfileSerializer, EmployerProfileSerializer, ApplicantProfileSerializer,
+    ]
+
+
+def _hot_models():
+    from django.contrib.auth import get_user_model
+    from jobs.models import Job, JobApplication
+
+    return [Job, JobApplication, get_user_model()]
+
+
+def warmup(database=True):
+    """Prime per-process caches; returns {step: milliseconds}"""
+    from django.conf import settings
+    from django.core.cache import caches
+    from django.db import connections
+    from django.urls import get_resolver
+    from django.utils.module_loading import import_string
+
+    from api.compiled import compiled
+    from jobs.autocomplete import autocomplete
+    from jobs.geo import gazetteer
+
+    timings = {}
+
+    def step(name, function):
+        started = time.perf_counter()
+        function()
+        timings[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    # Populating the resolver compiles every pattern and imports every view
+    step('urls', lambda: get_resolver()._populate())
+    step('serializers', lambda: [compiled(serializer) for serializer in _hot_serializers()])
+    step('gazetteer', gazetteer)
+    step('backends', lambda: (caches.all(), import_string(settings.MESSAGE_STORAGE)))
+    if database:
+        def query():
+            try:
+                step('autocomplete', autocomplete.build)
+                for model in _hot_models():
+                    list(model.objects.all()[:1])
+            finally:
+                connections.close_all()
+                # Pooled backends would otherwise keep the sockets open into the fork
+                for connection in connections.all(initialized_only=True):
+                    if hasattr(connection, 'close_pool'):
+                        connection.close_pool()
+        step('database', query)
+
+    logger.info('Warmup finished: %s', timings)
+    return timings
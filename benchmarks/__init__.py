@@ -0,0 +1,14 @@
+"""
+WorkZone benchmark suite.
+
+Run from the project root:
+
+    python -m benchmarks run                      # full API scenario run
+    python -m benchmarks run --users 5000 --jobs 20000 --iterations 500
+    python -m benchmarks compare old.json new.json
+
+Each run builds a throwaway test database, fills it with synthetic data
+(`benchmarks.data`), drives the real URL conf through the Django test client
+(`benchmarks.scenarios`) and writes a JSON report to `benchmarks/results/`,
+named after the current git commit so runs can be diffed between commits.
+"""
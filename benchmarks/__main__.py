@@ -0,0 +1,201 @@
+"""
+Command line entry point: `python -m benchmarks {run,compare,payload,startup,pool}`
+"""
+import argparse
+import json
+import sys
+
+from . import harness
+
+
+def run(args):
+    harness.setup_django()
+
+    from django.test.utils import override_settings
+    from . import data, scenarios
+
+    overrides = {
+        'EMAIL_BACKEND': 'django.core.mail.backends.locmem.EmailBackend',
+        'QUERY_BUDGET_STRICT': False,
+        'DEBUG': False,
+    }
+    if not args.real_hashing:
+        # Measure the application, not PBKDF2
+        overrides['PASSWORD_HASHERS'] = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+    selected = args.scenario or list(scenarios.SCENARIOS)
+    with override_settings(**overrides), harness.benchmark_database():
+        dataset = data.generate(
+            users=args.users,
+            jobs_per_employer=max(1, args.jobs // max(1, int(args.users * 0.1))),
+            seed=args.seed,
+        )
+        ctx = scenarios.ScenarioContext(seed=args.seed)
+        ctx.prepare()
+
+        results = {'meta': harness.environment_info(), 'scenarios': {}}
+        results['meta'].update({
+            'dataset': dataset, 'seed': args.seed, 'iterations': args.iterations,
+            'real_hashing': args.real_hashing,
+        })
+
+        for name in selected:
+            scenario = scenarios.SCENARIOS[name]
+            iterations = args.iterations
+            if name in scenarios.SLOW_SCENARIOS and args.real_hashing:
+                iterations = max(5, iterations // 20)
+            if name == 'apply':
+                iterations = min(iterations, len(ctx.apply_job_ids))
+
+            for warmup in range(args.warmup):
+                if name not in ('register', 'apply'):
+                    scenario(ctx, -1 - warmup)
+
+            timer = harness.Timer()
+            for iteration in range(iterations):
+                with timer.measure():
+                    response = scenario(ctx, iteration)
+                if response.status_code >= 400:
+                    timer.errors += 1
+            results['scenarios'][name] = stats = timer.summary()
+            print(
+                f"{name:<24} p50 {stats['p50_ms']:>8.2f}ms  p95 {stats['p95_ms']:>8.2f}ms  "
+                f"p99 {stats['p99_ms']:>8.2f}ms  {stats['throughput_rps']:>8.1f} req/s  "
+                f"{stats['queries_per_request']:>5.1f} q/req  errors {stats['errors']}"
+            )
+
+    path = harness.write_results(results, args.output)
+    print(f"Results written to {path}")
+
+
+def payload(args):
+    harness.setup_django()
+
+    from django.test.utils import override_settings
+    from . import data
+    from .payload import run as run_payload
+
+    with override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']), \
+            harness.benchmark_database():
+        employers = max(1, int(args.users * 0.1))
+        dataset = data.generate(users=args.users, jobs_per_employer=max(1, args.jobs // employers), seed=args.seed)
+        results = {'meta': harness.environment_info(), 'payload': {}}
+        results['meta'].update({'dataset': dataset, 'seed': args.seed, 'repeats': args.repeats})
+
+        for page_size, by_variant in run_payload(args.page_size or [100, 1000], args.repeats).items():
+            baseline = by_variant['json']
+            results['payload'][str(page_size)] = by_variant
+            for name, stats in by_variant.items():
+                print(
+                    f"{page_size:>5} rows  {name:<25} {stats['bytes']:>10} bytes "
+                    f"({100 * stats['bytes'] / baseline['bytes']:5.1f}%)  "
+                    f"{stats['cpu_ms']:>8.2f}ms cpu ({100 * stats['cpu_ms'] / baseline['cpu_ms']:5.1f}%)"
+                )
+
+    path = harness.write_results(results, args.output, suffix='-payload')
+    print(f"Results written to {path}")
+
+
+def startup(args):
+    harness.setup_django()
+
+    from .startup import run as run_startup
+
+    results = {'meta': harness.environment_info(), 'startup': run_startup(args.runs)}
+    results['meta']['runs'] = args.runs
+    for mode, stats in results['startup'].items():
+        print(f"{mode:<5} " + '  '.join(f"{metric} {value:>8.2f}" for metric, value in stats.items()))
+
+    path = harness.write_results(results, args.output, suffix='-startup')
+    print(f"Results written to {path}")
+
+
+def pool(args):
+    harness.setup_django()
+
+    from .pool import run as run_pool
+
+    results = {'meta': harness.environment_info(), 'pool': run_pool(
+        url=args.url, threads=args.threads, requests=args.requests,
+        connect_ms=args.connect_ms, query_ms=args.query_ms, check=not args.no_check,
+    )}
+    results['meta'].update({
+        'server': 'postgres' if args.url else f'fake ({args.connect_ms}ms connect, {args.query_ms}ms query)',
+        'threads': args.threads, 'requests': args.requests, 'health_checks': not args.no_check,
+    })
+    for mode, stats in results['pool'].items():
+        print(
+            f"{mode:<7} {stats['requests_per_second']:>9.1f} req/s  p50 {stats['p50_ms']:>7.2f}ms  "
+            f"p99 {stats['p99_ms']:>7.2f}ms  {stats['connections_opened']:>6} connections opened"
+        )
+
+    path = harness.write_results(results, args.output, suffix='-pool')
+    print(f"Results written to {path}")
+
+
+def compare(args):
+    with open(args.old) as old_file, open(args.new) as new_file:
+        old, new = json.load(old_file), json.load(new_file)
+    rows, regressions = harness.compare(old, new, threshold=args.threshold)
+    for name, metric, before, after, change in rows:
+        flag = '  <-- regression' if (name, metric, before, after, change) in regressions else ''
+        print(f"{name:<24} {metric:<20} {before:>10} -> {after:<10} {change:+6.1f}%{flag}")
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed by more than {args.threshold}%")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='WorkZone benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Run the API scenarios against synthetic data')
+    run_parser.add_argument('--users', type=int, default=1000, help='Users to generate (10%% employers)')
+    run_parser.add_argument('--jobs', type=int, default=500, help='Approximate number of jobs to generate')
+    run_parser.add_argument('--iterations', type=int, default=200, help='Timed requests per scenario')
+    run_parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per scenario')
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--scenario', action='append', help='Only run the named scenario(s)')
+    run_parser.add_argument('--real-hashing', action='store_true',
+                            help='Use the configured password hashers instead of a fast test hasher')
+    run_parser.add_argument('--output', help='Result file (default: benchmarks/results/<commit>.json)')
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser('compare', help='Diff two result files')
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float, default=10.0,
+                                help='Percent increase that counts as a regression')
+    compare_parser.set_defaults(func=compare)
+
+    payload_parser = commands.add_parser('payload', help='Measure list payload size and serialization CPU per format')
+    payload_parser.add_argument('--users', type=int, default=200, help='Users to generate (10%% employers)')
+    payload_parser.add_argument('--jobs', type=int, default=1200, help='Approximate number of jobs to generate')
+    payload_parser.add_argument('--page-size', type=int, action='append', help='Rows per page (default: 100 and 1000)')
+    payload_parser.add_argument('--repeats', type=int, default=10, help='Runs per variant; the median is reported')
+    payload_parser.add_argument('--seed', type=int, default=42)
+    payload_parser.add_argument('--output', help='Result file (default: benchmarks/results/<commit>-payload.json)')
+    payload_parser.set_defaults(func=payload)
+
+    startup_parser = commands.add_parser('startup', help='Measure worker boot and first-request time, cold and warmed')
+    startup_parser.add_argument('--runs', type=int, default=10, help='Fresh processes per mode; medians are reported')
+    startup_parser.add_argument('--output', help='Result file (default: benchmarks/results/<commit>-startup.json)')
+    startup_parser.set_defaults(func=startup)
+
+    pool_parser = commands.add_parser('pool', help='Compare connection-per-request with the connection pool')
+    pool_parser.add_argument('--url', help='Postgres URL to benchmark against (default: a fake driver)')
+    pool_parser.add_argument('--threads', type=int, default=8, help='Concurrent workers (and pool size)')
+    pool_parser.add_argument('--requests', type=int, default=200, help='Requests per worker')
+    pool_parser.add_argument('--connect-ms', type=float, default=5.0, help='Fake driver: time to open a connection')
+    pool_parser.add_argument('--query-ms', type=float, default=0.2, help='Fake driver: time per query')
+    pool_parser.add_argument('--no-check', action='store_true', help='Skip the health check on checkout')
+    pool_parser.add_argument('--output', help='Result file (default: benchmarks/results/<commit>-pool.json)')
+    pool_parser.set_defaults(func=pool)
+
+    args = parser.parse_args(argv)
+    return args.func(args) or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,210 @@
+"""
+Synthetic data generator for benchmarks.
+
+Bulk-creates users with their role profiles, jobs, resumes and applications.
+Skills follow a Zipf-like distribution so a few skills are very common and
+most are rare, which is what real postings look like and what search and
+matching code paths are sensitive to.
+"""
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from jobs.models import Job, JobChange, Resume, JobApplication, JOB_TYPES, EXPERIENCE_LEVELS
+from jobs import ranking, similar
+from jobs.salary import to_usd
+from users.models import EmployerProfile, ApplicantProfile
+
+User = get_user_model()
+
+DEFAULT_PASSWORD = 'Bench-Pass-123!'
+
+SKILLS = [
+    'Python', 'JavaScript', 'SQL', 'Communication', 'Excel', 'Java', 'React', 'Django',
+    'Project Management', 'AWS', 'Docker', 'TypeScript', 'Customer Service', 'Sales',
+    'Node.js', 'Linux', 'Git', 'Kubernetes', 'Data Analysis', 'Marketing', 'C#', 'Go',
+    'PostgreSQL', 'Figma', 'Accounting', 'Machine Learning', 'Rust', 'Kotlin', 'Swift',
+    'Terraform', 'GraphQL', 'Redis', 'Tableau', 'Copywriting', 'SEO', 'PHP', 'Ruby',
+    'Scala', 'Spark', 'Negotiation',
+]
+
+LOCATIONS = [
+    'Lagos', 'Abuja', 'Nairobi', 'Accra', 'London', 'Berlin', 'New York',
+    'San Francisco', 'Toronto', 'Remote', 'Cape Town', 'Kigali', 'Paris', 'Dubai',
+]
+
+CURRENCIES = ['USD', 'USD', 'USD', 'EUR', 'GBP', 'NGN', 'KES']
+
+TITLE_PREFIXES = ['Junior', 'Senior', 'Lead', 'Principal', 'Staff', '', '', '']
+TITLE_ROLES = [
+    'Software Engineer', 'Backend Developer', 'Frontend Developer', 'Data Analyst',
+    'Product Manager', 'DevOps Engineer', 'Sales Executive', 'Account Manager',
+    'UX Designer', 'Data Scientist', 'Customer Support Agent', 'Marketing Specialist',
+]
+
+WORDS = (
+    'team build deliver scale product customers platform growth design ship reliable '
+    'services data quality ownership collaborate remote fast-paced mission impact '
+    'mentor review improve support launch roadmap metrics stakeholders'
+).split()
+
+# Zipf-like weights: the n-th skill is 1/n as likely as the first
+SKILL_WEIGHTS = [1 / rank for rank in range(1, len(SKILLS) + 1)]
+
+
+def sample_skills(rng, count):
+    """Draw `count` distinct skills following the Zipf-like weights"""
+    chosen = []
+    while len(chosen) < count:
+        skill = rng.choices(SKILLS, weights=SKILL_WEIGHTS)[0]
+        if skill not in chosen:
+            chosen.append(skill)
+    return chosen
+
+
+def _sentence(rng, words=12):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _create_users(rng, count, role, password_hash, offset, batch_size):
+    users = [
+        User(
+            username=f'bench_{role}_{offset + index}',
+            email=f'bench_{role}_{offset + index}@example.com',
+            first_name=role.capitalize(),
+            last_name=str(offset + index),
+            role=role,
+            password=password_hash,
+        )
+        for index in range(count)
+    ]
+    return User.objects.bulk_create(users, batch_size=batch_size)
+
+
+def generate(users=1000, employer_ratio=0.1, jobs_per_employer=5, applications_per_applicant=3,
+             seed=42, password=DEFAULT_PASSWORD, batch_size=1000):
+    """
+    Populate the current database and return the created object counts.
+
+    The same `seed` always produces the same dataset, so results stay
+    comparable between commits.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    # Hash once: hashing per user would dominate generation time
+    password_hash = make_password(password)
+    offset = User.objects.count()
+
+    employer_count = max(1, int(users * employer_ratio))
+    applicant_count = max(1, users - employer_count)
+    employers = _create_users(rng, employer_count, 'employer', password_hash, offset, batch_size)
+    applicants = _create_users(rng, applicant_count, 'applicant', password_hash, offset, batch_size)
+
+    EmployerProfile.objects.bulk_create([
+        EmployerProfile(
+            user=employer,
+            company_name=f'{rng.choice(["Acme", "Globex", "Initech", "Umbrella", "Hooli"])} {employer.pk}',
+            industry=rng.choice(['Technology', 'Finance', 'Retail', 'Healthcare', 'Logistics']),
+            company_size=rng.choice(['1-10', '11-50', '51-200', '201-1000', '1000+']),
+            is_verified_employer=rng.random() < 0.6,
+        )
+        for employer in employers
+    ], batch_size=batch_size)
+
+    expectations = [rng.randrange(20_000, 200_000, 1000) for _ in applicants]
+    ApplicantProfile.objects.bulk_create([
+        ApplicantProfile(
+            user=applicant,
+            headline=f'{rng.choice(TITLE_ROLES)}',
+            experience_years=rng.randint(0, 20),
+            skills=sample_skills(rng, rng.randint(2, 8)),
+            preferred_job_types=[rng.choice(JOB_TYPES)[0]],
+            preferred_locations=rng.sample(LOCATIONS, 2),
+            salary_expectation=expectation,
+            salary_expectation_usd=expectation,
+        )
+        for applicant, expectation in zip(applicants, expectations)
+    ], batch_size=batch_size)
+
+    job_objects = []
+    for employer in employers:
+        for _ in range(jobs_per_employer):
+            salary_min = rng.randrange(20_000, 150_000, 1000)
+            roll = rng.random()
+            if roll < 0.1:
+                deadline = now - timedelta(days=rng.randint(1, 60))
+            elif roll < 0.3:
+                deadline = None
+            else:
+                deadline = now + timedelta(days=rng.randint(1, 90))
+            job = Job(
+                employer=employer,
+                title=f'{rng.choice(TITLE_PREFIXES)} {rng.choice(TITLE_ROLES)}'.strip(),
+                description=' '.join(_sentence(rng) for _ in range(5)),
+                requirements=_sentence(rng),
+                responsibilities=_sentence(rng),
+                job_type=rng.choice(JOB_TYPES)[0],
+                experience_level=rng.choice(EXPERIENCE_LEVELS)[0],
+                location=rng.choice(LOCATIONS),
+                salary_min=salary_min,
+                salary_max=salary_min + rng.randrange(5_000, 60_000, 1000),
+                salary_currency=rng.choice(CURRENCIES),
+                required_skills=sample_skills(rng, rng.randint(2, 6)),
+                preferred_skills=sample_skills(rng, rng.randint(0, 4)),
+                tags=rng.sample(WORDS, 3),
+                application_deadline=deadline,
+                is_featured=rng.random() < 0.05,
+            )
+            job.geocode()
+            job.normalize_salary()
+            job_objects.append(job)
+    jobs = Job.objects.bulk_create(job_objects, batch_size=batch_size)
+    similar.index_jobs(jobs, created=True)
+    # Logged as earlier writes, so the change feed serves them at once
+    JobChange.objects.bulk_create(
+        [JobChange(job_id=job.pk, changed_at=now - timedelta(hours=1)) for job in jobs], batch_size=batch_size,
+    )
+
+    resumes = Resume.objects.bulk_create([
+        Resume(
+            user=applicant,
+            title=f'{applicant.first_name} {applicant.last_name} CV',
+            file=f'resumes/bench_{applicant.pk}.pdf',
+            is_primary=True,
+            summary=_sentence(rng, 20),
+            skills=sample_skills(rng, rng.randint(2, 10)),
+            experience_years=rng.randint(0, 20),
+        )
+        for applicant in applicants
+    ], batch_size=batch_size)
+
+    applications = []
+    per_applicant = min(applications_per_applicant, len(jobs))
+    for applicant, resume in zip(applicants, resumes):
+        for job in rng.sample(jobs, per_applicant):
+            expected_salary = rng.randrange(20_000, 200_000, 1000)
+            applications.append(JobApplication(
+                job=job,
+                applicant=applicant,
+                resume=resume,
+                cover_letter=_sentence(rng, 30),
+                expected_salary=expected_salary,
+                expected_salary_usd=to_usd(expected_salary, job.salary_currency),
+            ))
+            application = applications[-1]
+            application.score = ranking.score(
+                ranking.Requirements.for_job(job), resume.skills, resume.experience_years,
+                application.expected_salary_usd,
+            )
+    JobApplication.objects.bulk_create(applications, batch_size=batch_size)
+
+    return {
+        'employers': len(employers),
+        'applicants': len(applicants),
+        'jobs': len(jobs),
+        'resumes': len(resumes),
+        'applications': len(applications),
+    }
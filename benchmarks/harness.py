@@ -0,0 +1,142 @@
+"""
+Shared plumbing for benchmarks: Django setup, a throwaway database,
+latency statistics and the JSON result format.
+"""
+import json
+import math
+import os
+import platform
+import subprocess
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
+    import django
+    django.setup()
+
+
+@contextmanager
+def benchmark_database():
+    """Create a fresh test database for the duration of the block"""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+class Timer:
+    """Collects per-call latencies and query counts for one scenario"""
+
+    def __init__(self):
+        self.latencies = []
+        self.queries = []
+        self.errors = 0
+        self.started = None
+        self.elapsed = 0.0
+
+    @contextmanager
+    def measure(self):
+        from django.db import connection
+        from api.instrumentation import RequestMetrics
+
+        metrics = RequestMetrics()
+        if self.started is None:
+            self.started = time.perf_counter()
+        with connection.execute_wrapper(metrics):
+            start = time.perf_counter()
+            yield
+            self.latencies.append(time.perf_counter() - start)
+        self.queries.append(metrics.queries)
+        self.elapsed = time.perf_counter() - self.started
+
+    def summary(self):
+        return summarize(self.latencies, self.queries, self.elapsed, self.errors)
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(0, min(len(sorted_samples) - 1, math.ceil(pct / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[rank]
+
+
+def summarize(latencies, queries=(), elapsed=None, errors=0):
+    samples = sorted(latencies)
+    elapsed = elapsed if elapsed else sum(samples)
+    return {
+        'iterations': len(samples),
+        'errors': errors,
+        'mean_ms': round(sum(samples) / len(samples) * 1000, 3) if samples else 0.0,
+        'p50_ms': round(percentile(samples, 50) * 1000, 3),
+        'p95_ms': round(percentile(samples, 95) * 1000, 3),
+        'p99_ms': round(percentile(samples, 99) * 1000, 3),
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        'queries_per_request': round(sum(queries) / len(queries), 2) if queries else 0.0,
+        'max_queries': max(queries) if queries else 0,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def environment_info():
+    import django
+    from django.db import connection
+    return {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'machine': platform.machine(),
+    }
+
+
+def write_results(results, output=None, suffix=''):
+    """Write `results` as JSON; defaults to results/<commit><suffix>.json"""
+    if output is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        output = RESULTS_DIR / f"{results['meta']['commit']}{suffix}.json"
+    output = Path(output)
+    output.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n')
+    return output
+
+
+def compare(old, new, threshold=10.0, metrics=('p50_ms', 'p95_ms', 'p99_ms', 'queries_per_request')):
+    """
+    Compare two result documents. Returns (rows, regressions) where each row
+    is (scenario, metric, old, new, change_percent).
+    """
+    rows, regressions = [], []
+    for name, new_stats in sorted(new.get('scenarios', {}).items()):
+        old_stats = old.get('scenarios', {}).get(name)
+        if old_stats is None:
+            continue
+        for metric in metrics:
+            if metric not in new_stats or metric not in old_stats:
+                continue
+            before, after = old_stats[metric], new_stats[metric]
+            change = ((after - before) / before * 100) if before else 0.0
+            row = (name, metric, before, after, round(change, 1))
+            rows.append(row)
+            if change > threshold:
+                regressions.append(row)
+    return rows, regressions
@@ -0,0 +1,62 @@
+"""
+Payload benchmark: response size and serialization CPU of a job list page
+per format, with and without a sparse fieldset, through DRF's serializer
+and through the compiled one (api/compiled.py) fed from values() rows.
+
+Each variant loads a page of jobs, serializes and renders it; CPU time is
+the median over `repeats` runs.
+"""
+import statistics
+import time
+
+SPARSE_FIELDS = 'id,title,job_type,experience_level,location,salary_min_usd,salary_max_usd,created_at'
+
+
+def variants():
+    from api import renderers
+    from rest_framework.renderers import JSONRenderer
+
+    formats = [('json', JSONRenderer()), ('compact', renderers.CompactJSONRenderer())]
+    if renderers.msgpack is not None:
+        formats.append(('msgpack', renderers.MessagePackRenderer()))
+    for name, renderer in formats:
+        for fields, suffix in ((None, ''), (SPARSE_FIELDS, ' sparse')):
+            yield f'{name}{suffix}', renderer, fields, False
+            yield f'{name}{suffix} compiled', renderer, fields, True
+
+
+def measure_page(page_size, renderer, fields, use_compiled, repeats):
+    from rest_framework.request import Request
+    from rest_framework.test import APIRequestFactory
+
+    from api.compiled import compiled
+    from api.sparse import sparse_fields, sparse_queryset
+    from jobs.models import Job
+    from jobs.serializers import JobSerializer
+
+    request = Request(APIRequestFactory().get('/api/jobs/', {'fields': fields} if fields else {}))
+    samples, size = [], 0
+    for _ in range(repeats):
+        started = time.process_time()
+        jobs = sparse_queryset(Job.objects.order_by('-created_at'), JobSerializer, request)
+        if use_compiled:
+            serializer = compiled(JobSerializer, **sparse_fields(request))
+            results = serializer.many(jobs.values(*serializer.value_names)[:page_size])
+        else:
+            results = JobSerializer(jobs[:page_size], many=True, **sparse_fields(request)).data
+        data = {'count': page_size, 'results': results}
+        body = renderer.render(data)
+        samples.append((time.process_time() - started) * 1000)
+        size = len(body)
+    return {'bytes': size, 'cpu_ms': round(statistics.median(samples), 3)}
+
+
+def run(page_sizes=(100, 1000), repeats=10):
+    """{page_size: {variant: {'bytes', 'cpu_ms'}}}"""
+    results = {}
+    for page_size in page_sizes:
+        results[page_size] = {
+            name: measure_page(page_size, renderer, fields, use_compiled, repeats)
+            for name, renderer, fields, use_compiled in variants()
+        }
+    return results
@@ -0,0 +1,103 @@
+"""
+Connection benchmark: requests per second when each request opens its own
+database connection ("direct", what CONN_MAX_AGE=0 does) versus taking
+one from the per-process pool (api/db/pool.py).
+
+Each of `threads` workers runs `requests` iterations of connect or check
+out, `SELECT 1`, close or return. Against a real server pass a Postgres
+URL. Without one a fake driver stands in, sleeping `connect_ms` to open a
+connection (TCP, TLS and authentication) and `query_ms` per query.
+"""
+import statistics
+import threading
+import time
+
+from .harness import percentile
+
+
+class FakeConnection:
+    """A psycopg2 stand-in with configurable latency"""
+
+    def __init__(self, connect_ms, query_ms):
+        time.sleep(connect_ms / 1000)
+        self.query_ms = query_ms
+        self.closed = 0
+        self.info = type('Info', (), {'transaction_status': 0})()
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def execute(self, sql):
+        time.sleep(self.query_ms / 1000)
+
+    def close(self):
+        self.closed = 1
+
+
+def connect_function(url=None, connect_ms=5.0, query_ms=0.2):
+    if url is None:
+        return lambda: FakeConnection(connect_ms, query_ms)
+
+    import psycopg2
+    from api.db import database_config
+
+    config = database_config(url)
+    params = {
+        'dbname': config['NAME'], 'user': config['USER'], 'password': config['PASSWORD'],
+        'host': config['HOST'], 'port': config['PORT'], **config.get('OPTIONS', {}),
+    }
+    params = {key: value for key, value in params.items() if value not in ('', None)}
+    return lambda: psycopg2.connect(**params)
+
+
+def measure(mode, connect, threads, requests, check):
+    from api.db.pool import ConnectionPool
+    from api.db.postgresql.base import _check, _reset
+
+    pool = ConnectionPool(connect, health_check=_check, reset=_reset, max_size=threads, check=check)
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        samples = []
+        for _ in range(requests):
+            started = time.perf_counter()
+            connection = pool.getconn() if mode == 'pooled' else connect()
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if mode == 'pooled':
+                pool.putconn(connection)
+            else:
+                connection.close()
+            samples.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(samples)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    pool.close()
+
+    latencies.sort()
+    return {
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'connections_opened': pool.stats['opened'] if mode == 'pooled' else len(latencies),
+        'p50_ms': round(statistics.median(latencies) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def run(url=None, threads=8, requests=200, connect_ms=5.0, query_ms=0.2, check=True):
+    """{mode: stats}"""
+    connect = connect_function(url, connect_ms, query_ms)
+    return {mode: measure(mode, connect, threads, requests, check) for mode in ('direct', 'pooled')}
@@ -0,0 +1,161 @@
+"""
+Scripted API scenarios driven through the real URL conf.
+
+Each scenario is a function `(ctx, iteration) -> response` that performs one
+request. `ScenarioContext.prepare()` runs before any timing starts and sets
+up the accounts, tokens and job IDs the scenarios need.
+"""
+import random
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from jobs.models import Job, Resume
+from users.models import ApplicantProfile
+from .data import DEFAULT_PASSWORD, SKILLS, LOCATIONS, TITLE_ROLES
+
+User = get_user_model()
+
+
+class ScenarioContext:
+    def __init__(self, seed=42, password=DEFAULT_PASSWORD):
+        self.client = Client()
+        self.rng = random.Random(seed)
+        self.password = password
+        self.applicant = None
+        self.auth = {}
+        self.apply_job_ids = []
+        self.queue_job_id = None
+        self.employer_auth = {}
+
+    def login(self, email):
+        response = self.client.post(reverse('login'), {'email': email, 'password': self.password})
+        return {'HTTP_AUTHORIZATION': f"Bearer {response.json()['access']}"}
+
+    def prepare(self):
+        """Create a dedicated applicant with a resume and no applications yet"""
+        self.applicant = User.objects.create_user(
+            email='bench_runner@example.com', username='bench_runner', password=self.password,
+            first_name='Bench', last_name='Runner', role='applicant',
+        )
+        ApplicantProfile.objects.create(user=self.applicant, preferred_locations=LOCATIONS[:2])
+        Resume.objects.create(
+            user=self.applicant, title='Runner CV', file='resumes/bench_runner.pdf',
+            is_primary=True, skills=SKILLS[:5], experience_years=4,
+        )
+        self.auth = self.login(self.applicant.email)
+        self.apply_job_ids = list(
+            Job.objects.filter(is_active=True, application_deadline__isnull=True)
+            .values_list('pk', flat=True)
+        )
+        self.rng.shuffle(self.apply_job_ids)
+        # The most-applied-to job, reviewed by its employer
+        busiest = Job.objects.annotate(total=Count('applications')).order_by('-total').first()
+        self.queue_job_id = busiest.pk
+        self.employer_auth = self.login(busiest.employer.email)
+
+
+def register(ctx, iteration):
+    return ctx.client.post(reverse('register'), {
+        'email': f'bench_register_{iteration}@example.com',
+        'username': f'bench_register_{iteration}',
+        'first_name': 'Bench', 'last_name': 'Register',
+        'password': ctx.password, 'confirm_password': ctx.password,
+        'role': ctx.rng.choice(['employer', 'applicant']),
+    })
+
+
+def login(ctx, iteration):
+    return ctx.client.post(reverse('login'), {'email': ctx.applicant.email, 'password': ctx.password})
+
+
+def profile_get(ctx, iteration):
+    return ctx.client.get(reverse('user-profile'), **ctx.auth)
+
+
+def profile_put(ctx, iteration):
+    return ctx.client.put(
+        reverse('user-profile'), {'address': f'{iteration} Benchmark Street'},
+        content_type='application/json', **ctx.auth,
+    )
+
+
+def applicant_profile_get(ctx, iteration):
+    return ctx.client.get(reverse('applicant-profile'), **ctx.auth)
+
+
+def job_search(ctx, iteration):
+    params = {'q': ctx.rng.choice(['Engineer', 'Developer', 'Manager', 'Data', 'team'])}
+    if ctx.rng.random() < 0.5:
+        params['location'] = ctx.rng.choice(LOCATIONS)
+    if ctx.rng.random() < 0.3:
+        params['min_salary_usd'] = ctx.rng.choice([40_000, 80_000, 120_000])
+    return ctx.client.get(reverse('job-list'), params, **ctx.auth)
+
+
+# 'Remote' is not a place
+NEAR_LOCATIONS = [location for location in LOCATIONS if location != 'Remote'] + ['preferred']
+
+
+def job_search_near(ctx, iteration):
+    params = {'near': ctx.rng.choice(NEAR_LOCATIONS), 'radius_km': ctx.rng.choice([25, 100, 500])}
+    return ctx.client.get(reverse('job-list'), params, **ctx.auth)
+
+
+def autocomplete(ctx, iteration):
+    # One keystroke: a 1-4 character prefix of a title, skill or location
+    word = ctx.rng.choice([*TITLE_ROLES, *SKILLS, *LOCATIONS])
+    return ctx.client.get(reverse('job-autocomplete'), {'q': word[:ctx.rng.randint(1, 4)]})
+
+
+def similar_jobs(ctx, iteration):
+    return ctx.client.get(reverse('job-similar', args=[ctx.rng.choice(ctx.apply_job_ids)]))
+
+
+def change_feed(ctx, iteration):
+    # A partner's first page of an incremental sync
+    return ctx.client.get(reverse('job-changes'), {'limit': ctx.rng.choice([100, 500])})
+
+
+def application_queue(ctx, iteration):
+    params = {'page_size': ctx.rng.choice([10, 20, 50])}
+    return ctx.client.get(reverse('job-application-queue', args=[ctx.queue_job_id]), params, **ctx.employer_auth)
+
+
+def job_list_anonymous(ctx, iteration):
+    return ctx.client.get(reverse('job-list'), {'page': ctx.rng.randint(1, 5)})
+
+
+def job_detail(ctx, iteration):
+    return ctx.client.get(reverse('job-detail', args=[ctx.rng.choice(ctx.apply_job_ids)]))
+
+
+def apply(ctx, iteration):
+    job_id = ctx.apply_job_ids[iteration % len(ctx.apply_job_ids)]
+    return ctx.client.post(
+        reverse('job-apply', args=[job_id]), {'cover_letter': 'Benchmark application'}, **ctx.auth,
+    )
+
+
+SCENARIOS = {
+    'register': register,
+    'login': login,
+    'profile_get': profile_get,
+    'profile_put': profile_put,
+    'applicant_profile_get': applicant_profile_get,
+    'job_search': job_search,
+    'job_search_near': job_search_near,
+    'job_list_anonymous': job_list_anonymous,
+    'job_detail': job_detail,
+    'autocomplete': autocomplete,
+    'similar_jobs': similar_jobs,
+    'change_feed': change_feed,
+    'apply': apply,
+    'application_queue': application_queue,
+}
+
+# Scenarios that hash passwords are orders of magnitude slower than the
+# rest; they run fewer iterations so a full run stays short.
+SLOW_SCENARIOS = {'register', 'login'}
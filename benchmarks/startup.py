@@ -0,0 +1,97 @@
+"""
+Startup benchmark: how long a fresh worker process takes to boot and to
+serve its first requests, cold and after api.warmup.
+
+Every sample is a new interpreter, so nothing is shared between runs. Each
+child loads the WSGI app, optionally warms up, then sends GET /api/jobs/
+twice through it against a throwaway migrated SQLite database. The
+difference between the first and second request is what an unwarmed worker
+makes its first user pay.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+CHILD = """
+import json, os, sys, time
+started = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
+from api.wsgi import application
+from django.conf import settings
+from django.urls import get_resolver
+get_resolver().url_patterns
+booted = time.perf_counter()
+
+# Connections are lazy, so the database can still be pointed elsewhere
+settings.DATABASES['default']['NAME'] = os.environ['BENCHMARK_DB']
+if sys.argv[1] == 'migrate':
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    sys.exit()
+
+timings = {'boot_ms': (booted - started) * 1000}
+if sys.argv[1] == 'warm':
+    from api.warmup import warmup
+    warmup()
+    timings['warmup_ms'] = (time.perf_counter() - booted) * 1000
+
+def get(path):
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80', 'HTTP_HOST': 'localhost', 'REMOTE_ADDR': '127.0.0.1', 'wsgi.url_scheme': 'http',
+        'wsgi.input': sys.stdin.buffer, 'wsgi.errors': sys.stderr,
+    }
+    status = []
+    begin = time.perf_counter()
+    body = b''.join(application(environ, lambda s, headers, exc_info=None: status.append(s)))
+    elapsed = (time.perf_counter() - begin) * 1000
+    assert status[0].startswith('200'), (status, body[:200])
+    return elapsed
+
+timings['first_request_ms'] = get('/api/jobs/')
+timings['second_request_ms'] = get('/api/jobs/')
+print(json.dumps(timings))
+"""
+
+MODES = ('cold', 'warm')
+
+
+def _child(mode, database):
+    env = dict(os.environ, BENCHMARK_DB=str(database))
+    env.setdefault('SECRET_KEY', 'benchmark')
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, '-c', CHILD, mode], cwd=ROOT, env=env,
+        stdin=subprocess.DEVNULL, capture_output=True, text=True,
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    if process.returncode:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1])
+    return wall_ms, process.stdout
+
+
+def run(runs=10):
+    """{mode: {metric: median milliseconds}}"""
+    with tempfile.TemporaryDirectory() as directory:
+        database = Path(directory) / 'startup.sqlite3'
+        _child('migrate', database)
+        samples = {mode: [] for mode in MODES}
+        # Alternate modes so drift in the machine's load affects both equally
+        for _ in range(runs):
+            for mode in MODES:
+                wall_ms, output = _child(mode, database)
+                timings = json.loads(output.strip().splitlines()[-1])
+                timings['process_ms'] = wall_ms
+                samples[mode].append(timings)
+    return {
+        mode: {metric: round(statistics.median(sample[metric] for sample in mode_samples), 2)
+               for metric in mode_samples[0]}
+        for mode, mode_samples in samples.items()
+    }
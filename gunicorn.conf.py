@@ -0,0 +1,26 @@
+"""
+gunicorn settings: `gunicorn -c gunicorn.conf.py`.
+
+The app is loaded and warmed once in the master (see api/warmup.py) and
+workers are forked from it, so they start with Django set up, the URLconf
+and serializers built and nothing left to import.
+"""
+import os
+
+wsgi_app = 'api.wsgi:application'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+preload_app = True
+
+
+def when_ready(server):
+    from api.warmup import warmup
+
+    server.log.info('Warmup: %s', warmup())
+
+
+def post_fork(server, worker):
+    # Never reuse a database socket opened before the fork
+    from django.db import connections
+
+    connections.close_all()
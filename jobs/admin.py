@@ -1,3 +1,87 @@
 from django.contrib import admin
+from api.admin_performance import PerformanceModelAdmin
+from tasks.admin import BackgroundDeletionMixin, background_action
+from .models import Job, Resume, JobApplication, JobSearch, JobBookmark, SavedSearch, SavedSearchMatch
 
-# Register your models here.
+# --- Job Admin ---
+@admin.register(Job)
+class JobAdmin(BackgroundDeletionMixin, PerformanceModelAdmin):
+    list_display = ['title', 'employer', 'job_type', 'experience_level', 'location', 'is_active', 'is_featured', 'created_at']
+    list_filter = ['job_type', 'experience_level', 'is_active', 'is_featured', 'created_at']
+    search_fields = ['^title', '^employer__email', '=external_id']
+    ordering = ['-created_at']
+    raw_id_fields = ['employer', 'duplicate_of']
+    actions = [background_action('jobs.deactivate_jobs', 'Deactivate selected jobs')]
+
+    fieldsets = (
+        ('Job Information', {'fields': ('title', 'employer', 'description', 'requirements', 'responsibilities')}),
+        ('Specifications', {'fields': ('job_type', 'experience_level', 'required_skills', 'preferred_skills', 'tags')}),
+        ('Location', {'fields': ('location', 'place_id', 'latitude', 'longitude')}),
+        ('Salary', {'fields': ('salary_min', 'salary_max', 'salary_currency', 'salary_min_usd', 'salary_max_usd')}),
+        ('Status', {'fields': ('application_deadline', 'is_active', 'is_featured', 'duplicate_of', 'external_id')}),
+        ('Timestamps', {'fields': ('created_at', 'updated_at')}),
+    )
+    readonly_fields = ['place_id', 'latitude', 'longitude', 'salary_min_usd', 'salary_max_usd', 'created_at', 'updated_at']
+
+# --- Resume Admin ---
+@admin.register(Resume)
+class ResumeAdmin(PerformanceModelAdmin):
+    list_display = ['title', 'user', 'is_primary', 'is_active', 'experience_years', 'created_at']
+    list_filter = ['is_primary', 'is_active', 'created_at']
+    search_fields = ['^user__email', '^title']
+    ordering = ['-created_at']
+    raw_id_fields = ['user']
+    readonly_fields = ['created_at', 'updated_at']
+
+# --- Job Application Admin ---
+@admin.register(JobApplication)
+class JobApplicationAdmin(PerformanceModelAdmin):
+    list_display = ['applicant', 'job', 'status', 'score', 'is_shortlisted', 'applied_at']
+    list_filter = ['status', 'is_shortlisted', 'applied_at']
+    search_fields = ['^applicant__email', '^job__title']
+    ordering = ['-applied_at']
+    # Job.__str__ reads the employer
+    list_select_related = ['applicant', 'job__employer']
+    raw_id_fields = ['job', 'applicant', 'resume']
+    readonly_fields = ['expected_salary_usd', 'score', 'applied_at', 'updated_at']
+
+# --- Job Search Admin ---
+@admin.register(JobSearch)
+class JobSearchAdmin(PerformanceModelAdmin):
+    list_display = ['query', 'user', 'results_count', 'searched_at']
+    list_filter = ['searched_at']
+    search_fields = ['^query', '^user__email']
+    ordering = ['-searched_at']
+    raw_id_fields = ['user']
+    readonly_fields = ['searched_at']
+
+# --- Saved Search Admin ---
+@admin.register(SavedSearch)
+class SavedSearchAdmin(PerformanceModelAdmin):
+    list_display = ['query', 'name', 'user', 'is_active', 'created_at']
+    list_filter = ['is_active', 'created_at']
+    search_fields = ['^query', '^user__email']
+    ordering = ['-created_at']
+    list_select_related = ['user']
+    raw_id_fields = ['user']
+    readonly_fields = ['created_at', 'updated_at']
+
+@admin.register(SavedSearchMatch)
+class SavedSearchMatchAdmin(PerformanceModelAdmin):
+    list_display = ['saved_search', 'job', 'matched_at', 'notified_at']
+    list_filter = ['matched_at', 'notified_at']
+    ordering = ['-matched_at']
+    list_select_related = ['saved_search__user', 'job__employer']
+    raw_id_fields = ['saved_search', 'job']
+    readonly_fields = ['matched_at']
+
+# --- Job Bookmark Admin ---
+@admin.register(JobBookmark)
+class JobBookmarkAdmin(PerformanceModelAdmin):
+    list_display = ['user', 'job', 'created_at']
+    list_filter = ['created_at']
+    search_fields = ['^user__email', '^job__title']
+    ordering = ['-created_at']
+    list_select_related = ['user', 'job__employer']
+    raw_id_fields = ['user', 'job']
+    readonly_fields = ['created_at']
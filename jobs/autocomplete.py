@@ -0,0 +1,388 @@
+"""
+Typeahead suggestions for job titles, skills, company names and locations.
+
+Each kind of term is held in a `PrefixIndex`: the terms' word starts in
+one sorted list, so the terms matching a prefix are a contiguous range
+found by binary search ("eng" finds "Engineer" and "Senior Software
+Engineer"). Terms are ranked by weight:
+
+- every listed job adds 1 plus its application count to its title, its
+  skills, its company and its (canonical) location, and
+- every search for exactly the term in the last AUTOCOMPLETE_SEARCH_DAYS
+  days adds 1.
+
+A short prefix matches thousands of terms, so the best MEMO_SIZE terms of
+any range wider than MEMO_THRESHOLD are remembered, and worked out from
+the remembered lists one character longer ("s" from "sa", "sb", ...),
+like the nodes of a trie. A weight increase patches the lists in place; a
+decrease forgets only the lists that held the term, and they are rebuilt
+from their children on the next keystroke. A keystroke is then two
+bisects plus at most MEMO_THRESHOLD comparisons, well under a millisecond.
+
+Like the facet index (jobs/facets.py) the index lives in each process.
+Job and company changes update it from signals and bump a shared
+version, so other processes rebuild. Applications and searches only
+change popularity: they update the local index and are picked up
+elsewhere by the rebuild every AUTOCOMPLETE_MAX_AGE seconds.
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from users.models import EmployerProfile
+from .geo import gazetteer
+from .models import Job, JobApplication, JobSearch
+
+VERSION_KEY = 'jobs:autocomplete:version'
+AUTOCOMPLETE_MAX_AGE = 300
+AUTOCOMPLETE_SEARCH_DAYS = 90
+
+KINDS = ('title', 'skill', 'company', 'location')
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 20
+
+# Ranges wider than this keep their best MEMO_SIZE terms
+MEMO_THRESHOLD = 64
+MEMO_SIZE = MAX_LIMIT
+
+VALUE_FIELDS = ('pk', 'employer_id', 'title', 'location', 'place_id', 'required_skills', 'preferred_skills')
+
+
+def normalize(text):
+    return ' '.join(str(text).casefold().split())
+
+
+def _after(prefix):
+    """The smallest string greater than every string starting with `prefix`"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def word_starts(term):
+    """The term from each of its words on: 'senior python developer' -> 3 keys"""
+    keys = [term]
+    keys.extend(term[index + 1:] for index, char in enumerate(term) if char == ' ')
+    return keys
+
+
+class PrefixIndex:
+    """Weighted terms of one kind, searchable by the prefix of any word"""
+
+    def __init__(self):
+        self.terms = {}  # normalized -> [display, job weight, search weight]
+        self.keys = []  # sorted (word start, normalized)
+        self._memo = {}  # prefix -> best normalized terms, heaviest first
+        self._loading = False
+
+    def __len__(self):
+        return len(self.terms)
+
+    def weight(self, term):
+        _, jobs, searches = self.terms[term]
+        return jobs + searches
+
+    def _rank(self, term):
+        return -self.weight(term), term
+
+    # --- Updates ---
+
+    @contextmanager
+    def loading(self):
+        """Add many terms, sorting the keys once at the end instead of per insert"""
+        self._loading = True
+        try:
+            yield self
+        finally:
+            self._loading = False
+            self.keys.sort()
+            self._memo.clear()
+            self._remember_all()
+
+    def add(self, display, jobs=0, searches=0):
+        """Add weight to a term; a term whose job weight drops to 0 is removed"""
+        term = normalize(display)
+        if not term:
+            return
+        entry = self.terms.get(term)
+        if entry is None:
+            if jobs <= 0:
+                return
+            self.terms[term] = [display, jobs, searches]
+            if self._loading:
+                self.keys.extend((key, term) for key in word_starts(term))
+                return
+            for key in word_starts(term):
+                insort(self.keys, (key, term))
+        else:
+            entry[1] += jobs
+            entry[2] += searches
+            if entry[1] <= 0:
+                del self.terms[term]
+                for key in word_starts(term):
+                    del self.keys[bisect_left(self.keys, (key, term))]
+        self._reranked(term)
+
+    def _prefixes(self, term):
+        for key in word_starts(term):
+            for end in range(1, len(key) + 1):
+                yield key[:end]
+
+    def _reranked(self, term):
+        """Keep the remembered lists under the term's prefixes right after its weight changed"""
+        if self._loading:
+            return
+        rank = self._rank(term) if term in self.terms else None
+        for prefix in self._prefixes(term):
+            best = self._memo.get(prefix)
+            if best is None:
+                continue
+            # A full list may leave out terms, none of them ranked above its last one
+            full = len(best) >= MEMO_SIZE
+            if term in best:
+                best.remove(term)
+                if full and (rank is None or rank > self._rank(best[-1])):
+                    # An unlisted term may now belong in its place: rebuild on the next keystroke
+                    del self._memo[prefix]
+                    continue
+            elif rank is None or (full and rank > self._rank(best[-1])):
+                continue
+            if rank is not None:
+                best.insert(bisect_left([self._rank(other) for other in best], rank), term)
+                del best[MEMO_SIZE:]
+
+    # --- Querying ---
+
+    def suggest(self, prefix, limit=DEFAULT_LIMIT):
+        """[(display, weight)] of the heaviest terms with a word starting with `prefix`"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        start = bisect_left(self.keys, (prefix,))
+        end = bisect_left(self.keys, (_after(prefix),), start)
+        best = self._best(prefix, start, end)
+        return [(self.terms[term][0], self.weight(term)) for term in best[:limit]]
+
+    def _best(self, prefix, start, end):
+        """The heaviest MEMO_SIZE terms of keys[start:end], the keys starting with `prefix`"""
+        if end - start <= MEMO_THRESHOLD:
+            return heapq.nsmallest(MEMO_SIZE, {term for _, term in self.keys[start:end]}, key=self._rank)
+        best = self._memo.get(prefix)
+        if best is None:
+            candidates = set()
+            index = start
+            while index < end:
+                key, term = self.keys[index]
+                if key == prefix:
+                    candidates.add(term)
+                    index += 1
+                    continue
+                child = key[:len(prefix) + 1]
+                child_end = bisect_left(self.keys, (_after(child),), index, end)
+                candidates.update(self._best(child, index, child_end))
+                index = child_end
+            best = self._memo[prefix] = heapq.nsmallest(MEMO_SIZE, candidates, key=self._rank)
+        return best
+
+    def _remember_all(self):
+        """Work out every wide range up front, so no keystroke pays for it"""
+        index = 0
+        while index < len(self.keys):
+            first = self.keys[index][0][:1]
+            end = bisect_left(self.keys, (_after(first),), index)
+            self._best(first, index, end)
+            index = end
+
+
+class AutocompleteIndex:
+    def __init__(self, cache=cache, max_age=AUTOCOMPLETE_MAX_AGE):
+        self.cache = cache
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._indexes = None
+        self._jobs = {}  # pk -> [weight, employer_id, [(kind, display)]]
+        self._companies = {}  # employer_id -> company name
+        self._version = None
+        self._built_at = 0.0
+
+    # --- Building ---
+
+    def _shared_version(self):
+        version = self.cache.get(VERSION_KEY)
+        if version is None:
+            self.cache.add(VERSION_KEY, 0, None)
+            version = self.cache.get(VERSION_KEY, 0)
+        return version
+
+    def _job_terms(self, company, title, location, place_id, required_skills, preferred_skills):
+        place = gazetteer().places.get(place_id) if place_id else None
+        terms = [('title', title), ('location', place.name if place else location)]
+        if company:
+            terms.append(('company', company))
+        skills = {normalize(skill): skill for skill in (required_skills or []) + (preferred_skills or [])
+                  if isinstance(skill, str)}
+        terms.extend(('skill', skill) for skill in skills.values())
+        return terms
+
+    def build(self):
+        """Rebuild every kind from the listed jobs, their applications and recent searches"""
+        version = self._shared_version()
+        companies = dict(EmployerProfile.objects.values_list('user_id', 'company_name'))
+        listed = Job.objects.listed()
+        applications = dict(
+            JobApplication.objects.filter(job__in=listed.values('pk')).order_by()
+            .values_list('job_id').annotate(count=Count('pk'))
+        )
+        indexes = {kind: PrefixIndex() for kind in KINDS}
+        jobs = {}
+        rows = listed.order_by().values_list(*VALUE_FIELDS).iterator(chunk_size=5000)
+        with ExitStack() as stack:
+            for index in indexes.values():
+                stack.enter_context(index.loading())
+            for pk, employer_id, *fields in rows:
+                weight = 1 + applications.get(pk, 0)
+                terms = self._job_terms(companies.get(employer_id), *fields)
+                jobs[pk] = [weight, employer_id, terms]
+                for kind, display in terms:
+                    indexes[kind].add(display, jobs=weight)
+
+            days = getattr(settings, 'AUTOCOMPLETE_SEARCH_DAYS', AUTOCOMPLETE_SEARCH_DAYS)
+            searches = (
+                JobSearch.objects.filter(searched_at__gte=timezone.now() - timedelta(days=days)).order_by()
+                .values_list(Lower('query')).annotate(count=Count('pk'))
+            )
+            for query, count in searches.iterator():
+                for index in indexes.values():
+                    index.add(query, searches=count)
+
+        with self._lock:
+            self._indexes = indexes
+            self._jobs = jobs
+            self._companies = companies
+            self._version = version
+            self._built_at = time.monotonic()
+
+    def _ensure_fresh(self):
+        stale = (
+            self._indexes is None
+            or time.monotonic() - self._built_at > self.max_age
+            or self._shared_version() != self._version
+        )
+        if stale:
+            self.build()
+
+    # --- Incremental updates ---
+
+    def _bump_version(self):
+        """Publish a change; rebuild lazily if another process also changed things"""
+        try:
+            new_version = self.cache.incr(VERSION_KEY)
+        except ValueError:
+            self.cache.add(VERSION_KEY, 1, None)
+            new_version = None
+        with self._lock:
+            if new_version is not None and self._version is not None and new_version == self._version + 1:
+                self._version = new_version
+            else:
+                self._indexes = None
+
+    def _apply(self, terms, weight):
+        for kind, display in terms:
+            self._indexes[kind].add(display, jobs=weight)
+
+    def _remove(self, pk):
+        entry = self._jobs.pop(pk, None)
+        if entry is not None:
+            weight, _, terms = entry
+            self._apply(terms, -weight)
+        return entry
+
+    def update_job(self, job):
+        """Apply one saved job to the loaded index"""
+        with self._lock:
+            if self._indexes is not None:
+                weight, _, old_terms = self._jobs.pop(job.pk, None) or (1, None, [])
+                changes = Counter({term: -weight for term in old_terms})
+                if job.is_active and not job.is_expired and job.duplicate_of_id is None:
+                    terms = self._job_terms(self._companies.get(job.employer_id), job.title, job.location,
+                                            job.place_id, job.required_skills, job.preferred_skills)
+                    self._jobs[job.pk] = [weight, job.employer_id, terms]
+                    for term in terms:
+                        changes[term] += weight
+                # Most saves leave the terms as they were; only the difference is applied
+                for (kind, display), delta in changes.items():
+                    if delta:
+                        self._indexes[kind].add(display, jobs=delta)
+        self._bump_version()
+
+    def remove_job(self, pk):
+        with self._lock:
+            if self._indexes is not None:
+                self._remove(pk)
+        self._bump_version()
+
+    def update_company(self, employer_id, company_name):
+        """Move the employer's jobs to a new company name"""
+        with self._lock:
+            if self._indexes is None or self._companies.get(employer_id) == company_name:
+                return
+            self._companies[employer_id] = company_name
+            for pk, (weight, job_employer_id, terms) in self._jobs.items():
+                if job_employer_id != employer_id:
+                    continue
+                self._apply([term for term in terms if term[0] == 'company'], -weight)
+                terms[:] = [term for term in terms if term[0] != 'company']
+                if company_name:
+                    terms.append(('company', company_name))
+                    self._indexes['company'].add(company_name, jobs=weight)
+        self._bump_version()
+
+    def record_application(self, job_id):
+        """A new application makes the job's terms more popular, in this process only"""
+        with self._lock:
+            entry = self._jobs.get(job_id) if self._indexes is not None else None
+            if entry is not None:
+                entry[0] += 1
+                self._apply(entry[2], 1)
+
+    def record_search(self, query):
+        """A search for a known term makes it more popular, in this process only"""
+        with self._lock:
+            if self._indexes is not None:
+                for index in self._indexes.values():
+                    index.add(query, searches=1)
+
+    def invalidate(self):
+        """Drop the local index and tell other processes to rebuild"""
+        with self._lock:
+            self._indexes = None
+        try:
+            self.cache.incr(VERSION_KEY)
+        except ValueError:
+            self.cache.add(VERSION_KEY, 1, None)
+
+    # --- Querying ---
+
+    def suggest(self, prefix, kinds=KINDS, limit=DEFAULT_LIMIT):
+        """{kind: [{'value', 'weight'}]} for a typed prefix"""
+        limit = max(1, min(limit, MAX_LIMIT))
+        with self._lock:
+            self._ensure_fresh()
+            return {
+                kind: [
+                    {'value': value, 'weight': weight}
+                    for value, weight in self._indexes[kind].suggest(prefix, limit)
+                ]
+                for kind in kinds
+            }
+
+
+autocomplete = AutocompleteIndex()
@@ -0,0 +1,89 @@
+"""
+Bookmark service.
+
+Each user's bookmarked job IDs are cached as a packed, sorted array of
+64-bit ints, so "which jobs on this page are bookmarked?" is a binary
+search per job instead of a query per card.
+
+Writes go straight to `JobBookmark` and then drop the user's cached array,
+which the next read rebuilds from the database. `add` and `remove` state
+the outcome rather than flip it, so a retried or repeated request leaves
+the bookmark as the user asked. With the default per-process cache the
+delete only reaches the worker that wrote, and the others keep serving their
+copy until it expires, so BOOKMARK_CACHE_TIMEOUT is a few seconds unless
+REDIS_URL shares the cache.
+"""
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import JobBookmark
+
+CACHE_KEY = 'jobs:bookmarks:{user_id}'
+CACHE_TIMEOUT = 60 * 60
+
+
+def pack(job_ids):
+    return array('q', sorted(job_ids)).tobytes()
+
+
+def unpack(data):
+    ids = array('q')
+    ids.frombytes(data)
+    return ids
+
+
+def contains(sorted_ids, job_id):
+    index = bisect_left(sorted_ids, job_id)
+    return index < len(sorted_ids) and sorted_ids[index] == job_id
+
+
+class BookmarkService:
+    def __init__(self, cache=cache):
+        self.cache = cache
+
+    def _key(self, user_id):
+        return CACHE_KEY.format(user_id=user_id)
+
+    def _invalidate(self, user_id):
+        key = self._key(user_id)
+        # After commit, or a read in between would cache the old rows again
+        transaction.on_commit(lambda: self.cache.delete(key))
+
+    def get_ids(self, user_id):
+        """Return the user's bookmarked job IDs as a sorted array"""
+        data = self.cache.get(self._key(user_id))
+        if data is None:
+            data = pack(JobBookmark.objects.filter(user_id=user_id).values_list('job_id', flat=True))
+            self.cache.set(self._key(user_id), data, getattr(settings, 'BOOKMARK_CACHE_TIMEOUT', CACHE_TIMEOUT))
+        return unpack(data)
+
+    def bookmarked(self, user_id, job_ids):
+        """Return the subset of `job_ids` the user has bookmarked"""
+        ids = self.get_ids(user_id)
+        return {job_id for job_id in job_ids if contains(ids, job_id)}
+
+    def add(self, user_id, job_id):
+        """Bookmark a job; doing it again changes nothing"""
+        JobBookmark.objects.bulk_create([JobBookmark(user_id=user_id, job_id=job_id)], ignore_conflicts=True)
+        self._invalidate(user_id)
+
+    def remove(self, user_id, job_id):
+        """Drop a bookmark; doing it again changes nothing"""
+        JobBookmark.objects.filter(user_id=user_id, job_id=job_id).delete()
+        self._invalidate(user_id)
+
+    def toggle(self, user_id, job_id):
+        """Flip a bookmark as stored, and return whether the job is now bookmarked"""
+        deleted, _ = JobBookmark.objects.filter(user_id=user_id, job_id=job_id).delete()
+        if deleted:
+            self._invalidate(user_id)
+            return False
+        self.add(user_id, job_id)
+        return True
+
+
+bookmarks = BookmarkService()
@@ -0,0 +1,249 @@
+"""
+Streaming bulk import and export of job postings.
+
+Import reads NDJSON or CSV line by line, validates rows in batches and
+upserts them with a single `bulk_create(update_conflicts=True)` per batch,
+keyed on (employer, external_id). Export walks the table with
+`iterator(chunk_size=...)` and yields text chunks suitable for a
+`StreamingHttpResponse`, so memory use does not grow with the row count.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from rest_framework import serializers
+
+from . import dedupe, similar
+from .models import Job, JobApplication
+from .percolator import percolate_saved
+from .ranking import RANKING_FIELDS
+from .salary import rates
+from .signals import jobs_bulk_changed
+
+FORMATS = ('ndjson', 'csv')
+
+IMPORT_FIELDS = [
+    'external_id', 'title', 'description', 'requirements', 'responsibilities',
+    'job_type', 'experience_level', 'location', 'salary_min', 'salary_max', 'salary_currency',
+    'required_skills', 'preferred_skills', 'tags', 'application_deadline', 'is_active',
+]
+
+# Derived on import from `location` (Job.geocode) and the salary fields (Job.normalize_salary)
+DERIVED_FIELDS = ['place_id', 'latitude', 'longitude', 'salary_min_usd', 'salary_max_usd']
+
+EXPORT_FIELDS = ['id', 'employer_id'] + IMPORT_FIELDS + DERIVED_FIELDS + ['is_featured', 'created_at', 'updated_at']
+
+# JSON list fields are written as "a|b|c" in CSV
+LIST_FIELDS = ('required_skills', 'preferred_skills', 'tags')
+LIST_SEPARATOR = '|'
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_CHUNK_SIZE = 2000
+
+
+class RowError:
+    """A row that could not be parsed; carried through so it is reported, not dropped"""
+
+    def __init__(self, message):
+        self.message = message
+
+
+class JobImportSerializer(serializers.ModelSerializer):
+    external_id = serializers.CharField(max_length=100)
+
+    class Meta:
+        model = Job
+        fields = IMPORT_FIELDS
+
+
+def detect_format(name='', content_type=''):
+    """Guess the import format from a file name or content type"""
+    if name.endswith('.csv') or 'csv' in content_type:
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl')) or 'ndjson' in content_type or 'jsonl' in content_type:
+        return 'ndjson'
+    return None
+
+
+def decode_lines(byte_lines, encoding='utf-8'):
+    """Decode an iterable of byte lines (uploaded files, request streams)"""
+    for line in byte_lines:
+        yield line.decode(encoding) if isinstance(line, bytes) else line
+
+
+def iter_ndjson(lines):
+    """Yield (line_number, row) pairs from NDJSON text lines"""
+    for line_number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, RowError(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(row, dict):
+            yield line_number, RowError("Each line must be a JSON object.")
+            continue
+        yield line_number, row
+
+
+def iter_csv(lines):
+    """Yield (line_number, row) pairs from CSV text lines with a header row"""
+    reader = csv.DictReader(lines)
+    for row in reader:
+        cleaned = {}
+        for key, value in row.items():
+            if key is None:
+                continue
+            if value == '':
+                # Let model defaults / nullability apply to empty cells
+                continue
+            if key in LIST_FIELDS:
+                value = [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+            cleaned[key] = value
+        yield reader.line_num, cleaned
+
+
+def iter_rows(lines, file_format):
+    if file_format == 'csv':
+        return iter_csv(lines)
+    return iter_ndjson(lines)
+
+
+def _fail(summary, line_number, errors, max_errors):
+    """Count a failed row; only the first `max_errors` are kept"""
+    summary['failed'] += 1
+    if len(summary['errors']) < max_errors:
+        summary['errors'].append({'line': line_number, 'errors': errors})
+
+
+def _upsert(batch, employer, summary, max_errors):
+    """Validate one batch and upsert the valid rows"""
+    # Later rows win when a batch repeats an external_id; the database
+    # refuses to update the same row twice in one statement.
+    by_external_id = {}
+    for line_number, row in batch:
+        by_external_id[str(row.get('external_id', ''))] = (line_number, row)
+    line_numbers = [line_number for line_number, _ in by_external_id.values()]
+    rows = [row for _, row in by_external_id.values()]
+    summary['skipped'] += len(batch) - len(rows)
+
+    validator = JobImportSerializer()
+    rate_table = rates()
+    jobs = []
+    for line_number, row in zip(line_numbers, rows):
+        try:
+            data = validator.run_validation(row)
+        except serializers.ValidationError as e:
+            _fail(summary, line_number, e.detail, max_errors)
+            continue
+        job = Job(employer=employer, **data)
+        job.geocode()
+        job.normalize_salary(rate_table)
+        jobs.append(job)
+
+    if jobs:
+        # State of the rows being replaced: requirements, to re-rank only what
+        # changed, and duplicate flags, which the upsert leaves alone
+        existing = Job.objects.filter(employer=employer, external_id__in=[job.external_id for job in jobs])
+        loaded, duplicate_of = {}, {}
+        for job in existing.only('external_id', 'duplicate_of', *RANKING_FIELDS):
+            loaded[job.external_id] = job.ranking_snapshot()
+            duplicate_of[job.external_id] = job.duplicate_of_id
+        for job in jobs:
+            job.duplicate_of_id = duplicate_of.get(job.external_id)
+        # The upsert commits together with what it derives, change feed entries included
+        with transaction.atomic():
+            Job.objects.bulk_create(
+                jobs,
+                update_conflicts=True,
+                unique_fields=['employer', 'external_id'],
+                update_fields=[field for field in IMPORT_FIELDS if field != 'external_id'] + DERIVED_FIELDS + ['updated_at'],
+            )
+            dedupe.index_jobs(jobs)
+            similar.index_jobs(jobs)
+            percolate_saved(jobs)
+            jobs_bulk_changed.send(sender=Job, job_ids=[job.pk for job in jobs])
+        changed = [
+            job.external_id for job in jobs
+            if job.external_id in loaded and loaded[job.external_id] != job.ranking_snapshot()
+        ]
+        if changed:
+            JobApplication.objects.filter(job__employer=employer, job__external_id__in=changed).rescore()
+    summary['imported'] += len(jobs)
+
+
+def import_jobs(rows, employer, batch_size=DEFAULT_BATCH_SIZE, max_errors=100):
+    """
+    Upsert jobs for `employer` from an iterable of (line_number, row) pairs.
+
+    Returns a summary with processed/imported/failed/skipped counts and up
+    to `max_errors` row errors.
+    """
+    summary = {'processed': 0, 'imported': 0, 'failed': 0, 'skipped': 0, 'errors': []}
+    batch = []
+    for line_number, row in rows:
+        summary['processed'] += 1
+        if isinstance(row, RowError):
+            _fail(summary, line_number, row.message, max_errors)
+            continue
+        batch.append((line_number, row))
+        if len(batch) >= batch_size:
+            _upsert(batch, employer, summary, max_errors)
+            batch = []
+    if batch:
+        _upsert(batch, employer, summary, max_errors)
+    return summary
+
+
+class _Echo:
+    """File-like object whose write() just returns the value, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(field, value):
+    if field in LIST_FIELDS:
+        return LIST_SEPARATOR.join(str(item) for item in value or [])
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def exportable_jobs(employer=None):
+    """The jobs an export covers: every live job, or one employer's"""
+    jobs = Job.objects.live()
+    return jobs if employer is None else jobs.filter(employer=employer)
+
+
+def export_jobs(queryset, file_format='ndjson', chunk_size=DEFAULT_CHUNK_SIZE, lines_per_yield=256):
+    """
+    Yield the queryset as NDJSON or CSV text chunks.
+
+    Rows are fetched with `values()` and `iterator(chunk_size=...)` (a
+    server-side cursor on PostgreSQL), so no model instances are built and
+    only one chunk is held in memory at a time.
+    """
+    rows = queryset.order_by('pk').values(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    buffer = []
+    if file_format == 'csv':
+        writer = csv.writer(_Echo())
+        buffer.append(writer.writerow(EXPORT_FIELDS))
+        for row in rows:
+            buffer.append(writer.writerow([_csv_value(field, row[field]) for field in EXPORT_FIELDS]))
+            if len(buffer) >= lines_per_yield:
+                yield ''.join(buffer)
+                buffer = []
+    else:
+        for row in rows:
+            buffer.append(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+            if len(buffer) >= lines_per_yield:
+                yield ''.join(buffer)
+                buffer = []
+    if buffer:
+        yield ''.join(buffer)
@@ -0,0 +1,232 @@
+"""
+Two-tier cache for public job payloads.
+
+Job list pages and job details are the same for every visitor, so their
+serialized form is cached in two tiers: a small per-process LRU in front of
+the shared Django cache. A hit in the first tier costs no network round
+trip and no unpickling; the second tier shares work between processes.
+
+Keys carry version numbers kept in the shared cache. Saving or deleting a
+job bumps the listing version and that job's version (see jobs.signals);
+bulk writes bump the listing version and the version shared by every
+detail. Old entries are never deleted, they just stop being read. Each
+process remembers the versions it has seen for JOB_CACHE['VERSION_TTL']
+seconds, which bounds how long another process can serve an old payload.
+
+That bound only holds if the shared tier really is shared. The default
+LocMemCache is private to each process, versions included: a bump is
+seen by the process that made it, and every other one keeps serving its
+own copy for up to FRESH + STALE seconds. Deployments running more than
+one process configure a shared backend (REDIS_URL in api/settings.py).
+
+Every entry is fresh for JOB_CACHE['FRESH'] seconds and may then be served
+stale for JOB_CACHE['STALE'] more while a single caller rebuilds it
+(stale-while-revalidate). On a cold miss only one caller builds the
+payload: threads in a process wait on the first one, and processes take a
+short lock in the shared cache and wait for its holder to publish.
+
+Cached payloads are shared between requests: treat them as read-only.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+DEFAULTS = {
+    'LOCAL_SIZE': 1024,
+    'LOCAL_TTL': 5,
+    'VERSION_TTL': 1,
+    'FRESH': 30,
+    'STALE': 120,
+    'LOCK_TIMEOUT': 5,
+}
+POLL_INTERVAL = 0.05
+
+LISTING = 'listing'
+DETAILS = 'details'
+
+
+def job_version(pk):
+    return f'job:{pk}'
+
+
+class Entry(NamedTuple):
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+
+class LocalLRU:
+    """Thread-safe least-recently-used map with a per-entry expiry"""
+
+    def __init__(self, size):
+        self.size = size
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    def get(self, key, now):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if now >= expires:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires):
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class TieredCache:
+    def __init__(self, prefix, cache=cache, **options):
+        self.prefix = prefix
+        self.cache = cache
+        self.options = {**DEFAULTS, **getattr(settings, 'JOB_CACHE', {}), **options}
+        self.local = LocalLRU(self.options['LOCAL_SIZE'])
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._flights = {}
+
+    # --- Versions ---
+
+    def _version_key(self, name):
+        return f'{self.prefix}:version:{name}'
+
+    def versions(self, names):
+        """Current version of each name, from the local memo or the shared cache"""
+        now = time.monotonic()
+        with self._lock:
+            known = {name: self._versions.get(name) for name in names}
+        missing = [name for name, item in known.items() if item is None or now >= item[1]]
+        result = {name: item[0] for name, item in known.items() if name not in missing}
+        if missing:
+            shared = self.cache.get_many([self._version_key(name) for name in missing])
+            expires = now + self.options['VERSION_TTL']
+            with self._lock:
+                for name in missing:
+                    result[name] = shared.get(self._version_key(name), 0)
+                    self._versions[name] = (result[name], expires)
+        return [result[name] for name in names]
+
+    def bump(self, *names):
+        """Move the named versions on, retiring every key built from them"""
+        now = time.monotonic()
+        for name in names:
+            key = self._version_key(name)
+            try:
+                version = self.cache.incr(key)
+            except ValueError:
+                # Missing counts as 0, so start at 1
+                self.cache.add(key, 1, None)
+                version = self.cache.get(key, 1)
+            with self._lock:
+                self._versions[name] = (version, now + self.options['VERSION_TTL'])
+
+    def key(self, key, versions=()):
+        tags = ''.join(f':{name}.{version}' for name, version in zip(versions, self.versions(versions)))
+        digest = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        return f'{self.prefix}{tags}:{digest}'
+
+    # --- Lookup ---
+
+    def _lookup(self, full_key):
+        """The entry from the local tier, else the shared one (copied into the local tier)"""
+        now = time.time()
+        entry = self.local.get(full_key, now)
+        if entry is None:
+            entry = self.cache.get(full_key)
+            if entry is not None:
+                self._keep_local(full_key, entry, now)
+        return entry
+
+    def _keep_local(self, full_key, entry, now):
+        self.local.set(full_key, entry, min(entry.stale_until, now + self.options['LOCAL_TTL']))
+
+    def _store(self, full_key, value):
+        now = time.time()
+        fresh_until = now + self.options['FRESH']
+        entry = Entry(value, fresh_until, fresh_until + self.options['STALE'])
+        self.cache.set(full_key, entry, self.options['FRESH'] + self.options['STALE'])
+        self._keep_local(full_key, entry, now)
+        return value
+
+    def _build(self, full_key, build):
+        """Build and publish under the shared lock, or wait for whoever holds it"""
+        lock_key = f'{full_key}:lock'
+        timeout = self.options['LOCK_TIMEOUT']
+        if self.cache.add(lock_key, 1, timeout):
+            try:
+                return self._store(full_key, build())
+            finally:
+                self.cache.delete(lock_key)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            time.sleep(POLL_INTERVAL)
+            entry = self._lookup(full_key)
+            if entry is not None:
+                return entry.value
+        # The holder died or is too slow; don't make the caller wait longer
+        return self._store(full_key, build())
+
+    def get_or_build(self, key, build, versions=()):
+        """
+        The cached value for `key`, calling `build()` to make it when needed.
+        `versions` names the version counters the entry depends on.
+        """
+        full_key = self.key(key, versions)
+        entry = self._lookup(full_key)
+        if entry is not None and time.time() < entry.fresh_until:
+            return entry.value
+
+        with self._lock:
+            flight = self._flights.get(full_key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[full_key] = threading.Event()
+
+        if not leader:
+            if entry is not None:
+                # Someone here is already refreshing
+                return entry.value
+            flight.wait(self.options['LOCK_TIMEOUT'])
+            entry = self._lookup(full_key)
+            return entry.value if entry is not None else self._store(full_key, build())
+
+        try:
+            if entry is not None:
+                # Stale: refresh unless another process already is
+                lock_key = f'{full_key}:lock'
+                if not self.cache.add(lock_key, 1, self.options['LOCK_TIMEOUT']):
+                    return entry.value
+                try:
+                    return self._store(full_key, build())
+                finally:
+                    self.cache.delete(lock_key)
+            return self._build(full_key, build)
+        finally:
+            with self._lock:
+                del self._flights[full_key]
+            flight.set()
+
+    def clear_local(self):
+        self.local.clear()
+        with self._lock:
+            self._versions.clear()
+
+
+job_cache = TieredCache('jobs:public')
@@ -0,0 +1,155 @@
+"""
+Change feed of job listings, for partners that mirror them.
+
+Every write to a job appends a `JobChange` in the same transaction: saves
+and deletions through jobs.signals, bulk writes through
+`jobs_bulk_changed`. `GET /api/jobs/changes/?cursor=` pages through the
+log in sequence order. Each change is answered with the job's current
+listing, or with a deletion once the job is no longer listed, so a
+partner stores the returned cursor and fetches only what changed since.
+
+Sequence numbers are handed out at insert, not at commit, so a slow
+transaction can commit an entry below one already served. Pages
+therefore stop at the first entry younger than SETTLE seconds.
+
+`manage.py compact_job_changes` keeps the log small. An entry followed
+by a later one for the same job adds nothing, so it is dropped once
+older than COMPACT_AFTER seconds, and reading from the start gives one
+entry per job. Deletions are dropped after TOMBSTONE_DAYS, which a
+partner that stopped syncing for longer would miss. A cursor therefore
+carries the time its holder was last caught up (or started reading from
+the start), and once that is nearly TOMBSTONE_DAYS ago the feed answers
+410 Gone: the partner resyncs from the start.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Exists, Max, OuterRef
+from django.utils import timezone
+
+from .models import Job, JobChange
+
+SETTLE = 5
+COMPACT_AFTER = 3600
+TOMBSTONE_DAYS = 30
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 1000
+COMPACT_CHUNK_SIZE = 10_000
+
+
+class CursorExpired(Exception):
+    """Deletions the cursor's holder has not seen may have been compacted away"""
+
+
+def record(job_ids, action="saved"):
+    """Append one entry per job; call inside the transaction writing the jobs"""
+    now = timezone.now()
+    JobChange.objects.bulk_create([JobChange(job_id=pk, action=action, changed_at=now) for pk in job_ids])
+
+
+# --- Cursors ---
+
+def _setting(name, default):
+    return getattr(settings, f'JOB_CHANGES_{name}', default)
+
+
+def format_cursor(seq, synced_at):
+    return f'{seq}.{int(synced_at)}'
+
+
+def parse_cursor(cursor):
+    """(sequence, synced_at) of a cursor; (0, now) to start from the beginning"""
+    if not cursor:
+        return 0, time.time()
+    seq, _, synced_at = cursor.partition('.')
+    if not (seq.isdigit() and synced_at.isdigit()):
+        raise ValueError('Invalid cursor.')
+    synced_at = int(synced_at)
+    if synced_at < time.time() - (_setting('TOMBSTONE_DAYS', TOMBSTONE_DAYS) - 1) * 86400:
+        raise CursorExpired('Cursor expired; sync again from the start, without a cursor.')
+    return int(seq), synced_at
+
+
+# --- Reading ---
+
+def read(cursor, serializer, limit=DEFAULT_LIMIT):
+    """
+    {'changes': [...], 'cursor': str, 'has_more': bool} after `cursor`,
+    with jobs serialized by `serializer`, a compiled JobSerializer
+    """
+    after, synced_at = parse_cursor(cursor)
+    settled = timezone.now() - timedelta(seconds=_setting('SETTLE', SETTLE))
+    rows = list(
+        JobChange.objects.filter(pk__gt=after).order_by('pk').values_list('pk', 'job_id', 'changed_at')[:limit + 1]
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    for index, (_, _, changed_at) in enumerate(rows):
+        if changed_at > settled:
+            rows, has_more = rows[:index], False
+            break
+
+    # A job changed twice in the page is reported once, at its last entry
+    latest = {job_id: seq for seq, job_id, _ in rows}
+    jobs = {}
+    if latest:
+        listed = Job.objects.listed().filter(pk__in=list(latest))
+        if serializer.value_names is not None:
+            listed = listed.values(*serializer.value_names)
+        jobs = {data['id']: data for data in serializer.many(listed)}
+    changes = []
+    for job_id, seq in sorted(latest.items(), key=lambda item: item[1]):
+        if job_id in jobs:
+            changes.append({'seq': seq, 'id': job_id, 'op': 'upsert', 'job': jobs[job_id]})
+        else:
+            changes.append({'seq': seq, 'id': job_id, 'op': 'delete'})
+
+    # Caught up: everything before `settled` has been seen
+    if not has_more:
+        synced_at = settled.timestamp()
+    return {
+        'changes': changes,
+        'cursor': format_cursor(rows[-1][0] if rows else after, synced_at),
+        'has_more': has_more,
+    }
+
+
+def backfill(batch_size=COMPACT_CHUNK_SIZE):
+    """Log every job without an entry, as when the feed is first deployed; returns how many"""
+    logged = JobChange.objects.filter(job_id=OuterRef('pk'))
+    jobs = Job.objects.filter(~Exists(logged)).order_by('pk').values_list('pk', flat=True)
+    total, last = 0, 0
+    while True:
+        pks = list(jobs.filter(pk__gt=last)[:batch_size])
+        if not pks:
+            return total
+        record(pks)
+        total, last = total + len(pks), pks[-1]
+
+
+# --- Compaction ---
+
+def compact(now=None):
+    """Drop superseded entries and old deletions; returns {'superseded': n, 'tombstones': n}"""
+    now = now or timezone.now()
+    superseded_before = now - timedelta(seconds=_setting('COMPACT_AFTER', COMPACT_AFTER))
+    tombstones_before = now - timedelta(days=_setting('TOMBSTONE_DAYS', TOMBSTONE_DAYS))
+    later = JobChange.objects.filter(job_id=OuterRef('job_id'), pk__gt=OuterRef('pk'))
+    superseded = _delete_in_chunks(JobChange.objects.filter(Exists(later), changed_at__lt=superseded_before))
+    # The newest entry always stays: SQLite would hand its sequence out again
+    newest = JobChange.objects.aggregate(newest=Max('pk'))['newest']
+    tombstones = _delete_in_chunks(
+        JobChange.objects.filter(action="deleted", changed_at__lt=tombstones_before)
+        .exclude(Exists(later)).exclude(pk=newest)
+    )
+    return {'superseded': superseded, 'tombstones': tombstones}
+
+
+def _delete_in_chunks(queryset):
+    deleted = 0
+    while True:
+        pks = list(queryset.order_by('pk').values_list('pk', flat=True)[:COMPACT_CHUNK_SIZE])
+        if not pks:
+            return deleted
+        deleted += JobChange.objects.filter(pk__in=pks).delete()[0]
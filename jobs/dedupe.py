@@ -0,0 +1,200 @@
+"""
+Near-duplicate job detection with MinHash and LSH.
+
+A job's title, description and requirements are cut into overlapping word
+shingles and summarised by a MinHash signature: NUM_PERM minimum hash
+values whose pairwise agreement estimates the Jaccard similarity of two
+shingle sets. Signatures are split into BANDS bands of ROWS values and each
+band is hashed into a bucket stored in `JobFingerprintBand`. Two postings
+that are similar enough almost surely share a bucket, so finding
+candidates is one indexed `bucket IN (...)` lookup instead of a scan, and
+only those candidates are compared signature to signature.
+
+A job whose estimated similarity to an older open job of the same
+employer reaches `settings.JOB_DUPLICATE_THRESHOLD` gets `duplicate_of`
+set to the oldest posting in the chain, and drops out of
+`Job.objects.listed()`. Closed postings (inactive, expired or being
+deleted) are never originals: reposting an expired job lists the repost,
+and once an original closes `release` re-checks its reposts so the oldest
+takes its place.
+"""
+import hashlib
+import random
+import re
+from array import array
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Job, JobFingerprint, JobFingerprintBand, TEXT_FIELDS
+
+# 20 bands of 6 rows: postings with similarity 0.8 share a bucket with
+# probability above 99.8%, unrelated ones at 0.5 about 27% of the time
+NUM_PERM = 120
+BANDS = 20
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+DEFAULT_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD = re.compile(r'\w+')
+
+# Fixed seed: signatures must stay comparable across processes and deploys
+_rng = random.Random(1729)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERM)
+]
+
+
+def duplicate_threshold():
+    return getattr(settings, 'JOB_DUPLICATE_THRESHOLD', DEFAULT_THRESHOLD)
+
+
+def _hash(data):
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Hashes of the overlapping `size`-word windows of `text`"""
+    words = _WORD.findall(text.casefold())
+    if len(words) < size:
+        return {_hash(' '.join(words).encode())} if words else set()
+    return {_hash(' '.join(words[i:i + size]).encode()) for i in range(len(words) - size + 1)}
+
+
+def signature(job):
+    """MinHash signature of a job's text as an array of NUM_PERM unsigned ints"""
+    hashes = [value & _MAX_HASH for value in shingles(' '.join(getattr(job, field) or '' for field in TEXT_FIELDS))]
+    if not hashes:
+        return array('I', [_MAX_HASH] * NUM_PERM)
+    return array('I', [
+        min((a * value + b) % _MERSENNE_PRIME for value in hashes) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    ])
+
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(x == y for x, y in zip(first, second)) / NUM_PERM
+
+
+def buckets(sig):
+    """One signed 64-bit bucket per band, band number mixed in so bands never collide"""
+    return [
+        _hash(bytes([band]) + sig[band * ROWS:(band + 1) * ROWS].tobytes()) - (1 << 63)
+        for band in range(BANDS)
+    ]
+
+
+def is_open(job):
+    """Whether a job can be the original of a repost, as Job.objects.open().live()"""
+    return job.is_active and job.deletion_requested_at is None and not job.is_expired
+
+
+def _open_q(prefix, now):
+    return (
+        Q(**{f'{prefix}is_active': True, f'{prefix}deletion_requested_at__isnull': True})
+        & (Q(**{f'{prefix}application_deadline__isnull': True}) | Q(**{f'{prefix}application_deadline__gt': now}))
+    )
+
+
+def _unpack(data):
+    sig = array('I')
+    sig.frombytes(bytes(data))
+    return sig
+
+
+def index_jobs(jobs, threshold=None, created=False):
+    """
+    Fingerprint saved jobs, flag near-duplicates and store their LSH buckets.
+
+    Each job is only compared with older open postings (lower pk) of the
+    same employer, already indexed or earlier in `jobs`, so the first
+    posting stays the original. Sets `duplicate_of_id` on the given
+    instances and returns the {job_id: duplicate_of_id} changes that were
+    written. Pass `created` for jobs that were just inserted and so have
+    nothing stored yet.
+    """
+    threshold = duplicate_threshold() if threshold is None else threshold
+    jobs = sorted((job for job in jobs if job.pk is not None), key=lambda job: job.pk)
+    if not jobs:
+        return {}
+    job_ids = [job.pk for job in jobs]
+    signatures = {job.pk: signature(job) for job in jobs}
+    job_buckets = {job.pk: buckets(signatures[job.pk]) for job in jobs}
+
+    # One lookup for every stored posting sharing a bucket with the batch
+    by_bucket = {}
+    rows = JobFingerprintBand.objects.filter(
+        bucket__in={bucket for values in job_buckets.values() for bucket in values},
+    ).exclude(job_id__in=job_ids).values_list('bucket', 'job_id')
+    for bucket, job_id in rows:
+        by_bucket.setdefault(bucket, set()).add(job_id)
+    candidate_ids = set().union(*by_bucket.values()) if by_bucket else set()
+    # Only open postings, and only reposts of open ones, can be matched
+    now = timezone.now()
+    fingerprints = JobFingerprint.objects.filter(
+        _open_q('job__', now), Q(job__duplicate_of__isnull=True) | _open_q('job__duplicate_of__', now),
+        job_id__in=candidate_ids, job__employer_id__in={job.employer_id for job in jobs},
+    )
+    candidates = {
+        job_id: (_unpack(data), employer_id, original_id)
+        for job_id, data, employer_id, original_id
+        in fingerprints.values_list('job_id', 'signature', 'job__employer_id', 'job__duplicate_of_id')
+    }
+
+    changes = {}
+    for job in jobs:
+        sig = signatures[job.pk]
+        best = None
+        seen = set()
+        for bucket in job_buckets[job.pk] if is_open(job) else ():
+            for other_id in by_bucket.get(bucket, ()):
+                if other_id >= job.pk or other_id in seen or other_id not in candidates:
+                    continue
+                seen.add(other_id)
+                other_sig, employer_id, original_id = candidates[other_id]
+                if employer_id != job.employer_id:
+                    continue
+                score = similarity(sig, other_sig)
+                if score >= threshold and (best is None or score > best[0]):
+                    best = (score, original_id or other_id)
+        duplicate_of_id = best[1] if best else None
+        if duplicate_of_id != job.duplicate_of_id:
+            changes[job.pk] = duplicate_of_id
+            job.duplicate_of_id = duplicate_of_id
+        # Later jobs in the batch can match this one
+        if is_open(job):
+            candidates[job.pk] = (sig, job.employer_id, duplicate_of_id)
+        for bucket in job_buckets[job.pk]:
+            by_bucket.setdefault(bucket, set()).add(job.pk)
+
+    # Within a job's save this joins its transaction, without a savepoint
+    with transaction.atomic(savepoint=False):
+        if not created:
+            JobFingerprintBand.objects.filter(job_id__in=job_ids).delete()
+            JobFingerprint.objects.filter(job_id__in=job_ids).delete()
+        JobFingerprint.objects.bulk_create(
+            [JobFingerprint(job_id=job_id, signature=signatures[job_id].tobytes()) for job_id in job_ids],
+        )
+        JobFingerprintBand.objects.bulk_create([
+            JobFingerprintBand(job_id=job_id, bucket=bucket)
+            for job_id in job_ids for bucket in job_buckets[job_id]
+        ])
+        if changes:
+            Job.objects.bulk_update([job for job in jobs if job.pk in changes], ['duplicate_of'])
+    return changes
+
+
+def release(job_ids):
+    """
+    Re-check the reposts of jobs that have closed, so the oldest of them is
+    listed in its place; returns the {job_id: duplicate_of_id} changes
+    """
+    reposts = Job.objects.filter(duplicate_of_id__in=job_ids).order_by('pk').only(
+        'pk', 'employer', 'duplicate_of', 'is_active', 'application_deadline', 'deletion_requested_at', *TEXT_FIELDS,
+    )
+    return index_jobs(list(reposts))
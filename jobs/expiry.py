@@ -0,0 +1,27 @@
+"""
+Expiry sweeper: flips postings whose application deadline has passed to
+inactive, in bounded bulk UPDATEs so no single statement locks the table
+for long.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Job
+from .signals import jobs_bulk_changed
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def expire_jobs(batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """Deactivate every expired job and return how many were updated"""
+    now = now or timezone.now()
+    total = 0
+    while True:
+        # order_by() drops the default ordering so the partial deadline index is used
+        ids = list(Job.objects.expired(now).order_by().values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            break
+        with transaction.atomic():
+            total += Job.objects.filter(pk__in=ids, is_active=True).update(is_active=False, updated_at=now)
+            jobs_bulk_changed.send(sender=Job, job_ids=ids)
+    return total
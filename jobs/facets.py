@@ -0,0 +1,274 @@
+"""
+Facet counts for job search.
+
+The index keeps one posting bitmap per facet value over the listed jobs (a
+Python int with bit N set when job N has that value). Facet counts for a
+result set are then `(candidates & posting).bit_count()` per value: one
+pass to build the candidate bitmap from the matching IDs, no GROUP BY per
+facet.
+
+A bitmap costs max job ID / 8 bytes whatever it holds, so only bounded
+value sets get one: the choices, salary bands and gazetteer places.
+Free-text locations that match no place are a long tail of one-off values;
+they are counted from each job's values instead (a running Counter for the
+whole index, one pass over the candidate IDs for a result set).
+
+The index lives in each process. Job saves and deletes update it
+incrementally (see jobs.signals); bulk writes send `jobs_bulk_changed`.
+A shared version number in the cache tells other processes to rebuild, and
+the index is also rebuilt after FACET_INDEX_MAX_AGE seconds so deadlines
+that pass without any write still drop out.
+"""
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from .geo import gazetteer
+from .models import Job, JOB_TYPES, EXPERIENCE_LEVELS
+
+VERSION_KEY = 'jobs:facets:version'
+FACET_INDEX_MAX_AGE = 300
+LOCATION_FACET_LIMIT = 20
+
+# Annual USD (see jobs/salary.py): (key, label, lower bound inclusive, upper bound exclusive)
+SALARY_BANDS = (
+    ('0-30k', 'Under $30k', 0, 30_000),
+    ('30k-60k', '$30k - $60k', 30_000, 60_000),
+    ('60k-100k', '$60k - $100k', 60_000, 100_000),
+    ('100k-150k', '$100k - $150k', 100_000, 150_000),
+    ('150k+', '$150k and above', 150_000, None),
+)
+SALARY_NOT_SPECIFIED = 'not-specified'
+
+FACETS = ('job_type', 'experience_level', 'location', 'salary_band')
+VALUE_FIELDS = ('pk', 'job_type', 'experience_level', 'location', 'place_id', 'salary_min_usd', 'salary_max_usd')
+
+
+def salary_band(salary_min, salary_max):
+    """Band a job by its minimum salary, falling back to the maximum"""
+    amount = salary_min if salary_min is not None else salary_max
+    if amount is None:
+        return SALARY_NOT_SPECIFIED
+    for key, _, low, high in SALARY_BANDS:
+        if amount >= low and (high is None or amount < high):
+            return key
+    return SALARY_NOT_SPECIFIED
+
+
+def salary_band_q(key):
+    """Q object selecting the jobs that salary_band() puts in `key`"""
+    for band, _, low, high in SALARY_BANDS:
+        if band == key:
+            amount = Q(salary_min_usd__gte=low) | Q(salary_min_usd__isnull=True, salary_max_usd__gte=low)
+            if high is not None:
+                amount &= Q(salary_min_usd__lt=high) | Q(salary_min_usd__isnull=True, salary_max_usd__lt=high)
+            return amount
+    if key == SALARY_NOT_SPECIFIED:
+        return Q(salary_min_usd__isnull=True, salary_max_usd__isnull=True)
+    return None
+
+
+def facet_values(job_type, experience_level, location, place_id, salary_min, salary_max):
+    # Group spelling variants under the canonical place name when known
+    place = gazetteer().places.get(place_id) if place_id else None
+    return {
+        'job_type': job_type,
+        'experience_level': experience_level,
+        'location': place.name if place else (location or '').strip(),
+        'salary_band': salary_band(salary_min, salary_max),
+    }
+
+
+@lru_cache(maxsize=1)
+def _place_names():
+    return frozenset(place.name for place in gazetteer().places.values())
+
+
+def has_posting(facet, value):
+    """Whether `value` gets a bitmap; unmatched free-text locations are counted per job"""
+    return facet != 'location' or value in _place_names()
+
+
+def bitmap_from_ids(ids):
+    """Build a bitmap from an iterable of non-negative ints in one pass"""
+    ids = list(ids)
+    if not ids:
+        return 0
+    bits = bytearray(max(ids) // 8 + 1)
+    for job_id in ids:
+        bits[job_id >> 3] |= 1 << (job_id & 7)
+    return int.from_bytes(bits, 'little')
+
+
+class FacetIndex:
+    def __init__(self, cache=cache, max_age=FACET_INDEX_MAX_AGE):
+        self.cache = cache
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._postings = None
+        self._job_values = {}
+        self._unplaced = Counter()
+        self._version = None
+        self._built_at = 0.0
+
+    # --- Building ---
+
+    def _shared_version(self):
+        version = self.cache.get(VERSION_KEY)
+        if version is None:
+            self.cache.add(VERSION_KEY, 0, None)
+            version = self.cache.get(VERSION_KEY, 0)
+        return version
+
+    def build(self):
+        """Rebuild every posting bitmap from the listed jobs"""
+        version = self._shared_version()
+        postings = {facet: {} for facet in FACETS}
+        bits = {facet: {} for facet in FACETS}
+        job_values = {}
+        unplaced = Counter()
+        rows = Job.objects.listed().order_by().values_list(*VALUE_FIELDS).iterator(chunk_size=5000)
+        for pk, *fields in rows:
+            values = facet_values(*fields)
+            job_values[pk] = values
+            for facet, value in values.items():
+                if has_posting(facet, value):
+                    bits[facet].setdefault(value, []).append(pk)
+                else:
+                    unplaced[value] += 1
+        for facet, by_value in bits.items():
+            for value, ids in by_value.items():
+                postings[facet][value] = bitmap_from_ids(ids)
+        with self._lock:
+            self._postings = postings
+            self._job_values = job_values
+            self._unplaced = unplaced
+            self._version = version
+            self._built_at = time.monotonic()
+
+    def _ensure_fresh(self):
+        stale = (
+            self._postings is None
+            or time.monotonic() - self._built_at > self.max_age
+            or self._shared_version() != self._version
+        )
+        if stale:
+            self.build()
+
+    # --- Incremental updates ---
+
+    def _bump_version(self):
+        """Publish a change; rebuild lazily if another process also changed things"""
+        try:
+            new_version = self.cache.incr(VERSION_KEY)
+        except ValueError:
+            self.cache.add(VERSION_KEY, 1, None)
+            new_version = None
+        with self._lock:
+            if new_version is not None and self._version is not None and new_version == self._version + 1:
+                self._version = new_version
+            else:
+                self._postings = None
+
+    def _remove(self, pk):
+        values = self._job_values.pop(pk, None)
+        if values is None:
+            return
+        mask = ~(1 << pk)
+        for facet, value in values.items():
+            if not has_posting(facet, value):
+                self._unplaced[value] -= 1
+                if self._unplaced[value] <= 0:
+                    del self._unplaced[value]
+                continue
+            posting = self._postings[facet].get(value)
+            if posting is not None:
+                self._postings[facet][value] = posting & mask
+
+    def update_job(self, job):
+        """Apply one saved job to the loaded bitmaps"""
+        with self._lock:
+            if self._postings is not None:
+                self._remove(job.pk)
+                if job.is_active and not job.is_expired and job.duplicate_of_id is None:
+                    values = facet_values(job.job_type, job.experience_level, job.location, job.place_id,
+                                          job.salary_min_usd, job.salary_max_usd)
+                    self._job_values[job.pk] = values
+                    bit = 1 << job.pk
+                    for facet, value in values.items():
+                        if has_posting(facet, value):
+                            self._postings[facet][value] = self._postings[facet].get(value, 0) | bit
+                        else:
+                            self._unplaced[value] += 1
+        self._bump_version()
+
+    def remove_job(self, pk):
+        with self._lock:
+            if self._postings is not None:
+                self._remove(pk)
+        self._bump_version()
+
+    def invalidate(self):
+        """Drop the local bitmaps and tell other processes to rebuild"""
+        with self._lock:
+            self._postings = None
+        try:
+            self.cache.incr(VERSION_KEY)
+        except ValueError:
+            self.cache.add(VERSION_KEY, 1, None)
+
+    # --- Querying ---
+
+    def counts(self, candidate_ids=None):
+        """
+        Facet counts for the candidate job IDs, or for every open job when
+        `candidate_ids` is None.
+        """
+        if candidate_ids is not None:
+            candidate_ids = list(candidate_ids)
+        candidates = None if candidate_ids is None else bitmap_from_ids(candidate_ids)
+        with self._lock:
+            self._ensure_fresh()
+            return self._counts(self._postings, candidates, self._unplaced_counts(candidate_ids))
+
+    def _unplaced_counts(self, candidate_ids):
+        if candidate_ids is None:
+            return self._unplaced
+        return Counter(
+            values['location'] for values in map(self._job_values.get, candidate_ids)
+            if values is not None and not has_posting('location', values['location'])
+        )
+
+    def _counts(self, postings, candidates, unplaced):
+        def count(posting):
+            return (posting if candidates is None else posting & candidates).bit_count()
+
+        def choice_counts(facet, choices):
+            return [
+                {'value': value, 'label': label, 'count': count(postings[facet].get(value, 0))}
+                for value, label in choices
+            ]
+
+        locations = [(value, count(posting)) for value, posting in postings['location'].items()]
+        locations.extend(unplaced.items())
+        locations = sorted(
+            ((value, total) for value, total in locations if value), key=lambda item: (-item[1], item[0]),
+        )
+        salary_choices = [(key, label) for key, label, _, _ in SALARY_BANDS]
+        salary_choices.append((SALARY_NOT_SPECIFIED, 'Not specified'))
+        return {
+            'job_type': choice_counts('job_type', JOB_TYPES),
+            'experience_level': choice_counts('experience_level', EXPERIENCE_LEVELS),
+            'location': [
+                {'value': value, 'label': value, 'count': total}
+                for value, total in locations[:LOCATION_FACET_LIMIT] if total
+            ],
+            'salary_band': choice_counts('salary_band', salary_choices),
+        }
+
+
+facet_index = FacetIndex()
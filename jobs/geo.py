@@ -0,0 +1,166 @@
+"""
+Offline location normalisation and radius search.
+
+`jobs/data/gazetteer.csv` ships with the app, so nothing here touches the
+network. Free-text locations ("Ikeja, Lagos (Hybrid)", "München") resolve to
+a canonical place ID with coordinates, stored on the job. A radius query
+first finds the gazetteer places inside the circle using a 1-degree grid,
+then selects jobs by the indexed `place_id` column.
+"""
+import csv
+import math
+import re
+import unicodedata
+from collections import defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import NamedTuple
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / 'data' / 'gazetteer.csv'
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.195
+CELL_DEGREES = 1.0
+# Radius searches (`near`): default and largest radius
+DEFAULT_RADIUS_KM = 50
+MAX_RADIUS_KM = 1000
+
+_SEPARATORS = re.compile(r'[,/|;()\[\]]+|\s+-\s+')
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+class Place(NamedTuple):
+    id: str
+    name: str
+    country: str
+    latitude: float
+    longitude: float
+
+
+def normalize(text):
+    """Case-fold, strip accents and punctuation: ' Zürich ' -> 'zurich'"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return _NON_ALNUM.sub(' ', text.casefold()).strip()
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _cell(latitude, longitude):
+    return math.floor(latitude / CELL_DEGREES), math.floor(longitude / CELL_DEGREES)
+
+
+class Gazetteer:
+    def __init__(self, places):
+        self.places = {}
+        self._names = {}
+        self._cells = defaultdict(list)
+        for place, alternate_names in places:
+            self.places[place.id] = place
+            self._cells[_cell(place.latitude, place.longitude)].append(place)
+            for name in [place.name, *alternate_names]:
+                # First entry wins, so the file order settles ambiguous names
+                self._names.setdefault(normalize(name), place.id)
+
+    @classmethod
+    def from_csv(cls, path=GAZETTEER_PATH):
+        with open(path, encoding='utf-8', newline='') as source:
+            rows = list(csv.DictReader(source))
+        return cls(
+            (
+                Place(row['id'], row['name'], row['country'], float(row['latitude']), float(row['longitude'])),
+                [name for name in row['alternate_names'].split('|') if name],
+            )
+            for row in rows
+        )
+
+    def resolve(self, text):
+        """Return the Place for a free-text location, or None"""
+        key = normalize(text)
+        if not key:
+            return None
+        if key in self._names:
+            return self.places[self._names[key]]
+        # "Ikeja, Lagos (Hybrid)" -> try each part in turn
+        for part in _SEPARATORS.split(text):
+            place_id = self._names.get(normalize(part))
+            if place_id:
+                return self.places[place_id]
+        return None
+
+    def within(self, latitude, longitude, radius_km):
+        """Places within `radius_km` of a point, nearest first, as (place, km)"""
+        lat_span = radius_km / KM_PER_DEGREE
+        cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+        lng_span = min(180.0, radius_km / (KM_PER_DEGREE * cos_lat))
+
+        min_row, min_col = _cell(max(-90.0, latitude - lat_span), longitude - lng_span)
+        max_row, max_col = _cell(min(90.0, latitude + lat_span), longitude + lng_span)
+        columns_around_globe = int(360 / CELL_DEGREES)
+        columns = range(min_col, max_col + 1)
+        if len(columns) >= columns_around_globe:
+            columns = range(-columns_around_globe // 2, columns_around_globe // 2)
+
+        found = []
+        for row in range(min_row, max_row + 1):
+            for column in columns:
+                # Wrap across the antimeridian
+                wrapped = (column + columns_around_globe // 2) % columns_around_globe - columns_around_globe // 2
+                for place in self._cells.get((row, wrapped), ()):
+                    distance = haversine_km(latitude, longitude, place.latitude, place.longitude)
+                    if distance <= radius_km:
+                        found.append((place, distance))
+        found.sort(key=lambda item: item[1])
+        return found
+
+
+@lru_cache(maxsize=1)
+def gazetteer():
+    return Gazetteer.from_csv()
+
+
+def parse_point(text):
+    """(latitude, longitude) for "lat,lng" on the globe, or None"""
+    try:
+        latitude, longitude = (float(part) for part in text.split(','))
+    except ValueError:
+        return None
+    # float() also takes "nan" and "inf"
+    if not (math.isfinite(latitude) and math.isfinite(longitude)):
+        return None
+    if abs(latitude) > 90 or abs(longitude) > 180:
+        return None
+    return latitude, longitude
+
+
+def parse_radius(value):
+    """A radius in km, capped at MAX_RADIUS_KM, or None unless a finite number >= 0"""
+    try:
+        radius_km = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(radius_km) or radius_km < 0:
+        return None
+    return min(radius_km, MAX_RADIUS_KM)
+
+
+def resolve_origins(near):
+    """(latitude, longitude) points for "lat,lng", a place name or a list of place names"""
+    if isinstance(near, str):
+        point = parse_point(near)
+        if point is not None:
+            return [point]
+        near = [near]
+    places = [gazetteer().resolve(name) for name in near]
+    return [(place.latitude, place.longitude) for place in places if place]
+
+
+def place_ids_near(origins, radius_km):
+    """IDs of every place within `radius_km` of any (latitude, longitude) origin"""
+    place_ids = set()
+    for latitude, longitude in origins:
+        place_ids.update(place.id for place, _ in gazetteer().within(latitude, longitude, radius_km))
+    return place_ids
@@ -0,0 +1,42 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from jobs import similar
+from jobs.models import Job, JobTermStatistics, VECTOR_FIELDS
+
+
+class Command(BaseCommand):
+    help = "Recount term statistics and rebuild every job's similarity vector (backfill, or once the job mix has shifted)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        jobs = Job.objects.live().order_by('pk')
+
+        # Pass 1: in how many jobs each feature appears
+        frequencies, documents = Counter(), 0
+        for values in jobs.values(*VECTOR_FIELDS).iterator(chunk_size=batch_size):
+            frequencies.update(similar.terms(values).keys())
+            documents += 1
+        stats = similar.Statistics.from_counts(documents, frequencies)
+        latest = JobTermStatistics.objects.create(documents=documents, frequencies=stats.pack())
+        JobTermStatistics.objects.exclude(pk=latest.pk).delete()
+        similar.forget_statistics()
+
+        # Pass 2: every vector again with the new weights
+        batch, total = {}, 0
+        for values in jobs.values('pk', *VECTOR_FIELDS).iterator(chunk_size=batch_size):
+            batch[values['pk']] = similar.vectorize(values, stats)
+            if len(batch) >= batch_size:
+                similar.store(batch)
+                total += len(batch)
+                batch = {}
+        if batch:
+            similar.store(batch)
+            total += len(batch)
+        self.stdout.write(self.style.SUCCESS(
+            f"Vectorized {total} job(s) over {len(frequencies)} distinct term(s)"
+        ))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from jobs import changes
+
+
+class Command(BaseCommand):
+    help = "Compact the job change feed (superseded entries and old deletions). Run from cron."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backfill', action='store_true',
+                            help='First log every job the feed has no entry for (once, when the feed is deployed)')
+
+    def handle(self, *args, **options):
+        if options['backfill']:
+            self.stdout.write(f"Logged {changes.backfill()} job(s) without an entry")
+        removed = changes.compact()
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {removed['superseded']} superseded entr(ies) and {removed['tombstones']} old deletion(s)"
+        ))
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs import dedupe
+from jobs.models import Job, JobFingerprint, JobFingerprintBand, TEXT_FIELDS
+from jobs.signals import jobs_bulk_changed
+
+
+class Command(BaseCommand):
+    help = "Fingerprint every job and flag near-duplicate reposts (backfill, or after a threshold change)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--threshold', type=float, help='Defaults to settings.JOB_DUPLICATE_THRESHOLD')
+        parser.add_argument('--reset', action='store_true', help='Drop stored fingerprints first')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            JobFingerprintBand.objects.all().delete()
+            JobFingerprint.objects.all().delete()
+
+        # Oldest first, so the original posting of each group is indexed before its reposts
+        jobs = Job.objects.order_by('pk').only(
+            'pk', 'employer', 'duplicate_of', 'is_active', 'application_deadline', 'deletion_requested_at', *TEXT_FIELDS,
+        )
+        batch, total, flagged = [], 0, 0
+        for job in jobs.iterator(chunk_size=options['batch_size']):
+            batch.append(job)
+            if len(batch) >= options['batch_size']:
+                flagged += self._index(batch, options['threshold'])
+                total += len(batch)
+                batch = []
+        if batch:
+            flagged += self._index(batch, options['threshold'])
+            total += len(batch)
+        duplicates = Job.objects.filter(duplicate_of__isnull=False).count()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {total} job(s); {flagged} flag change(s); {duplicates} job(s) marked as duplicates"
+        ))
+
+    def _index(self, batch, threshold):
+        with transaction.atomic():
+            changes = dedupe.index_jobs(batch, threshold=threshold)
+            if changes:
+                jobs_bulk_changed.send(sender=Job, job_ids=list(changes))
+        return len(changes)
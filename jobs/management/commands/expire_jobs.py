@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.expiry import expire_jobs, DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = "Deactivate jobs whose application deadline has passed. Run from cron, or with --loop."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true', help='Keep sweeping every --interval seconds')
+        parser.add_argument('--interval', type=int, default=300)
+
+    def handle(self, *args, **options):
+        while True:
+            count = expire_jobs(batch_size=options['batch_size'])
+            self.stdout.write(f"Deactivated {count} expired job(s)")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,36 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import bulk
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Stream jobs to an NDJSON or CSV file in constant memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default='-', help="Destination file, or '-' for stdout")
+        parser.add_argument('--format', choices=bulk.FORMATS, default='ndjson')
+        parser.add_argument('--employer', help='Only export jobs owned by this employer email')
+        parser.add_argument('--chunk-size', type=int, default=bulk.DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        employer = None
+        if options['employer']:
+            employer = User.objects.filter(email=options['employer']).first()
+            if employer is None:
+                raise CommandError(f"No user with email {options['employer']}")
+        # The same rows as JobExportView: jobs awaiting deletion are left out
+        jobs = bulk.exportable_jobs(employer)
+
+        chunks = bulk.export_jobs(jobs, options['format'], chunk_size=options['chunk_size'])
+        if options['output'] == '-':
+            for chunk in chunks:
+                sys.stdout.write(chunk)
+        else:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as destination:
+                for chunk in chunks:
+                    destination.write(chunk)
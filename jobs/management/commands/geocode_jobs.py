@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs.models import Job
+from jobs.signals import jobs_bulk_changed
+
+
+class Command(BaseCommand):
+    help = "Resolve every job's location against the bundled gazetteer (backfill or after a gazetteer update)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--missing-only', action='store_true', help='Only jobs without a place yet')
+
+    def handle(self, *args, **options):
+        jobs = Job.objects.order_by('pk').only('pk', 'location', 'place_id', 'latitude', 'longitude')
+        if options['missing_only']:
+            jobs = jobs.filter(place_id__isnull=True)
+
+        batch, resolved, total = [], 0, 0
+        for job in jobs.iterator(chunk_size=options['batch_size']):
+            job.geocode()
+            resolved += job.place_id is not None
+            total += 1
+            batch.append(job)
+            if len(batch) >= options['batch_size']:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+        self.stdout.write(self.style.SUCCESS(f"Geocoded {total} job(s); {resolved} matched a known place"))
+
+    def _write(self, batch):
+        with transaction.atomic():
+            Job.objects.bulk_update(batch, ['place_id', 'latitude', 'longitude'])
+            jobs_bulk_changed.send(sender=Job, job_ids=[job.pk for job in batch])
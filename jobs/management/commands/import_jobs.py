@@ -0,0 +1,44 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs import bulk
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Upsert an employer's jobs from an NDJSON or CSV file, keyed on external_id"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' for stdin")
+        parser.add_argument('--employer', required=True, help='Email of the employer that owns the jobs')
+        parser.add_argument('--format', choices=bulk.FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=bulk.DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            employer = User.objects.get(email=options['employer'], role='employer')
+        except User.DoesNotExist:
+            raise CommandError(f"No employer with email {options['employer']}")
+
+        file_format = options['format'] or bulk.detect_format(options['path'])
+        if file_format is None:
+            raise CommandError('Could not detect the file format; pass --format.')
+
+        if options['path'] == '-':
+            summary = self._import(sys.stdin, file_format, employer, options['batch_size'])
+        else:
+            with open(options['path'], encoding='utf-8', newline='') as source:
+                summary = self._import(source, file_format, employer, options['batch_size'])
+
+        for error in summary['errors']:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {summary['processed']} rows: {summary['imported']} imported, "
+            f"{summary['failed']} failed, {summary['skipped']} superseded within a batch"
+        ))
+
+    def _import(self, source, file_format, employer, batch_size):
+        return bulk.import_jobs(bulk.iter_rows(source, file_format), employer, batch_size=batch_size)
@@ -0,0 +1,83 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from jobs.models import Job, JobApplication
+from jobs.salary import rates, to_usd
+from jobs.signals import jobs_bulk_changed
+from users.models import ApplicantProfile
+
+
+class Command(BaseCommand):
+    help = "Recompute the annual USD salary columns after SALARY_RATES_TO_USD changes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        self.table = rates()
+
+        jobs = Job.objects.order_by('pk').only(
+            'pk', 'salary_min', 'salary_max', 'salary_currency', 'salary_min_usd', 'salary_max_usd',
+        )
+        self.changed_job_ids = set()
+        changed = self._recompute(jobs, self._normalize_job, ['salary_min_usd', 'salary_max_usd'], notify=True)
+        self.stdout.write(f"Jobs: {changed} updated")
+
+        applications = JobApplication.objects.order_by('pk').select_related('job').only(
+            'pk', 'expected_salary', 'expected_salary_usd', 'job__salary_currency',
+        )
+        changed = self._recompute(applications, self._normalize_application, ['expected_salary_usd'])
+        self.stdout.write(f"Applications: {changed} updated")
+
+        profiles = ApplicantProfile.objects.order_by('pk').only(
+            'pk', 'salary_expectation', 'salary_expectation_currency', 'salary_expectation_usd',
+        )
+        changed = self._recompute(profiles, self._normalize_profile, ['salary_expectation_usd'])
+        self.stdout.write(f"Applicant profiles: {changed} updated")
+
+        # Salary fit is part of the review queue score
+        rescored = JobApplication.objects.filter(job_id__in=self.changed_job_ids).rescore(self.batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Re-ranked {rescored} application(s)"))
+
+    def _normalize_job(self, job):
+        before = (job.salary_min_usd, job.salary_max_usd)
+        job.normalize_salary(self.table)
+        if before != (job.salary_min_usd, job.salary_max_usd):
+            self.changed_job_ids.add(job.pk)
+            return True
+        return False
+
+    def _normalize_application(self, application):
+        before = application.expected_salary_usd
+        application.expected_salary_usd = to_usd(application.expected_salary, application.job.salary_currency, self.table)
+        if before != application.expected_salary_usd:
+            self.changed_job_ids.add(application.job_id)
+            return True
+        return False
+
+    def _normalize_profile(self, profile):
+        before = profile.salary_expectation_usd
+        profile.salary_expectation_usd = to_usd(profile.salary_expectation, profile.salary_expectation_currency, self.table)
+        return before != profile.salary_expectation_usd
+
+    def _recompute(self, queryset, normalize, fields, notify=False):
+        """Write back only the rows whose normalized value changed, in batches"""
+        model = queryset.model
+        batch, changed = [], 0
+        for obj in queryset.iterator(chunk_size=self.batch_size):
+            if normalize(obj):
+                batch.append(obj)
+            if len(batch) >= self.batch_size:
+                changed += self._write(model, batch, fields, notify)
+                batch = []
+        if batch:
+            changed += self._write(model, batch, fields, notify)
+        return changed
+
+    def _write(self, model, batch, fields, notify):
+        with transaction.atomic():
+            model.objects.bulk_update(batch, fields)
+            if notify:
+                jobs_bulk_changed.send(sender=model, job_ids=[obj.pk for obj in batch])
+        return len(batch)
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from jobs.models import JobApplication
+
+
+class Command(BaseCommand):
+    help = "Recompute review queue scores (backfill, or after changing jobs/ranking.py)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--job', type=int, action='append', help='Only the given job ID(s)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        applications = JobApplication.objects.all()
+        if options['job']:
+            applications = applications.filter(job_id__in=options['job'])
+        changed = applications.rescore(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Re-scored {changed} application(s)"))
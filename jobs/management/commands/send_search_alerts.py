@@ -0,0 +1,21 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.percolator import send_alerts
+
+
+class Command(BaseCommand):
+    help = "Email applicants the new jobs matching their saved searches. Run from cron, or with --loop."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep sending every --interval seconds')
+        parser.add_argument('--interval', type=int, default=3600)
+
+    def handle(self, *args, **options):
+        while True:
+            count = send_alerts()
+            self.stdout.write(f"Sent {count} search alert(s)")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,123 @@
+# Generated by Django 5.1.7 on 2026-10-19 11:34
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='Job Title')),
+                ('description', models.TextField(verbose_name='Job Description')),
+                ('requirements', models.TextField(verbose_name='Job Requirements')),
+                ('responsibilities', models.TextField(verbose_name='Job Responsibilities')),
+                ('job_type', models.CharField(choices=[('FullTime', 'Full Time'), ('PartTime', 'Part Time'), ('Contract', 'Contract'), ('Remote', 'Remote'), ('Hybrid', 'Hybrid'), ('Internship', 'Internship'), ('Freelance', 'Freelance')], default='FullTime', max_length=20, verbose_name='Job Type')),
+                ('experience_level', models.CharField(choices=[('Entry', 'Entry Level'), ('Junior', 'Junior'), ('Mid', 'Mid Level'), ('Senior', 'Senior'), ('Lead', 'Lead'), ('Executive', 'Executive')], default='Entry', max_length=20, verbose_name='Experience Level')),
+                ('location', models.CharField(max_length=200, verbose_name='Job Location')),
+                ('salary_min', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Minimum Salary')),
+                ('salary_max', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Maximum Salary')),
+                ('salary_currency', models.CharField(default='USD', max_length=3, verbose_name='Salary Currency')),
+                ('required_skills', models.JSONField(default=list, verbose_name='Required Skills')),
+                ('preferred_skills', models.JSONField(default=list, verbose_name='Preferred Skills')),
+                ('tags', models.JSONField(default=list, verbose_name='Job Tags')),
+                ('application_deadline', models.DateTimeField(blank=True, null=True, verbose_name='Application Deadline')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Active Job')),
+                ('is_featured', models.BooleanField(default=False, verbose_name='Featured Job')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('employer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='posted_jobs', to=settings.AUTH_USER_MODEL, verbose_name='Employer')),
+            ],
+            options={
+                'verbose_name': 'Job',
+                'verbose_name_plural': 'Jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=500, verbose_name='Search Query')),
+                ('filters', models.JSONField(default=dict, verbose_name='Applied Filters')),
+                ('results_count', models.IntegerField(default=0, verbose_name='Results Count')),
+                ('searched_at', models.DateTimeField(auto_now_add=True, verbose_name='Searched At')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_searches', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Job Search',
+                'verbose_name_plural': 'Job Searches',
+                'ordering': ['-searched_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Resume',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='Resume Title')),
+                ('file', models.FileField(upload_to='resumes/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['pdf', 'doc', 'docx'])], verbose_name='Resume File')),
+                ('is_primary', models.BooleanField(default=False, verbose_name='Primary Resume')),
+                ('is_active', models.BooleanField(default=True, verbose_name='Active Resume')),
+                ('summary', models.TextField(blank=True, null=True, verbose_name='Resume Summary')),
+                ('skills', models.JSONField(default=list, verbose_name='Skills Listed')),
+                ('experience_years', models.IntegerField(default=0, verbose_name='Years of Experience')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumes', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Resume',
+                'verbose_name_plural': 'Resumes',
+                'ordering': ['-is_primary', '-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='JobBookmark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Bookmarked At')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookmarks', to='jobs.job', verbose_name='Job')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookmarked_jobs', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Job Bookmark',
+                'verbose_name_plural': 'Job Bookmarks',
+                'ordering': ['-created_at'],
+                'unique_together': {('user', 'job')},
+            },
+        ),
+        migrations.CreateModel(
+            name='JobApplication',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cover_letter', models.TextField(blank=True, null=True, verbose_name='Cover Letter')),
+                ('status', models.CharField(choices=[('Applied', 'Applied'), ('Under_Review', 'Under Review'), ('Shortlisted', 'Shortlisted'), ('Interview', 'Interview'), ('Rejected', 'Rejected'), ('Hired', 'Hired'), ('Withdrawn', 'Withdrawn')], default='Applied', max_length=20, verbose_name='Application Status')),
+                ('expected_salary', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True, verbose_name='Expected Salary')),
+                ('available_start_date', models.DateField(blank=True, null=True, verbose_name='Available Start Date')),
+                ('employer_notes', models.TextField(blank=True, null=True, verbose_name='Employer Notes')),
+                ('is_shortlisted', models.BooleanField(default=False, verbose_name='Shortlisted')),
+                ('applied_at', models.DateTimeField(auto_now_add=True, verbose_name='Applied At')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('applicant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='job_applications', to=settings.AUTH_USER_MODEL, verbose_name='Applicant')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='jobs.job', verbose_name='Job')),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='jobs.resume', verbose_name='Resume Used')),
+            ],
+            options={
+                'verbose_name': 'Job Application',
+                'verbose_name_plural': 'Job Applications',
+                'ordering': ['-applied_at'],
+                'unique_together': {('job', 'applicant')},
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.7 on 2026-10-19 11:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_job_place'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='salary_max_usd',
+            field=models.IntegerField(blank=True, null=True, verbose_name='Maximum Salary (USD)'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='salary_min_usd',
+            field=models.IntegerField(blank=True, null=True, verbose_name='Minimum Salary (USD)'),
+        ),
+        migrations.AddField(
+            model_name='jobapplication',
+            name='expected_salary_usd',
+            field=models.IntegerField(blank=True, null=True, verbose_name='Expected Salary (USD)'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['salary_min_usd'], name='job_active_salary_min_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['salary_max_usd'], name='job_active_salary_max_idx'),
+        ),
+    ]
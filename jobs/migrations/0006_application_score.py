@@ -0,0 +1,24 @@
+# Generated by Django 5.1.7 on 2026-10-19 11:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0005_salary_usd'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobapplication',
+            name='score',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='Match Score'),
+        ),
+        migrations.AddIndex(
+            model_name='jobapplication',
+            index=models.Index(fields=['job', '-score', '-applied_at'], name='application_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.7 on 2026-10-19 11:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_application_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobFingerprint',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='jobs.job', verbose_name='Job')),
+                ('signature', models.BinaryField(verbose_name='MinHash Signature')),
+            ],
+            options={
+                'verbose_name': 'Job Fingerprint',
+                'verbose_name_plural': 'Job Fingerprints',
+            },
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='jobs.job', verbose_name='Duplicate Of'),
+        ),
+        migrations.CreateModel(
+            name='JobFingerprintBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.BigIntegerField(db_index=True, verbose_name='Bucket')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprint_bands', to='jobs.job', verbose_name='Job')),
+            ],
+            options={
+                'verbose_name': 'Job Fingerprint Band',
+                'verbose_name_plural': 'Job Fingerprint Bands',
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.7 on 2026-10-19 11:55
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0007_job_dedupe'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(django.db.models.functions.text.Lower('title'), name='job_title_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobsearch',
+            index=models.Index(fields=['-searched_at'], name='jobsearch_searched_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_admin_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='deletion_requested_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Deletion Requested At'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('deletion_requested_at__isnull', False)), fields=['deletion_requested_at'], name='job_deletion_requested_idx'),
+        ),
+    ]
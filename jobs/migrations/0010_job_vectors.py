@@ -0,0 +1,51 @@
+# Generated by Django 5.1.7 on 2026-10-19 12:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0009_deletion_requested'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobTermStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('documents', models.PositiveIntegerField(verbose_name='Documents')),
+                ('frequencies', models.BinaryField(verbose_name='Document Frequencies')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+            ],
+            options={
+                'verbose_name': 'Job Term Statistics',
+                'verbose_name_plural': 'Job Term Statistics',
+                'get_latest_by': 'created_at',
+            },
+        ),
+        migrations.CreateModel(
+            name='JobVector',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='vector', serialize=False, to='jobs.job', verbose_name='Job')),
+                ('vector', models.BinaryField(verbose_name='TF-IDF Vector')),
+            ],
+            options={
+                'verbose_name': 'Job Vector',
+                'verbose_name_plural': 'Job Vectors',
+            },
+        ),
+        migrations.CreateModel(
+            name='JobVectorBand',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.IntegerField(db_index=True, verbose_name='Bucket')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vector_bands', to='jobs.job', verbose_name='Job')),
+            ],
+            options={
+                'verbose_name': 'Job Vector Band',
+                'verbose_name_plural': 'Job Vector Bands',
+            },
+        ),
+    ]
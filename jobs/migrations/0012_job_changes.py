@@ -0,0 +1,28 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0011_saved_searches'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.BigIntegerField(db_index=True, verbose_name='Job ID')),
+                ('action', models.CharField(choices=[('saved', 'Saved'), ('deleted', 'Deleted')], default='saved', max_length=10, verbose_name='Action')),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Changed At')),
+            ],
+            options={
+                'verbose_name': 'Job Change',
+                'verbose_name_plural': 'Job Changes',
+                'ordering': ['id'],
+            },
+        ),
+    ]
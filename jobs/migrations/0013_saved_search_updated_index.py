@@ -0,0 +1,19 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0012_job_changes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='savedsearch',
+            index=models.Index(fields=['updated_at'], name='savedsearch_updated_idx'),
+        ),
+    ]
@@ -1,10 +1,19 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from django.contrib.auth import get_user_model
 from django.core.validators import FileExtensionValidator
 from django.utils import timezone
+from .geo import gazetteer, place_ids_near
+from .salary import rates, to_usd, pays_at_least_q, pays_at_most_q
+from . import ranking
 
 User = get_user_model()
 
+# Fields near-duplicate detection compares (see jobs/dedupe.py)
+TEXT_FIELDS = ('title', 'description', 'requirements')
+# Fields "similar jobs" vectors are built from (see jobs/similar.py)
+VECTOR_FIELDS = ('title', 'description', 'requirements', 'responsibilities', 'required_skills', 'preferred_skills', 'tags')
+
 # Job Types
 JOB_TYPES = (
     ("FullTime", "Full Time"),
@@ -37,6 +46,40 @@ APPLICATION_STATUS = (
     ("Withdrawn", "Withdrawn"),
 )
 
+class JobQuerySet(models.QuerySet):
+    def open(self):
+        """Active jobs whose application deadline has not passed, as SQL"""
+        return self.filter(
+            models.Q(application_deadline__isnull=True) | models.Q(application_deadline__gt=timezone.now()),
+            is_active=True,
+        )
+
+    def expired(self, now=None):
+        """Active jobs whose deadline has passed and should be swept"""
+        return self.filter(is_active=True, application_deadline__lte=now or timezone.now())
+
+    def live(self):
+        """Jobs not waiting for background deletion"""
+        return self.filter(deletion_requested_at__isnull=True)
+
+    def listed(self):
+        """Open jobs minus near-duplicate reposts (see jobs/dedupe.py) and jobs pending deletion"""
+        return self.open().live().filter(duplicate_of__isnull=True)
+
+    def near(self, latitude, longitude, radius_km):
+        """Jobs whose normalised location lies within `radius_km` of a point"""
+        place_ids = place_ids_near([(latitude, longitude)], radius_km)
+        return self.filter(place_id__in=place_ids) if place_ids else self.none()
+
+    def pays_at_least(self, amount_usd):
+        """Jobs whose salary range reaches `amount_usd` a year"""
+        return self.filter(pays_at_least_q(amount_usd))
+
+    def pays_at_most(self, amount_usd):
+        """Jobs whose salary range starts at or below `amount_usd` a year"""
+        return self.filter(pays_at_most_q(amount_usd))
+
+
 class Job(models.Model):
     """
     Job posting model for employers to create job opportunities
@@ -55,35 +98,144 @@ class Job(models.Model):
     
     # Location & Salary
     location = models.CharField(max_length=200, verbose_name="Job Location")
+    place_id = models.CharField(max_length=64, null=True, blank=True, db_index=True, verbose_name="Normalized Place")
+    latitude = models.FloatField(null=True, blank=True, verbose_name="Latitude")
+    longitude = models.FloatField(null=True, blank=True, verbose_name="Longitude")
     salary_min = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Minimum Salary")
     salary_max = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Maximum Salary")
     salary_currency = models.CharField(max_length=3, default="USD", verbose_name="Salary Currency")
+    salary_min_usd = models.IntegerField(null=True, blank=True, verbose_name="Minimum Salary (USD)")
+    salary_max_usd = models.IntegerField(null=True, blank=True, verbose_name="Maximum Salary (USD)")
     
     # Skills & Tags
     required_skills = models.JSONField(default=list, verbose_name="Required Skills")
     preferred_skills = models.JSONField(default=list, verbose_name="Preferred Skills")
     tags = models.JSONField(default=list, verbose_name="Job Tags")
     
+    # Near-duplicate of an older posting (see jobs/dedupe.py)
+    duplicate_of = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='duplicates', verbose_name="Duplicate Of"
+    )
+    
+    # External Sync
+    external_id = models.CharField(max_length=100, null=True, blank=True, verbose_name="External ID")
+    
     # Application Details
     application_deadline = models.DateTimeField(null=True, blank=True, verbose_name="Application Deadline")
     is_active = models.BooleanField(default=True, verbose_name="Active Job")
     is_featured = models.BooleanField(default=False, verbose_name="Featured Job")
+    # Set when the job is taken down for background deletion (see tasks/deletion.py)
+    deletion_requested_at = models.DateTimeField(null=True, blank=True, verbose_name="Deletion Requested At")
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
     
+    objects = JobQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Job"
         verbose_name_plural = "Jobs"
         ordering = ['-created_at']
+        indexes = [
+            # Partial indexes backing Job.objects.open() listings and the expiry sweeper
+            models.Index(fields=['-created_at'], condition=models.Q(is_active=True), name='job_active_created_idx'),
+            models.Index(fields=['application_deadline'], condition=models.Q(is_active=True), name='job_active_deadline_idx'),
+            # Range filters on normalized salaries
+            models.Index(fields=['salary_min_usd'], condition=models.Q(is_active=True), name='job_active_salary_min_idx'),
+            models.Index(fields=['salary_max_usd'], condition=models.Q(is_active=True), name='job_active_salary_max_idx'),
+            # Prefix search in the admin
+            models.Index(Lower('title'), name='job_title_lower_idx'),
+            # Deletion tasks select their rows by stamp
+            models.Index(
+                fields=['deletion_requested_at'], condition=models.Q(deletion_requested_at__isnull=False),
+                name='job_deletion_requested_idx',
+            ),
+        ]
+        constraints = [
+            # Upsert key for bulk imports from employer ATS systems
+            models.UniqueConstraint(fields=['employer', 'external_id'], name='unique_job_external_id_per_employer'),
+        ]
     
     def __str__(self):
         return f"{self.title} at {self.employer.get_full_name()}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        job = super().from_db(db, field_names, values)
+        job._loaded_ranking = job.ranking_snapshot()
+        job._loaded_text = job.text_snapshot()
+        job._loaded_vector = job.vector_snapshot()
+        return job
+    
+    def text_snapshot(self):
+        """The text near-duplicate detection runs on (None if any of it is deferred)"""
+        if self.get_deferred_fields().intersection(TEXT_FIELDS):
+            return None
+        return tuple(getattr(self, field) for field in TEXT_FIELDS)
+    
+    @property
+    def text_changed(self):
+        """Whether the deduplicated text may differ from what was loaded (True when unknown)"""
+        loaded = getattr(self, '_loaded_text', None)
+        return loaded is None or loaded != self.text_snapshot()
+    
+    def vector_snapshot(self):
+        """The inputs of the job's similarity vector (None if any are deferred)"""
+        if self.get_deferred_fields().intersection(VECTOR_FIELDS):
+            return None
+        return tuple(repr(getattr(self, field)) for field in VECTOR_FIELDS)
+    
+    @property
+    def vector_changed(self):
+        """Whether the vector inputs may differ from what was loaded (True when unknown)"""
+        loaded = getattr(self, '_loaded_vector', None)
+        return loaded is None or loaded != self.vector_snapshot()
+    
+    def ranking_snapshot(self):
+        """The job values applications are ranked on (None if any are deferred)"""
+        deferred = self.get_deferred_fields()
+        if deferred.intersection(ranking.RANKING_FIELDS):
+            return None
+        return ranking.Requirements.for_job(self)
+    
+    @property
+    def ranking_inputs_changed(self):
+        """Whether the ranking inputs differ from what was loaded from the database"""
+        loaded = getattr(self, '_loaded_ranking', None)
+        return loaded is not None and loaded != self.ranking_snapshot()
+    
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        derived = set()
+        if update_fields is None or 'location' in update_fields:
+            self.geocode()
+            derived.update(('place_id', 'latitude', 'longitude'))
+        if update_fields is None or {'salary_min', 'salary_max', 'salary_currency'} & set(update_fields):
+            self.normalize_salary()
+            derived.update(('salary_min_usd', 'salary_max_usd'))
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, *derived}
+        # post_save runs inside, so the change feed entry commits with the row
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+    
+    def geocode(self):
+        """Resolve `location` against the bundled gazetteer"""
+        place = gazetteer().resolve(self.location)
+        self.place_id = place.id if place else None
+        self.latitude = place.latitude if place else None
+        self.longitude = place.longitude if place else None
+    
+    def normalize_salary(self, table=None):
+        """Fill the annual USD salary columns from the configured rate table"""
+        table = table or rates()
+        self.salary_min_usd = to_usd(self.salary_min, self.salary_currency, table)
+        self.salary_max_usd = to_usd(self.salary_max, self.salary_currency, table)
+    
     @property
     def is_expired(self):
-        """Check if job application deadline has passed"""
+        """Check if job application deadline has passed (use Job.objects.open() for querysets)"""
         if self.application_deadline:
             return timezone.now() > self.application_deadline
         return False
@@ -99,6 +251,101 @@ class Job(models.Model):
             return f"Up to {self.salary_currency} {self.salary_max:,}"
         return "Salary not specified"
 
+class JobFingerprint(models.Model):
+    """
+    MinHash signature of a job's text for near-duplicate detection
+    """
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='fingerprint', verbose_name="Job")
+    signature = models.BinaryField(verbose_name="MinHash Signature")
+    
+    class Meta:
+        verbose_name = "Job Fingerprint"
+        verbose_name_plural = "Job Fingerprints"
+    
+    def __str__(self):
+        return f"Fingerprint of job {self.job_id}"
+
+class JobFingerprintBand(models.Model):
+    """
+    One LSH bucket of a job's signature; jobs sharing a bucket are duplicate candidates
+    """
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='fingerprint_bands', verbose_name="Job")
+    bucket = models.BigIntegerField(db_index=True, verbose_name="Bucket")
+    
+    class Meta:
+        verbose_name = "Job Fingerprint Band"
+        verbose_name_plural = "Job Fingerprint Bands"
+    
+    def __str__(self):
+        return f"Job {self.job_id} bucket {self.bucket}"
+
+class JobVector(models.Model):
+    """
+    Sparse TF-IDF vector of a job's text and skills for "similar jobs"
+    """
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='vector', verbose_name="Job")
+    vector = models.BinaryField(verbose_name="TF-IDF Vector")
+    
+    class Meta:
+        verbose_name = "Job Vector"
+        verbose_name_plural = "Job Vectors"
+    
+    def __str__(self):
+        return f"Vector of job {self.job_id}"
+
+class JobVectorBand(models.Model):
+    """
+    One random-projection LSH bucket of a job's vector; jobs sharing buckets are neighbour candidates
+    """
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='vector_bands', verbose_name="Job")
+    bucket = models.IntegerField(db_index=True, verbose_name="Bucket")
+    
+    class Meta:
+        verbose_name = "Job Vector Band"
+        verbose_name_plural = "Job Vector Bands"
+    
+    def __str__(self):
+        return f"Job {self.job_id} bucket {self.bucket}"
+
+class JobTermStatistics(models.Model):
+    """
+    Document frequencies behind the IDF weights of job vectors, written by `manage.py build_job_vectors`
+    """
+    documents = models.PositiveIntegerField(verbose_name="Documents")
+    frequencies = models.BinaryField(verbose_name="Document Frequencies")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+    
+    class Meta:
+        verbose_name = "Job Term Statistics"
+        verbose_name_plural = "Job Term Statistics"
+        get_latest_by = 'created_at'
+    
+    def __str__(self):
+        return f"Term statistics over {self.documents} jobs"
+
+# Change Feed Actions
+CHANGE_ACTIONS = (
+    ("saved", "Saved"),
+    ("deleted", "Deleted"),
+)
+
+class JobChange(models.Model):
+    """
+    One entry of the append-only job change feed partners sync from (see jobs/changes.py); the ID is the sequence
+    """
+    # Not a foreign key: entries outlive the jobs they record the deletion of
+    job_id = models.BigIntegerField(db_index=True, verbose_name="Job ID")
+    action = models.CharField(max_length=10, choices=CHANGE_ACTIONS, default="saved", verbose_name="Action")
+    changed_at = models.DateTimeField(default=timezone.now, verbose_name="Changed At")
+    
+    class Meta:
+        verbose_name = "Job Change"
+        verbose_name_plural = "Job Changes"
+        ordering = ['id']
+    
+    def __str__(self):
+        return f"#{self.pk} job {self.job_id} {self.action}"
+
 class Resume(models.Model):
     """
     Resume model for job seekers to upload and manage their resumes
@@ -130,12 +377,69 @@ class Resume(models.Model):
     def __str__(self):
         return f"{self.title} - {self.user.get_full_name()}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        resume = super().from_db(db, field_names, values)
+        resume._loaded_ranking = resume.ranking_snapshot()
+        return resume
+    
+    def ranking_snapshot(self):
+        """The values applications with this resume are ranked on (None if any are deferred)"""
+        if self.get_deferred_fields().intersection(ranking.APPLICANT_FIELDS):
+            return None
+        return repr(self.skills), self.experience_years
+    
+    @property
+    def ranking_inputs_changed(self):
+        """Whether the ranking inputs differ from what was loaded from the database"""
+        loaded = getattr(self, '_loaded_ranking', None)
+        return loaded is not None and loaded != self.ranking_snapshot()
+    
     def save(self, *args, **kwargs):
         # Ensure only one primary resume per user
         if self.is_primary:
             Resume.objects.filter(user=self.user, is_primary=True).update(is_primary=False)
         super().save(*args, **kwargs)
 
+class JobApplicationQuerySet(models.QuerySet):
+    def ranked(self):
+        """Review queue order, served by the (job, -score, -applied_at) index"""
+        return self.order_by('-score', '-applied_at')
+    
+    def rescore(self, batch_size=1000):
+        """Recompute stored scores in batches; returns the number of rows changed"""
+        job_fields = [f'job__{field}' for field in ranking.RANKING_FIELDS]
+        rows = self.order_by().values_list(
+            'pk', 'job_id', 'score', 'expected_salary_usd', 'resume__skills', 'resume__experience_years',
+            'applicant__applicant_profile__skills', 'applicant__applicant_profile__experience_years', *job_fields,
+        )
+        requirements = {}
+        changed = []
+        total = 0
+        for pk, job_id, old_score, expected_salary_usd, *values in rows.iterator(chunk_size=batch_size):
+            applicant, job_values = values[:4], values[4:]
+            if job_id not in requirements:
+                requirements[job_id] = ranking.Requirements.from_values(*job_values)
+            new_score = ranking.score(requirements[job_id], *ranking.applicant_inputs(*applicant), expected_salary_usd)
+            if new_score != old_score:
+                changed.append(JobApplication(pk=pk, score=new_score))
+            if len(changed) >= batch_size:
+                JobApplication.objects.bulk_update(changed, ['score'])
+                total += len(changed)
+                changed = []
+        if changed:
+            JobApplication.objects.bulk_update(changed, ['score'])
+            total += len(changed)
+        return total
+    
+    def within_salary_band(self):
+        """Applications whose expected salary fits the job's advertised range (in USD)"""
+        return self.filter(
+            models.Q(job__salary_max_usd__isnull=True) | models.Q(expected_salary_usd__lte=models.F('job__salary_max_usd')),
+            expected_salary_usd__isnull=False,
+        )
+
+
 class JobApplication(models.Model):
     """
     Job application model for job seekers to apply for jobs
@@ -150,6 +454,8 @@ class JobApplication(models.Model):
     
     # Additional Information
     expected_salary = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, verbose_name="Expected Salary")
+    expected_salary_usd = models.IntegerField(null=True, blank=True, verbose_name="Expected Salary (USD)")
+    score = models.PositiveSmallIntegerField(default=0, verbose_name="Match Score")
     available_start_date = models.DateField(null=True, blank=True, verbose_name="Available Start Date")
     
     # Employer Notes
@@ -160,14 +466,51 @@ class JobApplication(models.Model):
     applied_at = models.DateTimeField(auto_now_add=True, verbose_name="Applied At")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
     
+    objects = JobApplicationQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Job Application"
         verbose_name_plural = "Job Applications"
         ordering = ['-applied_at']
         unique_together = ['job', 'applicant']  # Prevent duplicate applications
+        indexes = [
+            # Per-job review queue, best match first (see jobs/ranking.py)
+            models.Index(fields=['job', '-score', '-applied_at'], name='application_queue_idx'),
+        ]
     
     def __str__(self):
         return f"{self.applicant.get_full_name()} applied for {self.job.title}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        application = super().from_db(db, field_names, values)
+        # Compared on save to publish status changes (see webhooks/signals.py)
+        application._loaded_status = application.__dict__.get('status')
+        return application
+
+    @property
+    def status_changed(self):
+        """Whether the status differs from what was loaded (False when unknown)"""
+        loaded = getattr(self, '_loaded_status', None)
+        return loaded is not None and loaded != self.status
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'expected_salary' in update_fields:
+            # Expected salaries are quoted in the job's currency
+            self.expected_salary_usd = to_usd(self.expected_salary, self.job.salary_currency)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'expected_salary_usd'}
+        if update_fields is None or {'expected_salary', 'resume'} & set(update_fields):
+            profile = getattr(self.applicant, 'applicant_profile', None)
+            skills, years = ranking.applicant_inputs(
+                self.resume.skills, self.resume.experience_years,
+                profile and profile.skills, profile and profile.experience_years,
+            )
+            self.score = ranking.score(ranking.Requirements.for_job(self.job), skills, years, self.expected_salary_usd)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'score'}
+        super().save(*args, **kwargs)
     
     @property
     def days_since_applied(self):
@@ -188,10 +531,54 @@ class JobSearch(models.Model):
         verbose_name = "Job Search"
         verbose_name_plural = "Job Searches"
         ordering = ['-searched_at']
+        indexes = [models.Index(fields=['-searched_at'], name='jobsearch_searched_idx')]
     
     def __str__(self):
         return f"{self.user.get_full_name()} searched: {self.query}"
 
+class SavedSearch(models.Model):
+    """
+    A search an applicant keeps to be alerted of new matching jobs (see jobs/percolator.py)
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='saved_searches', verbose_name="User")
+    name = models.CharField(max_length=100, blank=True, verbose_name="Name")
+    query = models.CharField(max_length=500, blank=True, verbose_name="Search Query")
+    filters = models.JSONField(default=dict, blank=True, verbose_name="Filters")
+    is_active = models.BooleanField(default=True, verbose_name="Alerts On")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
+    
+    class Meta:
+        verbose_name = "Saved Search"
+        verbose_name_plural = "Saved Searches"
+        ordering = ['-created_at']
+        indexes = [
+            # The percolator reads recently changed searches before every match
+            models.Index(fields=['updated_at'], name='savedsearch_updated_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.get_full_name()} saved: {self.name or self.query}"
+
+class SavedSearchMatch(models.Model):
+    """
+    A job that appeared after a saved search was stored and matches it
+    """
+    saved_search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='matches', verbose_name="Saved Search")
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='saved_search_matches', verbose_name="Job")
+    matched_at = models.DateTimeField(auto_now_add=True, verbose_name="Matched At")
+    notified_at = models.DateTimeField(null=True, blank=True, verbose_name="Notified At")
+    
+    class Meta:
+        verbose_name = "Saved Search Match"
+        verbose_name_plural = "Saved Search Matches"
+        unique_together = ['saved_search', 'job']
+        ordering = ['-matched_at']
+        indexes = [models.Index(fields=['notified_at'], name='searchmatch_notified_idx')]
+    
+    def __str__(self):
+        return f"{self.job_id} matches saved search {self.saved_search_id}"
+
 class JobBookmark(models.Model):
     """
     Model for job seekers to bookmark/save jobs
@@ -0,0 +1,374 @@
+"""
+Saved-search alerts by reverse ("percolator") matching.
+
+Running every saved search against each new job costs saved searches x
+new jobs. Instead the searches themselves are indexed, by a key any job
+matching them must have:
+
+    place       the job's place: a `location` that names a known place, or
+                every place within a `near` radius
+    phrase      three characters of the query; a job whose title or
+                description contains the query contains each of them
+    location    three characters of a `location` the gazetteer does not know
+    salary_band, experience_level, job_type
+    any         searches with none of the above
+
+Each search is filed under one anchor, the first kind above that it has
+(for text, the trigram of the rarest letters). A job looks up only the
+searches filed under its own keys. Each candidate is then checked against
+the conditions JobListView applies to the same query and filters. So the
+work per job grows with the searches that could match it, not with every
+search stored. Matches are stored as `SavedSearchMatch` rows, and
+`manage.py send_search_alerts` emails them.
+
+The index lives in each process, like the facet and autocomplete indexes.
+Saved search changes made by the process update it as they happen (see
+jobs.signals). Changes made by other processes are read from the database
+before each match: a match comes once, when the job is saved, so an index
+that missed a search would lose its alerts for good. That check does not
+go through the cache, which may be private to the process. Searches
+updated since shortly before the newest one seen are re-read, and a row
+count that differs from the index's means searches were deleted, which
+triggers a rebuild.
+"""
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from users.utils import send_mail
+
+from .facets import salary_band, salary_band_q
+from .geo import gazetteer, parse_radius, place_ids_near, resolve_origins, DEFAULT_RADIUS_KM
+from .models import Job, SavedSearch, SavedSearchMatch, User, JOB_TYPES, EXPERIENCE_LEVELS
+from .salary import pays_at_least, pays_at_most
+
+logger = logging.getLogger(__name__)
+
+PERCOLATOR_MAX_AGE = 3600
+# Searches updated up to this many seconds before the newest one seen are
+# read again: a slow transaction can commit after a later one
+SETTLE = 5
+# Jobs listed in one alert email
+ALERT_JOBS = 20
+
+FILTERS = (
+    'job_type', 'experience_level', 'location', 'near', 'radius_km', 'salary_band', 'min_salary_usd',
+    'max_salary_usd',
+)
+MATCH_FIELDS = (
+    'title', 'description', 'location', 'place_id', 'job_type', 'experience_level', 'salary_min_usd',
+    'salary_max_usd',
+)
+KINDS = ('place', 'phrase', 'location', 'salary_band', 'experience_level', 'job_type', 'any')
+
+# English letters, most common first: rarer letters make a more selective trigram
+_LETTER_RANKS = {letter: rank for rank, letter in enumerate('etaoinshrdlcumwfgypbvkjxqz', 1)}
+
+
+def _grams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _rarest(text):
+    return max(sorted(_grams(text)), key=lambda gram: sum(
+        _LETTER_RANKS.get(char, 0 if char.isspace() else 13) for char in gram
+    ))
+
+
+def validate_filters(filters):
+    """Error message for filters JobListView would not accept, or None"""
+    if not isinstance(filters, dict):
+        return 'filters must be an object.'
+    unknown = set(filters) - set(FILTERS)
+    if unknown:
+        return f"Unknown filter: {', '.join(sorted(unknown))}. Choose from {', '.join(FILTERS)}."
+    if filters.get('job_type') and filters['job_type'] not in dict(JOB_TYPES):
+        return f"Unknown job_type: {filters['job_type']}"
+    if filters.get('experience_level') and filters['experience_level'] not in dict(EXPERIENCE_LEVELS):
+        return f"Unknown experience_level: {filters['experience_level']}"
+    if filters.get('salary_band') and salary_band_q(filters['salary_band']) is None:
+        return f"Unknown salary_band: {filters['salary_band']}"
+    for name in ('radius_km', 'min_salary_usd', 'max_salary_usd'):
+        value = filters.get(name)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            return f'{name} must be a number.'
+    if filters.get('radius_km') is not None and parse_radius(filters['radius_km']) is None:
+        return 'radius_km must be a number of kilometres.'
+    if 'near' in filters:
+        near = filters['near']
+        names = [near] if isinstance(near, str) else near
+        if not isinstance(names, list) or not all(isinstance(name, str) for name in names) \
+                or not resolve_origins(near):
+            return f"Unknown location: {near}"
+    return None
+
+
+class SearchConditions:
+    """One saved search's query and filters, applied as JobListView applies them"""
+
+    def __init__(self, query='', filters=None):
+        filters = filters or {}
+        self.phrase = (query or '').strip().casefold()
+        self.job_type = filters.get('job_type') or None
+        self.experience_level = filters.get('experience_level') or None
+        location = (filters.get('location') or '').strip()
+        place = gazetteer().resolve(location) if location else None
+        self.place_id = place.id if place else None
+        self.location = location.casefold() if location and place is None else ''
+        self.near_place_ids = None
+        if filters.get('near'):
+            radius_km = parse_radius(filters.get('radius_km') or DEFAULT_RADIUS_KM)
+            self.near_place_ids = frozenset(place_ids_near(resolve_origins(filters['near']), radius_km))
+        self.salary_band = filters.get('salary_band') or None
+        self.min_salary_usd = filters.get('min_salary_usd')
+        self.max_salary_usd = filters.get('max_salary_usd')
+
+    def anchors(self):
+        """[(kind, key)] to file the search under; a matching job has at least one"""
+        if self.place_id is not None:
+            return [('place', self.place_id)]
+        if len(self.phrase) >= 3:
+            return [('phrase', _rarest(self.phrase))]
+        if self.near_place_ids is not None:
+            return [('place', place_id) for place_id in self.near_place_ids]
+        if len(self.location) >= 3:
+            return [('location', _rarest(self.location))]
+        for kind in ('salary_band', 'experience_level', 'job_type'):
+            if getattr(self, kind):
+                return [(kind, getattr(self, kind))]
+        return [('any', None)]
+
+    def matches(self, job):
+        """Whether the job (a dict of MATCH_FIELDS) is in this search's results"""
+        if self.job_type and job['job_type'] != self.job_type:
+            return False
+        if self.experience_level and job['experience_level'] != self.experience_level:
+            return False
+        if self.place_id is not None and job['place_id'] != self.place_id:
+            return False
+        if self.location and self.location not in (job['location'] or '').casefold():
+            return False
+        if self.near_place_ids is not None and job['place_id'] not in self.near_place_ids:
+            return False
+        if self.salary_band and salary_band(job['salary_min_usd'], job['salary_max_usd']) != self.salary_band:
+            return False
+        if self.min_salary_usd is not None and not pays_at_least(
+            job['salary_min_usd'], job['salary_max_usd'], self.min_salary_usd,
+        ):
+            return False
+        if self.max_salary_usd is not None and not pays_at_most(
+            job['salary_min_usd'], job['salary_max_usd'], self.max_salary_usd,
+        ):
+            return False
+        if self.phrase and self.phrase not in (job['title'] or '').casefold() \
+                and self.phrase not in (job['description'] or '').casefold():
+            return False
+        return True
+
+
+def job_keys(job):
+    """{kind: keys} of a job (a dict of MATCH_FIELDS), to look up the searches filed under them"""
+    return {
+        'place': {job['place_id']} if job['place_id'] else set(),
+        'phrase': _grams((job['title'] or '').casefold()) | _grams((job['description'] or '').casefold()),
+        'location': _grams((job['location'] or '').casefold()),
+        'salary_band': {salary_band(job['salary_min_usd'], job['salary_max_usd'])},
+        'experience_level': {job['experience_level']},
+        'job_type': {job['job_type']},
+        'any': {None},
+    }
+
+
+class Percolator:
+    def __init__(self, max_age=PERCOLATOR_MAX_AGE):
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._searches = None
+        self._postings = None
+        # Every saved search the index has seen, active or not, and the
+        # newest `updated_at` among them
+        self._known = set()
+        self._seen_until = None
+        self._built_at = 0.0
+
+    # --- Building ---
+
+    def build(self):
+        """File every active saved search under its anchors"""
+        with self._lock:
+            self._searches, self._postings = {}, {kind: {} for kind in KINDS}
+            self._known, self._seen_until = set(), None
+            self._apply(SavedSearch.objects.all())
+            self._built_at = time.monotonic()
+
+    def _apply(self, queryset):
+        rows = queryset.values_list('pk', 'query', 'filters', 'is_active', 'updated_at')
+        for pk, query, filters, is_active, updated_at in rows.iterator(chunk_size=5000):
+            self._index(pk, query, filters, is_active)
+            self._known.add(pk)
+            if self._seen_until is None or updated_at > self._seen_until:
+                self._seen_until = updated_at
+
+    def _ensure_fresh(self):
+        """Catch up with saved search changes made by other processes"""
+        if self._postings is None or time.monotonic() - self._built_at > self.max_age:
+            self.build()
+            return
+        changed = SavedSearch.objects.all()
+        if self._seen_until is not None:
+            changed = changed.filter(updated_at__gte=self._seen_until - timedelta(seconds=SETTLE))
+        self._apply(changed)
+        if SavedSearch.objects.count() != len(self._known):
+            self.build()
+
+    @staticmethod
+    def _file(postings, pk, anchors):
+        for kind, key in anchors:
+            postings[kind].setdefault(key, set()).add(pk)
+
+    # --- Incremental updates ---
+
+    def _index(self, pk, query, filters, is_active):
+        self._remove(pk)
+        if is_active:
+            conditions = SearchConditions(query, filters)
+            self._searches[pk] = (conditions, conditions.anchors())
+            self._file(self._postings, pk, self._searches[pk][1])
+
+    def _remove(self, pk):
+        _, anchors = self._searches.pop(pk, (None, ()))
+        for kind, key in anchors:
+            filed = self._postings[kind].get(key)
+            if filed is not None:
+                filed.discard(pk)
+                if not filed:
+                    del self._postings[kind][key]
+
+    def update_search(self, search):
+        """Apply one saved search to the loaded index"""
+        with self._lock:
+            if self._postings is not None:
+                self._index(search.pk, search.query, search.filters, search.is_active)
+                self._known.add(search.pk)
+
+    def remove_search(self, pk):
+        with self._lock:
+            if self._postings is not None:
+                self._remove(pk)
+                self._known.discard(pk)
+
+    def invalidate(self):
+        """Drop the local index; the next match rebuilds it"""
+        with self._lock:
+            self._postings = None
+
+    # --- Matching ---
+
+    def match(self, jobs):
+        """{job pk: [saved search IDs]} for jobs given as dicts of 'pk' and MATCH_FIELDS"""
+        matched = {}
+        with self._lock:
+            self._ensure_fresh()
+            for job in jobs:
+                candidates = set()
+                for kind, keys in job_keys(job).items():
+                    postings = self._postings[kind]
+                    for key in keys & postings.keys():
+                        candidates |= postings[key]
+                found = sorted(pk for pk in candidates if self._searches[pk][0].matches(job))
+                if found:
+                    matched[job['pk']] = found
+        return matched
+
+
+percolator = Percolator()
+
+
+def match_values(job):
+    """The values matching reads from a saved Job, or None when it is not listed"""
+    if not job.is_active or job.is_expired or job.duplicate_of_id is not None or job.deletion_requested_at:
+        return None
+    return {'pk': job.pk, **{field: getattr(job, field) for field in MATCH_FIELDS}}
+
+
+def percolate(jobs):
+    """Store a match for every saved search each job satisfies; returns the number of matches"""
+    rows = [
+        SavedSearchMatch(saved_search_id=search_id, job_id=job_id)
+        for job_id, search_ids in percolator.match(jobs).items() for search_id in search_ids
+    ]
+    if rows:
+        # A job matched again after an edit keeps its first match
+        SavedSearchMatch.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
+
+
+def percolate_saved(jobs):
+    """Match saved Job instances against the saved searches once the transaction commits"""
+    values = [values for values in map(match_values, jobs) if values is not None]
+    if values:
+        transaction.on_commit(lambda: percolate(values))
+
+
+# --- Alerts ---
+
+def send_alerts():
+    """Email each user the listed jobs their saved searches matched since the last alert; returns emails sent"""
+    pending = SavedSearchMatch.objects.filter(notified_at__isnull=True, saved_search__is_active=True)
+    user_ids = pending.order_by().values_list('saved_search__user', flat=True).distinct()
+    sent = 0
+    for user in User.objects.filter(pk__in=user_ids, is_active=True).only('email', 'first_name', 'last_name', 'username'):
+        rows = list(pending.filter(saved_search__user=user).order_by('-pk').values_list('pk', 'job_id'))
+        if not rows:
+            continue
+        # Matches stored while this runs wait for the next alert
+        matches = pending.filter(saved_search__user=user, pk__lte=rows[0][0])
+        # Newest first, once per job even when several searches matched it
+        job_ids = list(dict.fromkeys(job_id for _, job_id in rows))
+        listed = {
+            pk: (title, location)
+            for pk, title, location in Job.objects.listed().filter(pk__in=job_ids).values_list('pk', 'title', 'location')
+        }
+        jobs = [listed[job_id] for job_id in job_ids if job_id in listed]
+        if jobs and not _send_alert(user, jobs):
+            continue
+        # Matches whose job has closed since are dropped with the rest
+        matches.update(notified_at=timezone.now())
+        sent += bool(jobs)
+    return sent
+
+
+def _send_alert(user, jobs):
+    lines = [f"- {title} ({location})" for title, location in jobs[:ALERT_JOBS]]
+    if len(jobs) > ALERT_JOBS:
+        lines.append(f"- ...and {len(jobs) - ALERT_JOBS} more in your saved searches")
+    listing = '\n'.join(lines)
+    message = f"""
+Hi {user.get_full_name() or user.username},
+
+New jobs match your saved searches on WorkZone:
+
+{listing}
+
+Turn alerts off for a search under your saved searches.
+
+Best regards,
+The WorkZone Team
+    """
+    try:
+        send_mail(
+            subject="New jobs matching your saved searches",
+            message=message,
+            from_email=settings.EMAIL_HOST_USER,
+            recipient_list=[user.email],
+            fail_silently=False,
+        )
+        return True
+    except Exception:
+        logger.exception("Failed to send search alert to %s", user.email)
+        return False
@@ -0,0 +1,113 @@
+"""
+Candidate ranking for the employer review queue.
+
+Each application gets a 0-1000 score when it is created, stored in
+`JobApplication.score` behind a (job, -score, -applied_at) index, so the
+top of a job's queue is one index range scan however many applications it
+has. Scores only depend on the job's requirements (RANKING_FIELDS), the
+application itself and the skills and experience on its resume and the
+applicant's profile (APPLICANT_FIELDS), so they are recomputed only when
+one of those changes.
+
+Score weights:
+    required skills covered     50%
+    preferred skills covered    15%
+    experience fits the level   20%
+    expected salary fits        15%
+"""
+from typing import NamedTuple
+
+MAX_SCORE = 1000
+
+WEIGHTS = {
+    'required_skills': 0.50,
+    'preferred_skills': 0.15,
+    'experience': 0.20,
+    'salary': 0.15,
+}
+
+# Years of experience expected for each Job.experience_level (inclusive range)
+EXPERIENCE_YEARS = {
+    'Entry': (0, 1),
+    'Junior': (1, 3),
+    'Mid': (3, 6),
+    'Senior': (5, 10),
+    'Lead': (8, 15),
+    'Executive': (12, None),
+}
+
+# Job fields the score depends on; changing any of them re-scores the job's applications
+RANKING_FIELDS = ('required_skills', 'preferred_skills', 'experience_level', 'salary_min_usd', 'salary_max_usd')
+
+
+# Resume and ApplicantProfile fields the score depends on
+APPLICANT_FIELDS = ('skills', 'experience_years')
+
+
+def _skill_set(skills):
+    return {str(skill).strip().casefold() for skill in skills or () if str(skill).strip()}
+
+
+class Requirements(NamedTuple):
+    required: frozenset
+    preferred: frozenset
+    min_years: int
+    max_years: int
+    salary_ceiling: int
+
+    @classmethod
+    def from_values(cls, required_skills, preferred_skills, experience_level, salary_min_usd, salary_max_usd):
+        min_years, max_years = EXPERIENCE_YEARS.get(experience_level, (0, None))
+        return cls(
+            frozenset(_skill_set(required_skills)),
+            frozenset(_skill_set(preferred_skills)),
+            min_years,
+            max_years,
+            salary_max_usd if salary_max_usd is not None else salary_min_usd,
+        )
+
+    @classmethod
+    def for_job(cls, job):
+        return cls.from_values(*(getattr(job, field) for field in RANKING_FIELDS))
+
+
+def _coverage(wanted, skills):
+    if not wanted:
+        return 1.0
+    return len(wanted & skills) / len(wanted)
+
+
+def _experience_fit(requirements, years):
+    years = years or 0
+    if years < requirements.min_years:
+        return years / requirements.min_years
+    if requirements.max_years is not None and years > requirements.max_years:
+        # Mildly overqualified is still a good match
+        return max(0.5, 1.0 - 0.1 * (years - requirements.max_years))
+    return 1.0
+
+
+def _salary_fit(requirements, expected_salary_usd):
+    ceiling = requirements.salary_ceiling
+    if expected_salary_usd is None or not ceiling:
+        return 0.5
+    if expected_salary_usd <= ceiling:
+        return 1.0
+    return max(0.0, 1.0 - (expected_salary_usd - ceiling) / ceiling)
+
+
+def applicant_inputs(resume_skills, resume_years, profile_skills=None, profile_years=None):
+    """(skills, experience_years) to score: the resume and the profile taken together"""
+    return [*(resume_skills or ()), *(profile_skills or ())], max(resume_years or 0, profile_years or 0)
+
+
+def score(requirements, skills, experience_years, expected_salary_usd):
+    """Score one application against a job's Requirements"""
+    skills = _skill_set(skills)
+    total = (
+        WEIGHTS['required_skills'] * _coverage(requirements.required, skills)
+        + WEIGHTS['preferred_skills'] * _coverage(requirements.preferred, skills)
+        + WEIGHTS['experience'] * _experience_fit(requirements, experience_years)
+        + WEIGHTS['salary'] * _salary_fit(requirements, expected_salary_usd)
+    )
+    return round(total * MAX_SCORE)
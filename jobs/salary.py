@@ -0,0 +1,59 @@
+"""
+Salary normalisation.
+
+Postings quote salaries in their own currency, which makes "at least 80k
+USD" impossible to answer with an index. Every amount is therefore also
+stored as whole annual US dollars, converted with the local rate table in
+`settings.SALARY_RATES_TO_USD` (units of USD per unit of currency). Run
+`manage.py normalize_salaries` after changing the table.
+
+Amounts in currencies missing from the table normalise to None, so those
+postings drop out of salary filters instead of being compared wrongly.
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db.models import Q
+
+DEFAULT_RATES_TO_USD = {'USD': '1'}
+
+
+def rates():
+    return {
+        currency.upper(): Decimal(str(rate))
+        for currency, rate in getattr(settings, 'SALARY_RATES_TO_USD', DEFAULT_RATES_TO_USD).items()
+    }
+
+
+def to_usd(amount, currency, table=None):
+    """Convert an amount to whole US dollars, or None if it cannot be"""
+    if amount is None:
+        return None
+    rate = (table or rates()).get((currency or 'USD').upper())
+    if rate is None:
+        return None
+    return int((Decimal(amount) * rate).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def pays_at_least_q(amount_usd):
+    """Jobs whose advertised range reaches `amount_usd`"""
+    return Q(salary_max_usd__gte=amount_usd) | Q(salary_max_usd__isnull=True, salary_min_usd__gte=amount_usd)
+
+
+def pays_at_most_q(amount_usd):
+    """Jobs whose advertised range starts at or below `amount_usd`"""
+    return Q(salary_min_usd__lte=amount_usd) | Q(salary_min_usd__isnull=True, salary_max_usd__lte=amount_usd)
+
+
+def pays_at_least(salary_min_usd, salary_max_usd, amount_usd):
+    """pays_at_least_q() for one job's values"""
+    if salary_max_usd is not None:
+        return salary_max_usd >= amount_usd
+    return salary_min_usd is not None and salary_min_usd >= amount_usd
+
+
+def pays_at_most(salary_min_usd, salary_max_usd, amount_usd):
+    """pays_at_most_q() for one job's values"""
+    if salary_min_usd is not None:
+        return salary_min_usd <= amount_usd
+    return salary_max_usd is not None and salary_max_usd <= amount_usd
@@ -1,21 +1,49 @@
 from rest_framework import serializers
-from .models import Job,Resume,JobApplication,JobSearch, JobBookmark
-from django.core.validators import FileExtensionValidator
+from api.sparse import SparseFieldsetMixin
+from .models import Job,Resume,JobApplication,JobSearch, JobBookmark, SavedSearch
+from .percolator import validate_filters
 
-class JobSerializer(serializers.ModelSerializer):
+class JobSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Job
         fields = "__all__"
+        read_only_fields = [
+            'employer', 'place_id', 'latitude', 'longitude', 'salary_min_usd', 'salary_max_usd',
+            'duplicate_of', 'deletion_requested_at', 'created_at', 'updated_at',
+        ]
+        # (employer, external_id) uniqueness is left to the database: employer
+        # is not part of the input, so DRF's validator would demand external_id
+        validators = []
         
 class ResumeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Resume
         fields = "__all__"
-        validators =FileExtensionValidator[(allowed_extensions = ['pdf', 'jpeg', 'png'])]
+        read_only_fields = ['user', 'created_at', 'updated_at']
                       
-class JobApplicationSerializer(serializers.ModelSerializer):
+class JobApplicationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model =JobApplication
         fields = "__all__"
-        
+        read_only_fields = ['job', 'applicant', 'resume', 'status', 'employer_notes', 'is_shortlisted',
+                            'expected_salary_usd', 'score', 'applied_at', 'updated_at']
+
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SavedSearch
+        fields = "__all__"
+        read_only_fields = ['user', 'created_at', 'updated_at']
+
+    def validate_filters(self, filters):
+        error = validate_filters(filters)
+        if error:
+            raise serializers.ValidationError(error)
+        return filters
 
+    def validate(self, attrs):
+        query = attrs.get('query', getattr(self.instance, 'query', ''))
+        filters = attrs.get('filters', getattr(self.instance, 'filters', {}))
+        if not (query or '').strip() and not filters:
+            raise serializers.ValidationError('Save a query or at least one filter.')
+        return attrs
@@ -0,0 +1,126 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver, Signal
+
+from tasks.deletion import deletion_scheduled
+from users.models import ApplicantProfile, EmployerProfile
+from . import changes, dedupe, similar
+from .autocomplete import autocomplete
+from .cache import job_cache, job_version, LISTING, DETAILS
+from .facets import facet_index
+from .models import Job, JobApplication, JobSearch, Resume, SavedSearch, User, TEXT_FIELDS, VECTOR_FIELDS
+from .percolator import percolator, percolate_saved
+
+# Sent after writes that bypass Job.save()/delete(), such as bulk_create()
+# and queryset update(). `job_ids` is the list of affected IDs.
+jobs_bulk_changed = Signal()
+
+
+@receiver(post_save, sender=Job)
+def job_saved(sender, instance, created, update_fields, **kwargs):
+    text_saved = update_fields is None or set(update_fields) & set(TEXT_FIELDS)
+    if created or (text_saved and instance.text_changed):
+        dedupe.index_jobs([instance], created=created)
+    if not created and not dedupe.is_open(instance):
+        release_reposts([instance.pk])
+    instance._loaded_text = instance.text_snapshot()
+    vector_saved = update_fields is None or set(update_fields) & set(VECTOR_FIELDS)
+    if created or (vector_saved and instance.vector_changed):
+        similar.index_jobs([instance], created=created)
+    instance._loaded_vector = instance.vector_snapshot()
+    percolate_saved([instance])
+    changes.record([instance.pk])
+    transaction.on_commit(lambda: facet_index.update_job(instance))
+    transaction.on_commit(lambda: autocomplete.update_job(instance))
+    pk = instance.pk
+    transaction.on_commit(lambda: job_cache.bump(LISTING, job_version(pk)))
+    if instance.ranking_inputs_changed:
+        transaction.on_commit(lambda: JobApplication.objects.filter(job_id=pk).rescore())
+    instance._loaded_ranking = instance.ranking_snapshot()
+
+
+@receiver(post_delete, sender=Job)
+def job_deleted(sender, instance, **kwargs):
+    pk = instance.pk
+    changes.record([pk], action="deleted")
+    transaction.on_commit(lambda: facet_index.remove_job(pk))
+    transaction.on_commit(lambda: autocomplete.remove_job(pk))
+    transaction.on_commit(lambda: job_cache.bump(LISTING, job_version(pk)))
+
+
+def release_reposts(job_ids):
+    """List the reposts of jobs that closed in their place"""
+    released = dedupe.release(job_ids)
+    if released:
+        jobs_bulk_changed.send(sender=Job, job_ids=list(released))
+
+
+@receiver(jobs_bulk_changed)
+def jobs_bulk_written(sender, job_ids, **kwargs):
+    release_reposts(job_ids)
+    changes.record(job_ids)
+    transaction.on_commit(facet_index.invalidate)
+    transaction.on_commit(autocomplete.invalidate)
+    transaction.on_commit(lambda: job_cache.bump(LISTING, DETAILS))
+
+
+@receiver(post_save, sender=JobApplication)
+def application_saved(sender, instance, created, **kwargs):
+    if created:
+        job_id = instance.job_id
+        transaction.on_commit(lambda: autocomplete.record_application(job_id))
+
+
+@receiver(post_save, sender=Resume)
+def resume_saved(sender, instance, **kwargs):
+    # Skills and experience count towards the score of every application sent with the resume
+    if instance.ranking_inputs_changed:
+        pk = instance.pk
+        transaction.on_commit(lambda: JobApplication.objects.filter(resume_id=pk).rescore())
+    instance._loaded_ranking = instance.ranking_snapshot()
+
+
+@receiver(post_save, sender=ApplicantProfile)
+def applicant_profile_saved(sender, instance, **kwargs):
+    # ... and so do the profile's, for all of the applicant's applications
+    if instance.ranking_inputs_changed:
+        user_id = instance.user_id
+        transaction.on_commit(lambda: JobApplication.objects.filter(applicant_id=user_id).rescore())
+    instance._loaded_ranking = instance.ranking_snapshot()
+
+
+@receiver(post_save, sender=JobSearch)
+def search_saved(sender, instance, created, **kwargs):
+    if created:
+        query = instance.query
+        transaction.on_commit(lambda: autocomplete.record_search(query))
+
+
+@receiver(post_save, sender=SavedSearch)
+def saved_search_saved(sender, instance, **kwargs):
+    transaction.on_commit(lambda: percolator.update_search(instance))
+
+
+@receiver(post_delete, sender=SavedSearch)
+def saved_search_deleted(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: percolator.remove_search(pk))
+
+
+@receiver(post_save, sender=EmployerProfile)
+def employer_profile_saved(sender, instance, **kwargs):
+    transaction.on_commit(lambda: autocomplete.update_company(instance.user_id, instance.company_name))
+
+
+@receiver(deletion_scheduled, sender=User)
+def users_deletion_scheduled(sender, queryset, requested_at, **kwargs):
+    """Take the jobs of employers being deleted down with their accounts"""
+    jobs = Job.objects.filter(employer__in=queryset.values('pk'), deletion_requested_at__isnull=True)
+    if jobs.update(is_active=False, deletion_requested_at=requested_at, updated_at=requested_at):
+        job_ids = list(Job.objects.filter(employer__in=queryset.values('pk')).values_list('pk', flat=True))
+        jobs_bulk_changed.send(sender=Job, job_ids=job_ids)
+
+
+@receiver(deletion_scheduled, sender=Job)
+def jobs_deletion_scheduled(sender, queryset, **kwargs):
+    jobs_bulk_changed.send(sender=Job, job_ids=list(queryset.values_list('pk', flat=True)))
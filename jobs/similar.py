@@ -0,0 +1,287 @@
+"""
+"Similar jobs" with hashed TF-IDF vectors and random-projection LSH.
+
+A job's title, description, requirements and responsibilities are split
+into words, and its skills and tags are taken whole. Each term is hashed
+to a 32-bit feature, so no vocabulary has to be stored or shared.
+Features are weighted by field (FIELD_WEIGHTS), sublinear term frequency
+and inverse document frequency. Only the MAX_FEATURES heaviest are kept,
+and the vector is scaled to unit length and stored packed in `JobVector`
+(under 400 bytes).
+
+Neighbours are found with random-hyperplane LSH. Each of NUM_BITS
+hyperplanes, defined by hashing the features, gives one bit: the sign of
+the vector's projection on it. Two vectors agree on a bit with
+probability 1 - angle / pi. The bits are split into BANDS bands of ROWS,
+and each band is stored as a bucket in `JobVectorBand`. Candidates are
+the listed jobs sharing the most buckets with the query, found in one
+indexed query, and are ranked by exact cosine similarity.
+
+IDF weights come from the latest `JobTermStatistics`, written by `manage.py
+build_job_vectors` along with every vector. Jobs saved in between are
+vectorized with those statistics (see jobs.signals). Run the command
+again once the job mix has shifted. Before its first run every term
+weighs the same.
+"""
+import hashlib
+import math
+import re
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from functools import lru_cache
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Job, JobApplication, JobTermStatistics, JobVector, JobVectorBand, VECTOR_FIELDS
+
+# Title words count three times as much as description words
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'description': 1.0,
+    'requirements': 1.0,
+    'responsibilities': 0.5,
+    'required_skills': 3.0,
+    'preferred_skills': 1.5,
+    'tags': 1.0,
+}
+LIST_FIELDS = ('required_skills', 'preferred_skills', 'tags')
+MAX_FEATURES = 48
+
+# 20 bands of 6 bits: vectors at cosine 0.6 share a bucket with
+# probability about 0.93, unrelated ones (cosine 0) about 0.27. A query
+# reads 20 / 64ths of the band rows at most; more bits per band would read
+# fewer but miss more of the moderately similar jobs
+NUM_BITS = 120
+BANDS = 20
+ROWS = NUM_BITS // BANDS
+
+# Listed jobs sharing the most buckets are scored exactly
+CANDIDATES = 100
+MIN_SIMILARITY = 0.05
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+# Recommendations start from this many of the user's latest bookmarks and applications
+PROFILE_JOBS = 50
+
+STATISTICS_MAX_AGE = 300
+
+_WORD = re.compile(r'\w+')
+
+
+def _feature(kind, term):
+    return int.from_bytes(hashlib.blake2b(f'{kind}:{term}'.encode(), digest_size=4).digest(), 'little')
+
+
+def terms(values):
+    """Counter of weighted features from {field: value} of VECTOR_FIELDS"""
+    counts = Counter()
+    for field in VECTOR_FIELDS:
+        value = values.get(field)
+        if not value:
+            continue
+        weight = FIELD_WEIGHTS[field]
+        if field in LIST_FIELDS:
+            for item in value:
+                if isinstance(item, str) and item.strip():
+                    counts[_feature('s', ' '.join(item.casefold().split()))] += weight
+        else:
+            for word in _WORD.findall(value.casefold()):
+                if len(word) > 1 and not word.isdigit():
+                    counts[_feature('w', word)] += weight
+    return counts
+
+
+# --- Term statistics ---
+
+class Statistics:
+    """Document frequencies as parallel sorted arrays"""
+
+    def __init__(self, documents=0, features=(), frequencies=()):
+        self.documents = documents
+        self.features = array('I', features)
+        self.frequencies = array('I', frequencies)
+
+    @classmethod
+    def from_counts(cls, documents, counts):
+        features = sorted(counts)
+        return cls(documents, features, [counts[feature] for feature in features])
+
+    def pack(self):
+        return self.features.tobytes() + self.frequencies.tobytes()
+
+    @classmethod
+    def unpack(cls, documents, data):
+        data = bytes(data)
+        middle = len(data) // 2
+        features, frequencies = array('I'), array('I')
+        features.frombytes(data[:middle])
+        frequencies.frombytes(data[middle:])
+        return cls(documents, features, frequencies)
+
+    def idf(self, feature):
+        if not self.documents:
+            return 1.0
+        index = bisect_left(self.features, feature)
+        found = index < len(self.features) and self.features[index] == feature
+        frequency = self.frequencies[index] if found else 0
+        return math.log((1 + self.documents) / (1 + frequency)) + 1
+
+
+_statistics = (None, 0.0)
+
+
+def statistics():
+    """The latest term statistics, reloaded every STATISTICS_MAX_AGE seconds"""
+    global _statistics
+    loaded, loaded_at = _statistics
+    if loaded is None or time.monotonic() - loaded_at > STATISTICS_MAX_AGE:
+        row = JobTermStatistics.objects.order_by('-created_at').values_list('documents', 'frequencies').first()
+        loaded = Statistics.unpack(*row) if row else Statistics()
+        _statistics = (loaded, time.monotonic())
+    return loaded
+
+
+def forget_statistics():
+    global _statistics
+    _statistics = (None, 0.0)
+
+
+# --- Vectors ---
+
+def vectorize(values, stats=None):
+    """{feature: weight} of unit length from {field: value}"""
+    stats = stats or statistics()
+    weights = {
+        feature: (1 + math.log(count) if count > 1 else count) * stats.idf(feature)
+        for feature, count in terms(values).items()
+    }
+    kept = sorted(weights.items(), key=lambda item: -item[1])[:MAX_FEATURES]
+    norm = math.sqrt(sum(weight * weight for _, weight in kept))
+    return {feature: weight / norm for feature, weight in kept} if norm else {}
+
+
+def pack(vector):
+    features = sorted(vector)
+    return array('I', features).tobytes() + array('f', [vector[feature] for feature in features]).tobytes()
+
+
+def unpack(data):
+    data = bytes(data)
+    middle = len(data) // 2
+    features, weights = array('I'), array('f')
+    features.frombytes(data[:middle])
+    weights.frombytes(data[middle:])
+    return dict(zip(features, weights))
+
+
+def cosine(first, second):
+    return sum(first[feature] * second[feature] for feature in first.keys() & second.keys())
+
+
+def centroid(vectors):
+    """Unit-length mean of several vectors, cut to MAX_FEATURES"""
+    total = Counter()
+    for vector in vectors:
+        total.update(vector)
+    kept = total.most_common(MAX_FEATURES)
+    norm = math.sqrt(sum(weight * weight for _, weight in kept))
+    return {feature: weight / norm for feature, weight in kept} if norm else {}
+
+
+# --- LSH ---
+
+@lru_cache(maxsize=1 << 16)
+def _hyperplanes(feature):
+    """This feature's coordinate (+1 or -1) on every hyperplane, one bit each"""
+    return int.from_bytes(hashlib.blake2b(feature.to_bytes(4, 'little'), digest_size=NUM_BITS // 8).digest(), 'little')
+
+
+def buckets(vector):
+    """One bucket per band: the band number followed by its ROWS sign bits"""
+    projections = [0.0] * NUM_BITS
+    for feature, weight in vector.items():
+        signs = _hyperplanes(feature)
+        for bit in range(NUM_BITS):
+            if signs >> bit & 1:
+                projections[bit] += weight
+            else:
+                projections[bit] -= weight
+    result = []
+    for band in range(BANDS):
+        bits = 0
+        for row in range(ROWS):
+            bits = bits << 1 | (projections[band * ROWS + row] > 0)
+        result.append(band << ROWS | bits)
+    return result
+
+
+def index_jobs(jobs, stats=None, created=False):
+    """Store the vectors and buckets of saved jobs; pass `created` for jobs just inserted"""
+    jobs = [job for job in jobs if job.pk is not None]
+    if not jobs:
+        return
+    vectors = {job.pk: vectorize({field: getattr(job, field) for field in VECTOR_FIELDS}, stats) for job in jobs}
+    store(vectors, replace=not created)
+
+
+def store(vectors, replace=True):
+    """Write {job_id: vector} with their buckets"""
+    job_ids = list(vectors)
+    # Within a job's save this joins its transaction, without a savepoint
+    with transaction.atomic(savepoint=False):
+        if replace:
+            JobVectorBand.objects.filter(job_id__in=job_ids).delete()
+            JobVector.objects.filter(job_id__in=job_ids).delete()
+        JobVector.objects.bulk_create(
+            [JobVector(job_id=job_id, vector=pack(vector)) for job_id, vector in vectors.items()],
+        )
+        JobVectorBand.objects.bulk_create([
+            JobVectorBand(job_id=job_id, bucket=bucket)
+            for job_id, vector in vectors.items() if vector for bucket in buckets(vector)
+        ])
+
+
+# --- Queries ---
+
+def neighbours(vector, limit=DEFAULT_LIMIT, exclude=()):
+    """[(job_id, similarity)] of the listed jobs nearest to `vector`, most similar first"""
+    if not vector:
+        return []
+    exclude = list(exclude)
+    hits = (
+        JobVectorBand.objects.filter(bucket__in=buckets(vector)).exclude(job_id__in=exclude)
+        .values('job_id').annotate(hits=Count('pk')).order_by('-hits')[:CANDIDATES]
+    )
+    candidates = (
+        Job.objects.listed().filter(pk__in=hits.values('job_id')).order_by().values_list('pk', 'vector__vector')
+    )
+    scored = [(job_id, cosine(vector, unpack(data))) for job_id, data in candidates if data is not None]
+    scored = [(job_id, score) for job_id, score in scored if score >= MIN_SIMILARITY]
+    scored.sort(key=lambda item: (-item[1], -item[0]))
+    return scored[:limit]
+
+
+def similar_jobs(job_id, limit=DEFAULT_LIMIT):
+    """[(job_id, similarity)] of listed jobs like the given one"""
+    data = JobVector.objects.filter(job_id=job_id).values_list('vector', flat=True).first()
+    if data is None:
+        return []
+    return neighbours(unpack(data), limit, exclude=[job_id])
+
+
+def recommended_jobs(user_id, bookmarked_ids=(), limit=DEFAULT_LIMIT):
+    """[(job_id, similarity)] of listed jobs like the ones the user bookmarked and applied to"""
+    applied = list(
+        JobApplication.objects.filter(applicant_id=user_id).order_by('-applied_at').values_list('job_id', flat=True)
+    )
+    # Bookmark IDs are sorted; the highest are the newest postings
+    profile = set(applied[:PROFILE_JOBS]) | set(sorted(bookmarked_ids)[-PROFILE_JOBS:])
+    if not profile:
+        return []
+    vectors = [unpack(data) for data in JobVector.objects.filter(job_id__in=profile).values_list('vector', flat=True)]
+    # Nothing the user bookmarked or applied to is recommended back
+    return neighbours(centroid(vectors), limit, exclude=profile | set(applied) | set(bookmarked_ids))
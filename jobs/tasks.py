@@ -0,0 +1,14 @@
+from django.utils import timezone
+
+from tasks.registry import register
+from tasks.runner import process_in_chunks
+from .models import Job
+from .signals import jobs_bulk_changed
+
+
+@register('jobs.deactivate_jobs')
+def deactivate_jobs(task):
+    def apply(pks):
+        Job.objects.filter(pk__in=pks).update(is_active=False, updated_at=timezone.now())
+        jobs_bulk_changed.send(sender=Job, job_ids=pks)
+    return {'deactivated': process_in_chunks(task, task.get_queryset(), apply)}
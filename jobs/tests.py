@@ -1,3 +1,1166 @@
-from django.test import TestCase
+import datetime
+import json
+import threading
+import time
+from io import StringIO
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api.compiled import _compiled, compiled
+from users.models import ApplicantProfile, EmployerProfile
+from . import autocomplete as autocomplete_module
+from . import bulk, changes, dedupe, ranking, similar
+from .bookmarks import BookmarkService
+from .cache import DETAILS, LISTING, Entry, TieredCache
+from .facets import FacetIndex, facet_index
+from .salary import pays_at_least, pays_at_most, to_usd
+from .percolator import SearchConditions, percolator, send_alerts
+from .autocomplete import PrefixIndex, autocomplete
+from .expiry import expire_jobs
+from .models import (
+    Job, JobApplication, JobBookmark, JobChange, JobSearch, JobTermStatistics, JobVector, Resume, SavedSearch, SavedSearchMatch,
+)
+from .serializers import JobSerializer, JobApplicationSerializer, ResumeSerializer
+from .signals import jobs_bulk_changed
+
+User = get_user_model()
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+# --- Compiled Serializers ---
+class CompiledSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+        )
+        cls.applicant = User.objects.create_user(
+            username='applicant', email='applicant@example.com', password='x', role='applicant',
+        )
+        cls.full = Job.objects.create(
+            employer=cls.employer, title='Backend Engineer', description='Build APIs',
+            requirements='Python', responsibilities='Ship', job_type='Remote', experience_level='Senior',
+            location='Lagos', salary_min=Decimal('50000'), salary_max=Decimal('72000.5'), salary_currency='EUR',
+            required_skills=['python', 'django'], tags=['api'], external_id='ext-1',
+            application_deadline=timezone.now() + datetime.timedelta(days=30), is_featured=True,
+        )
+        cls.sparse = Job.objects.create(
+            employer=cls.employer, title='Intern', description='', requirements='', responsibilities='',
+            location='Nowhere in particular',
+        )
+        cls.resume = Resume.objects.create(user=cls.applicant, title='CV', file='resumes/cv.pdf', skills=['python'])
+        cls.application = JobApplication.objects.create(
+            job=cls.full, applicant=cls.applicant, resume=cls.resume, cover_letter='Hello',
+            expected_salary=Decimal('60000'), available_start_date=datetime.date(2026, 1, 5),
+        )
+
+    def assertSameOutput(self, serializer_class, instances, **sparse):
+        drf = serializer_class(instances, many=True, **sparse).data
+        self.assertEqual(render(compiled(serializer_class, **sparse).many(instances)), render(drf))
+
+    def test_job_from_instances(self):
+        self.assertSameOutput(JobSerializer, list(Job.objects.order_by('pk')))
+
+    def test_job_from_values_rows(self):
+        serializer = compiled(JobSerializer)
+        self.assertIsNotNone(serializer.value_names)
+        rows = Job.objects.order_by('pk').values(*serializer.value_names)
+        drf = JobSerializer(Job.objects.order_by('pk'), many=True).data
+        self.assertEqual(render(serializer.many(rows)), render(drf))
+
+    def test_job_sparse_fieldset(self):
+        jobs = list(Job.objects.order_by('pk'))
+        self.assertSameOutput(JobSerializer, jobs, fields={'title', 'salary_min', 'employer'}, exclude=set())
+        self.assertSameOutput(JobSerializer, jobs, fields=None, exclude={'description', 'requirements'})
+
+    def test_unknown_names_share_the_cached_serializer(self):
+        title = compiled(JobSerializer, fields={'title'})
+        self.assertIs(compiled(JobSerializer, fields={'title', 'x1'}, exclude={'x2'}), title)
+        self.assertIs(compiled(JobSerializer, exclude={'x3'}), compiled(JobSerializer))
+        self.assertEqual(list(title.many([self.full])[0]), ['id', 'title'])
+        self.assertIsNotNone(_compiled.cache_info().maxsize)
+
+    def test_job_in_another_timezone(self):
+        with timezone.override(datetime.timezone(datetime.timedelta(hours=1))):
+            self.assertSameOutput(JobSerializer, list(Job.objects.order_by('pk')))
+
+    def test_application_from_instances_and_rows(self):
+        applications = list(JobApplication.objects.order_by('pk'))
+        self.assertSameOutput(JobApplicationSerializer, applications)
+        serializer = compiled(JobApplicationSerializer)
+        rows = JobApplication.objects.order_by('pk').values(*serializer.value_names)
+        self.assertEqual(render(serializer.many(rows)), render(JobApplicationSerializer(applications, many=True).data))
+
+    def test_file_fields_need_instances(self):
+        serializer = compiled(ResumeSerializer)
+        self.assertIsNone(serializer.value_names)
+        self.assertSameOutput(ResumeSerializer, [self.resume])
+        with self.assertRaises(TypeError):
+            serializer.to_representation(Resume.objects.values().get(pk=self.resume.pk))
+
+
+# --- Autocomplete ---
+class PrefixIndexTests(SimpleTestCase):
+    def index(self, weights):
+        index = PrefixIndex()
+        with index.loading():
+            for term, weight in weights.items():
+                index.add(term, jobs=weight)
+        return index
+
+    def test_matches_any_word_by_weight(self):
+        index = self.index({'Software Engineer': 3, 'Senior Software Engineer': 5, 'Sales Lead': 1, 'Engineering Manager': 2})
+        self.assertEqual(
+            [value for value, _ in index.suggest('  ENG')],
+            ['Senior Software Engineer', 'Software Engineer', 'Engineering Manager'],
+        )
+        self.assertEqual(index.suggest('software eng', limit=1), [('Senior Software Engineer', 5)])
+        self.assertEqual(index.suggest('x'), [])
+        self.assertEqual(index.suggest(''), [])
+
+    @mock.patch.object(autocomplete_module, 'MEMO_THRESHOLD', 1)
+    @mock.patch.object(autocomplete_module, 'MEMO_SIZE', 3)
+    def test_remembered_prefixes_follow_weight_changes(self):
+        index = self.index({'python': 6, 'php': 4, 'perl': 2, 'pascal': 1})
+        self.assertEqual(index._memo['p'], ['python', 'php', 'perl'])
+
+        # Heavier terms are moved in place
+        index.add('pascal', jobs=3)
+        self.assertEqual(index._memo['p'], ['python', 'pascal', 'php'])
+        # So are lighter ones still ahead of everything left out
+        index.add('python', jobs=-1)
+        self.assertEqual(index._memo['p'], ['python', 'pascal', 'php'])
+
+        # Otherwise the list is worked out again on the next keystroke
+        index.add('pascal', jobs=-5)
+        self.assertNotIn('p', index._memo)
+        self.assertEqual([value for value, _ in index.suggest('p')], ['python', 'php', 'perl'])
+        self.assertEqual(index._memo['p'], ['python', 'php', 'perl'])
+
+
+class AutocompleteTests(TestCase):
+    def setUp(self):
+        autocomplete.invalidate()
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+        )
+        EmployerProfile.objects.create(user=self.employer, company_name='Acme Labs')
+        self.applicant = User.objects.create_user(
+            username='applicant', email='applicant@example.com', password='x', role='applicant',
+        )
+        self.resume = Resume.objects.create(user=self.applicant, title='CV', file='resumes/cv.pdf')
+        self.python = Job.objects.create(
+            employer=self.employer, title='Python Developer', description='', requirements='', responsibilities='',
+            location='Lagos', required_skills=['Python', 'Django'],
+        )
+        self.php = Job.objects.create(
+            employer=self.employer, title='PHP Developer', description='', requirements='', responsibilities='',
+            location='Lagos', required_skills=['PHP'],
+        )
+        JobApplication.objects.create(job=self.php, applicant=self.applicant, resume=self.resume)
+        self.addCleanup(autocomplete.invalidate)
+
+    def values(self, prefix, kind):
+        return [(item['value'], item['weight']) for item in autocomplete.suggest(prefix, [kind])[kind]]
+
+    def test_weighted_by_jobs_applications_and_searches(self):
+        self.assertEqual(self.values('p', 'skill'), [('PHP', 2), ('Python', 1)])
+        self.assertEqual(self.values('dev', 'title'), [('PHP Developer', 2), ('Python Developer', 1)])
+        self.assertEqual(self.values('ac', 'company'), [('Acme Labs', 3)])
+        self.assertEqual(self.values('LAG', 'location')[0][1], 3)
+
+        JobSearch.objects.bulk_create(JobSearch(user=self.applicant, query='python') for _ in range(2))
+        autocomplete.invalidate()
+        self.assertEqual(self.values('p', 'skill'), [('Python', 3), ('PHP', 2)])
+
+    def test_signals_update_the_loaded_index(self):
+        self.values('p', 'skill')
+        with self.captureOnCommitCallbacks(execute=True):
+            JobApplication.objects.create(job=self.python, applicant=self.applicant, resume=self.resume)
+            JobSearch.objects.create(user=self.applicant, query='Python')
+        self.assertEqual(self.values('p', 'skill'), [('Python', 3), ('PHP', 2)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.php.is_active = False
+            self.php.save()
+            profile = self.employer.employer_profile
+            profile.company_name = 'Globex'
+            profile.save()
+        self.assertEqual(self.values('p', 'skill'), [('Python', 3)])
+        self.assertEqual(self.values('a', 'company'), [])
+        self.assertEqual(self.values('glo', 'company'), [('Globex', 2)])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python.delete()
+        self.assertEqual(self.values('p', 'title'), [])
+
+    def test_endpoint(self):
+        client = APIClient()
+        response = client.get('/api/jobs/autocomplete/', {'q': 'py', 'kind': 'skill,title', 'limit': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['suggestions'], {
+            'skill': [{'value': 'Python', 'weight': 1}], 'title': [{'value': 'Python Developer', 'weight': 1}],
+        })
+        self.assertEqual(client.get('/api/jobs/autocomplete/', {'q': 'py', 'kind': 'salary'}).status_code, 400)
+        with self.assertNumQueries(0):
+            client.get('/api/jobs/autocomplete/', {'q': 'p'})
+
+
+# --- Similar Jobs ---
+class SimilarJobsTests(TestCase):
+    def setUp(self):
+        similar.forget_statistics()
+        self.addCleanup(similar.forget_statistics)
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+        )
+        self.applicant = User.objects.create_user(
+            username='applicant', email='applicant@example.com', password='x', role='applicant',
+        )
+        self.resume = Resume.objects.create(user=self.applicant, title='CV', file='resumes/cv.pdf')
+        self.django = self.job('Senior Python Developer', 'Build Django REST APIs and Celery workers', ['Python', 'Django'])
+        self.flask = self.job('Python Backend Developer', 'Build Flask REST APIs and workers', ['Python', 'Flask'])
+        self.data = self.job('Python Data Engineer', 'Airflow pipelines and SQL warehouses', ['Python', 'SQL'])
+        self.nurse = self.job('Registered Nurse', 'Patient care on the night ward', ['Nursing'])
+
+    def job(self, title, description, skills):
+        return Job.objects.create(
+            employer=self.employer, title=title, description=description, requirements='', responsibilities='',
+            location='Lagos', required_skills=skills,
+        )
+
+    def test_vectors_are_unit_length_and_pack_roundtrip(self):
+        vector = similar.vectorize({'title': 'Python Developer', 'required_skills': ['Python']})
+        self.assertAlmostEqual(sum(weight * weight for weight in vector.values()), 1.0)
+        unpacked = similar.unpack(similar.pack(vector))
+        self.assertEqual(set(unpacked), set(vector))
+        self.assertAlmostEqual(similar.cosine(vector, unpacked), 1.0, places=5)
+        self.assertEqual(len(similar.buckets(vector)), similar.BANDS)
+
+    def test_similar_jobs_ranked_by_cosine(self):
+        ranked = [job_id for job_id, _ in similar.similar_jobs(self.django.pk)]
+        self.assertEqual(ranked[:2], [self.flask.pk, self.data.pk])
+        self.assertNotIn(self.django.pk, ranked)
+        self.assertNotIn(self.nurse.pk, ranked)
+
+    def test_saving_a_job_updates_its_vector(self):
+        before = bytes(JobVector.objects.get(job=self.nurse).vector)
+        self.nurse.title = 'Python Developer'
+        self.nurse.required_skills = ['Python', 'Django']
+        self.nurse.save()
+        self.assertNotEqual(bytes(JobVector.objects.get(job=self.nurse).vector), before)
+        self.assertIn(self.nurse.pk, [job_id for job_id, _ in similar.similar_jobs(self.django.pk)])
+
+        # The row and its change feed entry; the vector is left alone
+        with self.assertNumQueries(2):
+            self.nurse.is_featured = True
+            self.nurse.save(update_fields=['is_featured'])
+
+    def test_recommendations_skip_applied_and_bookmarked_jobs(self):
+        JobApplication.objects.create(job=self.django, applicant=self.applicant, resume=self.resume)
+        recommended = similar.recommended_jobs(self.applicant.pk, bookmarked_ids=[self.data.pk])
+        self.assertEqual(recommended[0][0], self.flask.pk)
+        self.assertFalse({self.django.pk, self.data.pk} & {job_id for job_id, _ in recommended})
+
+        client = APIClient()
+        client.force_authenticate(self.applicant)
+        response = client.get('/api/jobs/recommended/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['id'], self.flask.pk)
+
+    def test_endpoint_and_rebuild_command(self):
+        call_command('build_job_vectors', stdout=StringIO())
+        self.assertEqual(JobTermStatistics.objects.get().documents, 4)
+        self.assertEqual(JobVector.objects.count(), 4)
+
+        response = APIClient().get(f'/api/jobs/{self.django.pk}/similar/', {'limit': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([job['id'] for job in response.data['results']], [self.flask.pk])
+        self.assertGreater(response.data['results'][0]['similarity'], 0)
+        self.assertEqual(APIClient().get('/api/jobs/999999/similar/').status_code, 404)
+
+
+# --- Saved Searches ---
+class SavedSearchTests(TestCase):
+    def setUp(self):
+        percolator.invalidate()
+        self.addCleanup(percolator.invalidate)
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+        )
+        self.applicant = User.objects.create_user(
+            username='applicant', email='applicant@example.com', password='x', role='applicant',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.applicant)
+
+    def job(self, title, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Job.objects.create(
+                employer=self.employer, title=title, description='', requirements='', responsibilities='',
+                location=fields.pop('location', 'Lagos'), **fields,
+            )
+
+    def save_search(self, **data):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/jobs/saved-searches/', data, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return SavedSearch.objects.get(pk=response.data['id'])
+
+    def test_conditions_follow_the_listing(self):
+        conditions = SearchConditions('dev', {'job_type': 'FullTime', 'min_salary_usd': 50_000})
+        self.assertEqual(conditions.anchors(), [('phrase', 'dev')])
+        job = {
+            'title': 'Backend Developer', 'description': '', 'location': 'Lagos', 'place_id': None,
+            'job_type': 'FullTime', 'experience_level': 'Junior', 'salary_min_usd': 40_000, 'salary_max_usd': 60_000,
+        }
+        self.assertTrue(conditions.matches(job))
+        self.assertFalse(conditions.matches({**job, 'salary_max_usd': 45_000}))
+        self.assertFalse(conditions.matches({**job, 'job_type': 'PartTime'}))
+        self.assertEqual(SearchConditions('', {'job_type': 'FullTime'}).anchors(), [('job_type', 'FullTime')])
+
+    def test_new_jobs_are_matched_against_candidate_searches_only(self):
+        python = self.save_search(query='python', filters={'job_type': 'FullTime'})
+        nurse = self.save_search(query='nurse')
+        with mock.patch.object(SearchConditions, 'matches', autospec=True, side_effect=SearchConditions.matches) as checked:
+            job = self.job('Senior Python Engineer', job_type='FullTime')
+            self.job('Senior Python Engineer', job_type='PartTime')
+        # The nurse search is never looked at
+        self.assertEqual({call.args[0] for call in checked.call_args_list}, {percolator._searches[python.pk][0]})
+        self.assertEqual(list(SavedSearchMatch.objects.values_list('saved_search', 'job')), [(python.pk, job.pk)])
+        self.assertFalse(nurse.matches.exists())
+
+        # Saving the job again keeps the one match
+        with self.captureOnCommitCallbacks(execute=True):
+            job.save()
+        self.assertEqual(SavedSearchMatch.objects.count(), 1)
+
+        response = self.client.get(f'/api/jobs/saved-searches/{python.pk}/matches/')
+        self.assertEqual([item['id'] for item in response.data['results']], [job.pk])
+        response = self.client.get('/api/jobs/saved-searches/')
+        self.assertEqual({item['id']: item['new_matches'] for item in response.data['results']}, {python.pk: 1, nurse.pk: 0})
+
+    def test_searches_saved_by_another_process_are_matched(self):
+        python = self.save_search(query='python')
+        self.job('Python Developer')
+        # Another worker saves, edits and deletes searches: this one sees no signals
+        with mock.patch('jobs.signals.transaction.on_commit'):
+            nurse = SavedSearch.objects.create(user=self.applicant, query='nurse')
+            SavedSearch.objects.filter(pk=python.pk).update(is_active=False, updated_at=timezone.now())
+        self.job('Night Nurse')
+        self.job('Senior Python Developer')
+        self.assertEqual(
+            set(SavedSearchMatch.objects.values_list('saved_search', 'job__title')),
+            {(python.pk, 'Python Developer'), (nurse.pk, 'Night Nurse')},
+        )
+
+        with mock.patch('jobs.signals.transaction.on_commit'):
+            nurse.delete()
+            designer = SavedSearch.objects.create(user=self.applicant, query='designer')
+            # Committed late, with a timestamp older than the newest change seen
+            SavedSearch.objects.filter(pk=designer.pk).update(updated_at=timezone.now() - datetime.timedelta(seconds=2))
+        self.job('Nurse Practitioner')
+        self.job('Product Designer')
+        self.assertEqual(
+            set(SavedSearchMatch.objects.values_list('saved_search', 'job__title')),
+            {(python.pk, 'Python Developer'), (designer.pk, 'Product Designer')},
+        )
+
+    def test_saving_a_past_search_and_editing_it(self):
+        past = JobSearch.objects.create(user=self.applicant, query='designer', filters={'experience_level': 'Junior'})
+        search = self.save_search(search=past.pk)
+        self.assertEqual((search.query, search.filters), ('designer', {'experience_level': 'Junior'}))
+
+        response = self.client.post('/api/jobs/saved-searches/', {'filters': {'salary': 1}}, format='json')
+        self.assertEqual(response.status_code, 400)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put(f'/api/jobs/saved-searches/{search.pk}/', {'is_active': False}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.job('Junior Designer', experience_level='Junior')
+        self.assertFalse(SavedSearchMatch.objects.exists())
+
+    def test_alerts_are_emailed_once(self):
+        search = self.save_search(query='python')
+        self.job('Python Developer')
+        self.job('Django (Python) Engineer')
+        self.assertEqual(send_alerts(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Python Developer', mail.outbox[0].body)
+        self.assertFalse(search.matches.filter(notified_at__isnull=True).exists())
+        self.assertEqual(send_alerts(), 0)
+
+
+# --- Change Feed ---
+@override_settings(JOB_CHANGES_SETTLE=0)
+class ChangeFeedTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+        )
+        self.client = APIClient()
+
+    def job(self, title, **fields):
+        return Job.objects.create(
+            employer=self.employer, title=title, description='', requirements='', responsibilities='',
+            location='Lagos', **fields,
+        )
+
+    def feed(self, cursor=None, **params):
+        response = self.client.get('/api/jobs/changes/', {**({'cursor': cursor} if cursor else {}), **params})
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def ops(self, data):
+        return [(change['id'], change['op']) for change in data['changes']]
+
+    def test_partners_fetch_only_what_changed(self):
+        kept, edited, removed = self.job('Kept'), self.job('Edited'), self.job('Removed')
+        edited.title = 'Edited twice'
+        edited.save()
+        removed_pk = removed.pk
+        removed.delete()
+
+        first = self.feed(limit=2)
+        self.assertEqual(self.ops(first), [(kept.pk, 'upsert'), (edited.pk, 'upsert')])
+        self.assertTrue(first['has_more'])
+        second = self.feed(first['cursor'], fields='id,title')
+        # A job changed twice in the page is reported once, as it is now
+        self.assertEqual(self.ops(second), [(edited.pk, 'upsert'), (removed_pk, 'delete')])
+        self.assertEqual(second['changes'][0]['job'], {'id': edited.pk, 'title': 'Edited twice'})
+        self.assertFalse(second['has_more'])
+        self.assertEqual(self.feed(second['cursor'])['changes'], [])
+
+        # Bulk writes are logged too; a closed job is no longer listed
+        Job.objects.filter(pk=kept.pk).update(application_deadline=timezone.now() - datetime.timedelta(minutes=1))
+        expire_jobs()
+        self.assertEqual(self.ops(self.feed(second['cursor'])), [(kept.pk, 'delete')])
+
+        # Bad cursors
+        self.assertEqual(self.client.get('/api/jobs/changes/', {'cursor': 'x'}).status_code, 400)
+
+    def test_entries_commit_with_the_job(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.job('Rolled back')
+            raise RuntimeError
+        self.assertFalse(JobChange.objects.exists())
+        job = self.job('Committed')
+        with override_settings(JOB_CHANGES_SETTLE=60):
+            # Too recent to serve: a transaction still open could commit a lower sequence
+            self.assertEqual(self.feed()['changes'], [])
+        self.assertEqual(self.ops(self.feed()), [(job.pk, 'upsert')])
+
+    def test_compaction_keeps_the_latest_entry_per_job(self):
+        job, gone = self.job('Job'), self.job('Gone')
+        for title in ('Job v2', 'Job v3'):
+            job.title = title
+            job.save()
+        gone_pk = gone.pk
+        gone.delete()
+        self.job('Newest')
+        cursor = self.feed()['cursor']
+        self.assertEqual(JobChange.objects.filter(job_id=job.pk).count(), 3)
+
+        later = timezone.now() + datetime.timedelta(days=1)
+        self.assertEqual(changes.compact(now=later), {'superseded': 3, 'tombstones': 0})
+        self.assertEqual(JobChange.objects.filter(job_id=job.pk).count(), 1)
+        self.assertEqual(len(self.feed()['changes']), 3)
+
+        # Deletions go after TOMBSTONE_DAYS, and cursors from before that expire
+        much_later = timezone.now() + datetime.timedelta(days=changes.TOMBSTONE_DAYS + 1)
+        self.assertEqual(changes.compact(now=much_later), {'superseded': 0, 'tombstones': 1})
+        self.assertFalse(JobChange.objects.filter(job_id=gone_pk).exists())
+        with mock.patch('jobs.changes.time.time', return_value=much_later.timestamp()):
+            response = self.client.get('/api/jobs/changes/', {'cursor': cursor})
+        self.assertEqual(response.status_code, 410)
+
+
+# --- Bulk Import / Export ---
+class BulkImportExportTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+
+    def upload(self, body, file_format='ndjson'):
+        response = self.client.post(
+            f'/api/jobs/import/?file_format={file_format}', data=body, content_type='application/octet-stream',
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def row(self, external_id, title, **fields):
+        return json.dumps({
+            'external_id': external_id, 'title': title, 'description': 'd', 'requirements': 'r',
+            'responsibilities': 's', 'location': 'Lagos', **fields,
+        })
+
+    def test_jobs_are_posted_without_an_external_id(self):
+        data = {'title': 'Engineer', 'description': 'd', 'requirements': 'r', 'responsibilities': 's', 'location': 'Lagos'}
+        self.assertEqual(self.client.post('/api/jobs/', data, format='json').status_code, 201)
+        self.assertEqual(self.client.post('/api/jobs/', data, format='json').status_code, 201)
+        self.assertEqual(self.client.post('/api/jobs/', {**data, 'external_id': 'a'}, format='json').status_code, 201)
+        response = self.client.post('/api/jobs/', {**data, 'external_id': 'a'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_import_upserts_on_external_id_and_reports_bad_rows(self):
+        summary = self.upload('\n'.join([
+            self.row('a', 'First', required_skills=['python']),
+            '{not json',
+            self.row('b', 'Second', job_type='Sometimes'),
+            self.row('c', 'Third'),
+        ]))
+        self.assertEqual(
+            {key: summary[key] for key in ('processed', 'imported', 'failed', 'skipped')},
+            {'processed': 4, 'imported': 2, 'failed': 2, 'skipped': 0},
+        )
+        self.assertEqual([error['line'] for error in summary['errors']], [2, 3])
+        self.assertEqual(set(summary['errors'][1]['errors']), {'job_type'})
+
+        csv_body = 'external_id,title,description,requirements,responsibilities,location,tags\n' \
+                   'a,First v2,d,r,s,Lagos,remote|api\n'
+        self.assertEqual(self.upload(csv_body, 'csv')['imported'], 1)
+        job = Job.objects.get(external_id='a')
+        self.assertEqual((job.title, job.tags, job.required_skills), ('First v2', ['remote', 'api'], []))
+        self.assertEqual(Job.objects.filter(employer=self.employer).count(), 2)
+
+    def test_errors_stop_being_collected_at_max_errors(self):
+        rows = [(line, bulk.RowError('bad')) for line in range(1, 6)] + [(6, {'external_id': 'x'})]
+        summary = bulk.import_jobs(iter(rows), self.employer, max_errors=2)
+        self.assertEqual(summary['failed'], 6)
+        self.assertEqual([error['line'] for error in summary['errors']], [1, 2])
+
+    def test_export_streams_only_the_employers_jobs(self):
+        self.upload('\n'.join([self.row('a', 'First', tags=['x', 'y']), self.row('b', 'Second')]))
+        other = User.objects.create_user(username='other', email='other@example.com', password='x', role='employer')
+        Job.objects.create(
+            employer=other, title='Theirs', description='', requirements='', responsibilities='', location='Lagos',
+        )
+
+        response = self.client.get('/api/jobs/export/')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([(row['external_id'], row['tags']) for row in rows], [('a', ['x', 'y']), ('b', [])])
+
+        response = self.client.get('/api/jobs/export/', {'file_format': 'csv'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(','), bulk.EXPORT_FIELDS)
+        self.assertEqual(len(lines), 3)
+        self.assertIn(',x|y,', lines[1])
+
+    def test_command_exports_what_the_view_does(self):
+        self.upload('\n'.join([self.row('a', 'First'), self.row('b', 'Second')]))
+        Job.objects.filter(external_id='b').update(deletion_requested_at=timezone.now())
+        with mock.patch('sys.stdout', new_callable=StringIO) as stdout:
+            call_command('export_jobs', employer='employer@example.com')
+        response = self.client.get('/api/jobs/export/')
+        self.assertEqual(stdout.getvalue(), b''.join(response.streaming_content).decode())
+        self.assertEqual([json.loads(line)['external_id'] for line in stdout.getvalue().splitlines()], ['a'])
+
+
+# --- Open Jobs and Expiry ---
+class ExpiryTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+        )
+        self.now = timezone.now()
+
+    def job(self, title, days=None, **fields):
+        deadline = self.now + datetime.timedelta(days=days) if days is not None else None
+        return Job.objects.create(
+            employer=self.employer, title=title, description='', requirements='', responsibilities='',
+            location='Lagos', application_deadline=deadline, **fields,
+        )
+
+    def test_open_and_expired_are_sql_predicates(self):
+        undated, upcoming, past = self.job('Undated'), self.job('Upcoming', days=3), self.job('Past', days=-1)
+        self.job('Closed', days=3, is_active=False)
+        self.job('Closed and past', days=-1, is_active=False)
+        self.assertEqual(set(Job.objects.open()), {undated, upcoming})
+        self.assertEqual(list(Job.objects.expired()), [past])
+        self.assertEqual(list(Job.objects.expired(self.now - datetime.timedelta(days=2))), [])
+
+    def test_sweeper_updates_in_batches_and_signals_each(self):
+        expired = [self.job(f'Past {number}', days=-1) for number in range(5)]
+        upcoming = self.job('Upcoming', days=3)
+        batches = []
+
+        def receiver(sender, job_ids, **kwargs):
+            batches.append(sorted(job_ids))
+        jobs_bulk_changed.connect(receiver)
+        self.addCleanup(jobs_bulk_changed.disconnect, receiver)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(expire_jobs(batch_size=2), 5)
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual(sorted(sum(batches, [])), sorted(job.pk for job in expired))
+        self.assertFalse(Job.objects.filter(pk__in=[job.pk for job in expired], is_active=True).exists())
+        self.assertTrue(Job.objects.get(pk=upcoming.pk).is_active)
+        # Nothing left to sweep
+        self.assertEqual(expire_jobs(), 0)
+        self.assertEqual(len(batches), 3)
+
+    def test_only_open_jobs_take_applications(self):
+        applicant = User.objects.create_user(username='a', email='a@example.com', password='x', role='applicant')
+        Resume.objects.create(user=applicant, title='CV', file='resumes/cv.pdf')
+        client = APIClient()
+        client.force_authenticate(applicant)
+        past, closed, upcoming = self.job('Past', days=-1), self.job('Closed', is_active=False), self.job('Upcoming', days=3)
+        self.assertEqual(client.post(f'/api/jobs/{past.pk}/apply/').status_code, 400)
+        self.assertEqual(client.post(f'/api/jobs/{closed.pk}/apply/').status_code, 404)
+        self.assertEqual(client.post(f'/api/jobs/{upcoming.pk}/apply/').status_code, 201)
+
+
+# --- Bookmarks ---
+class BookmarkTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+        )
+        self.applicant = User.objects.create_user(
+            username='applicant', email='applicant@example.com', password='x', role='applicant',
+        )
+        self.job = Job.objects.create(
+            employer=self.employer, title='Engineer', description='', requirements='', responsibilities='',
+            location='Lagos',
+        )
+
+    def test_add_and_remove_can_be_repeated(self):
+        client = APIClient()
+        client.force_authenticate(self.applicant)
+        url = f'/api/jobs/{self.job.pk}/bookmark/'
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(client.put(url).data, {'job': self.job.pk, 'is_bookmarked': True})
+        self.assertEqual(JobBookmark.objects.filter(user=self.applicant).count(), 1)
+        self.assertTrue(client.get(f'/api/jobs/{self.job.pk}/').data['is_bookmarked'])
+        self.assertEqual(client.get('/api/jobs/bookmarks/').data['count'], 1)
+
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.assertEqual(client.delete(url).data, {'job': self.job.pk, 'is_bookmarked': False})
+        self.assertFalse(JobBookmark.objects.exists())
+        self.assertFalse(client.get(f'/api/jobs/{self.job.pk}/').data['is_bookmarked'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(client.post(url).data['is_bookmarked'])
+        self.assertFalse(client.post(url).data['is_bookmarked'])
+        self.assertEqual(client.put('/api/jobs/0/bookmark/').status_code, 404)
+
+    def test_a_stale_worker_cannot_undo_a_bookmark(self):
+        # Two processes, each with its own cache
+        first = BookmarkService(LocMemCache('bookmarks-first', {}))
+        second = BookmarkService(LocMemCache('bookmarks-second', {}))
+        user_id, job_id = self.applicant.pk, self.job.pk
+        self.assertEqual(list(first.get_ids(user_id)), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.add(user_id, job_id)
+            # The retry lands on the worker that cached no bookmarks
+            first.add(user_id, job_id)
+        self.assertEqual(JobBookmark.objects.count(), 1)
+        self.assertEqual(first.bookmarked(user_id, [job_id]), {job_id})
+
+        # Writes reach the database at once: nothing is buffered to lose
+        with self.captureOnCommitCallbacks(execute=True):
+            first.remove(user_id, job_id)
+        self.assertFalse(JobBookmark.objects.exists())
+        self.assertEqual(first.bookmarked(user_id, [job_id]), set())
+
+
+    @override_settings(BOOKMARK_CACHE_TIMEOUT=5)
+    def test_other_workers_catch_up_when_their_copy_expires(self):
+        first = BookmarkService(LocMemCache('bookmarks-first', {}))
+        second = BookmarkService(LocMemCache('bookmarks-second', {}))
+        user_id, job_id = self.applicant.pk, self.job.pk
+        self.assertEqual(second.bookmarked(user_id, [job_id]), set())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.add(user_id, job_id)
+        self.assertEqual(second.bookmarked(user_id, [job_id]), set())
+        with mock.patch('django.core.cache.backends.locmem.time.time', return_value=time.time() + 6):
+            self.assertEqual(second.bookmarked(user_id, [job_id]), {job_id})
+
+
+# --- Facets ---
+class FacetTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+        )
+        self.lagos = self.job('Backend', job_type='FullTime', salary_min=Decimal('40000'))
+        self.remote = self.job('Frontend', job_type='Remote')
+        facet_index.invalidate()
+
+    def job(self, title, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Job.objects.create(
+                employer=self.employer, title=title, description='', requirements='', responsibilities='',
+                **{'location': 'Lagos', **fields},
+            )
+
+    def count(self, counts, facet, value):
+        return next(item['count'] for item in counts[facet] if item['value'] == value)
+
+    def test_saves_and_deletes_update_the_loaded_bitmaps(self):
+        counts = facet_index.counts()
+        self.assertEqual(self.count(counts, 'job_type', 'FullTime'), 1)
+        self.assertEqual(self.count(counts, 'salary_band', '30k-60k'), 1)
+        self.assertEqual(self.count(counts, 'salary_band', 'not-specified'), 1)
+
+        added = self.job('Data', job_type='FullTime', salary_min=Decimal('120000'))
+        with self.assertNumQueries(0):
+            counts = facet_index.counts()
+        self.assertEqual(self.count(counts, 'job_type', 'FullTime'), 2)
+        self.assertEqual(self.count(counts, 'salary_band', '100k-150k'), 1)
+        # Counts within a result set
+        counts = facet_index.counts([added.pk, self.remote.pk])
+        self.assertEqual(
+            (self.count(counts, 'job_type', 'FullTime'), self.count(counts, 'job_type', 'Remote')), (1, 1),
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lagos.delete()
+            added.is_active = False
+            added.save()
+        with self.assertNumQueries(0):
+            counts = facet_index.counts()
+        self.assertEqual(self.count(counts, 'job_type', 'FullTime'), 0)
+        self.assertEqual(self.count(counts, 'salary_band', '30k-60k'), 0)
+
+    def test_free_text_locations_get_no_bitmap(self):
+        self.lagos.location = 'Ikeja (Hybrid)'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lagos.save()
+        town = self.job('Ops', location='Smalltown')
+        self.job('Support', location='Smalltown')
+        counts = facet_index.counts()
+        self.assertEqual(set(facet_index._postings['location']), {'Lagos'})
+        self.assertEqual(self.count(counts, 'location', 'Lagos'), 2)
+        self.assertEqual(self.count(counts, 'location', 'Smalltown'), 2)
+        # Within a result set, the unplaced values are counted from the candidates
+        counts = facet_index.counts([town.pk, self.remote.pk])
+        self.assertEqual((self.count(counts, 'location', 'Lagos'), self.count(counts, 'location', 'Smalltown')), (1, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            town.delete()
+        self.assertEqual(self.count(facet_index.counts(), 'location', 'Smalltown'), 1)
+        # The running counts agree with a rebuild
+        self.assertEqual(facet_index.counts()['location'], FacetIndex().counts()['location'])
+
+    def test_bulk_changes_rebuild_every_process(self):
+        other_process = FacetIndex()
+        self.assertEqual(self.count(other_process.counts(), 'job_type', 'Remote'), 1)
+        facet_index.counts()
+
+        with self.captureOnCommitCallbacks(execute=True), transaction.atomic():
+            Job.objects.filter(pk=self.remote.pk).update(is_active=False)
+            jobs_bulk_changed.send(sender=Job, job_ids=[self.remote.pk])
+        for index in (facet_index, other_process):
+            with self.assertNumQueries(1):
+                self.assertEqual(self.count(index.counts(), 'job_type', 'Remote'), 0)
+
+        # A save in one process reaches the other through the shared version
+        self.job('Another', job_type='Remote')
+        self.assertEqual(self.count(other_process.counts(), 'job_type', 'Remote'), 1)
+
+
+# --- Locations ---
+class GeoTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+        )
+        self.lagos = self.job('Backend', 'Ikeja, Lagos (Hybrid)')
+        self.ibadan = self.job('Frontend', 'Ibadan')
+        self.abuja = self.job('Data', 'FCT - Abuja')
+        self.client = APIClient()
+
+    def job(self, title, location):
+        return Job.objects.create(
+            employer=self.employer, title=title, description='', requirements='', responsibilities='',
+            location=location,
+        )
+
+    def near(self, **params):
+        return self.client.get('/api/jobs/', params)
+
+    def test_free_text_locations_resolve_to_places(self):
+        self.assertEqual(
+            [(job.place_id, job.latitude) for job in (self.lagos, self.ibadan, self.abuja)],
+            [('ng-lagos', 6.455), ('ng-ibadan', 7.3775), ('ng-abuja', 9.0765)],
+        )
+        self.assertIsNone(self.job('Ops', 'Somewhere nice').place_id)
+
+    def test_radius_search_by_place_or_coordinates(self):
+        # Ibadan is about 110 km from Lagos, Abuja about 520 km
+        response = self.near(near='Lagos')
+        self.assertEqual([job['id'] for job in response.data['results']], [self.lagos.pk])
+        response = self.near(near='Lagos', radius_km=200)
+        self.assertEqual({job['id'] for job in response.data['results']}, {self.lagos.pk, self.ibadan.pk})
+        response = self.near(near='7.38,3.95', radius_km=5000)
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_bad_coordinates_and_radii_are_rejected(self):
+        for near in ('nan,nan', 'inf,3', '3,-inf', '91,0', '0,180.5', 'Atlantis'):
+            with self.subTest(near=near):
+                self.assertEqual(self.near(near=near).status_code, 400)
+        for radius_km in ('nan', 'inf', '-1', 'far'):
+            with self.subTest(radius_km=radius_km):
+                self.assertEqual(self.near(near='Lagos', radius_km=radius_km).status_code, 400)
+
+    def test_geocode_command_backfills_places(self):
+        Job.objects.update(place_id=None, latitude=None, longitude=None)
+        Job.objects.filter(pk=self.abuja.pk).update(place_id='ng-lagos')
+        out = StringIO()
+        call_command('geocode_jobs', '--missing-only', '--batch-size', 1, stdout=out)
+        self.assertIn('Geocoded 2 job(s); 2 matched a known place', out.getvalue())
+        self.assertEqual(
+            dict(Job.objects.values_list('pk', 'place_id')),
+            {self.lagos.pk: 'ng-lagos', self.ibadan.pk: 'ng-ibadan', self.abuja.pk: 'ng-lagos'},
+        )
+
+        call_command('geocode_jobs', stdout=StringIO())
+        self.assertEqual(Job.objects.get(pk=self.abuja.pk).place_id, 'ng-abuja')
+
+
+# --- Salary Normalization ---
+class SalaryConversionTests(SimpleTestCase):
+    table = {'USD': Decimal('1'), 'EUR': Decimal('1.08')}
+
+    def test_to_usd(self):
+        self.assertEqual(to_usd(Decimal('50000'), 'eur', self.table), 54000)
+        self.assertEqual(to_usd(Decimal('0.5'), 'USD', self.table), 1)
+        self.assertEqual(to_usd(Decimal('100'), None, self.table), 100)
+        # Unknown currencies and missing amounts stay out of salary filters
+        self.assertIsNone(to_usd(Decimal('100'), 'XYZ', self.table))
+        self.assertIsNone(to_usd(None, 'USD', self.table))
+
+    def test_range_predicates(self):
+        self.assertTrue(pays_at_least(40_000, 60_000, 60_000))
+        self.assertFalse(pays_at_least(40_000, 60_000, 60_001))
+        self.assertTrue(pays_at_least(70_000, None, 60_000))
+        self.assertFalse(pays_at_least(None, None, 0))
+        self.assertTrue(pays_at_most(40_000, 60_000, 40_000))
+        self.assertFalse(pays_at_most(40_001, 60_000, 40_000))
+        self.assertTrue(pays_at_most(None, 30_000, 40_000))
+
+
+class SalaryNormalizationTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+        )
+        self.applicant = User.objects.create_user(
+            username='applicant', email='applicant@example.com', password='x', role='applicant',
+        )
+
+    def job(self, title, salary_min=None, salary_max=None, currency='USD'):
+        return Job.objects.create(
+            employer=self.employer, title=title, description='', requirements='', responsibilities='',
+            location='Lagos', salary_min=salary_min, salary_max=salary_max, salary_currency=currency,
+        )
+
+    def test_filters_compare_across_currencies(self):
+        euros = self.job('Euros', Decimal('50000'), Decimal('70000'), 'EUR')
+        dollars = self.job('Dollars', Decimal('50000'), Decimal('56000'))
+        self.job('Unknown currency', Decimal('90000'), Decimal('99000'), 'XYZ')
+        self.assertEqual((euros.salary_min_usd, euros.salary_max_usd), (54000, 75600))
+
+        response = APIClient().get('/api/jobs/', {'min_salary_usd': 60000, 'facets': 'false'})
+        self.assertEqual([job['id'] for job in response.data['results']], [euros.pk])
+        response = APIClient().get('/api/jobs/', {'max_salary_usd': 52000, 'facets': 'false'})
+        self.assertEqual([job['id'] for job in response.data['results']], [dollars.pk])
+        self.assertEqual(set(Job.objects.pays_at_least(50000)), {euros, dollars})
+
+    def test_command_applies_new_rates(self):
+        job = self.job('Euros', Decimal('50000'), None, 'EUR')
+        resume = Resume.objects.create(user=self.applicant, title='CV', file='resumes/cv.pdf')
+        application = JobApplication.objects.create(
+            job=job, applicant=self.applicant, resume=resume, expected_salary=Decimal('40000'),
+        )
+        profile = ApplicantProfile.objects.create(
+            user=self.applicant, salary_expectation=Decimal('30000'), salary_expectation_currency='EUR',
+        )
+        self.assertEqual(application.expected_salary_usd, 43200)
+
+        out = StringIO()
+        with override_settings(SALARY_RATES_TO_USD={'USD': '1', 'EUR': '1.2'}):
+            call_command('normalize_salaries', stdout=out)
+        self.assertIn('Jobs: 1 updated', out.getvalue())
+        self.assertIn('Applications: 1 updated', out.getvalue())
+        self.assertIn('Applicant profiles: 1 updated', out.getvalue())
+        job.refresh_from_db()
+        application.refresh_from_db()
+        profile.refresh_from_db()
+        self.assertEqual(
+            (job.salary_min_usd, application.expected_salary_usd, profile.salary_expectation_usd),
+            (60000, 48000, 36000),
+        )
+
+        # Nothing changes on a second run
+        out = StringIO()
+        with override_settings(SALARY_RATES_TO_USD={'USD': '1', 'EUR': '1.2'}):
+            call_command('normalize_salaries', stdout=out)
+        self.assertIn('Jobs: 0 updated', out.getvalue())
+
+
+# --- Application Ranking ---
+class RankingScoreTests(SimpleTestCase):
+    def test_weights(self):
+        requirements = ranking.Requirements.from_values(['Python', 'SQL'], ['Go'], 'Mid', 50_000, 80_000)
+        self.assertEqual(ranking.score(requirements, ['python', 'sql', 'go'], 4, 70_000), 1000)
+        # Half the required skills (250), none preferred, no experience, no salary given (75)
+        self.assertEqual(ranking.score(requirements, ['python'], 0, None), 325)
+        self.assertEqual(ranking.applicant_inputs(['python'], 2, ['sql'], 5), (['python', 'sql'], 5))
+        self.assertEqual(ranking.applicant_inputs(['python'], 2, None, None), (['python'], 2))
+
+
+class RankingTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+        )
+        self.job = Job.objects.create(
+            employer=self.employer, title='Engineer', description='', requirements='', responsibilities='',
+            location='Lagos', required_skills=['python', 'sql'], experience_level='Mid',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+
+    def apply(self, name, skills, years=0):
+        applicant = User.objects.create_user(username=name, email=f'{name}@example.com', role='applicant')
+        resume = Resume.objects.create(user=applicant, title='CV', file='resumes/cv.pdf', skills=skills, experience_years=years)
+        return JobApplication.objects.create(job=self.job, applicant=applicant, resume=resume)
+
+    def queue(self):
+        response = self.client.get(f'/api/jobs/{self.job.pk}/applications/', {'fields': 'id,score'})
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def test_queue_is_ordered_by_score(self):
+        partial, strong, weak = self.apply('partial', ['python'], 4), self.apply('strong', ['python', 'sql'], 4), self.apply('weak', [])
+        self.assertEqual(self.queue(), [strong.pk, partial.pk, weak.pk])
+
+    def test_resume_and_profile_changes_rescore(self):
+        weak, partial = self.apply('weak', []), self.apply('partial', ['python'], 4)
+        self.assertEqual(self.queue(), [partial.pk, weak.pk])
+
+        resume = Resume.objects.get(pk=weak.resume_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            resume.skills = ['python', 'sql']
+            resume.experience_years = 4
+            resume.save()
+        self.assertEqual(self.queue(), [weak.pk, partial.pk])
+
+        # Skills on the profile count too
+        profile = ApplicantProfile.objects.create(user=partial.applicant, experience_years=4)
+        profile = ApplicantProfile.objects.get(pk=profile.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.skills = ['sql']
+            profile.save()
+        partial.refresh_from_db()
+        weak.refresh_from_db()
+        self.assertEqual(partial.score, weak.score)
+
+        # Saves that change nothing the score uses run no rescore
+        with self.captureOnCommitCallbacks() as callbacks:
+            profile.headline = 'Engineer'
+            profile.save()
+            resume.title = 'New CV'
+            resume.save()
+        self.assertEqual(callbacks, [])
+
+    def test_job_requirement_changes_rescore(self):
+        python, sql = self.apply('python', ['python']), self.apply('sql', ['sql'])
+        job = Job.objects.get(pk=self.job.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            job.required_skills = ['sql']
+            job.save()
+        self.assertEqual(self.queue(), [sql.pk, python.pk])
+
+
+# --- Near-Duplicate Reposts ---
+class DuplicateTests(TestCase):
+    text = {
+        'description': 'We are hiring a backend engineer to design, build and run the payment APIs of our platform '
+                       'in Python and Django, with PostgreSQL, Redis and Celery, for customers in twelve countries.',
+        'requirements': 'Five years of Python, strong SQL, experience running services in production.',
+    }
+
+    def setUp(self):
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+        )
+
+    def post(self, employer=None, **fields):
+        return Job.objects.create(**{
+            'employer': employer or self.employer, 'title': 'Backend Engineer', 'responsibilities': '',
+            'location': 'Lagos', **self.text, **fields,
+        })
+
+    def listed(self):
+        return list(Job.objects.listed().order_by('pk').values_list('pk', flat=True))
+
+    def test_reposts_of_open_jobs_are_hidden(self):
+        original = self.post()
+        repost = self.post(title='Backend Engineer (Remote)')
+        self.assertEqual(repost.duplicate_of_id, original.pk)
+        self.assertEqual(self.post().duplicate_of_id, original.pk)
+        self.assertEqual(self.listed(), [original.pk])
+        self.assertEqual(APIClient().get('/api/jobs/', {'facets': 'false'}).data['count'], 1)
+
+    def test_reposting_a_closed_job_lists_the_repost(self):
+        self.post(application_deadline=timezone.now() - datetime.timedelta(days=1))
+        self.post(is_active=False)
+        repost = self.post()
+        self.assertIsNone(repost.duplicate_of_id)
+        self.assertEqual(self.listed(), [repost.pk])
+        self.assertEqual(APIClient().get('/api/jobs/', {'facets': 'false'}).data['count'], 1)
+
+    def test_other_employers_are_never_duplicates(self):
+        original = self.post()
+        other = User.objects.create_user(username='other', email='other@example.com', password='x', role='employer')
+        theirs = self.post(employer=other)
+        self.assertIsNone(theirs.duplicate_of_id)
+        self.assertEqual(self.listed(), [original.pk, theirs.pk])
+
+    def test_reposts_take_over_when_the_original_closes(self):
+        original = self.post()
+        first, second = self.post(), self.post()
+        self.assertEqual(self.listed(), [original.pk])
+
+        Job.objects.filter(pk=original.pk).update(application_deadline=timezone.now() - datetime.timedelta(minutes=1))
+        expire_jobs()
+        self.assertEqual(self.listed(), [first.pk])
+        self.assertEqual(Job.objects.get(pk=second.pk).duplicate_of_id, first.pk)
+        self.assertEqual(dedupe.release([original.pk]), {})
+
+        # Closing with a save does the same
+        first = Job.objects.get(pk=first.pk)
+        first.is_active = False
+        first.save()
+        self.assertEqual(self.listed(), [second.pk])
+
+
+# --- Public Job Cache ---
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.shared = LocMemCache('tiered-cache-tests', {})
+        self.shared.clear()
+        self.now = 1_000_000.0
+        clock = mock.patch('jobs.cache.time.time', side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+        self.builds = 0
+
+    def process(self, **options):
+        """A worker process: its own local tier in front of the shared cache"""
+        options = {'FRESH': 30, 'STALE': 120, 'LOCAL_TTL': 5, 'VERSION_TTL': 60, 'LOCK_TIMEOUT': 2, **options}
+        return TieredCache('test', cache=self.shared, **options)
+
+    def build(self, started=None, release=None):
+        def build():
+            self.builds += 1
+            if started is not None:
+                started.set()
+                release.wait(5)
+            return f'payload {self.builds}'
+        return build
+
+    def in_thread(self, function):
+        results = []
+        thread = threading.Thread(target=lambda: results.append(function()))
+        thread.start()
+        return thread, results
+
+    def test_fresh_entries(self):
+        first, second = self.process(), self.process()
+        self.assertEqual(first.get_or_build('page', self.build()), 'payload 1')
+        self.assertEqual(first.get_or_build('page', self.build()), 'payload 1')
+        # Another process reads it from the shared tier
+        self.assertEqual(second.get_or_build('page', self.build()), 'payload 1')
+        # The local tier answers without the shared one, for LOCAL_TTL seconds
+        self.shared.clear()
+        self.assertEqual(first.get_or_build('page', self.build()), 'payload 1')
+        self.now += 6
+        self.assertEqual(first.get_or_build('page', self.build()), 'payload 2')
+        self.assertEqual(self.builds, 2)
+
+    def test_stale_entries_are_served_while_one_caller_refreshes(self):
+        cache = self.process()
+        cache.get_or_build('page', self.build())
+        self.now += 31
+
+        # Another process is refreshing it
+        lock_key = f"{cache.key('page')}:lock"
+        self.shared.add(lock_key, 1)
+        self.assertEqual(cache.get_or_build('page', self.build()), 'payload 1')
+        self.shared.delete(lock_key)
+
+        # A thread of this process is refreshing it
+        started, release = threading.Event(), threading.Event()
+        thread, results = self.in_thread(lambda: cache.get_or_build('page', self.build(started, release)))
+        self.assertTrue(started.wait(5))
+        self.assertEqual(cache.get_or_build('page', self.build()), 'payload 1')
+        release.set()
+        thread.join()
+        self.assertEqual(results, ['payload 2'])
+        self.assertEqual(cache.get_or_build('page', self.build()), 'payload 2')
+
+        # Past STALE it is rebuilt before answering
+        self.now += 200
+        self.assertEqual(cache.get_or_build('page', self.build()), 'payload 3')
+        self.assertEqual(self.builds, 3)
+
+    def test_one_build_per_cold_miss(self):
+        cache = self.process()
+        started, release = threading.Event(), threading.Event()
+        threads = [self.in_thread(lambda: cache.get_or_build('page', self.build(started, release))) for _ in range(8)]
+        self.assertTrue(started.wait(5))
+        release.set()
+        for thread, _ in threads:
+            thread.join()
+        self.assertEqual([results for _, results in threads], [['payload 1']] * 8)
+        self.assertEqual(self.builds, 1)
+
+    def test_processes_wait_for_the_lock_holder(self):
+        cache = self.process()
+        full_key = cache.key('page')
+        self.shared.add(f'{full_key}:lock', 1)
+        thread, results = self.in_thread(lambda: cache.get_or_build('page', self.build()))
+        self.shared.set(full_key, Entry('built elsewhere', self.now + 30, self.now + 150))
+        thread.join()
+        self.assertEqual((results, self.builds), (['built elsewhere'], 0))
+
+        # A holder that never publishes is waited for LOCK_TIMEOUT at most
+        cache = self.process(LOCK_TIMEOUT=0.2)
+        self.shared.add(f"{cache.key('other')}:lock", 1)
+        self.assertEqual(cache.get_or_build('other', self.build()), 'payload 1')
+
+    def test_bumps_retire_entries(self):
+        first = self.process()
+        self.assertEqual(first.get_or_build('page', self.build(), versions=[LISTING]), 'payload 1')
+        self.assertEqual(first.get_or_build('detail', self.build(), versions=[DETAILS]), 'payload 2')
+        first.bump(LISTING)
+        self.assertEqual(first.get_or_build('page', self.build(), versions=[LISTING]), 'payload 3')
+        self.assertEqual(first.get_or_build('detail', self.build(), versions=[DETAILS]), 'payload 2')
+        # Processes see the shared version once their memo of it expires
+        second = self.process(VERSION_TTL=0)
+        self.assertEqual(second.get_or_build('page', self.build(), versions=[LISTING]), 'payload 3')
+        self.assertEqual(second.versions([LISTING, DETAILS]), [1, 0])
@@ -0,0 +1,20 @@
+from django.urls import path
+from .import views
+
+urlpatterns = [
+    path('jobs/', views.JobListView.as_view(), name='job-list'),
+    path('jobs/autocomplete/', views.JobAutocompleteView.as_view(), name='job-autocomplete'),
+    path('jobs/import/', views.JobImportView.as_view(), name='job-import'),
+    path('jobs/export/', views.JobExportView.as_view(), name='job-export'),
+    path('jobs/changes/', views.JobChangeFeedView.as_view(), name='job-changes'),
+    path('jobs/bookmarks/', views.JobBookmarkListView.as_view(), name='job-bookmark-list'),
+    path('jobs/recommended/', views.JobRecommendedView.as_view(), name='job-recommended'),
+    path('jobs/saved-searches/', views.SavedSearchListView.as_view(), name='saved-search-list'),
+    path('jobs/saved-searches/<int:pk>/', views.SavedSearchDetailView.as_view(), name='saved-search-detail'),
+    path('jobs/saved-searches/<int:pk>/matches/', views.SavedSearchMatchListView.as_view(), name='saved-search-matches'),
+    path('jobs/<int:pk>/', views.JobDetailView.as_view(), name='job-detail'),
+    path('jobs/<int:pk>/apply/', views.JobApplyView.as_view(), name='job-apply'),
+    path('jobs/<int:pk>/applications/', views.JobApplicationQueueView.as_view(), name='job-application-queue'),
+    path('jobs/<int:pk>/similar/', views.JobSimilarView.as_view(), name='job-similar'),
+    path('jobs/<int:pk>/bookmark/', views.JobBookmarkView.as_view(), name='job-bookmark'),
+]
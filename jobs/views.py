@@ -1,3 +1,561 @@
-from django.shortcuts import render
+from urllib.parse import urlencode
 
-# Create your views here.
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly
+from api.compiled import compiled
+from api.instrumentation import query_budget
+from api.sparse import requested_fields, sparse_fields, sparse_queryset
+from tasks.deletion import schedule_deletion
+from .models import Job, Resume, JobApplication, JobSearch, SavedSearch
+from .serializers import JobSerializer, JobApplicationSerializer, SavedSearchSerializer
+from . import bulk, changes, similar
+from .autocomplete import autocomplete, DEFAULT_LIMIT, KINDS
+from .bookmarks import bookmarks
+from .cache import job_cache, job_version, LISTING, DETAILS
+from .facets import facet_index, salary_band_q
+from .geo import gazetteer, parse_radius, place_ids_near, resolve_origins, DEFAULT_RADIUS_KM
+
+
+class JobPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+# --- Job List / Search View ---
+# POST: the user, BEGIN and the insert, the duplicate check (2 reads, 2 writes
+# and flagging a repost), the vector (2), the change feed entry and, after
+# commit, matching saved searches: catching up with searches changed by
+# other processes (2 reads), then BEGIN and storing the matches. COMMIT is
+# not counted.
+@query_budget(get=7, post=14)
+class JobListView(APIView):
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get(self, request):
+        jobs = sparse_queryset(Job.objects.listed(), JobSerializer, request)
+
+        query = request.query_params.get('q', '').strip()
+        if query:
+            jobs = jobs.filter(Q(title__icontains=query) | Q(description__icontains=query))
+
+        filters = {}
+        for param in ('job_type', 'experience_level'):
+            value = request.query_params.get(param)
+            if value:
+                filters[param] = value
+                jobs = jobs.filter(**{param: value})
+        location = request.query_params.get('location')
+        if location:
+            filters['location'] = location
+            place = gazetteer().resolve(location)
+            jobs = jobs.filter(place_id=place.id) if place else jobs.filter(location__icontains=location)
+        near = request.query_params.get('near')
+        if near:
+            radius_km = parse_radius(request.query_params.get('radius_km', DEFAULT_RADIUS_KM))
+            if radius_km is None:
+                return Response(
+                    {'error': 'radius_km must be a number of kilometres.'}, status=status.HTTP_400_BAD_REQUEST,
+                )
+            origins = self.near_origins(request, near)
+            if not origins:
+                return Response({'error': f"Unknown location: {near}"}, status=status.HTTP_400_BAD_REQUEST)
+            filters['near'] = near
+            filters['radius_km'] = radius_km
+            jobs = jobs.filter(place_id__in=place_ids_near(origins, radius_km))
+        band = request.query_params.get('salary_band')
+        if band and salary_band_q(band) is not None:
+            filters['salary_band'] = band
+            jobs = jobs.filter(salary_band_q(band))
+        for param, method in (('min_salary_usd', 'pays_at_least'), ('max_salary_usd', 'pays_at_most')):
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            amount = self.salary_amount(request, value)
+            if amount is None:
+                return Response(
+                    {'error': f'{param} must be a number or "expected".'}, status=status.HTTP_400_BAD_REQUEST,
+                )
+            filters[param] = amount
+            jobs = getattr(jobs, method)(amount)
+
+        def build():
+            # Every JobSerializer field is a column, so pages are values() rows, not models
+            serializer = compiled(JobSerializer, **sparse_fields(request))
+            paginator = JobPagination()
+            page = paginator.paginate_queryset(jobs.values(*serializer.value_names), request, view=self)
+            payload = paginator.get_paginated_response(serializer.many(page)).data
+            if request.query_params.get('facets', 'true').lower() != 'false':
+                # Unfiltered listings use the postings directly; otherwise one ID query
+                candidate_ids = jobs.order_by().values_list('pk', flat=True) if query or filters else None
+                payload['facets'] = facet_index.counts(candidate_ids)
+            return payload
+
+        # "preferred" and "expected" depend on who is asking
+        personal = near == 'preferred' or 'expected' in (
+            request.query_params.get('min_salary_usd'), request.query_params.get('max_salary_usd'),
+        )
+        data = build() if personal else job_cache.get_or_build(self.cache_key(request), build, versions=[LISTING])
+        if request.user.is_authenticated:
+            # The cached page is shared: overlay bookmarks on copies
+            results = [dict(job) for job in data['results']]
+            bookmarked = bookmarks.bookmarked(request.user.pk, [job['id'] for job in results])
+            for job in results:
+                job['is_bookmarked'] = job['id'] in bookmarked
+            data = {**data, 'results': results}
+
+        # Track searches for analytics
+        if query and request.user.is_authenticated:
+            JobSearch.objects.create(
+                user=request.user, query=query, filters=filters, results_count=data['count'],
+            )
+        return Response(data, status=status.HTTP_200_OK)
+
+    def cache_key(self, request):
+        """The listing URL with its parameters in a canonical order"""
+        params = sorted((key, value) for key, values in request.query_params.lists() for value in values)
+        return f"list:{request.build_absolute_uri(request.path)}?{urlencode(params)}"
+
+    def near_origins(self, request, near):
+        """
+        Coordinates to search around: a place name, "lat,lng", or
+        "preferred" for the applicant's preferred locations.
+        """
+        if near == 'preferred':
+            profile = getattr(request.user, 'applicant_profile', None) if request.user.is_authenticated else None
+            return resolve_origins(profile.preferred_locations if profile else [])
+        return resolve_origins(near)
+
+    def salary_amount(self, request, value):
+        """An annual USD amount, or "expected" for the applicant's normalized expectation"""
+        if value == 'expected':
+            profile = getattr(request.user, 'applicant_profile', None) if request.user.is_authenticated else None
+            return profile.salary_expectation_usd if profile else None
+        try:
+            return int(value)
+        except ValueError:
+            return None
+
+    def post(self, request):
+        if not request.user.is_employer:
+            return Response({'error': 'Only employers can post jobs.'}, status=status.HTTP_403_FORBIDDEN)
+        serializer = JobSerializer(data=request.data)
+        if serializer.is_valid():
+            try:
+                with transaction.atomic():
+                    serializer.save(employer=request.user)
+            except IntegrityError:
+                return Response({'error': 'You already have a job with this external ID.'}, status=status.HTTP_400_BAD_REQUEST)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+# --- Autocomplete View ---
+# No queries per keystroke; up to 4 when the in-memory index is (re)built
+@query_budget(4)
+class JobAutocompleteView(APIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        kinds = request.query_params.get('kind')
+        kinds = tuple(kinds.split(',')) if kinds else KINDS
+        unknown = set(kinds) - set(KINDS)
+        if unknown:
+            return Response(
+                {'error': f"Unknown kind: {', '.join(sorted(unknown))}. Choose from {', '.join(KINDS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            return Response({'error': 'limit must be a number.'}, status=status.HTTP_400_BAD_REQUEST)
+        query = request.query_params.get('q', '')
+        return Response(
+            {'query': query, 'suggestions': autocomplete.suggest(query, kinds, limit)}, status=status.HTTP_200_OK,
+        )
+
+
+# --- Job Detail View ---
+# PUT: as POST plus reading the job and deleting its old fingerprint and
+# vector rows (4), then rescoring its applications after a change to the
+# requirements: a read, plus BEGIN and an UPDATE per 1000 changed scores.
+# DELETE: the user, the job, then BEGIN, marking it, the marked IDs, its
+# reposts (released to stand on their own), the change feed entry and the
+# deletion task
+@query_budget(get=2, put=22, delete=8)
+class JobDetailView(APIView):
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get(self, request, pk):
+        data = job_cache.get_or_build(
+            self.cache_key(request, pk), lambda: self.serialize(request, pk),
+            versions=[DETAILS, job_version(pk)],
+        )
+        if request.user.is_authenticated:
+            data = {**data, 'is_bookmarked': bool(bookmarks.bookmarked(request.user.pk, [pk]))}
+        return Response(data, status=status.HTTP_200_OK)
+
+    def cache_key(self, request, pk):
+        fields, exclude = requested_fields(request)
+        return f"detail:{pk}:{','.join(sorted(fields or ()))}:{','.join(sorted(exclude))}"
+
+    def serialize(self, request, pk):
+        job = get_object_or_404(sparse_queryset(Job.objects.live(), JobSerializer, request), pk=pk)
+        return compiled(JobSerializer, **sparse_fields(request)).to_representation(job)
+
+    def put(self, request, pk):
+        job = get_object_or_404(Job.objects.live(), pk=pk, employer=request.user)
+        serializer = JobSerializer(job, data=request.data, partial=True)
+        if serializer.is_valid():
+            try:
+                with transaction.atomic():
+                    serializer.save()
+            except IntegrityError:
+                return Response({'error': 'You already have a job with this external ID.'}, status=status.HTTP_400_BAD_REQUEST)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def delete(self, request, pk):
+        job = get_object_or_404(Job.objects.live().only('pk'), pk=pk, employer=request.user)
+        # Applications and bookmarks can run to many thousands of rows: the
+        # job is taken down now and deleted by a background task
+        schedule_deletion(Job.objects.filter(pk=job.pk), created_by=request.user)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# --- Similar Jobs Views ---
+def _scored_jobs(scored):
+    """Serialized listed jobs from [(job_id, similarity)], in that order"""
+    serializer = compiled(JobSerializer)
+    rows = Job.objects.listed().filter(pk__in=[job_id for job_id, _ in scored]).values(*serializer.value_names)
+    data = {item['id']: item for item in serializer.many(rows)}
+    return [
+        {**data[job_id], 'similarity': round(similarity, 4)} for job_id, similarity in scored if job_id in data
+    ]
+
+
+def _limit(request):
+    limit = int(request.query_params.get('limit', similar.DEFAULT_LIMIT))
+    return max(1, min(limit, similar.MAX_LIMIT))
+
+
+@query_budget(4)
+class JobSimilarView(APIView):
+    """Listed jobs most like this one (see jobs/similar.py)"""
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, pk):
+        try:
+            limit = _limit(request)
+        except ValueError:
+            return Response({'error': 'limit must be a number.'}, status=status.HTTP_400_BAD_REQUEST)
+        data = job_cache.get_or_build(
+            f'similar:{pk}:{limit}', lambda: self.build(pk, limit), versions=[LISTING, job_version(pk)],
+        )
+        if data is None:
+            return Response({'error': 'Job not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'job': pk, 'results': data}, status=status.HTTP_200_OK)
+
+    def build(self, pk, limit):
+        if not Job.objects.live().filter(pk=pk).exists():
+            return None
+        return _scored_jobs(similar.similar_jobs(pk, limit))
+
+
+@query_budget(6)
+class JobRecommendedView(APIView):
+    """Listed jobs like the ones the user bookmarked and applied to"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        try:
+            limit = _limit(request)
+        except ValueError:
+            return Response({'error': 'limit must be a number.'}, status=status.HTTP_400_BAD_REQUEST)
+        scored = similar.recommended_jobs(request.user.pk, bookmarks.get_ids(request.user.pk), limit)
+        return Response({'results': _scored_jobs(scored) if scored else []}, status=status.HTTP_200_OK)
+
+
+# --- Change Feed View ---
+@query_budget(2)
+class JobChangeFeedView(APIView):
+    """
+    Job changes after `?cursor=` for partners mirroring the listings (see
+    jobs/changes.py). Start without a cursor, then pass the returned one.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('limit', changes.DEFAULT_LIMIT))
+        except ValueError:
+            return Response({'error': 'limit must be a number.'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, changes.MAX_LIMIT))
+        serializer = compiled(JobSerializer, **sparse_fields(request))
+        try:
+            data = changes.read(request.query_params.get('cursor'), serializer, limit)
+        except changes.CursorExpired as e:
+            return Response({'error': str(e)}, status=status.HTTP_410_GONE)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(data, status=status.HTTP_200_OK)
+
+
+# --- Job Apply View ---
+# The user, job, resume and profile (scored with the application), BEGIN and
+# the insert, and the webhook endpoints and deliveries it is queued to
+@query_budget(8)
+class JobApplyView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        if not request.user.is_applicant:
+            return Response({'error': 'Only applicants can apply for jobs.'}, status=status.HTTP_403_FORBIDDEN)
+        job = Job.objects.open().filter(pk=pk).first()
+        if job is None:
+            # Active but not open: the deadline has passed and the sweeper has not run yet
+            if Job.objects.filter(pk=pk, is_active=True).exists():
+                return Response({'error': 'The application deadline has passed.'}, status=status.HTTP_400_BAD_REQUEST)
+            raise Http404
+
+        resumes = Resume.objects.filter(user=request.user, is_active=True)
+        resume_id = request.data.get('resume')
+        resume = resumes.filter(pk=resume_id).first() if resume_id else resumes.first()
+        if resume is None:
+            return Response({'error': 'Resume not found.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = JobApplicationSerializer(data=request.data)
+        if serializer.is_valid():
+            try:
+                with transaction.atomic():
+                    serializer.save(job=job, applicant=request.user, resume=resume)
+            except IntegrityError:
+                return Response({'error': 'You have already applied for this job.'}, status=status.HTTP_400_BAD_REQUEST)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+# --- Application Review Queue ---
+@query_budget(4)
+class JobApplicationQueueView(APIView):
+    """
+    A job's applications for its employer, best match first (see
+    jobs/ranking.py). Filter with `?status=`.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        job = get_object_or_404(Job.objects.live().only('pk'), pk=pk, employer=request.user)
+        applications = sparse_queryset(JobApplication.objects.filter(job=job).ranked(), JobApplicationSerializer, request)
+        application_status = request.query_params.get('status')
+        if application_status:
+            applications = applications.filter(status=application_status)
+        serializer = compiled(JobApplicationSerializer, **sparse_fields(request))
+        paginator = JobPagination()
+        page = paginator.paginate_queryset(applications.values(*serializer.value_names), request, view=self)
+        return paginator.get_paginated_response(serializer.many(page))
+
+
+# --- Bookmark Views ---
+@query_budget(post=4, put=3, delete=2)
+class JobBookmarkView(APIView):
+    """
+    PUT bookmarks a job and DELETE removes the bookmark; both can be
+    repeated safely. POST flips it, for older clients.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk):
+        if not Job.objects.live().filter(pk=pk).exists():
+            return Response({'error': 'Job not found.'}, status=status.HTTP_404_NOT_FOUND)
+        bookmarked = bookmarks.toggle(request.user.pk, pk)
+        return Response({'job': pk, 'is_bookmarked': bookmarked}, status=status.HTTP_200_OK)
+
+    def put(self, request, pk):
+        if not Job.objects.live().filter(pk=pk).exists():
+            return Response({'error': 'Job not found.'}, status=status.HTTP_404_NOT_FOUND)
+        bookmarks.add(request.user.pk, pk)
+        return Response({'job': pk, 'is_bookmarked': True}, status=status.HTTP_200_OK)
+
+    def delete(self, request, pk):
+        bookmarks.remove(request.user.pk, pk)
+        return Response({'job': pk, 'is_bookmarked': False}, status=status.HTTP_200_OK)
+
+
+@query_budget(4)
+class JobBookmarkListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        job_ids = bookmarks.get_ids(request.user.pk)
+        jobs = sparse_queryset(Job.objects.live().filter(pk__in=list(job_ids)), JobSerializer, request)
+        serializer = compiled(JobSerializer, **sparse_fields(request))
+        paginator = JobPagination()
+        page = paginator.paginate_queryset(jobs.values(*serializer.value_names), request, view=self)
+        return paginator.get_paginated_response(serializer.many(page))
+
+
+# --- Saved Search Views ---
+def _saved_search_data(request):
+    """
+    Request data for a saved search: "preferred" and "expected" (see
+    JobListView) become the applicant's current locations and salary
+    """
+    data = {key: request.data[key] for key in request.data}
+    filters = data.get('filters')
+    personal = isinstance(filters, dict) and (
+        filters.get('near') == 'preferred'
+        or 'expected' in (filters.get('min_salary_usd'), filters.get('max_salary_usd'))
+    )
+    if personal:
+        profile = getattr(request.user, 'applicant_profile', None)
+        filters = dict(filters)
+        if filters.get('near') == 'preferred':
+            filters['near'] = profile.preferred_locations if profile else []
+        for param in ('min_salary_usd', 'max_salary_usd'):
+            if filters.get(param) == 'expected':
+                filters[param] = profile.salary_expectation_usd if profile else None
+        data['filters'] = filters
+    return data
+
+
+@query_budget(get=4, post=6)
+class SavedSearchListView(APIView):
+    """
+    The user's saved searches, with the number of matching jobs not yet
+    alerted. POST a `query` and `filters` as JobListView takes them, or
+    `search`, the ID of a past JobSearch, to save that search.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        searches = SavedSearch.objects.filter(user=request.user).annotate(
+            new_matches=Count('matches', filter=Q(matches__notified_at__isnull=True)),
+        ).order_by('-created_at', '-pk')
+        paginator = JobPagination()
+        page = paginator.paginate_queryset(searches, request, view=self)
+        return paginator.get_paginated_response([
+            {**SavedSearchSerializer(search).data, 'new_matches': search.new_matches} for search in page
+        ])
+
+    def post(self, request):
+        if not request.user.is_applicant:
+            return Response({'error': 'Only applicants can save searches.'}, status=status.HTTP_403_FORBIDDEN)
+        data = _saved_search_data(request)
+        search_id = data.pop('search', None)
+        if search_id:
+            past = JobSearch.objects.filter(pk=search_id, user=request.user).only('query', 'filters').first()
+            if past is None:
+                return Response({'error': 'Search not found.'}, status=status.HTTP_400_BAD_REQUEST)
+            data.setdefault('query', past.query)
+            data.setdefault('filters', past.filters)
+        serializer = SavedSearchSerializer(data=data)
+        if serializer.is_valid():
+            serializer.save(user=request.user)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@query_budget(get=2, put=3, delete=5)
+class SavedSearchDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        search = get_object_or_404(SavedSearch, pk=pk, user=request.user)
+        return Response(SavedSearchSerializer(search).data, status=status.HTTP_200_OK)
+
+    def put(self, request, pk):
+        search = get_object_or_404(SavedSearch, pk=pk, user=request.user)
+        serializer = SavedSearchSerializer(search, data=_saved_search_data(request), partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def delete(self, request, pk):
+        search = get_object_or_404(SavedSearch, pk=pk, user=request.user)
+        search.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@query_budget(4)
+class SavedSearchMatchListView(APIView):
+    """Jobs that matched a saved search since it was saved, newest first"""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        search = get_object_or_404(SavedSearch.objects.only('pk'), pk=pk, user=request.user)
+        jobs = sparse_queryset(
+            Job.objects.live().filter(saved_search_matches__saved_search=search), JobSerializer, request,
+        ).order_by('-saved_search_matches__matched_at')
+        serializer = compiled(JobSerializer, **sparse_fields(request))
+        paginator = JobPagination()
+        page = paginator.paginate_queryset(jobs.values(*serializer.value_names), request, view=self)
+        return paginator.get_paginated_response(serializer.many(page))
+
+
+# --- Bulk Import View ---
+class JobImportView(APIView):
+    """
+    Upsert an employer's jobs from an NDJSON or CSV upload, keyed on
+    `external_id`. Accepts a multipart `file` or a raw request body; the
+    format comes from `?file_format=`, the file name or the content type.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        if not request.user.is_employer:
+            return Response({'error': 'Only employers can import jobs.'}, status=status.HTTP_403_FORBIDDEN)
+
+        if request.content_type.startswith('multipart/form-data'):
+            upload = request.FILES.get('file')
+            if upload is None:
+                return Response({'error': 'No file uploaded.'}, status=status.HTTP_400_BAD_REQUEST)
+            name, content_type, lines = upload.name, upload.content_type, upload
+        else:
+            # Read the body line by line instead of letting DRF parse it all
+            name, content_type = '', request.content_type
+            lines = iter(request.stream.readline, b'') if request.stream else []
+
+        file_format = request.query_params.get('file_format') or bulk.detect_format(name, content_type)
+        if file_format not in bulk.FORMATS:
+            return Response(
+                {'error': f"Unsupported format. Use one of: {', '.join(bulk.FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        rows = bulk.iter_rows(bulk.decode_lines(lines), file_format)
+        summary = bulk.import_jobs(rows, request.user)
+        return Response(summary, status=status.HTTP_200_OK)
+
+
+# --- Bulk Export View ---
+class JobExportView(APIView):
+    """
+    Stream the requesting employer's jobs (every job for staff) as NDJSON
+    or CSV, chosen with `?file_format=`.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        file_format = request.query_params.get('file_format', 'ndjson')
+        if file_format not in bulk.FORMATS:
+            return Response(
+                {'error': f"Unsupported format. Use one of: {', '.join(bulk.FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        jobs = bulk.exportable_jobs(None if request.user.is_staff else request.user)
+        content_type = 'text/csv' if file_format == 'csv' else 'application/x-ndjson'
+        response = StreamingHttpResponse(bulk.export_jobs(jobs, file_format), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="jobs.{file_format}"'
+        return response
@@ -0,0 +1,128 @@
+import json
+
+from django.contrib import admin, messages
+from django.contrib.admin import FieldListFilter
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.html import format_html
+from api.admin_performance import PerformanceModelAdmin
+from .deletion import schedule_deletion
+from .models import BackgroundTask
+
+def changelist_filters(modeladmin, request):
+    """
+    (filters, search term) of the changelist `request` was made from, the
+    filters as plain lookups with JSON values. None when they cannot be
+    written down that way (custom list filters, the date hierarchy).
+    """
+    changelist = modeladmin.get_changelist_instance(request)
+    filter_specs, _, lookups, _, _ = changelist.get_filters(request)
+    for spec in filter_specs:
+        if spec.used_parameters and not isinstance(spec, FieldListFilter):
+            return None
+        lookups.update(spec.used_parameters)
+    if any(len(values) != 1 for values in lookups.values()):
+        return None
+    filters = {lookup: values[0] for lookup, values in lookups.items()}
+    try:
+        json.dumps(filters)
+    except TypeError:
+        return None
+    return filters, changelist.query
+
+
+def background_action(task_name, description):
+    """
+    Build an admin action that queues `task_name` over the selected rows
+    and returns at once. Rows ticked by hand are stored by ID; with
+    "select all", only the changelist's filters and search are stored,
+    never the matching IDs, and the task works through whatever matches
+    them when it runs.
+    """
+    @admin.action(description=description)
+    def action(modeladmin, request, queryset):
+        if request.POST.get('select_across') == '1':
+            selection = changelist_filters(modeladmin, request)
+            if selection is None:
+                modeladmin.message_user(
+                    request, 'These filters cannot be run in the background; select the rows by hand.',
+                    messages.ERROR,
+                )
+                return
+            filters, search = selection
+            task = BackgroundTask.for_filters(
+                task_name, modeladmin.model, filters, search=search, created_by=request.user,
+            )
+        else:
+            task = BackgroundTask.for_queryset(task_name, queryset, created_by=request.user)
+        task.save()
+        url = reverse('admin:tasks_backgroundtask_change', args=[task.pk])
+        modeladmin.message_user(
+            request,
+            format_html('"{}" is running in the background. <a href="{}">Follow its progress</a>.', description, url),
+            messages.INFO,
+        )
+    action.__name__ = task_name.replace('.', '_')
+    return action
+
+class BackgroundDeletionMixin:
+    """
+    Deleting from the admin (the delete page or "Delete selected") disables
+    the rows and queues their cascade as a background task, see
+    tasks/deletion.py. The confirmation page lists the selected rows
+    only; collecting everything underneath is what used to time out.
+    """
+    deletion_preview_size = 20
+
+    def get_deleted_objects(self, objs, request):
+        objs = list(objs[:self.deletion_preview_size + 1]) if hasattr(objs, 'query') else list(objs)
+        preview = [str(obj) for obj in objs[:self.deletion_preview_size]]
+        if len(objs) > self.deletion_preview_size:
+            preview.append('…')
+        note = 'and everything that depends on them, in the background'
+        return preview, {self.model._meta.verbose_name_plural: note}, set(), []
+
+    def delete_model(self, request, obj):
+        schedule_deletion(self.model._base_manager.filter(pk=obj.pk), created_by=request.user)
+
+    def delete_queryset(self, request, queryset):
+        task = schedule_deletion(queryset, created_by=request.user)
+        url = reverse('admin:tasks_backgroundtask_change', args=[task.pk])
+        self.message_user(
+            request, format_html('Deletion is running in the background. <a href="{}">Follow its progress</a>.', url),
+            messages.INFO,
+        )
+
+# --- Background Task Admin ---
+@admin.register(BackgroundTask)
+class BackgroundTaskAdmin(PerformanceModelAdmin):
+    list_display = ['name', 'status', 'progress', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'name', 'created_at']
+    search_fields = ['^name']
+    ordering = ['-created_at']
+    actions = ['cancel_tasks']
+    exclude = ['selection']
+    readonly_fields = [
+        'name', 'params', 'model', 'status', 'progress', 'total', 'processed', 'result', 'error',
+        'created_by', 'worker', 'created_at', 'started_at', 'heartbeat_at', 'finished_at',
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.display(description='Progress')
+    def progress(self, obj):
+        label = f"{obj.processed:,} / {obj.total:,}" if obj.total is not None else f"{obj.processed:,}"
+        return format_html(
+            '<progress value="{}" max="100" style="width: 120px;"></progress> {}% ({})',
+            obj.percent, obj.percent, label,
+        )
+
+    @admin.action(description='Cancel selected tasks')
+    def cancel_tasks(self, request, queryset):
+        # Running tasks notice on their next progress report and stop between chunks
+        count = queryset.filter(status__in=['pending', 'running']).update(status='cancelled', finished_at=timezone.now())
+        self.message_user(request, f"Cancelled {count} task(s).")
@@ -0,0 +1,111 @@
+"""
+Background cascade deletion.
+
+`Model.delete()` collects every row a delete cascades to (an employer's
+jobs, their applications and bookmarks, other applicants' rows...) and
+deletes them all in one transaction, holding locks for as long as that
+takes. Instead, `schedule_deletion(queryset)` runs in the request. In one
+UPDATE it stamps the rows' `deletion_requested_at` and clears `is_active`,
+so they are hidden and can no longer log in or be applied to at once. It
+then queues `tasks.cascade_delete`, which:
+
+1. derives the CASCADE tree under the model from its relations
+   (`cascade_plan()`),
+2. deletes each dependent table leaves first, in keyset chunks of
+   TASK_CHUNK_SIZE rows, each chunk in its own transaction, through
+   `QuerySet.delete()` so signals and SET_NULL still apply,
+3. deletes the stamped rows themselves the same way, and
+4. removes the files the deleted rows referenced (resumes, profile
+   images, logos) once each chunk has committed.
+
+Every committed chunk stays deleted, so nothing is redone when a task
+whose worker died is taken over. Scheduling rows again, say after a
+cancelled task, restamps them and queues a new task that continues from
+what is left. Models opt in with a nullable `deletion_requested_at`
+field.
+"""
+from django.db import models, transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import BackgroundTask
+
+TASK_NAME = 'tasks.cascade_delete'
+
+# Sent inside the scheduling transaction with `queryset` (the stamped rows)
+# and `requested_at`, so other apps can take dependent rows down as well
+deletion_scheduled = Signal()
+
+
+def schedule_deletion(queryset, created_by=None):
+    """Disable the rows now and queue their deletion; returns the task"""
+    model = queryset.model
+    now = timezone.now()
+    updates = {'deletion_requested_at': now}
+    field_names = {field.name for field in model._meta.concrete_fields}
+    if 'is_active' in field_names:
+        updates['is_active'] = False
+    if 'updated_at' in field_names:
+        updates['updated_at'] = now
+
+    marked = model._base_manager.filter(deletion_requested_at=now)
+    with transaction.atomic():
+        queryset.update(**updates)
+        deletion_scheduled.send(sender=model, queryset=marked, requested_at=now)
+        task = BackgroundTask.for_filters(
+            TASK_NAME, model, {'deletion_requested_at': now.isoformat()}, created_by=created_by,
+        )
+        task.save()
+    return task
+
+
+def cascade_plan(model):
+    """
+    [(model, lookup)] for every table a delete of `model` cascades to,
+    ordered so that rows go before the rows they reference. `lookup`
+    filters a table down to the rows under a queryset of `model`, e.g.
+    (JobApplication, 'job__employer__in') for User.
+    """
+    plan = []
+
+    def walk(current, path, ancestors):
+        for relation in current._meta.related_objects:
+            if relation.on_delete is not models.CASCADE:
+                continue
+            related = relation.related_model
+            # A cycle back up the tree is left to the collector
+            if related in ancestors:
+                continue
+            lookup = f'{relation.field.name}__{path}'
+            walk(related, lookup, ancestors | {related})
+            plan.append((related, lookup))
+
+    walk(model, 'in', {model})
+    return plan
+
+
+def _file_fields(model):
+    return [field for field in model._meta.concrete_fields if isinstance(field, models.FileField)]
+
+
+def _delete_files(files):
+    for storage, name in files:
+        try:
+            storage.delete(name)
+        except OSError:
+            pass
+
+
+def delete_rows(model, pks):
+    """Delete one chunk and, once it commits, the files its rows referenced"""
+    queryset = model._base_manager.filter(pk__in=pks)
+    file_fields = _file_fields(model)
+    files = []
+    if file_fields:
+        for row in queryset.values(*[field.attname for field in file_fields]):
+            files.extend((field.storage, row[field.attname]) for field in file_fields if row[field.attname])
+    deleted, _ = queryset.delete()
+    if files:
+        transaction.on_commit(lambda: _delete_files(files))
+    return deleted
+
@@ -0,0 +1,31 @@
+import os
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from tasks.runner import claim_next, run
+
+
+class Command(BaseCommand):
+    help = "Work through queued background tasks (admin bulk actions and the like)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+        parser.add_argument('--interval', type=float, default=2.0, help='Seconds to wait when the queue is empty')
+
+    def handle(self, *args, **options):
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.stdout.write(f"Task worker {worker} started")
+        while True:
+            close_old_connections()
+            task = claim_next(worker)
+            if task is None:
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+                continue
+            run(task)
+            task.refresh_from_db()
+            self.stdout.write(f"{task} processed {task.processed} item(s)")
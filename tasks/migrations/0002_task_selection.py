@@ -0,0 +1,36 @@
+# Generated by Django 5.1.7 on 2026-10-19 13:33
+
+import pickle
+
+from django.db import migrations, models
+
+
+def select_by_pk(apps, schema_editor):
+    # Unfinished tasks keep their rows: the pickled filter is run one last time
+    BackgroundTask = apps.get_model('tasks', 'BackgroundTask')
+    for task in BackgroundTask.objects.filter(status__in=['pending', 'running']).exclude(query=None):
+        model = apps.get_model(task.model)
+        queryset = model._base_manager.all()
+        queryset.query = pickle.loads(bytes(task.query))
+        task.selection = {'pks': list(queryset.order_by('pk').values_list('pk', flat=True).distinct())}
+        task.save(update_fields=['selection'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backgroundtask',
+            name='selection',
+            field=models.JSONField(blank=True, default=dict, verbose_name='Selection'),
+        ),
+        migrations.RunPython(select_by_pk, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='backgroundtask',
+            name='query',
+        ),
+    ]
@@ -0,0 +1,128 @@
+from django.apps import apps
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+# Task Status
+TASK_STATUS = (
+    ("pending", "Pending"),
+    ("running", "Running"),
+    ("succeeded", "Succeeded"),
+    ("failed", "Failed"),
+    ("cancelled", "Cancelled"),
+)
+
+# Primary keys a task may store; larger selections are stored as filters
+MAX_SELECTED_ROWS = 1000
+
+class BackgroundTask(models.Model):
+    """
+    A unit of work run by `manage.py run_tasks` instead of a web worker
+    """
+    name = models.CharField(max_length=100, verbose_name="Task")
+    params = models.JSONField(default=dict, blank=True, verbose_name="Parameters")
+
+    # Target selection: a model plus either the primary keys of a few
+    # hand-picked rows ({"pks": [...]}) or plain field lookups and an admin
+    # search term ({"filters": {...}, "search": "..."}), so "select all 2M
+    # matching rows" stores a filter, not 2M IDs. Both are JSON: a queued
+    # task survives code and Django upgrades, and loading one never runs
+    # code stored in the database.
+    model = models.CharField(max_length=100, blank=True, verbose_name="Model")
+    selection = models.JSONField(default=dict, blank=True, verbose_name="Selection")
+
+    # Progress
+    status = models.CharField(max_length=20, choices=TASK_STATUS, default="pending", verbose_name="Status")
+    total = models.PositiveIntegerField(null=True, blank=True, verbose_name="Total Items")
+    processed = models.PositiveIntegerField(default=0, verbose_name="Processed Items")
+    result = models.JSONField(default=dict, blank=True, verbose_name="Result")
+    error = models.TextField(blank=True, verbose_name="Error")
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='background_tasks', verbose_name="Created By"
+    )
+    worker = models.CharField(max_length=100, blank=True, verbose_name="Worker")
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Started At")
+    heartbeat_at = models.DateTimeField(null=True, blank=True, verbose_name="Last Heartbeat")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Finished At")
+
+    class Meta:
+        verbose_name = "Background Task"
+        verbose_name_plural = "Background Tasks"
+        ordering = ['-created_at']
+        indexes = [
+            # Workers claim the oldest pending task
+            models.Index(fields=['status', 'created_at'], name='task_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+    @classmethod
+    def for_queryset(cls, name, queryset, **kwargs):
+        """
+        Build a task that works through the rows `queryset` selects now,
+        stored by primary key. Only for small selections: more than
+        MAX_SELECTED_ROWS raises ValueError, use `for_filters` instead.
+        """
+        limit = getattr(settings, 'TASK_MAX_SELECTED_ROWS', MAX_SELECTED_ROWS)
+        pks = list(queryset.order_by('pk').values_list('pk', flat=True).distinct()[:limit + 1])
+        if len(pks) > limit:
+            raise ValueError(f'More than {limit} rows selected; select them by filter instead.')
+        return cls(name=name, model=queryset.model._meta.label, selection={'pks': pks}, **kwargs)
+
+    @classmethod
+    def for_filters(cls, name, model, filters, search='', **kwargs):
+        """
+        Build a task that works through the rows of `model` matching
+        `filters` (lookups with JSON values) and, optionally, the admin
+        changelist search for `search`
+        """
+        selection = {'filters': filters, **({'search': search} if search else {})}
+        return cls(name=name, model=model._meta.label, selection=selection, **kwargs)
+
+    def get_queryset(self):
+        """The rows the task was created for"""
+        queryset = apps.get_model(self.model)._default_manager.all()
+        if 'pks' in self.selection:
+            queryset = queryset.filter(pk__in=self.selection['pks'])
+        if 'filters' in self.selection:
+            queryset = queryset.filter(**self.selection['filters'])
+        if self.selection.get('search'):
+            # The same search as the changelist the rows were selected on
+            from django.contrib import admin
+            model_admin = admin.site.get_model_admin(queryset.model)
+            queryset, may_have_duplicates = model_admin.get_search_results(None, queryset, self.selection['search'])
+            if may_have_duplicates:
+                queryset = queryset.distinct()
+        return queryset
+
+    @property
+    def percent(self):
+        if self.status == "succeeded":
+            return 100
+        if not self.total:
+            return 0
+        return min(100, round(100 * self.processed / self.total))
+
+    @property
+    def is_finished(self):
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def report_progress(self, processed, total=None):
+        """
+        Save progress and a heartbeat in one UPDATE. Returns False when the
+        task has been cancelled or taken over by another worker, so the
+        caller can stop between chunks.
+        """
+        self.processed = processed
+        if total is not None:
+            self.total = total
+        self.heartbeat_at = timezone.now()
+        return BackgroundTask.objects.filter(pk=self.pk, status="running", worker=self.worker).update(
+            processed=self.processed, total=self.total, heartbeat_at=self.heartbeat_at,
+        ) == 1
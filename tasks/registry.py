@@ -0,0 +1,42 @@
+"""
+Background task registry.
+
+Apps register task functions in their own `tasks.py` (imported by
+TasksConfig.ready()):
+
+    @register('users.verify_employers')
+    def verify_employers(task):
+        ...
+
+A task function receives its `BackgroundTask` row and returns an optional
+JSON-serialisable result.
+"""
+from .models import BackgroundTask
+
+_tasks = {}
+
+
+def register(name):
+    def decorator(func):
+        _tasks[name] = func
+        func.task_name = name
+        return func
+    return decorator
+
+
+def get_task(name):
+    try:
+        return _tasks[name]
+    except KeyError:
+        raise LookupError(f"No background task registered as {name!r}") from None
+
+
+def enqueue(name, queryset=None, created_by=None, **params):
+    """Queue a registered task, optionally over the rows of `queryset`"""
+    get_task(name)
+    if queryset is not None:
+        task = BackgroundTask.for_queryset(name, queryset, params=params, created_by=created_by)
+    else:
+        task = BackgroundTask(name=name, params=params, created_by=created_by)
+    task.save()
+    return task
@@ -0,0 +1,94 @@
+"""
+Running background tasks: claiming, chunked processing and bookkeeping.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import BackgroundTask
+from .registry import get_task
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+STALE_AFTER = 600
+
+
+class TaskCancelled(Exception):
+    """Raised between chunks once a task has been cancelled"""
+
+
+def _claimable():
+    # A running task whose worker stopped sending heartbeats is picked up again
+    stale_after = getattr(settings, 'TASK_STALE_AFTER', STALE_AFTER)
+    stale = timezone.now() - timedelta(seconds=stale_after)
+    return Q(status="pending") | Q(status="running", heartbeat_at__lt=stale)
+
+
+def claim_next(worker):
+    """
+    Atomically take the oldest claimable task. The conditional UPDATE only
+    succeeds for one worker, so no row locks or broker are needed.
+    """
+    candidates = BackgroundTask.objects.filter(_claimable()).order_by('created_at').values_list('pk', flat=True)
+    for pk in candidates[:10]:
+        now = timezone.now()
+        claimed = BackgroundTask.objects.filter(_claimable(), pk=pk).update(
+            status="running", worker=worker, started_at=now, heartbeat_at=now, processed=0,
+        )
+        if claimed:
+            return BackgroundTask.objects.get(pk=pk)
+    return None
+
+
+def run(task):
+    """Run a claimed task and record how it ended"""
+    logger.info("Running %s", task)
+    try:
+        result = get_task(task.name)(task, **task.params)
+    except TaskCancelled:
+        logger.info("%s was cancelled", task)
+        BackgroundTask.objects.filter(pk=task.pk).update(finished_at=timezone.now())
+        return
+    except Exception:
+        logger.exception("%s failed", task)
+        BackgroundTask.objects.filter(pk=task.pk, worker=task.worker).update(
+            status="failed", error=traceback.format_exc(), finished_at=timezone.now(),
+        )
+        return
+    BackgroundTask.objects.filter(pk=task.pk, status="running", worker=task.worker).update(
+        status="succeeded", result=result or {}, processed=task.processed, finished_at=timezone.now(),
+    )
+
+
+def process_in_chunks(task, queryset, apply, chunk_size=None, processed=0, total=None):
+    """
+    Call `apply(pks)` for successive chunks of the queryset's primary keys,
+    each in its own transaction, reporting progress after every chunk.
+
+    Chunks are taken by keyset (`pk > last`), so rows that stop matching
+    the filter once updated are never skipped or revisited. A task that
+    works through several querysets passes the rows done so far as
+    `processed` and its overall `total`. Returns the number of rows
+    processed by this call.
+    """
+    chunk_size = chunk_size or getattr(settings, 'TASK_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    task.report_progress(processed, queryset.order_by().count() if total is None else total)
+    start, last = processed, None
+    while True:
+        chunk = list((pks if last is None else pks.filter(pk__gt=last))[:chunk_size])
+        if not chunk:
+            break
+        with transaction.atomic():
+            apply(chunk)
+        processed += len(chunk)
+        last = chunk[-1]
+        if not task.report_progress(processed):
+            raise TaskCancelled
+    return processed - start
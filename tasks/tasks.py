@@ -0,0 +1,27 @@
+from .deletion import TASK_NAME, cascade_plan, delete_rows
+from .registry import register
+from .runner import process_in_chunks
+
+
+@register(TASK_NAME)
+def cascade_delete(task):
+    """Delete the task's rows and everything under them, leaves first (see tasks/deletion.py)"""
+    roots = task.get_queryset()
+    steps = [
+        (model, model._base_manager.filter(**{lookup: roots.values('pk')}))
+        for model, lookup in cascade_plan(roots.model)
+    ]
+    steps.append((roots.model, roots))
+
+    total = sum(queryset.order_by().count() for _, queryset in steps)
+    processed = 0
+    deleted = {}
+    for model, queryset in steps:
+        done = process_in_chunks(
+            task, queryset, lambda pks, model=model: delete_rows(model, pks), processed=processed, total=total,
+        )
+        if done:
+            label = model._meta.label
+            deleted[label] = deleted.get(label, 0) + done
+        processed += done
+    return {'deleted': deleted}
@@ -0,0 +1,169 @@
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from jobs.models import Job
+from .deletion import TASK_NAME, schedule_deletion
+from .models import BackgroundTask
+from .registry import enqueue
+from .runner import TaskCancelled, claim_next, process_in_chunks, run
+
+User = get_user_model()
+
+
+class TaskTestCase(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+        )
+        self.jobs = [self.post(f'Job {number}') for number in range(5)]
+
+    def post(self, title, **fields):
+        return Job.objects.create(
+            employer=self.employer, title=title, description='', requirements='', responsibilities='',
+            location='Lagos', **fields,
+        )
+
+
+# --- Selection ---
+class SelectionTests(TaskTestCase):
+    def test_selected_rows_are_stored_by_primary_key(self):
+        task = enqueue('jobs.deactivate_jobs', Job.objects.filter(title__in=['Job 3', 'Job 1']))
+        task.refresh_from_db()
+        self.assertEqual(task.selection, {'pks': [self.jobs[1].pk, self.jobs[3].pk]})
+        # Plain JSON, nothing pickled
+        self.assertEqual(json.loads(json.dumps(task.selection)), task.selection)
+        self.assertEqual(list(task.get_queryset().order_by('pk')), [self.jobs[1], self.jobs[3]])
+
+    def test_rows_matching_later_are_left_alone(self):
+        enqueue('jobs.deactivate_jobs', Job.objects.filter(is_active=True))
+        late = self.post('Posted after the action')
+        run(claim_next('test'))
+        self.assertFalse(Job.objects.filter(pk__in=[job.pk for job in self.jobs], is_active=True).exists())
+        late.refresh_from_db()
+        self.assertTrue(late.is_active)
+
+    @override_settings(TASK_MAX_SELECTED_ROWS=3)
+    def test_large_selections_need_a_filter(self):
+        with self.assertRaises(ValueError):
+            enqueue('jobs.deactivate_jobs', Job.objects.all())
+        task = BackgroundTask.for_filters('jobs.deactivate_jobs', Job, {'is_active': True}, search='job employer')
+        self.assertEqual(task.selection, {'filters': {'is_active': True}, 'search': 'job employer'})
+        self.assertEqual(task.get_queryset().count(), 5)
+        # The search is the admin's: a prefix of the title or the employer's email
+        task.selection['search'] = 'ob'
+        self.assertFalse(task.get_queryset().exists())
+
+    def test_deletion_is_stored_as_a_filter(self):
+        task = schedule_deletion(Job.objects.filter(pk=self.jobs[0].pk))
+        task.refresh_from_db()
+        self.jobs[0].refresh_from_db()
+        self.assertEqual(task.name, TASK_NAME)
+        self.assertEqual(task.selection, {'filters': {'deletion_requested_at': self.jobs[0].deletion_requested_at.isoformat()}})
+        self.assertEqual(list(task.get_queryset()), [self.jobs[0]])
+
+
+# --- Admin Actions ---
+class BackgroundActionTests(TaskTestCase):
+    def setUp(self):
+        super().setUp()
+        Job.objects.filter(pk=self.jobs[4].pk).update(is_active=False)
+        self.client.force_login(User.objects.create_superuser(username='root', email='root@example.com', password='x'))
+
+    def act(self, query, **data):
+        data = {'action': 'jobs_deactivate_jobs', 'index': 0, '_selected_action': [self.jobs[0].pk], **data}
+        response = self.client.post(f'/admin/jobs/job/?{query}', data)
+        self.assertEqual(response.status_code, 302)
+        return BackgroundTask.objects.get()
+
+    def test_select_all_stores_the_changelist_filters(self):
+        task = self.act('is_active__exact=1&q=job', select_across=1)
+        self.assertEqual(task.selection, {'filters': {'is_active__exact': '1'}, 'search': 'job'})
+        # Rows matching when the task runs are included
+        late = self.post('Job posted later')
+        run(claim_next('test'))
+        self.assertEqual(BackgroundTask.objects.get().result, {'deactivated': 5})
+        late.refresh_from_db()
+        self.assertFalse(late.is_active)
+
+    def test_rows_ticked_by_hand_are_stored_by_id(self):
+        task = self.act('is_active__exact=1', _selected_action=[self.jobs[0].pk, self.jobs[2].pk])
+        self.assertEqual(task.selection, {'pks': [self.jobs[0].pk, self.jobs[2].pk]})
+
+
+# --- Claiming ---
+@override_settings(TASK_STALE_AFTER=60)
+class ClaimTests(TaskTestCase):
+    def queue(self, minutes_ago, **fields):
+        task = BackgroundTask.objects.create(name='jobs.deactivate_jobs', **fields)
+        BackgroundTask.objects.filter(pk=task.pk).update(created_at=timezone.now() - timedelta(minutes=minutes_ago))
+        return task
+
+    def test_oldest_pending_task_first_and_once(self):
+        newer, older = self.queue(1), self.queue(5)
+        self.queue(10, status='cancelled')
+        self.queue(10, status='succeeded')
+
+        claimed = claim_next('a')
+        self.assertEqual((claimed.pk, claimed.status, claimed.worker), (older.pk, 'running', 'a'))
+        self.assertIsNotNone(claimed.heartbeat_at)
+        self.assertEqual(claim_next('b').pk, newer.pk)
+        self.assertIsNone(claim_next('c'))
+
+    def test_tasks_of_a_dead_worker_are_taken_over(self):
+        now = timezone.now()
+        alive = self.queue(10, status='running', worker='a', heartbeat_at=now, processed=3)
+        dead = self.queue(5, status='running', worker='b', heartbeat_at=now - timedelta(minutes=5), processed=3)
+
+        claimed = claim_next('c')
+        self.assertEqual((claimed.pk, claimed.worker, claimed.processed), (dead.pk, 'c', 0))
+        self.assertIsNone(claim_next('d'))
+        alive.refresh_from_db()
+        self.assertEqual(alive.worker, 'a')
+
+        # The old worker's progress reports now fail, so it stops
+        dead.status, dead.worker = 'running', 'b'
+        self.assertFalse(dead.report_progress(4))
+
+
+# --- Chunked Processing ---
+@override_settings(TASK_CHUNK_SIZE=2)
+class ProcessInChunksTests(TaskTestCase):
+    def setUp(self):
+        super().setUp()
+        BackgroundTask.objects.create(name='jobs.deactivate_jobs')
+        self.task = claim_next('test')
+        self.chunks = []
+
+    def deactivate(self, pks):
+        self.chunks.append(pks)
+        Job.objects.filter(pk__in=pks).update(is_active=False)
+
+    def test_rows_that_stop_matching_are_neither_skipped_nor_revisited(self):
+        pks = [job.pk for job in self.jobs]
+        done = process_in_chunks(self.task, Job.objects.filter(is_active=True), self.deactivate)
+        self.assertEqual(done, 5)
+        self.assertEqual(self.chunks, [pks[:2], pks[2:4], pks[4:]])
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.processed, self.task.total), (5, 5))
+
+    def test_progress_continues_across_querysets(self):
+        done = process_in_chunks(
+            self.task, Job.objects.filter(pk=self.jobs[0].pk), self.deactivate, chunk_size=10, processed=7, total=20,
+        )
+        self.assertEqual(done, 1)
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.processed, self.task.total), (8, 20))
+
+    def test_cancelled_tasks_stop_between_chunks(self):
+        def cancel_after_first(pks):
+            self.deactivate(pks)
+            BackgroundTask.objects.filter(pk=self.task.pk).update(status='cancelled')
+
+        with self.assertRaises(TaskCancelled):
+            process_in_chunks(self.task, Job.objects.all(), cancel_after_first)
+        self.assertEqual(len(self.chunks), 1)
+        self.assertEqual(Job.objects.filter(is_active=True).count(), 3)
@@ -1,15 +1,18 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.html import format_html
+from api.admin_performance import PerformanceAdminMixin, PerformanceModelAdmin
+from tasks.admin import BackgroundDeletionMixin, background_action
 from .models import User, AdminProfile, EmployerProfile, ApplicantProfile
 
 # --- User Admin ---
 @admin.register(User)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(BackgroundDeletionMixin, PerformanceAdminMixin, UserAdmin):
     list_display = ['email', 'username', 'first_name', 'last_name', 'role', 'is_verified', 'is_active', 'created_at']
     list_filter = ['role', 'is_verified', 'is_active', 'created_at']
-    search_fields = ['email', 'username', 'first_name', 'last_name']
+    search_fields = ['^email', '=username', '^first_name', '^last_name']
     ordering = ['-created_at']
+    actions = [background_action('users.deactivate_users', 'Deactivate selected users and close their jobs')]
     
     fieldsets = (
         (None, {'fields': ('email', 'password')}),
@@ -28,11 +31,12 @@ class CustomUserAdmin(UserAdmin):
 
 # --- Admin Profile Admin ---
 @admin.register(AdminProfile)
-class AdminProfileAdmin(admin.ModelAdmin):
+class AdminProfileAdmin(PerformanceModelAdmin):
     list_display = ['user', 'department', 'employee_id', 'created_at']
     list_filter = ['department', 'created_at']
-    search_fields = ['user__email', 'user__first_name', 'user__last_name', 'employee_id']
+    search_fields = ['^user__email', '^user__first_name', '^user__last_name', '=employee_id']
     ordering = ['-created_at']
+    raw_id_fields = ['user']
     
     fieldsets = (
         ('User Information', {'fields': ('user',)}),
@@ -43,11 +47,13 @@ class AdminProfileAdmin(admin.ModelAdmin):
 
 # --- Employer Profile Admin ---
 @admin.register(EmployerProfile)
-class EmployerProfileAdmin(admin.ModelAdmin):
+class EmployerProfileAdmin(PerformanceModelAdmin):
     list_display = ['user', 'company_name', 'industry', 'is_verified_employer', 'created_at']
     list_filter = ['industry', 'is_verified_employer', 'company_size', 'created_at']
-    search_fields = ['user__email', 'company_name', 'industry']
+    search_fields = ['^user__email', '^company_name', '=industry']
     ordering = ['-created_at']
+    raw_id_fields = ['user']
+    actions = [background_action('users.verify_employers', 'Verify selected employers')]
     
     fieldsets = (
         ('User Information', {'fields': ('user',)}),
@@ -66,18 +72,20 @@ class EmployerProfileAdmin(admin.ModelAdmin):
 
 # --- Applicant Profile Admin ---
 @admin.register(ApplicantProfile)
-class ApplicantProfileAdmin(admin.ModelAdmin):
+class ApplicantProfileAdmin(PerformanceModelAdmin):
     list_display = ['user', 'headline', 'experience_years', 'education_level', 'is_available_for_work', 'is_verified_applicant', 'created_at']
     list_filter = ['gender', 'education_level', 'is_available_for_work', 'is_verified_applicant', 'created_at']
-    search_fields = ['user__email', 'user__first_name', 'user__last_name', 'headline']
+    search_fields = ['^user__email', '^user__first_name', '^user__last_name']
     ordering = ['-created_at']
+    raw_id_fields = ['user']
+    actions = [background_action('users.verify_applicants', 'Verify selected applicants')]
     
     fieldsets = (
         ('User Information', {'fields': ('user',)}),
         ('Personal Information', {'fields': ('date_of_birth', 'gender')}),
         ('Professional Information', {'fields': ('headline', 'summary', 'experience_years')}),
         ('Education', {'fields': ('education_level',)}),
-        ('Skills & Preferences', {'fields': ('skills', 'preferred_job_types', 'preferred_locations', 'salary_expectation')}),
+        ('Skills & Preferences', {'fields': ('skills', 'preferred_job_types', 'preferred_locations', 'salary_expectation', 'salary_expectation_currency')}),
         ('Social Links', {'fields': ('linkedin_url', 'github_url', 'portfolio_url')}),
         ('Status', {'fields': ('is_available_for_work', 'is_verified_applicant')}),
         ('Timestamps', {'fields': ('created_at', 'updated_at')}),
@@ -0,0 +1,196 @@
+"""
+Personal data export.
+
+`write_export(user, fileobj)` writes everything stored about an account as
+a ZIP archive:
+
+    manifest.json          when and for whom, and the rows per file
+    user.ndjson            the User row (without the password hash)
+    admin_profile.ndjson   the role profile, where there is one
+    employer_profile.ndjson
+    applicant_profile.ndjson
+    resumes.ndjson
+    applications.ndjson    applications the user sent
+    bookmarks.ndjson
+    searches.ndjson        JobSearch history
+    saved_searches.ndjson  searches kept for job alerts
+    posted_jobs.ndjson     jobs the user posted as an employer
+    files/...              uploaded files (profile image, logo, resumes)
+                           under their storage names
+
+Every member is streamed into the archive as it is read: rows come from
+`values().iterator(chunk_size)` and files are copied in blocks, so memory
+use stays flat however many searches or resumes an account has. Exports
+are built in the background by the `users.export_personal_data` task
+(users/tasks.py) and kept in the `exports` storage, which is not served
+publicly; users download them through a signed, expiring link.
+"""
+import json
+import shutil
+import zipfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import storages
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+from jobs.models import Job, JobApplication, JobBookmark, JobSearch, Resume, SavedSearch
+from webhooks.models import WebhookEndpoint
+from .models import AdminProfile, EmployerProfile, ApplicantProfile, User
+
+TASK_NAME = 'users.export_personal_data'
+STORAGE_ALIAS = 'exports'
+
+DEFAULT_CHUNK_SIZE = 2000
+MAX_AGE = 7 * 24 * 3600
+
+TOKEN_SALT = 'users.export'
+
+# (file name, model, filter to the user's rows)
+SECTIONS = [
+    ('user', User, 'pk'),
+    ('admin_profile', AdminProfile, 'user'),
+    ('employer_profile', EmployerProfile, 'user'),
+    ('applicant_profile', ApplicantProfile, 'user'),
+    ('resumes', Resume, 'user'),
+    ('applications', JobApplication, 'applicant'),
+    ('bookmarks', JobBookmark, 'user'),
+    ('searches', JobSearch, 'user'),
+    ('saved_searches', SavedSearch, 'user'),
+    ('posted_jobs', Job, 'employer'),
+    ('webhook_endpoints', WebhookEndpoint, 'employer'),
+]
+
+# Never exported, even to the account owner
+EXCLUDED_FIELDS = {User: {'password'}, WebhookEndpoint: {'secret'}}
+
+
+def _fields(model):
+    excluded = EXCLUDED_FIELDS.get(model, set())
+    return [field.attname for field in model._meta.concrete_fields if field.name not in excluded]
+
+
+def _file_fields(model):
+    return [field for field in model._meta.concrete_fields if isinstance(field, models.FileField)]
+
+
+def sections(user):
+    """[(name, queryset)] of the user's rows, one NDJSON file each"""
+    return [
+        (name, model._base_manager.filter(**{lookup: user.pk}).order_by('pk'))
+        for name, model, lookup in SECTIONS
+    ]
+
+
+def count_rows(user):
+    return sum(queryset.count() for _, queryset in sections(user))
+
+
+def write_export(user, fileobj, chunk_size=None, progress=None):
+    """
+    Write the user's export to `fileobj` (anything writable, seekable or
+    not) and return {section: rows}. `progress(rows)` is called after every
+    chunk of rows; when it returns False the export stops there.
+    """
+    chunk_size = chunk_size or getattr(settings, 'PERSONAL_EXPORT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+    counts = {}
+    written = 0
+    with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, queryset in sections(user):
+            rows = 0
+            with archive.open(f'{name}.ndjson', 'w', force_zip64=True) as member:
+                for row in queryset.values(*_fields(queryset.model)).iterator(chunk_size=chunk_size):
+                    member.write(json.dumps(row, cls=DjangoJSONEncoder).encode() + b'\n')
+                    rows += 1
+                    if rows % chunk_size == 0 and progress and progress(written + rows) is False:
+                        return counts
+            counts[name] = rows
+            written += rows
+            if progress and progress(written) is False:
+                return counts
+
+        # A second pass over the file columns keeps the names out of memory
+        for _, queryset in sections(user):
+            file_fields = _file_fields(queryset.model)
+            if not file_fields:
+                continue
+            names = queryset.values_list(*[field.attname for field in file_fields]).iterator(chunk_size=chunk_size)
+            for row in names:
+                for field, file_name in zip(file_fields, row):
+                    if file_name:
+                        _write_file(archive, field.storage, file_name)
+
+        archive.writestr('manifest.json', json.dumps({
+            'user': user.pk,
+            'email': user.email,
+            'exported_at': timezone.now(),
+            'rows': counts,
+        }, cls=DjangoJSONEncoder, indent=2))
+    return counts
+
+
+def _write_file(archive, storage, name):
+    try:
+        source = storage.open(name, 'rb')
+    except OSError:
+        # The row outlived its file; the NDJSON still records the name
+        return
+    with source, archive.open(f'files/{name}', 'w', force_zip64=True) as member:
+        shutil.copyfileobj(source, member, 64 * 1024)
+
+
+# --- Stored exports ---
+
+def storage():
+    return storages[STORAGE_ALIAS]
+
+
+def file_name(user, task):
+    return f'{user.pk}/workzone-export-{task.pk}.zip'
+
+
+def max_age():
+    return getattr(settings, 'PERSONAL_EXPORT_MAX_AGE', MAX_AGE)
+
+
+def download_token(task):
+    return signing.dumps({'task': task.pk, 'file': task.result['file']}, salt=TOKEN_SALT)
+
+
+def read_download_token(token):
+    """The stored file name a download token grants, or None once expired or tampered with"""
+    try:
+        return signing.loads(token, salt=TOKEN_SALT, max_age=max_age())['file']
+    except (signing.BadSignature, KeyError, TypeError):
+        return None
+
+
+def remove_exports(user, keep=None):
+    """Delete the user's stored exports other than `keep`"""
+    exports = storage()
+    directory = str(user.pk)
+    if not exports.exists(directory):
+        return
+    for name in exports.listdir(directory)[1]:
+        path = f'{directory}/{name}'
+        if path != keep:
+            exports.delete(path)
+
+
+def prune_exports():
+    """Delete stored exports older than PERSONAL_EXPORT_MAX_AGE, whose links have expired"""
+    exports = storage()
+    if not exports.exists(''):
+        return 0
+    cutoff = timezone.now() - timedelta(seconds=max_age())
+    pruned = 0
+    for directory in exports.listdir('')[0]:
+        for name in exports.listdir(directory)[1]:
+            path = f'{directory}/{name}'
+            if exports.get_modified_time(path) < cutoff:
+                exports.delete(path)
+                pruned += 1
+    return pruned
@@ -0,0 +1,30 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from users import export
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Write a user's personal data export (ZIP of NDJSON plus uploaded files) in constant memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument('email', help='Export the account with this email')
+        parser.add_argument('--output', default='-', help="Destination ZIP file, or '-' for stdout")
+        parser.add_argument('--chunk-size', type=int, default=export.DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options['email'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user with email {options['email']}")
+
+        if options['output'] == '-':
+            rows = export.write_export(user, sys.stdout.buffer, chunk_size=options['chunk_size'])
+        else:
+            with open(options['output'], 'wb') as destination:
+                rows = export.write_export(user, destination, chunk_size=options['chunk_size'])
+            self.stderr.write(f"Exported {sum(rows.values())} rows to {options['output']}")
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.7 on 2026-10-19 11:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicantprofile',
+            name='salary_expectation_currency',
+            field=models.CharField(default='USD', max_length=3, verbose_name='Salary Expectation Currency'),
+        ),
+        migrations.AddField(
+            model_name='applicantprofile',
+            name='salary_expectation_usd',
+            field=models.IntegerField(blank=True, null=True, verbose_name='Salary Expectation (USD)'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.7 on 2026-10-19 11:55
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0002_salary_usd'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='adminprofile',
+            index=models.Index(fields=['-created_at'], name='adminprofile_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='applicantprofile',
+            index=models.Index(fields=['-created_at'], name='applicantprofile_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employerprofile',
+            index=models.Index(fields=['-created_at'], name='employerprofile_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employerprofile',
+            index=models.Index(django.db.models.functions.text.Lower('company_name'), name='employer_company_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-created_at'], name='user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='user_email_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('first_name'), name='user_first_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('last_name'), name='user_last_name_lower_idx'),
+        ),
+    ]
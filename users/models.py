@@ -1,7 +1,10 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import AbstractUser
 from django.contrib.auth import get_user_model
 from django.core.validators import FileExtensionValidator
+from jobs import ranking
+from jobs.salary import to_usd
 
 # Create your models here.
 class User(AbstractUser):
@@ -27,6 +30,8 @@ class User(AbstractUser):
     is_verified = models.BooleanField(default=False, verbose_name="Email Verified")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
+    # Set when the account is disabled for background deletion (see tasks/deletion.py)
+    deletion_requested_at = models.DateTimeField(null=True, blank=True, verbose_name="Deletion Requested At")
 
     # Make email the username field
     USERNAME_FIELD = 'email'
@@ -36,6 +41,18 @@ class User(AbstractUser):
         verbose_name = "User"
         verbose_name_plural = "Users"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='user_created_idx'),
+            # Prefix search in the admin (see api/admin_performance.py)
+            models.Index(Lower('email'), name='user_email_lower_idx'),
+            models.Index(Lower('first_name'), name='user_first_name_lower_idx'),
+            models.Index(Lower('last_name'), name='user_last_name_lower_idx'),
+            # Deletion tasks select their rows by stamp
+            models.Index(
+                fields=['deletion_requested_at'], condition=models.Q(deletion_requested_at__isnull=False),
+                name='user_deletion_requested_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.email} - {self.get_role_display()}"
@@ -73,6 +90,7 @@ class AdminProfile(models.Model):
     class Meta:
         verbose_name = "Admin Profile"
         verbose_name_plural = "Admin Profiles"
+        indexes = [models.Index(fields=['-created_at'], name='adminprofile_created_idx')]
 
     def __str__(self):
         return f"Admin: {self.user.get_full_name()} - {self.department}"
@@ -103,6 +121,10 @@ class EmployerProfile(models.Model):
     class Meta:
         verbose_name = "Employer Profile"
         verbose_name_plural = "Employer Profiles"
+        indexes = [
+            models.Index(fields=['-created_at'], name='employerprofile_created_idx'),
+            models.Index(Lower('company_name'), name='employer_company_lower_idx'),
+        ]
 
     def __str__(self):
         return f"Employer: {self.company_name} - {self.user.get_full_name()}"
@@ -155,6 +177,8 @@ class ApplicantProfile(models.Model):
         null=True,
         verbose_name="Salary Expectation"
     )
+    salary_expectation_currency = models.CharField(max_length=3, default="USD", verbose_name="Salary Expectation Currency")
+    salary_expectation_usd = models.IntegerField(blank=True, null=True, verbose_name="Salary Expectation (USD)")
     
     # Social Links
     linkedin_url = models.URLField(blank=True, null=True, verbose_name="LinkedIn Profile")
@@ -172,10 +196,37 @@ class ApplicantProfile(models.Model):
     class Meta:
         verbose_name = "Applicant Profile"
         verbose_name_plural = "Applicant Profiles"
+        indexes = [models.Index(fields=['-created_at'], name='applicantprofile_created_idx')]
 
     def __str__(self):
         return f"Applicant: {self.user.get_full_name()} - {self.headline or 'No headline'}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        profile = super().from_db(db, field_names, values)
+        profile._loaded_ranking = profile.ranking_snapshot()
+        return profile
+
+    def ranking_snapshot(self):
+        """The values the applicant's applications are ranked on (None if any are deferred)"""
+        if self.get_deferred_fields().intersection(ranking.APPLICANT_FIELDS):
+            return None
+        return repr(self.skills), self.experience_years
+
+    @property
+    def ranking_inputs_changed(self):
+        """Whether the ranking inputs differ from what was loaded from the database"""
+        loaded = getattr(self, '_loaded_ranking', None)
+        return loaded is not None and loaded != self.ranking_snapshot()
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or {'salary_expectation', 'salary_expectation_currency'} & set(update_fields):
+            self.salary_expectation_usd = to_usd(self.salary_expectation, self.salary_expectation_currency)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'salary_expectation_usd'}
+        super().save(*args, **kwargs)
+
     @property
     def age(self):
         if self.date_of_birth:
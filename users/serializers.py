@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from api.sparse import SparseFieldsetMixin
 from django.contrib.auth import get_user_model, authenticate
 from .models import AdminProfile, EmployerProfile, ApplicantProfile
 from django.core.validators import FileExtensionValidator
@@ -16,7 +17,7 @@ ROLE_CHOICES = (
 
 # --- User Serializers ---
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = [
@@ -141,6 +142,8 @@ class ApplicantProfileSerializer(serializers.ModelSerializer):
         fields = [
             'user', 'date_of_birth', 'gender', 'headline', 'summary', 'experience_years',
             'education_level', 'skills', 'preferred_job_types', 'preferred_locations',
-            'salary_expectation', 'linkedin_url', 'github_url', 'portfolio_url',
+            'salary_expectation', 'salary_expectation_currency', 'salary_expectation_usd',
+            'linkedin_url', 'github_url', 'portfolio_url',
             'is_available_for_work', 'is_verified_applicant', 'created_at', 'updated_at'
-        ]
\ No newline at end of file
+        ]
+        read_only_fields = ['salary_expectation_usd']
\ No newline at end of file
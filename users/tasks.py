@@ -0,0 +1,64 @@
+import tempfile
+
+from django.core.files import File
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.signals import jobs_bulk_changed
+from tasks.registry import register
+from tasks.runner import TaskCancelled, process_in_chunks
+from . import export
+from .models import User, EmployerProfile, ApplicantProfile
+
+
+@register('users.verify_employers')
+def verify_employers(task):
+    def apply(pks):
+        EmployerProfile.objects.filter(pk__in=pks).update(is_verified_employer=True, updated_at=timezone.now())
+    return {'verified': process_in_chunks(task, task.get_queryset(), apply)}
+
+
+@register('users.verify_applicants')
+def verify_applicants(task):
+    def apply(pks):
+        ApplicantProfile.objects.filter(pk__in=pks).update(is_verified_applicant=True, updated_at=timezone.now())
+    return {'verified': process_in_chunks(task, task.get_queryset(), apply)}
+
+
+@register('users.deactivate_users')
+def deactivate_users(task):
+    """Deactivate (spam) accounts and take their job postings down"""
+    jobs_closed = 0
+
+    def apply(pks):
+        nonlocal jobs_closed
+        now = timezone.now()
+        User.objects.filter(pk__in=pks).update(is_active=False, updated_at=now)
+        job_ids = list(Job.objects.filter(employer_id__in=pks, is_active=True).values_list('pk', flat=True))
+        if job_ids:
+            Job.objects.filter(pk__in=job_ids).update(is_active=False, updated_at=now)
+            jobs_bulk_changed.send(sender=Job, job_ids=job_ids)
+            jobs_closed += len(job_ids)
+
+    deactivated = process_in_chunks(task, task.get_queryset(), apply)
+    return {'deactivated': deactivated, 'jobs_closed': jobs_closed}
+
+
+@register(export.TASK_NAME)
+def export_personal_data(task):
+    """Build the account's data export and store it for download (see users/export.py)"""
+    user = task.get_queryset().get()
+    export.prune_exports()
+    total = export.count_rows(user)
+    task.report_progress(0, total)
+
+    with tempfile.TemporaryFile() as archive:
+        rows = export.write_export(user, archive, progress=lambda processed: task.report_progress(processed))
+        if not task.report_progress(sum(rows.values())):
+            raise TaskCancelled
+        size = archive.tell()
+        archive.seek(0)
+        name = export.storage().save(export.file_name(user, task), File(archive))
+    # Only the newest export is kept
+    export.remove_exports(user, keep=name)
+    return {'file': name, 'size': size, 'rows': rows}
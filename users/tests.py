@@ -1,3 +1,283 @@
-from django.test import TestCase
+import datetime
+import io
+import json
+import tempfile
+import zipfile
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from api.compiled import compiled
+from jobs.models import Job, JobApplication, JobBookmark, JobFingerprint, JobSearch, Resume
+from tasks.deletion import schedule_deletion
+from tasks.models import BackgroundTask
+from tasks.runner import claim_next, run
+from . import export
+from .utils import send_mail, send_role_specific_welcome_email
+from .models import AdminProfile, EmployerProfile, ApplicantProfile
+from .serializers import (
+    UserSerializer, AdminProfileSerializer, EmployerProfileSerializer, ApplicantProfileSerializer,
+)
+
+User = get_user_model()
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+# --- Compiled Serializers ---
+class CompiledSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='admin', email='admin@example.com', password='x', role='admin', phone_number='+2348000000',
+        )
+        cls.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+            profile_image='profile_images/logo.png', address='1 Marina, Lagos',
+        )
+        cls.applicant = User.objects.create_user(
+            username='applicant', email='applicant@example.com', password='x', role='applicant', is_verified=True,
+        )
+        AdminProfile.objects.create(user=cls.admin, employee_id='A-1', permissions={'jobs': ['read']})
+        EmployerProfile.objects.create(
+            user=cls.employer, company_name='Acme', company_logo='company_logos/acme.png', founded_year=1999,
+        )
+        ApplicantProfile.objects.create(
+            user=cls.applicant, date_of_birth=datetime.date(1995, 4, 1), gender='Female',
+            skills=['python'], salary_expectation=Decimal('45000.00'), salary_expectation_currency='GBP',
+            linkedin_url='https://linkedin.com/in/applicant',
+        )
+
+    def assertSameOutput(self, serializer_class, instance, **sparse):
+        drf = serializer_class(instance, **sparse).data
+        self.assertEqual(render(compiled(serializer_class, **sparse).to_representation(instance)), render(drf))
+
+    def test_users(self):
+        for user in User.objects.order_by('pk'):
+            self.assertSameOutput(UserSerializer, user)
+            self.assertSameOutput(UserSerializer, user, fields={'email', 'profile_image'}, exclude=set())
+
+    def test_profiles_with_nested_user(self):
+        self.assertSameOutput(AdminProfileSerializer, AdminProfile.objects.get())
+        self.assertSameOutput(EmployerProfileSerializer, EmployerProfile.objects.get())
+        self.assertSameOutput(ApplicantProfileSerializer, ApplicantProfile.objects.get())
+
+    def test_custom_to_representation_is_left_to_drf(self):
+        class Upper(serializers.ModelSerializer):
+            class Meta:
+                model = User
+                fields = ['id', 'email']
+
+            def to_representation(self, instance):
+                data = super().to_representation(instance)
+                data['email'] = data['email'].upper()
+                return data
+
+        self.assertSameOutput(Upper, self.admin)
+
+
+# --- Background Deletion ---
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), TASK_CHUNK_SIZE=2)
+class BackgroundDeletionTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+        )
+        self.applicant = User.objects.create_user(
+            username='applicant', email='applicant@example.com', password='x', role='applicant',
+        )
+        self.jobs = [
+            Job.objects.create(
+                employer=self.employer, title=f'Job {index}', description='', requirements='', responsibilities='',
+                location='Lagos',
+            )
+            for index in range(3)
+        ]
+        self.resume = Resume.objects.create(
+            user=self.applicant, title='CV', file=default_storage.save('resumes/cv.pdf', ContentFile(b'%PDF')),
+        )
+        for job in self.jobs:
+            JobApplication.objects.create(job=job, applicant=self.applicant, resume=self.resume)
+            JobBookmark.objects.create(user=self.applicant, job=job)
+
+    def run_task(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task = claim_next('test')
+            run(task)
+        task.refresh_from_db()
+        return task
+
+    def test_employer_is_disabled_at_once_and_deleted_in_chunks(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule_deletion(User.objects.filter(pk=self.employer.pk))
+        self.employer.refresh_from_db()
+        self.assertFalse(self.employer.is_active)
+        self.assertIsNotNone(self.employer.deletion_requested_at)
+        self.assertFalse(Job.objects.live().exists())
+        self.assertFalse(Job.objects.filter(is_active=True).exists())
+
+        task = self.run_task()
+        self.assertEqual(task.status, 'succeeded')
+        deleted = task.result['deleted']
+        self.assertEqual(
+            [deleted['jobs.JobApplication'], deleted['jobs.JobBookmark'], deleted['jobs.Job'], deleted['users.User']],
+            [3, 3, 3, 1],
+        )
+        self.assertEqual(task.processed, task.total)
+        self.assertFalse(User.objects.filter(pk=self.employer.pk).exists())
+        # The applicant keeps their account and resume
+        self.assertTrue(Resume.objects.filter(pk=self.resume.pk).exists())
+
+    def test_files_are_removed_after_the_rows(self):
+        name = self.resume.file.name
+        schedule_deletion(User.objects.filter(pk=self.applicant.pk))
+        task = self.run_task()
+        self.assertEqual(task.status, 'succeeded')
+        self.assertFalse(Resume.objects.exists())
+        self.assertFalse(default_storage.exists(name))
+        self.assertEqual(Job.objects.count(), 3)
+
+    def test_clients_cannot_stamp_a_job_for_deletion(self):
+        client = APIClient()
+        client.force_authenticate(self.employer)
+        response = client.post('/api/jobs/', {
+            'title': 'Stamped', 'description': 'x', 'requirements': 'x', 'responsibilities': 'x', 'location': 'Lagos',
+            'deletion_requested_at': '2026-01-01T00:00:00Z',
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertIsNone(Job.objects.get(pk=response.data['id']).deletion_requested_at)
+        self.assertEqual(client.put(f"/api/jobs/{response.data['id']}/", {'title': 'Edited'}, format='json').status_code, 200)
+
+    def test_stamped_jobs_are_never_listed(self):
+        # Even if something stamps a job without deactivating it
+        Job.objects.filter(pk=self.jobs[0].pk).update(deletion_requested_at=timezone.now())
+        self.assertNotIn(self.jobs[0].pk, set(Job.objects.listed().values_list('pk', flat=True)))
+        self.assertEqual(APIClient().get('/api/jobs/', {'facets': 'false'}).data['count'], 2)
+
+    def test_cancelled_deletion_resumes_when_scheduled_again(self):
+        schedule_deletion(Job.objects.filter(pk__in=[job.pk for job in self.jobs]))
+        task = claim_next('test')
+        # Cancelled after the first chunk (two of the three fingerprints) has been deleted
+        task.report_progress = lambda processed, total=None: BackgroundTask.objects.filter(pk=task.pk).update(
+            status='cancelled') and False
+        run(task)
+        self.assertEqual(JobFingerprint.objects.count(), 1)
+        self.assertEqual(JobApplication.objects.count(), 3)
+
+        schedule_deletion(Job.objects.filter(pk__in=[job.pk for job in self.jobs]))
+        self.assertEqual(self.run_task().status, 'succeeded')
+        self.assertFalse(Job.objects.exists())
+        self.assertFalse(JobBookmark.objects.exists())
+
+
+# --- Personal Data Export ---
+EXPORT_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'exports': {'BACKEND': 'django.core.files.storage.FileSystemStorage', 'OPTIONS': {'location': tempfile.mkdtemp()}},
+}
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), STORAGES=EXPORT_STORAGES, PERSONAL_EXPORT_CHUNK_SIZE=2)
+class PersonalDataExportTests(TestCase):
+    def setUp(self):
+        self.applicant = User.objects.create_user(
+            username='applicant', email='applicant@example.com', password='secret', role='applicant',
+            profile_image=default_storage.save('profile_images/me.png', ContentFile(b'PNG')),
+        )
+        ApplicantProfile.objects.create(user=self.applicant, skills=['python'])
+        employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+        )
+        job = Job.objects.create(
+            employer=employer, title='Job', description='', requirements='', responsibilities='', location='Lagos',
+        )
+        self.resume = Resume.objects.create(
+            user=self.applicant, title='CV', file=default_storage.save('resumes/cv.pdf', ContentFile(b'%PDF')),
+        )
+        JobApplication.objects.create(job=job, applicant=self.applicant, resume=self.resume)
+        JobBookmark.objects.create(user=self.applicant, job=job)
+        JobSearch.objects.bulk_create(
+            JobSearch(user=self.applicant, query=f'python {index}') for index in range(5)
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.applicant)
+
+    def test_archive_contents(self):
+        buffer = io.BytesIO()
+        rows = export.write_export(self.applicant, buffer)
+        self.assertEqual(rows['searches'], 5)
+        self.assertEqual(rows['employer_profile'], 0)
+        self.assertEqual(rows['posted_jobs'], 0)
+
+        with zipfile.ZipFile(buffer) as archive:
+            user = json.loads(archive.read('user.ndjson'))
+            self.assertEqual(user['email'], 'applicant@example.com')
+            self.assertNotIn('password', user)
+            searches = archive.read('searches.ndjson').decode().splitlines()
+            self.assertEqual(len(searches), 5)
+            self.assertEqual(json.loads(archive.read('applications.ndjson'))['applicant_id'], self.applicant.pk)
+            self.assertEqual(archive.read(f'files/{self.resume.file.name}'), b'%PDF')
+            self.assertEqual(archive.read(f'files/{self.applicant.profile_image.name}'), b'PNG')
+            self.assertEqual(json.loads(archive.read('manifest.json'))['rows'], rows)
+
+    def test_export_is_built_in_the_background_and_downloaded_by_link(self):
+        self.assertEqual(self.client.get('/api/profile/export/').status_code, 404)
+        response = self.client.post('/api/profile/export/')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'pending')
+        # A second request while the first is queued returns the same export
+        self.assertEqual(self.client.post('/api/profile/export/').data['id'], response.data['id'])
+
+        run(claim_next('test'))
+        task = BackgroundTask.objects.get(pk=response.data['id'])
+        self.assertEqual(task.status, 'succeeded')
+        self.assertEqual(task.processed, task.total)
+
+        response = self.client.get('/api/profile/export/')
+        self.assertEqual(response.data['percent'], 100)
+        download = APIClient().get(response.data['download_url'])
+        self.assertEqual(download.status_code, 200)
+        self.assertEqual(download['Content-Type'], 'application/zip')
+        with zipfile.ZipFile(io.BytesIO(b''.join(download.streaming_content))) as archive:
+            self.assertIn(f'files/{self.resume.file.name}', archive.namelist())
+
+        # Only the newest export is kept
+        self.client.post('/api/profile/export/')
+        run(claim_next('test'))
+        self.assertEqual(len(export.storage().listdir(str(self.applicant.pk))[1]), 1)
+        self.assertEqual(APIClient().get(response.data['download_url']).status_code, 404)
+
+    def test_download_token_is_checked(self):
+        for token in ('', 'forged', export.download_token(BackgroundTask(pk=1, result={'file': '1/x.zip'})) + 'x'):
+            with self.subTest(token=token):
+                response = APIClient().get('/api/profile/export/download/', {'token': token})
+                self.assertEqual(response.status_code, 404)
+        with override_settings(PERSONAL_EXPORT_MAX_AGE=-1):
+            task = BackgroundTask(pk=1, result={'file': '1/x.zip'})
+            self.assertIsNone(export.read_download_token(export.download_token(task)))
+
+
+# --- Emails ---
+class EmailTests(TestCase):
+    def test_mail_goes_through_the_configured_backend(self):
+        # The test runner swaps in the locmem backend; the lazy import must honour it
+        self.assertEqual(send_mail('Subject', 'Body', 'from@example.com', ['to@example.com']), 1)
+        self.assertEqual([(message.subject, message.to) for message in mail.outbox], [('Subject', ['to@example.com'])])
+
+    def test_welcome_emails_match_the_role(self):
+        employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+        )
+        self.assertTrue(send_role_specific_welcome_email(employer))
+        self.assertEqual(mail.outbox[0].to, ['employer@example.com'])
+        self.assertIn('Employer Account Activated', mail.outbox[0].subject)
@@ -2,12 +2,14 @@ from django.urls import path
 from .import views
 
 urlpatterns = [
-    path('register/', views.RegisterView.as_view()),
-    path('login/', views.LoginView.as_view()),
-    path('logout/', views.LogoutView.as_view()),
-    path('profile/', views.UserProfileView.as_view()),
-    path('admin-profile/', views.AdminProfileView.as_view()),
-    path('employer-profile/', views.EmployerProfileView.as_view()),
-    path('applicant-profile/', views.ApplicantProfileView.as_view()),
+    path('register/', views.RegisterView.as_view(), name='register'),
+    path('login/', views.LoginView.as_view(), name='login'),
+    path('logout/', views.LogoutView.as_view(), name='logout'),
+    path('profile/', views.UserProfileView.as_view(), name='user-profile'),
+    path('profile/export/', views.PersonalDataExportView.as_view(), name='user-data-export'),
+    path('profile/export/download/', views.PersonalDataExportDownloadView.as_view(), name='user-data-export-download'),
+    path('admin-profile/', views.AdminProfileView.as_view(), name='admin-profile'),
+    path('employer-profile/', views.EmployerProfileView.as_view(), name='employer-profile'),
+    path('applicant-profile/', views.ApplicantProfileView.as_view(), name='applicant-profile'),
 ]
 
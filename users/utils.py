@@ -1,6 +1,12 @@
-from django.core.mail import send_mail
 from django.conf import settings
-from django.template.loader import render_to_string
+
+
+def send_mail(*args, **kwargs):
+    # django.core.mail pulls in the email and smtplib stack; load it on first send
+    from django.core import mail
+
+    return mail.send_mail(*args, **kwargs)
+
 
 def send_welcome_email(user):
     """
@@ -1,18 +1,27 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
+from django.http import FileResponse, Http404
+from django.urls import reverse
+from api.compiled import compiled
+from api.instrumentation import query_budget
+from api.sparse import sparse_fields
 from .serializers import (
     UserSerializer, RegisterSerializer, LoginSerializer, LogoutSerializer,
     AdminProfileSerializer, EmployerProfileSerializer, ApplicantProfileSerializer
 )
+from tasks.models import BackgroundTask
+from tasks.registry import enqueue
+from . import export
 from .models import AdminProfile, EmployerProfile, ApplicantProfile
 
 User = get_user_model()
 
 # --- Registration View ---
+@query_budget(6)
 class RegisterView(APIView):
     def post(self, request):
         serializer = RegisterSerializer(data=request.data)
@@ -22,6 +31,7 @@ class RegisterView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 # --- Login View ---
+@query_budget(2)
 class LoginView(APIView):
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
@@ -30,6 +40,7 @@ class LoginView(APIView):
         return Response(serializer.errors, status=status.HTTP_401_UNAUTHORIZED)
 
 # --- Logout View ---
+@query_budget(8)
 class LogoutView(APIView):
     permission_classes = [IsAuthenticated]
     def post(self, request):
@@ -45,12 +56,13 @@ class LogoutView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 # --- User Profile View ---
+@query_budget(get=1, put=2)
 class UserProfileView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
         user = request.user
-        serializer = UserSerializer(user)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data = compiled(UserSerializer, **sparse_fields(request)).to_representation(user)
+        return Response(data, status=status.HTTP_200_OK)
     def put(self, request):
         user = request.user
         serializer = UserSerializer(user, data=request.data, partial=True)
@@ -60,13 +72,14 @@ class UserProfileView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 # --- Admin Profile View ---
+@query_budget(get=3, put=4)
 class AdminProfileView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
         try:
             profile = AdminProfile.objects.get(user=request.user)
-            serializer = AdminProfileSerializer(profile)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            data = compiled(AdminProfileSerializer).to_representation(profile)
+            return Response(data, status=status.HTTP_200_OK)
         except AdminProfile.DoesNotExist:
             return Response({'error': 'Admin profile not found.'}, status=status.HTTP_404_NOT_FOUND)
     def put(self, request):
@@ -81,13 +94,14 @@ class AdminProfileView(APIView):
             return Response({'error': 'Admin profile not found.'}, status=status.HTTP_404_NOT_FOUND)
 
 # --- Employer Profile View ---
+@query_budget(get=3, put=4)
 class EmployerProfileView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
         try:
             profile = EmployerProfile.objects.get(user=request.user)
-            serializer = EmployerProfileSerializer(profile)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            data = compiled(EmployerProfileSerializer).to_representation(profile)
+            return Response(data, status=status.HTTP_200_OK)
         except EmployerProfile.DoesNotExist:
             return Response({'error': 'Employer profile not found.'}, status=status.HTTP_404_NOT_FOUND)
     def put(self, request):
@@ -102,13 +116,14 @@ class EmployerProfileView(APIView):
             return Response({'error': 'Employer profile not found.'}, status=status.HTTP_404_NOT_FOUND)
 
 # --- Applicant Profile View ---
+@query_budget(get=3, put=4)
 class ApplicantProfileView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
         try:
             profile = ApplicantProfile.objects.get(user=request.user)
-            serializer = ApplicantProfileSerializer(profile)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            data = compiled(ApplicantProfileSerializer).to_representation(profile)
+            return Response(data, status=status.HTTP_200_OK)
         except ApplicantProfile.DoesNotExist:
             return Response({'error': 'Applicant profile not found.'}, status=status.HTTP_404_NOT_FOUND)
     def put(self, request):
@@ -120,4 +135,53 @@ class ApplicantProfileView(APIView):
                 return Response(serializer.data, status=status.HTTP_200_OK)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except ApplicantProfile.DoesNotExist:
-            return Response({'error': 'Applicant profile not found.'}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+            return Response({'error': 'Applicant profile not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+# --- Personal Data Export Views ---
+def export_status(request, task):
+    data = {
+        'id': task.pk,
+        'status': task.status,
+        'percent': task.percent,
+        'created_at': task.created_at,
+        'finished_at': task.finished_at,
+    }
+    if task.status == 'succeeded':
+        token = export.download_token(task)
+        data['size'] = task.result['size']
+        data['download_url'] = request.build_absolute_uri(f"{reverse('user-data-export-download')}?token={token}")
+        data['expires_in'] = export.max_age()
+    return data
+
+
+@query_budget(get=2, post=3)
+class PersonalDataExportView(APIView):
+    """POST starts an export of the account's data; GET reports the latest one"""
+    permission_classes = [IsAuthenticated]
+    def get(self, request):
+        task = BackgroundTask.objects.filter(name=export.TASK_NAME, created_by=request.user).first()
+        if task is None:
+            return Response({'error': 'No data export has been requested.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(export_status(request, task), status=status.HTTP_200_OK)
+    def post(self, request):
+        task = BackgroundTask.objects.filter(
+            name=export.TASK_NAME, created_by=request.user, status__in=('pending', 'running'),
+        ).first()
+        if task is None:
+            task = enqueue(export.TASK_NAME, User.objects.filter(pk=request.user.pk), created_by=request.user)
+        return Response(export_status(request, task), status=status.HTTP_202_ACCEPTED)
+
+
+@query_budget(0)
+class PersonalDataExportDownloadView(APIView):
+    """Streams a finished export; the signed token in the link is the credential"""
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    def get(self, request):
+        name = export.read_download_token(request.query_params.get('token', ''))
+        if name is None or not export.storage().exists(name):
+            raise Http404('This download link has expired.')
+        return FileResponse(
+            export.storage().open(name, 'rb'), as_attachment=True, filename=name.rsplit('/', 1)[-1],
+            content_type='application/zip',
+        )
@@ -0,0 +1,33 @@
+from django.contrib import admin
+from api.admin_performance import PerformanceModelAdmin
+from .dispatch import requeue
+from .models import WebhookEndpoint, WebhookDelivery
+
+
+@admin.action(description='Send selected deliveries again')
+def requeue_deliveries(modeladmin, request, queryset):
+    modeladmin.message_user(request, f"Queued {requeue(queryset)} deliveries again.")
+
+
+# --- Webhook Endpoint Admin ---
+@admin.register(WebhookEndpoint)
+class WebhookEndpointAdmin(PerformanceModelAdmin):
+    list_display = ['url', 'employer', 'max_batch_size', 'is_active', 'created_at']
+    list_filter = ['is_active', 'created_at']
+    search_fields = ['^url', '^employer__email']
+    ordering = ['-created_at']
+    list_select_related = ['employer']
+    raw_id_fields = ['employer']
+    readonly_fields = ['secret', 'created_at', 'updated_at']
+
+# --- Webhook Delivery Admin ---
+@admin.register(WebhookDelivery)
+class WebhookDeliveryAdmin(PerformanceModelAdmin):
+    list_display = ['event', 'endpoint', 'status', 'attempts', 'response_status', 'next_attempt_at', 'created_at']
+    list_filter = ['status', 'event', 'created_at']
+    search_fields = ['=event_id', '^endpoint__url']
+    ordering = ['-created_at']
+    list_select_related = ['endpoint']
+    raw_id_fields = ['endpoint']
+    actions = [requeue_deliveries]
+    readonly_fields = ['event_id', 'payload', 'claim', 'locked_until', 'created_at', 'delivered_at']
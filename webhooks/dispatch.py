@@ -0,0 +1,309 @@
+"""
+Webhook dispatch: claiming due deliveries and POSTing them.
+
+`manage.py run_webhooks` runs a Dispatcher. Each round it
+
+1. claims due deliveries with a conditional UPDATE that stamps a claim
+   token and a lease (`locked_until`), so several workers can share the
+   queue and the rows of a worker that died are sent again once the lease
+   runs out. Deliveries are grouped into batches of up to the endpoint's
+   `max_batch_size` events, and no destination (scheme, host and port)
+   gets more than `per_destination` batches per round;
+2. sends the batches from a thread pool. Connections are kept alive in a
+   pool per destination (api/db/pool.py) whose size caps the requests in
+   flight to one host, so a slow receiver holds a few threads at most;
+3. records each outcome. A 2xx response marks the batch delivered;
+   anything else is retried with exponential backoff and jitter (or after
+   `Retry-After`), and a delivery that has failed WEBHOOK_MAX_ATTEMPTS
+   times becomes a dead letter, listed for the employer to requeue.
+
+Delivery is at least once and unordered: receivers deduplicate on the
+event `id`. Bodies are signed (see webhooks/signing.py).
+"""
+import http.client
+import ipaddress
+import json
+import logging
+import random
+import socket
+import ssl
+import threading
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from api.db.pool import ConnectionPool
+from .models import WebhookDelivery, WebhookEndpoint
+from .signing import SIGNATURE_HEADER, sign
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT = 10
+MAX_ATTEMPTS = 8
+# Seconds a claimed batch stays locked; well above TIMEOUT
+LEASE = 120
+# Retries back off from 30 seconds to 6 hours: 8 attempts span about an hour
+BASE_DELAY = 30
+MAX_DELAY = 6 * 3600
+RETENTION_DAYS = 30
+
+CONCURRENCY = 8
+PER_DESTINATION = 4
+# Only this much of a response is read; larger ones end the connection
+MAX_RESPONSE_BYTES = 64 * 1024
+USER_AGENT = 'WorkZone-Webhooks/1.0'
+
+
+class Refused(Exception):
+    """The endpoint resolves to an address webhooks may not be sent to"""
+
+
+def destination(url):
+    """(scheme, host, port) of a URL; requests to one destination share a connection pool"""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    return scheme, parts.hostname or '', parts.port or (443 if scheme == 'https' else 80)
+
+
+def backoff(attempts, retry_after=None):
+    """Delay before the next attempt, after `attempts` failed ones"""
+    delay = min(BASE_DELAY * 2 ** (attempts - 1), MAX_DELAY) * random.uniform(0.8, 1.2)
+    if retry_after:
+        delay = max(delay, min(retry_after, MAX_DELAY))
+    return timedelta(seconds=delay)
+
+
+def _due(now):
+    return WebhookDelivery.objects.filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+        status="pending", next_attempt_at__lte=now, endpoint__is_active=True,
+    )
+
+
+# --- Claiming ---
+
+def claim(limit=CONCURRENCY, per_destination=PER_DESTINATION, lease=LEASE):
+    """
+    Claim up to `limit` batches of due deliveries, as [(endpoint, [deliveries])].
+    Endpoints with the oldest due deliveries go first.
+    """
+    now = timezone.now()
+    endpoint_ids = []
+    for endpoint_id in _due(now).order_by('next_attempt_at').values_list('endpoint_id', flat=True)[:limit * 10]:
+        if endpoint_id not in endpoint_ids:
+            endpoint_ids.append(endpoint_id)
+    endpoints = WebhookEndpoint.objects.in_bulk(endpoint_ids)
+
+    batches, per_host = [], Counter()
+    for endpoint_id in endpoint_ids:
+        endpoint = endpoints[endpoint_id]
+        host = destination(endpoint.url)
+        slots = min(per_destination - per_host[host], limit - len(batches))
+        if slots <= 0:
+            continue
+        size = max(endpoint.max_batch_size, 1)
+        pks = list(
+            _due(now).filter(endpoint_id=endpoint_id).order_by('next_attempt_at', 'pk')
+            .values_list('pk', flat=True)[:size * slots]
+        )
+        token = uuid.uuid4().hex
+        # Rows another worker claimed in the meantime no longer match
+        if not _due(now).filter(pk__in=pks).update(claim=token, locked_until=now + timedelta(seconds=lease)):
+            continue
+        claimed = list(WebhookDelivery.objects.filter(claim=token).order_by('next_attempt_at', 'pk'))
+        for start in range(0, len(claimed), size):
+            batches.append((endpoint, claimed[start:start + size]))
+            per_host[host] += 1
+    return batches
+
+
+# --- Sending ---
+
+def _connect(scheme, host, port, timeout):
+    address = _resolve(host, port)
+    if scheme == 'https':
+        connection = http.client.HTTPSConnection(host, port, timeout=timeout, context=ssl.create_default_context())
+    else:
+        connection = http.client.HTTPConnection(host, port, timeout=timeout)
+    # Open the socket to the vetted address: resolving the name again could
+    # give another one (DNS rebinding). `Host` and TLS still use the name.
+    connection._create_connection = lambda _, *args: socket.create_connection((address, port), *args)
+    connection.connect()
+    connection.used = False
+    return connection
+
+
+def _reusable(connection):
+    # http.client closes the socket after `Connection: close` or a failed exchange
+    return connection.sock is not None
+
+
+def _resolve(host, port):
+    """The address to connect to for `host`; Refused if it resolves to any non-public one"""
+    addresses = [address[0] for *_, address in socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)]
+    if not getattr(settings, 'WEBHOOK_ALLOW_PRIVATE_HOSTS', False):
+        for address in addresses:
+            ip = ipaddress.ip_address(address)
+            if not ip.is_global or ip.is_multicast:
+                raise Refused(f'{host} resolves to a non-public address ({ip})')
+    return addresses[0]
+
+
+def body_for(endpoint, deliveries):
+    """One event as is, or {"events": [...]} for endpoints that take batches"""
+    events = [delivery.payload for delivery in deliveries]
+    document = {'events': events} if endpoint.max_batch_size > 1 else events[0]
+    return json.dumps(document, separators=(',', ':')).encode()
+
+
+class Outcome:
+    def __init__(self, status=None, error='', retry_after=None):
+        self.status = status
+        self.error = error
+        self.retry_after = retry_after
+
+    @property
+    def ok(self):
+        return self.status is not None and 200 <= self.status < 300
+
+
+class Dispatcher:
+    def __init__(self, concurrency=CONCURRENCY, per_destination=PER_DESTINATION, timeout=None):
+        self.concurrency = concurrency
+        self.per_destination = per_destination
+        self.timeout = timeout or getattr(settings, 'WEBHOOK_TIMEOUT', TIMEOUT)
+        self.max_attempts = getattr(settings, 'WEBHOOK_MAX_ATTEMPTS', MAX_ATTEMPTS)
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='webhooks')
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def run_once(self):
+        """Claim, send and record one round of batches; returns how many were sent"""
+        batches = claim(self.concurrency, self.per_destination)
+        # Only the HTTP requests run in threads; rows are updated from this one
+        outcomes = list(self._executor.map(lambda batch: self.send(*batch), batches))
+        for (endpoint, deliveries), outcome in zip(batches, outcomes):
+            record(deliveries, outcome, self.max_attempts)
+        return len(batches)
+
+    def close(self):
+        self._executor.shutdown()
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+    def pool(self, scheme, host, port):
+        with self._lock:
+            key = (scheme, host, port)
+            if key not in self._pools:
+                self._pools[key] = ConnectionPool(
+                    lambda: _connect(scheme, host, port, self.timeout),
+                    reset=_reusable, max_size=self.per_destination, timeout=LEASE / 2,
+                    idle_timeout=60, check=False,
+                )
+            return self._pools[key]
+
+    def send(self, endpoint, deliveries):
+        """POST a batch and return its Outcome; never raises"""
+        scheme, host, port = destination(endpoint.url)
+        parts = urlsplit(endpoint.url)
+        path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+        body = body_for(endpoint, deliveries)
+        headers = {
+            'Content-Type': 'application/json',
+            'User-Agent': USER_AGENT,
+            'X-WorkZone-Event': ','.join(sorted({delivery.event for delivery in deliveries})),
+            'X-WorkZone-Delivery': ','.join(str(delivery.pk) for delivery in deliveries),
+            SIGNATURE_HEADER: sign(endpoint.secret, body),
+        }
+        try:
+            # New connections are vetted as they are opened, see _connect()
+            return self._post(self.pool(scheme, host, port), path, body, headers)
+        except Refused as error:
+            return Outcome(error=str(error))
+        except Exception as error:
+            return Outcome(error=f'{type(error).__name__}: {error}')
+
+    def _post(self, pool, path, body, headers):
+        while True:
+            connection = pool.getconn()
+            reused, connection.used = connection.used, True
+            try:
+                connection.request('POST', path, body=body, headers=headers)
+                response = connection.getresponse()
+                content = response.read(MAX_RESPONSE_BYTES + 1)
+                if len(content) > MAX_RESPONSE_BYTES or not response.isclosed():
+                    connection.close()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                pool.putconn(connection)
+                if reused:
+                    # The receiver closed an idle keep-alive connection; retry on a fresh one
+                    continue
+                raise
+            pool.putconn(connection)
+            return Outcome(
+                response.status,
+                error='' if 200 <= response.status < 300 else content[:500].decode('utf-8', 'replace'),
+                retry_after=_retry_after(response),
+            )
+
+
+def _retry_after(response):
+    if response.status not in (429, 503):
+        return None
+    try:
+        return max(int(response.getheader('Retry-After', '')), 0)
+    except ValueError:
+        return None
+
+
+# --- Bookkeeping ---
+
+def record(deliveries, outcome, max_attempts=MAX_ATTEMPTS):
+    """Mark a sent batch delivered, or schedule its retry (or dead letter)"""
+    now = timezone.now()
+    if outcome.ok:
+        WebhookDelivery.objects.filter(pk__in=[delivery.pk for delivery in deliveries]).update(
+            status="delivered", delivered_at=now, attempts=F('attempts') + 1, response_status=outcome.status,
+            last_error='', claim='', locked_until=None,
+        )
+        return
+    for delivery in deliveries:
+        delivery.attempts += 1
+        delivery.response_status = outcome.status
+        delivery.last_error = outcome.error
+        delivery.claim, delivery.locked_until = '', None
+        if delivery.attempts >= max_attempts:
+            delivery.status = "dead"
+        else:
+            delivery.next_attempt_at = now + backoff(delivery.attempts, outcome.retry_after)
+    WebhookDelivery.objects.bulk_update(
+        deliveries, ['attempts', 'response_status', 'last_error', 'claim', 'locked_until', 'status', 'next_attempt_at'],
+    )
+    dead = sum(delivery.status == "dead" for delivery in deliveries)
+    if dead:
+        logger.warning("%d webhook deliveries to endpoint %s are dead letters", dead, deliveries[0].endpoint_id)
+
+
+def requeue(deliveries):
+    """Send deliveries (a queryset) again from scratch; returns how many"""
+    return deliveries.update(
+        status="pending", attempts=0, next_attempt_at=timezone.now(), claim='', locked_until=None,
+        last_error='', delivered_at=None,
+    )
+
+
+def prune(days=None):
+    """Delete deliveries that succeeded more than `days` ago"""
+    days = days if days is not None else getattr(settings, 'WEBHOOK_RETENTION_DAYS', RETENTION_DAYS)
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = WebhookDelivery.objects.filter(status="delivered", delivered_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,61 @@
+"""
+Webhook events: payloads and the outbox.
+
+publish() queues one WebhookDelivery per subscribed endpoint inside the
+caller's transaction, so an event is queued exactly when the change that
+caused it commits, and no request waits on an employer's server.
+`manage.py run_webhooks` sends them (see webhooks/dispatch.py).
+"""
+import uuid
+
+from django.utils import timezone
+
+from .models import WebhookDelivery, WebhookEndpoint
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+def application_payload(application, previous_status=None):
+    """The `data` of application.* events"""
+    job, applicant = application.job, application.applicant
+    data = {
+        'application': {
+            'id': application.pk,
+            'status': application.status,
+            'score': application.score,
+            'expected_salary': str(application.expected_salary) if application.expected_salary is not None else None,
+            'available_start_date': _isoformat(application.available_start_date),
+            'applied_at': _isoformat(application.applied_at),
+            'updated_at': _isoformat(application.updated_at),
+        },
+        'job': {'id': job.pk, 'external_id': job.external_id, 'title': job.title},
+        'applicant': {
+            'id': applicant.pk,
+            'email': applicant.email,
+            'first_name': applicant.first_name,
+            'last_name': applicant.last_name,
+        },
+    }
+    if previous_status is not None:
+        data['application']['previous_status'] = previous_status
+    return data
+
+
+def publish(employer_id, event, data):
+    """Queue `event` for the employer's active endpoints subscribed to it; returns how many"""
+    endpoint_ids = [
+        pk for pk, events in
+        WebhookEndpoint.objects.filter(employer_id=employer_id, is_active=True).values_list('pk', 'events')
+        if event in events
+    ]
+    if not endpoint_ids:
+        return 0
+    now = timezone.now()
+    envelope = {'id': uuid.uuid4().hex, 'type': event, 'created_at': now.isoformat(), 'data': data}
+    WebhookDelivery.objects.bulk_create([
+        WebhookDelivery(endpoint_id=pk, event_id=envelope['id'], event=event, payload=envelope, next_attempt_at=now)
+        for pk in endpoint_ids
+    ])
+    return len(endpoint_ids)
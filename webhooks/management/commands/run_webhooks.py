@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from webhooks.dispatch import CONCURRENCY, PER_DESTINATION, Dispatcher, prune
+
+PRUNE_EVERY = 3600
+
+
+class Command(BaseCommand):
+    help = "Send queued webhook deliveries to employer endpoints"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when nothing is due')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to wait when nothing is due')
+        parser.add_argument('--concurrency', type=int, default=CONCURRENCY, help='Requests in flight at once')
+        parser.add_argument('--per-destination', type=int, default=PER_DESTINATION,
+                            help='Requests in flight to any one host')
+
+    def handle(self, *args, **options):
+        dispatcher = Dispatcher(options['concurrency'], options['per_destination'])
+        pruned_at = 0.0
+        try:
+            while True:
+                close_old_connections()
+                if time.monotonic() - pruned_at > PRUNE_EVERY:
+                    prune()
+                    pruned_at = time.monotonic()
+                sent = dispatcher.run_once()
+                if sent:
+                    self.stdout.write(f"Sent {sent} batch(es)")
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        finally:
+            dispatcher.close()
@@ -0,0 +1,30 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from webhooks.stub import StubServer
+
+
+class Command(BaseCommand):
+    help = "Run a local webhook receiver that prints what it receives (for trying out endpoints)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8099)
+        parser.add_argument('--secret', help='Endpoint secret to check signatures with')
+        parser.add_argument('--status', type=int, action='append', default=[],
+                            help='Status to answer with, in order (repeatable); 200 afterwards')
+
+    def handle(self, *args, **options):
+        def show(request, status):
+            signed = 'unchecked' if not options['secret'] else ('valid' if request['signed'] else 'INVALID')
+            self.stdout.write(f"{request['headers'].get('X-WorkZone-Event')} -> {status} (signature {signed})")
+            self.stdout.write(json.dumps(json.loads(request['body']), indent=2))
+
+        with StubServer(options['secret'], options['status'], port=options['port'], on_request=show) as stub:
+            self.stdout.write(f"Receiving webhooks at {stub.url}")
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                pass
@@ -0,0 +1,80 @@
+import secrets
+
+from django.conf import settings
+from django.db import models
+
+# Events employers can subscribe to
+EVENTS = (
+    ("application.created", "Application received"),
+    ("application.status_changed", "Application status changed"),
+)
+
+# Delivery Status
+DELIVERY_STATUS = (
+    ("pending", "Pending"),
+    ("delivered", "Delivered"),
+    ("dead", "Dead Letter"),
+)
+
+
+def generate_secret():
+    return secrets.token_hex(32)
+
+
+class WebhookEndpoint(models.Model):
+    """
+    An employer's subscription: the URL events are POSTed to, signed with `secret`
+    """
+    employer = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='webhook_endpoints', verbose_name="Employer"
+    )
+    url = models.URLField(max_length=500, verbose_name="URL")
+    events = models.JSONField(default=list, verbose_name="Events")
+    secret = models.CharField(max_length=64, default=generate_secret, verbose_name="Signing Secret")
+    # Above 1, up to this many events are sent together as {"events": [...]}
+    max_batch_size = models.PositiveSmallIntegerField(default=1, verbose_name="Events per Request")
+    is_active = models.BooleanField(default=True, verbose_name="Active")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
+
+    class Meta:
+        verbose_name = "Webhook Endpoint"
+        verbose_name_plural = "Webhook Endpoints"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return self.url
+
+
+class WebhookDelivery(models.Model):
+    """
+    One event queued for one endpoint; the durable queue `manage.py run_webhooks` works through
+    """
+    endpoint = models.ForeignKey(WebhookEndpoint, on_delete=models.CASCADE, related_name='deliveries', verbose_name="Endpoint")
+    event_id = models.CharField(max_length=32, verbose_name="Event ID")
+    event = models.CharField(max_length=50, choices=EVENTS, verbose_name="Event")
+    payload = models.JSONField(verbose_name="Payload")
+
+    status = models.CharField(max_length=20, choices=DELIVERY_STATUS, default="pending", verbose_name="Status")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Attempts")
+    next_attempt_at = models.DateTimeField(verbose_name="Next Attempt At")
+    # A worker's claim; the row is free again once `locked_until` passes
+    claim = models.CharField(max_length=32, blank=True, verbose_name="Claim")
+    locked_until = models.DateTimeField(null=True, blank=True, verbose_name="Locked Until")
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Last Response Status")
+    last_error = models.TextField(blank=True, verbose_name="Last Error")
+
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+    delivered_at = models.DateTimeField(null=True, blank=True, verbose_name="Delivered At")
+
+    class Meta:
+        verbose_name = "Webhook Delivery"
+        verbose_name_plural = "Webhook Deliveries"
+        ordering = ['-created_at']
+        indexes = [
+            # Workers pick up the deliveries that are due
+            models.Index(fields=['status', 'next_attempt_at'], name='delivery_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event} #{self.pk} ({self.status})"
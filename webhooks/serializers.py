@@ -0,0 +1,36 @@
+from rest_framework import serializers
+from .models import WebhookEndpoint, WebhookDelivery, EVENTS
+
+MAX_BATCH_SIZE = 100
+
+
+class WebhookEndpointSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WebhookEndpoint
+        fields = "__all__"
+        read_only_fields = ['employer', 'secret', 'created_at', 'updated_at']
+
+    def validate_url(self, url):
+        if not url.lower().startswith(('http://', 'https://')):
+            raise serializers.ValidationError('Use an http or https URL.')
+        return url
+
+    def validate_events(self, events):
+        known = {event for event, _ in EVENTS}
+        if not isinstance(events, list) or not events:
+            raise serializers.ValidationError('Subscribe to at least one event.')
+        unknown = [event for event in events if event not in known]
+        if unknown:
+            raise serializers.ValidationError(f"Unknown event(s): {', '.join(map(str, unknown))}.")
+        return sorted(set(events))
+
+    def validate_max_batch_size(self, size):
+        if not 1 <= size <= MAX_BATCH_SIZE:
+            raise serializers.ValidationError(f'Must be between 1 and {MAX_BATCH_SIZE}.')
+        return size
+
+
+class WebhookDeliverySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WebhookDelivery
+        exclude = ['claim', 'locked_until']
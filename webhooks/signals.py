@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from jobs.models import JobApplication
+from .events import application_payload, publish
+
+
+@receiver(post_save, sender=JobApplication)
+def application_saved(sender, instance, created, update_fields, **kwargs):
+    status_saved = update_fields is None or 'status' in update_fields
+    if created:
+        publish(instance.job.employer_id, 'application.created', application_payload(instance))
+    elif status_saved and instance.status_changed:
+        publish(
+            instance.job.employer_id, 'application.status_changed',
+            application_payload(instance, previous_status=instance._loaded_status),
+        )
+    if created or status_saved:
+        instance._loaded_status = instance.status
@@ -0,0 +1,94 @@
+"""
+A local webhook receiver for development and tests.
+
+`manage.py webhook_stub --secret <endpoint secret>` prints every request
+it receives and whether its signature checks out. `StubServer` runs the
+same receiver in a thread, records the requests and answers with the
+statuses it is given (200 once they run out).
+"""
+import json
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .signing import SIGNATURE_HEADER, verify
+
+
+class StubServer:
+    def __init__(self, secret=None, statuses=(), host='127.0.0.1', port=0, on_request=None):
+        self.secret = secret
+        self.statuses = deque(statuses)
+        self.requests = []  # {'path', 'headers', 'body', 'signed', 'connection'}
+        self.on_request = on_request
+        self._lock = threading.Lock()
+        self._thread = None
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}/hooks'
+
+    @property
+    def connections(self):
+        """Distinct client connections the requests arrived on"""
+        return len({request['connection'] for request in self.requests})
+
+    def events(self):
+        """Every event received, unwrapping batches"""
+        events = []
+        for request in self.requests:
+            document = json.loads(request['body'])
+            events.extend(document['events'] if 'events' in document else [document])
+        return events
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _respond(self, handler):
+        body = handler.rfile.read(int(handler.headers.get('Content-Length') or 0))
+        request = {
+            'path': handler.path,
+            'headers': dict(handler.headers),
+            'body': body,
+            'signed': self.secret is None or verify(self.secret, handler.headers.get(SIGNATURE_HEADER), body),
+            'connection': handler.client_address,
+        }
+        with self._lock:
+            self.requests.append(request)
+            status = self.statuses.popleft() if self.statuses else 200
+        if self.on_request:
+            self.on_request(request, status)
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'text/plain')
+        handler.send_header('Content-Length', '2')
+        handler.end_headers()
+        handler.wfile.write(b'ok')
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive, as most receivers do
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                stub._respond(self)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
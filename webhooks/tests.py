@@ -0,0 +1,195 @@
+import json
+import socket
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from jobs.models import Job, JobApplication, Resume
+from .dispatch import Dispatcher
+from .models import WebhookDelivery, WebhookEndpoint
+from .signing import SIGNATURE_HEADER, sign, verify
+from .stub import StubServer
+
+User = get_user_model()
+
+
+class SigningTests(SimpleTestCase):
+    def test_signatures_cover_the_body_and_expire(self):
+        header = sign('secret', b'{"id":1}', timestamp=1_000)
+        self.assertTrue(verify('secret', header, b'{"id":1}', now=1_100))
+        self.assertFalse(verify('secret', header, b'{"id":2}', now=1_100))
+        self.assertFalse(verify('other', header, b'{"id":1}', now=1_100))
+        self.assertFalse(verify('secret', header, b'{"id":1}', now=2_000))
+        self.assertFalse(verify('secret', 'garbage', b'{"id":1}'))
+
+
+@override_settings(WEBHOOK_ALLOW_PRIVATE_HOSTS=True)
+class WebhookTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='x', role='employer',
+        )
+        self.job = Job.objects.create(
+            employer=self.employer, title='Backend Engineer', description='', requirements='', responsibilities='',
+            location='Lagos', external_id='be-1',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.employer)
+        self.dispatcher = Dispatcher(concurrency=4, per_destination=2, timeout=5)
+        self.addCleanup(self.dispatcher.close)
+
+    def stub(self, **options):
+        stub = StubServer(**options).start()
+        self.addCleanup(stub.stop)
+        return stub
+
+    def subscribe(self, url, **data):
+        response = self.client.post('/api/webhooks/', {
+            'url': url, 'events': ['application.created', 'application.status_changed'], **data,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return WebhookEndpoint.objects.get(pk=response.data['id'])
+
+    def apply(self, number):
+        applicant = User.objects.create_user(
+            username=f'applicant{number}', email=f'applicant{number}@example.com', role='applicant',
+        )
+        resume = Resume.objects.create(user=applicant, title='CV', file='resumes/cv.pdf')
+        return JobApplication.objects.create(job=self.job, applicant=applicant, resume=resume)
+
+    def drain(self):
+        while self.dispatcher.run_once():
+            pass
+
+    def test_applications_are_queued_and_delivered_signed(self):
+        stub = self.stub()
+        endpoint = self.subscribe(stub.url)
+        stub.secret = endpoint.secret
+        WebhookEndpoint.objects.create(employer=self.employer, url=stub.url, events=['application.status_changed'])
+
+        applications = [self.apply(number) for number in range(3)]
+        # Queued with the application, sent by the worker
+        self.assertEqual(WebhookDelivery.objects.count(), 3)
+        self.assertEqual(stub.requests, [])
+        self.drain()
+
+        self.assertEqual(len(stub.requests), 3)
+        self.assertTrue(all(request['signed'] for request in stub.requests))
+        self.assertTrue(all(request['path'] == '/hooks' for request in stub.requests))
+        # Kept-alive connections are reused
+        self.assertLessEqual(stub.connections, 2)
+        event = stub.events()[0]
+        self.assertEqual(event['type'], 'application.created')
+        self.assertEqual(event['data']['job'], {'id': self.job.pk, 'external_id': 'be-1', 'title': 'Backend Engineer'})
+        self.assertEqual({event['data']['application']['id'] for event in stub.events()}, {a.pk for a in applications})
+        self.assertFalse(WebhookDelivery.objects.exclude(status="delivered").exists())
+
+        # Only a change of status is published, to both endpoints
+        application = JobApplication.objects.get(pk=applications[0].pk)
+        application.employer_notes = 'Strong'
+        application.save()
+        application.status = 'Under_Review'
+        application.save(update_fields=['status'])
+        self.drain()
+        changes = [event for event in stub.events() if event['type'] == 'application.status_changed']
+        self.assertEqual(len(changes), 2)
+        self.assertEqual(changes[0]['data']['application']['previous_status'], 'Applied')
+        self.assertEqual(changes[0]['data']['application']['status'], 'Under_Review')
+
+    def test_batches_up_to_the_endpoint_size(self):
+        stub = self.stub()
+        endpoint = self.subscribe(stub.url, max_batch_size=2)
+        for number in range(3):
+            self.apply(number)
+        self.drain()
+        # Both batches go out in the same round, in either order
+        self.assertEqual(sorted(len(json.loads(request['body'])['events']) for request in stub.requests), [1, 2])
+        for request in stub.requests:
+            self.assertTrue(verify(endpoint.secret, request['headers'][SIGNATURE_HEADER], request['body']))
+        self.assertEqual(WebhookDelivery.objects.filter(status="delivered").count(), 3)
+
+    @override_settings(WEBHOOK_MAX_ATTEMPTS=2)
+    def test_failures_back_off_then_become_dead_letters(self):
+        stub = self.stub(statuses=[500, 503])
+        self.subscribe(stub.url)
+        self.apply(1)
+        self.dispatcher = Dispatcher(timeout=5)
+        self.addCleanup(self.dispatcher.close)
+
+        self.assertEqual(self.dispatcher.run_once(), 1)
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual((delivery.status, delivery.attempts, delivery.response_status), ("pending", 1, 500))
+        # Not due again until its backoff has passed
+        self.assertEqual(self.dispatcher.run_once(), 0)
+
+        WebhookDelivery.objects.update(next_attempt_at=delivery.created_at)
+        with self.assertLogs('webhooks.dispatch', 'WARNING'):
+            self.dispatcher.run_once()
+        delivery.refresh_from_db()
+        self.assertEqual((delivery.status, delivery.attempts), ("dead", 2))
+
+        response = self.client.get('/api/webhooks/deliveries/', {'status': 'dead'})
+        self.assertEqual([row['id'] for row in response.data['results']], [delivery.pk])
+
+        response = self.client.post(f'/api/webhooks/deliveries/{delivery.pk}/retry/')
+        self.assertEqual(response.data, {'requeued': 1})
+        self.drain()
+        delivery.refresh_from_db()
+        self.assertEqual((delivery.status, delivery.attempts), ("delivered", 1))
+        self.assertEqual(len(stub.requests), 3)
+
+    def test_endpoints_are_validated_and_private(self):
+        response = self.client.post('/api/webhooks/', {'url': 'ftp://example.com/', 'events': ['nope']}, format='json')
+        self.assertEqual(set(response.data), {'url', 'events'})
+
+        other = User.objects.create_user(username='other', email='other@example.com', password='x', role='employer')
+        endpoint = WebhookEndpoint.objects.create(employer=other, url='https://example.com/', events=['application.created'])
+        self.assertEqual(self.client.get(f'/api/webhooks/{endpoint.pk}/').status_code, 404)
+        self.assertEqual(self.client.get('/api/webhooks/').data, [])
+
+        applicant = User.objects.create_user(username='a', email='a@example.com', password='x', role='applicant')
+        self.client.force_authenticate(applicant)
+        response = self.client.post('/api/webhooks/', {'url': 'https://example.com/', 'events': ['application.created']}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(WEBHOOK_ALLOW_PRIVATE_HOSTS=False)
+    def test_private_addresses_are_refused(self):
+        stub = self.stub()
+        self.subscribe(stub.url)
+        self.apply(1)
+        self.dispatcher.run_once()
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual(stub.requests, [])
+        self.assertIn('non-public address', delivery.last_error)
+
+    @override_settings(WEBHOOK_ALLOW_PRIVATE_HOSTS=False)
+    def test_connections_go_to_the_checked_address(self):
+        stub = self.stub()
+        port = stub.server.server_address[1]
+        self.subscribe(f'http://hooks.example:{port}/hooks')
+        self.apply(1)
+
+        # The name first resolves to a public address, then to a private one
+        answers = iter(['93.184.216.34', '127.0.0.1'])
+        lookups, connected = [], []
+        getaddrinfo, create_connection = socket.getaddrinfo, socket.create_connection
+
+        def resolve(host, *args, **kwargs):
+            if host != 'hooks.example':
+                return getaddrinfo(host, *args, **kwargs)
+            lookups.append(host)
+            return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, '', (next(answers), port))]
+
+        def connect(address, *args):
+            connected.append(address)
+            # Stands in for the public host
+            return create_connection(('127.0.0.1', port), *args)
+
+        with mock.patch('socket.getaddrinfo', resolve), mock.patch('socket.create_connection', connect):
+            self.drain()
+        self.assertEqual(lookups, ['hooks.example'])
+        self.assertEqual(connected, [('93.184.216.34', port)])
+        self.assertEqual(stub.requests[0]['headers']['Host'], f'hooks.example:{port}')
+        self.assertEqual(WebhookDelivery.objects.get().status, 'delivered')
@@ -0,0 +1,10 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path('webhooks/', views.WebhookEndpointListView.as_view(), name='webhook-list'),
+    path('webhooks/<int:pk>/', views.WebhookEndpointDetailView.as_view(), name='webhook-detail'),
+    path('webhooks/deliveries/', views.WebhookDeliveryListView.as_view(), name='webhook-delivery-list'),
+    path('webhooks/deliveries/retry/', views.WebhookDeliveryRetryView.as_view(), name='webhook-delivery-retry-dead'),
+    path('webhooks/deliveries/<int:pk>/retry/', views.WebhookDeliveryRetryView.as_view(), name='webhook-delivery-retry'),
+]
@@ -0,0 +1,108 @@
+from django.shortcuts import get_object_or_404
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import IsAuthenticated
+from api.instrumentation import query_budget
+from .dispatch import requeue
+from .models import WebhookEndpoint, WebhookDelivery, DELIVERY_STATUS
+from .serializers import WebhookEndpointSerializer, WebhookDeliverySerializer
+
+
+class DeliveryPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+# --- Endpoint Views ---
+@query_budget(get=2, post=3)
+class WebhookEndpointListView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        endpoints = WebhookEndpoint.objects.filter(employer=request.user)
+        return Response(WebhookEndpointSerializer(endpoints, many=True).data, status=status.HTTP_200_OK)
+
+    def post(self, request):
+        if not request.user.is_employer:
+            return Response({'error': 'Only employers can subscribe to webhooks.'}, status=status.HTTP_403_FORBIDDEN)
+        serializer = WebhookEndpointSerializer(data=request.data)
+        if serializer.is_valid():
+            serializer.save(employer=request.user)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@query_budget(get=2, put=3, delete=4)
+class WebhookEndpointDetailView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        endpoint = get_object_or_404(WebhookEndpoint, pk=pk, employer=request.user)
+        return Response(WebhookEndpointSerializer(endpoint).data, status=status.HTTP_200_OK)
+
+    def put(self, request, pk):
+        endpoint = get_object_or_404(WebhookEndpoint, pk=pk, employer=request.user)
+        serializer = WebhookEndpointSerializer(endpoint, data=request.data, partial=True)
+        if serializer.is_valid():
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def delete(self, request, pk):
+        endpoint = get_object_or_404(WebhookEndpoint, pk=pk, employer=request.user)
+        endpoint.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# --- Delivery Views ---
+@query_budget(3)
+class WebhookDeliveryListView(APIView):
+    """
+    The employer's deliveries, newest first. `?status=dead` lists the dead
+    letters; `?endpoint=` narrows to one endpoint.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        deliveries = WebhookDelivery.objects.filter(endpoint__employer=request.user).order_by('-created_at', '-pk')
+        delivery_status = request.query_params.get('status')
+        if delivery_status:
+            if delivery_status not in dict(DELIVERY_STATUS):
+                return Response({'error': 'Unknown status.'}, status=status.HTTP_400_BAD_REQUEST)
+            deliveries = deliveries.filter(status=delivery_status)
+        endpoint = request.query_params.get('endpoint')
+        if endpoint:
+            if not endpoint.isdigit():
+                return Response({'error': 'endpoint must be a number.'}, status=status.HTTP_400_BAD_REQUEST)
+            deliveries = deliveries.filter(endpoint_id=endpoint)
+        paginator = DeliveryPagination()
+        page = paginator.paginate_queryset(deliveries, request, view=self)
+        return paginator.get_paginated_response(WebhookDeliverySerializer(page, many=True).data)
+
+
+@query_budget(2)
+class WebhookDeliveryRetryView(APIView):
+    """
+    Queue a delivery again (`deliveries/<pk>/retry/`), or every dead letter
+    at once (`deliveries/retry/`, optionally for one `endpoint`).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, pk=None):
+        deliveries = WebhookDelivery.objects.filter(endpoint__employer=request.user)
+        if pk is not None:
+            deliveries = deliveries.filter(pk=pk).exclude(status="pending")
+        else:
+            deliveries = deliveries.filter(status="dead")
+            endpoint = request.data.get('endpoint')
+            if endpoint is not None:
+                if not str(endpoint).isdigit():
+                    return Response({'error': 'endpoint must be a number.'}, status=status.HTTP_400_BAD_REQUEST)
+                deliveries = deliveries.filter(endpoint_id=endpoint)
+        requeued = requeue(deliveries)
+        if pk is not None and not requeued:
+            return Response({'error': 'Delivery not found or already queued.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'requeued': requeued}, status=status.HTTP_200_OK)